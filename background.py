@@ -0,0 +1,149 @@
+"""
+Run long CSV jobs on a worker thread without freezing the Tk main loop.
+
+The worker thread never touches Tk widgets. It pushes events onto a queue
+that the main thread drains with ``root.after``, which is the only safe way
+to hand results back to Tkinter.
+"""
+
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+from common import ProcessingCancelled
+
+# How often the main thread drains the event queue
+POLL_INTERVAL_MS = 100
+
+
+def format_duration(seconds: float) -> str:
+    """Render a duration as ``H:MM:SS`` (or ``M:SS`` under an hour)."""
+    seconds = int(round(seconds))
+    hours, remainder = divmod(seconds, 3600)
+    minutes, seconds = divmod(remainder, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes}:{seconds:02d}"
+
+
+@dataclass
+class ProgressSnapshot:
+    """Progress of a running job, with derived throughput and ETA."""
+    rows: int
+    bytes_done: int
+    total_bytes: int
+    elapsed: float
+
+    @property
+    def fraction(self) -> float:
+        """Share of the input consumed, between 0.0 and 1.0."""
+        if self.total_bytes <= 0:
+            return 0.0
+        return min(self.bytes_done / self.total_bytes, 1.0)
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def eta_seconds(self) -> Optional[float]:
+        """Estimated seconds left, extrapolated from the bytes consumed so far."""
+        if self.bytes_done <= 0 or self.elapsed <= 0:
+            return None
+        return self.elapsed * (self.total_bytes - self.bytes_done) / self.bytes_done
+
+    def describe(self) -> str:
+        """One-line summary for the status bar."""
+        text = f"{self.rows:,} rows · {self.rows_per_second:,.0f} rows/sec · {self.fraction * 100:.0f}%"
+        eta = self.eta_seconds
+        if eta is not None:
+            text += f" · ETA {format_duration(eta)}"
+        return text
+
+
+class BackgroundJob:
+    """
+    Run ``target`` on a daemon thread and report back on the Tk main thread.
+
+    ``target`` receives the job and should pass ``job.report_progress`` and
+    ``job.cancel_event`` to the engine functions it calls. Exactly one of
+    ``on_done``, ``on_cancelled`` or ``on_error`` is called when it finishes.
+    """
+
+    def __init__(
+        self,
+        root,
+        target: Callable[['BackgroundJob'], Any],
+        total_bytes: int,
+        on_progress: Callable[[ProgressSnapshot], None],
+        on_done: Callable[[Any], None],
+        on_error: Callable[[Exception], None],
+        on_cancelled: Callable[[], None],
+    ):
+        self.root = root
+        self.target = target
+        self.total_bytes = total_bytes
+        self.on_progress = on_progress
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_cancelled = on_cancelled
+        self.cancel_event = threading.Event()
+        self._events = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._started_at = 0.0
+
+    def start(self) -> None:
+        """Start the worker thread and begin polling for its events."""
+        self._started_at = time.perf_counter()
+        self._thread.start()
+        self.root.after(POLL_INTERVAL_MS, self._poll)
+
+    def cancel(self) -> None:
+        """Ask the worker to stop at its next cancellation check."""
+        self.cancel_event.set()
+
+    @property
+    def running(self) -> bool:
+        return self._thread.is_alive()
+
+    def report_progress(self, rows: int, bytes_done: int) -> None:
+        """Progress callback for the engine; safe to call from the worker thread."""
+        elapsed = time.perf_counter() - self._started_at
+        self._events.put(('progress', ProgressSnapshot(rows, bytes_done, self.total_bytes, elapsed)))
+
+    def _run(self) -> None:
+        try:
+            result = self.target(self)
+        except ProcessingCancelled:
+            self._events.put(('cancelled', None))
+        except Exception as e:
+            self._events.put(('error', e))
+        else:
+            self._events.put(('done', result))
+
+    def _poll(self) -> None:
+        # Only the most recent progress event matters; skip stale ones
+        latest_progress = None
+        while True:
+            try:
+                kind, payload = self._events.get_nowait()
+            except queue.Empty:
+                break
+            if kind == 'progress':
+                latest_progress = payload
+                continue
+            if latest_progress is not None:
+                self.on_progress(latest_progress)
+            if kind == 'done':
+                self.on_done(payload)
+            elif kind == 'cancelled':
+                self.on_cancelled()
+            else:
+                self.on_error(payload)
+            return
+
+        if latest_progress is not None:
+            self.on_progress(latest_progress)
+        self.root.after(POLL_INTERVAL_MS, self._poll)
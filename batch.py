@@ -0,0 +1,373 @@
+"""
+Batch filtering of many CSV files on one shared worker pool.
+
+Inputs come from a directory (every ``*.csv`` below it, compressed ones
+included) or a manifest file (one path per line). Files are submitted
+largest first, so the big ones do not end up running alone at the end of
+the batch. Each file is filtered in one worker by the byte-level engine of
+byte_scan. A failed file is recorded and the batch carries on.
+
+Every finished file is appended to a journal in the output directory. A batch
+that is started again with the same output directory skips files the journal
+records as done, as long as the file, its output (size and modification
+time) and the selected columns and policies are unchanged. At the end one
+aggregated report is written as JSON.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, Iterable, List, Optional
+
+from byte_scan import filter_csv_bytes
+from char_policy import DEFAULT_POLICY, CharPolicy
+from column_rules import ColumnRules, Columns, require_columns
+from common import REPORT_NAME, default_worker_count
+from filter_engine import (
+    DEFAULT_CHUNKSIZE,
+    DEFAULT_COLUMNS,
+    ProcessingCancelled,
+    ProgressCallback,
+    check_cancelled,
+    read_header,
+)
+from formats import CODECS, output_path_for, strip_input_extension
+
+# Written to the output directory
+JOURNAL_NAME = 'batch_journal.jsonl'
+
+# Names of the files a directory batch picks up
+INPUT_SUFFIXES = ('.csv',) + tuple('.csv' + extension for extensions, _ in CODECS.values() for extension in extensions)
+
+# How often the scheduler wakes up to check for cancellation
+WAIT_SECONDS = 0.2
+
+
+@dataclass
+class BatchItem:
+    """One input file and where its matching rows go."""
+    input: str
+    output: str
+    size: int
+    mtime_ns: int
+    selection: str = ''
+
+
+@dataclass
+class FileResult:
+    """Outcome of filtering one file, as stored in the journal and report."""
+    input: str
+    output: str
+    size: int
+    mtime_ns: int
+    total_rows: int = 0
+    matching_rows: int = 0
+    seconds: float = 0.0
+    error: Optional[str] = None
+    resumed: bool = False
+    selection: str = ''
+    output_size: int = 0
+    output_mtime_ns: int = 0
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.size / self.seconds if self.seconds > 0 else 0.0
+
+    def to_dict(self) -> Dict:
+        """JSON-serialisable form with derived throughput and match rate."""
+        result = asdict(self)
+        result['bytes_per_second'] = round(self.bytes_per_second, 1)
+        result['percentage'] = round(self.matching_rows / self.total_rows * 100, 4) if self.total_rows else 0.0
+        return result
+
+
+def discover_inputs(source: str) -> List[str]:
+    """
+    List the CSV files of a batch.
+
+    Args:
+        source: A directory, searched recursively for ``*.csv`` files (and
+            ``*.csv.gz``, ``*.csv.bz2``, ``*.csv.zst``), or a
+            manifest file with one path per line (blank lines and lines
+            starting with ``#`` are ignored; relative paths are resolved
+            against the manifest's directory)
+
+    Returns:
+        List[str]: Input paths, without duplicates
+
+    Raises:
+        FileNotFoundError: If ``source`` does not exist
+    """
+    if os.path.isdir(source):
+        paths = []
+        for directory, _, names in os.walk(source):
+            paths.extend(os.path.join(directory, name) for name in names if name.lower().endswith(INPUT_SUFFIXES))
+        return sorted(paths)
+
+    base = os.path.dirname(os.path.abspath(source))
+    paths = []
+    with open(source, 'r', encoding='utf-8') as manifest:
+        for line in manifest:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                paths.append(line if os.path.isabs(line) else os.path.join(base, line))
+    return list(dict.fromkeys(paths))
+
+
+def selection_digest(columns: Columns, policy: CharPolicy = DEFAULT_POLICY) -> str:
+    """Hash of the requested columns, their policies and how they combine, as recorded in the journal."""
+    if isinstance(columns, ColumnRules):
+        parts = [columns.combine] + [f"{rule.selector}={(rule.policy or policy).key}" for rule in columns.rules]
+    else:
+        parts = ['any'] + [f"{column}={policy.key}" for column in columns]
+    return hashlib.sha1('\0'.join(parts).encode('utf-8')).hexdigest()
+
+
+def plan_batch(inputs: Iterable[str], output_dir: str, output_format: str = 'csv',
+               selection: str = '') -> List[BatchItem]:
+    """
+    Pair inputs with output paths and order them largest first.
+
+    Outputs mirror the inputs' layout below their common directory, so files
+    with the same name in different folders do not collide, and are named
+    ``<stem>_filtered`` plus the extension of ``output_format``. Missing inputs
+    are kept with size 0; they fail when processed and show up in the report.
+    Every item carries ``selection`` (see selection_digest).
+    """
+    inputs = [os.path.abspath(path) for path in inputs]
+    output_dir = os.path.abspath(output_dir)
+    if not inputs:
+        return []
+    root = os.path.commonpath([os.path.dirname(path) for path in inputs])
+    items = []
+    for path in inputs:
+        relative = os.path.relpath(path, root)
+        output = output_path_for(os.path.join(output_dir, strip_input_extension(relative) + '_filtered'), output_format)
+        try:
+            stat = os.stat(path)
+            size, mtime_ns = stat.st_size, stat.st_mtime_ns
+        except OSError:
+            size, mtime_ns = 0, 0
+        items.append(BatchItem(path, output, size, mtime_ns, selection))
+    items.sort(key=lambda item: item.size, reverse=True)
+    return items
+
+
+def load_journal(journal_path: str) -> Dict[str, FileResult]:
+    """
+    Read the finished files recorded by an earlier run.
+
+    Returns:
+        Dict[str, FileResult]: The latest result per input path
+    """
+    finished = {}
+    try:
+        with open(journal_path, 'r', encoding='utf-8') as journal:
+            for line in journal:
+                try:
+                    result = FileResult(**json.loads(line))
+                except (ValueError, TypeError):
+                    continue  # A line cut short when the batch was killed
+                finished[result.input] = result
+    except FileNotFoundError:
+        pass
+    return finished
+
+
+def is_finished(item: BatchItem, previous: Optional[FileResult]) -> bool:
+    """True if ``previous`` filtered the current input with the same selection and wrote the current output."""
+    if previous is None or previous.error is not None:
+        return False
+    try:
+        stat = os.stat(item.output)
+    except OSError:
+        return False
+    return (
+        (previous.size, previous.mtime_ns, previous.output, previous.selection)
+        == (item.size, item.mtime_ns, item.output, item.selection)
+        and (previous.output_size, previous.output_mtime_ns) == (stat.st_size, stat.st_mtime_ns)
+    )
+
+
+def _new_result(item: BatchItem) -> FileResult:
+    return FileResult(item.input, item.output, item.size, item.mtime_ns, selection=item.selection)
+
+
+def filter_item(item: BatchItem, columns: Columns, chunksize: int, policy: CharPolicy) -> FileResult:
+    """
+    Filter one file in the current process; errors are captured, not raised.
+
+    The checks match the GUI: named columns must be present and the
+    selection must not be empty (see column_rules.require_columns), then
+    the file is filtered with the byte-level engine. The output format
+    follows the output's extension.
+    """
+    result = _new_result(item)
+    start = time.perf_counter()
+    try:
+        selection = require_columns(read_header(item.input), columns, policy)
+        os.makedirs(os.path.dirname(item.output) or '.', exist_ok=True)
+        stats = filter_csv_bytes(item.input, item.output, selection, chunksize)
+        result.total_rows = stats.total_rows
+        result.matching_rows = stats.matching_rows
+        output = os.stat(item.output)
+        result.output_size, result.output_mtime_ns = output.st_size, output.st_mtime_ns
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {e}"
+        # Do not leave a partial output that looks like a finished one
+        if os.path.exists(item.output):
+            os.remove(item.output)
+    result.seconds = round(time.perf_counter() - start, 6)
+    return result
+
+
+def summarize(results: List[FileResult], seconds: float) -> Dict:
+    """Totals across all files of a batch."""
+    processed_bytes = sum(result.size for result in results if not result.resumed)
+    return {
+        'files': len(results),
+        'succeeded': sum(result.error is None for result in results),
+        'failed': sum(result.error is not None for result in results),
+        'resumed': sum(result.resumed for result in results),
+        'bytes': sum(result.size for result in results),
+        'total_rows': sum(result.total_rows for result in results),
+        'matching_rows': sum(result.matching_rows for result in results),
+        'seconds': round(seconds, 6),
+        'bytes_per_second': round(processed_bytes / seconds, 1) if seconds > 0 else 0.0,
+    }
+
+
+def run_batch(
+    source: str,
+    output_dir: str,
+    columns: Columns = DEFAULT_COLUMNS,
+    workers: int = 0,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    policy: CharPolicy = DEFAULT_POLICY,
+    progress: Optional[ProgressCallback] = None,
+    cancel_event: Optional[threading.Event] = None,
+    on_result: Optional[Callable[[FileResult], None]] = None,
+    output_format: str = 'csv',
+) -> Dict:
+    """
+    Filter every CSV file of a directory or manifest.
+
+    Args:
+        source: Directory or manifest file (see discover_inputs)
+        output_dir: Directory for the outputs, the journal and the report
+        columns: Names of the columns to check, or ColumnRules resolved
+            against each file's header
+        workers: Size of the shared process pool (0 uses every CPU)
+        chunksize: Rows per chunk where a file is parsed in chunks
+        policy: Characters considered allowed in columns without a policy of their own
+        progress: Called after every file with the rows and input bytes finished so far
+        cancel_event: Set by another thread to stop the batch; running files
+            finish and are journaled, queued ones are dropped
+        on_result: Called with each file's result as soon as it is known
+        output_format: Format of the outputs (see formats.OUTPUT_FORMATS)
+
+    Returns:
+        Dict: The report that was written, with ``files`` and ``totals``
+
+    Raises:
+        ProcessingCancelled: If ``cancel_event`` was set; the journal keeps
+            the files finished so far for the next run
+    """
+    if not isinstance(columns, ColumnRules):
+        columns = list(columns)  # Iterated once per file
+    workers = workers or default_worker_count()
+    started = time.perf_counter()
+    os.makedirs(output_dir, exist_ok=True)
+    journal_path = os.path.join(output_dir, JOURNAL_NAME)
+
+    # Outputs written inside the source directory are not inputs
+    output_root = os.path.join(os.path.abspath(output_dir), '')
+    inputs = [path for path in discover_inputs(source) if not os.path.abspath(path).startswith(output_root)]
+
+    previous = load_journal(journal_path)
+    results: List[FileResult] = []
+    pending: List[BatchItem] = []
+    for item in plan_batch(inputs, output_dir, output_format, selection_digest(columns, policy)):
+        if is_finished(item, previous.get(item.input)):
+            results.append(FileResult(**dict(asdict(previous[item.input]), resumed=True)))
+        else:
+            pending.append(item)
+
+    rows_done = sum(result.total_rows for result in results)
+    bytes_done = sum(result.size for result in results)
+
+    with open(journal_path, 'a', encoding='utf-8') as journal:
+        def record(result: FileResult) -> None:
+            nonlocal rows_done, bytes_done
+            results.append(result)
+            journal.write(json.dumps(asdict(result)) + '\n')
+            journal.flush()
+            os.fsync(journal.fileno())
+            rows_done += result.total_rows
+            bytes_done += result.size
+            if on_result is not None:
+                on_result(result)
+            if progress is not None:
+                progress(rows_done, bytes_done)
+
+        if workers <= 1:
+            for item in pending:
+                check_cancelled(cancel_event)
+                record(filter_item(item, columns, chunksize, policy))
+        else:
+            _run_on_pool(pending, workers, columns, chunksize, policy, record, cancel_event)
+
+    report = {
+        'source': os.path.abspath(source),
+        'output_dir': os.path.abspath(output_dir),
+        'files': [result.to_dict() for result in results],
+        'totals': summarize(results, time.perf_counter() - started),
+    }
+    with open(os.path.join(output_dir, REPORT_NAME), 'w', encoding='utf-8') as handle:
+        json.dump(report, handle, indent=2)
+    return report
+
+
+def _run_on_pool(
+    items: List[BatchItem],
+    workers: int,
+    columns: Columns,
+    chunksize: int,
+    policy: CharPolicy,
+    record: Callable[[FileResult], None],
+    cancel_event: Optional[threading.Event],
+) -> None:
+    """Submit ``items`` in order to a process pool and record results as they complete."""
+    executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        # The pool starts queued work in submission order, i.e. largest first
+        futures = {executor.submit(filter_item, item, columns, chunksize, policy): item for item in items}
+        remaining = set(futures)
+        while remaining:
+            check_cancelled(cancel_event)
+            done, remaining = wait(remaining, timeout=WAIT_SECONDS, return_when=FIRST_COMPLETED)
+            for future in done:
+                record(_result_of(future, futures[future]))
+    except ProcessingCancelled:
+        # Let running files finish so their work is journaled; drop the queue
+        executor.shutdown(wait=True, cancel_futures=True)
+        for future in remaining:
+            if not future.cancelled():
+                record(_result_of(future, futures[future]))
+        raise
+    finally:
+        executor.shutdown(wait=True)
+
+
+def _result_of(future, item: BatchItem) -> FileResult:
+    try:
+        return future.result()
+    except Exception as e:
+        # The worker died (e.g. killed for memory); the next run retries the file
+        result = _new_result(item)
+        result.error = f"{type(e).__name__}: {e}"
+        return result
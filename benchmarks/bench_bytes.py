@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Benchmark the byte-level filter against the streaming filter at several
+shares of non-ASCII rows.
+
+Usage:
+    python benchmarks/bench_bytes.py [rows] [extra_columns]
+"""
+
+import filecmp
+import os
+import sys
+import tempfile
+import time
+
+# Add the project root to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from byte_scan import filter_csv_bytes
+from datagen import add_filler_columns, make_frame
+from filter_engine import filter_csv_streaming
+
+SPECIAL_RATIOS = [0.0, 0.0001, 0.001, 0.01, 0.1]
+
+
+def time_it(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    extra_columns = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    print(f"Rows: {rows}  columns: {extra_columns + 3}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for ratio in SPECIAL_RATIOS:
+            input_path = os.path.join(workdir, "input.csv")
+            frame = add_filler_columns(make_frame(rows, special_ratio=ratio), extra_columns)
+            frame.to_csv(input_path, index=False)
+            size_mb = os.path.getsize(input_path) / (1024 * 1024)
+
+            streaming_path = os.path.join(workdir, "streaming.csv")
+            bytes_path = os.path.join(workdir, "bytes.csv")
+            stats, streaming_secs = time_it(filter_csv_streaming, input_path, streaming_path)
+            _, bytes_secs = time_it(filter_csv_bytes, input_path, bytes_path)
+            if not filecmp.cmp(streaming_path, bytes_path, shallow=False):
+                print("Output mismatch between streaming and byte-level filters!")
+                sys.exit(1)
+
+            print(
+                f"  {ratio:>7.2%} special ({stats.matching_rows:>6} matches): "
+                f"streaming {size_mb / streaming_secs:7.1f} MB/s  "
+                f"bytes {size_mb / bytes_secs:7.1f} MB/s  "
+                f"speedup {streaming_secs / bytes_secs:5.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
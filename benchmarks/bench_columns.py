@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark checking 1, 10 and 100 columns.
+
+Compares the one-pass ColumnSelection mask with a per-column loop (one
+column_mask call per column, as the mask was built before column rules)
+on frames read back from CSV, then times a whole byte-level filter run
+selecting the columns with a regex rule.
+
+Usage:
+    python benchmarks/bench_columns.py [rows] [special_ratio]
+"""
+
+import io
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+# Add the project root to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from byte_scan import filter_csv_bytes
+from char_policy import DEFAULT_POLICY
+from column_rules import column_mask, parse_rules
+from datagen import make_frame
+from filter_engine import READ_OPTIONS
+
+COLUMN_COUNTS = [1, 10, 100]
+
+
+def make_wide_frame(rows: int, columns: int, special_ratio: float) -> pd.DataFrame:
+    """``columns`` text columns named Text0.., each drawn with its own seed."""
+    return pd.DataFrame({
+        f'Text{index}': make_frame(rows, special_ratio, seed=index)['Title'] for index in range(columns)
+    })
+
+
+def per_column_mask(frame: pd.DataFrame, columns) -> pd.Series:
+    mask = pd.Series(False, index=frame.index)
+    for column in columns:
+        mask |= column_mask(frame[column], DEFAULT_POLICY)
+    return mask
+
+
+def best_of(func, repeat: int = 3) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    special_ratio = float(sys.argv[2]) if len(sys.argv) > 2 else 0.01
+    print(f"Rows: {rows}  special: {special_ratio:.1%}")
+    print(f"{'columns':>8}{'per column':>14}{'one pass':>12}{'speedup':>10}{'filter MB/s':>14}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for count in COLUMN_COUNTS:
+            text = make_wide_frame(rows, count, special_ratio).to_csv(index=False)
+            frame = pd.read_csv(io.StringIO(text), **READ_OPTIONS)
+            columns = frame.columns.tolist()
+            selection = parse_rules('re:^Text').resolve(columns)
+            assert selection.mask(frame).equals(per_column_mask(frame, columns))
+
+            loop_secs = best_of(lambda: per_column_mask(frame, columns))
+            one_pass_secs = best_of(lambda: selection.mask(frame))
+
+            input_path = os.path.join(workdir, f"wide{count}.csv")
+            with open(input_path, 'w', encoding='utf-8') as handle:
+                handle.write(text)
+            output_path = os.path.join(workdir, f"out{count}.csv")
+            filter_secs = best_of(lambda: filter_csv_bytes(input_path, output_path, parse_rules('re:^Text')), 1)
+            size_mb = os.path.getsize(input_path) / (1024 * 1024)
+            print(
+                f"{count:>8}{loop_secs:>13.4f}s{one_pass_secs:>11.4f}s{loop_secs / one_pass_secs:>9.2f}x"
+                f"{size_mb / filter_secs:>14.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
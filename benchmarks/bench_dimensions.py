@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Benchmark the streaming dimension counter against pd.read_csv(...).shape.
+
+Usage:
+    python benchmarks/bench_dimensions.py [rows]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+# Add the project root to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from csv_bytes import count_dimensions
+from datagen import write_csv
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    with tempfile.TemporaryDirectory() as workdir:
+        path = write_csv(os.path.join(workdir, "input.csv"), rows)
+        size_mb = os.path.getsize(path) / (1024 * 1024)
+
+        start = time.perf_counter()
+        expected = pd.read_csv(path).shape
+        pandas_secs = time.perf_counter() - start
+
+        start = time.perf_counter()
+        counted = count_dimensions(path)
+        counter_secs = time.perf_counter() - start
+
+    if counted != expected:
+        print(f"Dimension mismatch: {counted} != {expected}")
+        sys.exit(1)
+
+    print(f"Rows: {rows}  size: {size_mb:.1f} MB  dimensions: {counted}")
+    print(f"  pd.read_csv      : {pandas_secs:7.3f}s  {size_mb / pandas_secs:8.1f} MB/s")
+    print(f"  count_dimensions : {counter_secs:7.3f}s  {size_mb / counter_secs:8.1f} MB/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Benchmark compressed inputs and each output format.
+
+Reads the same data as plain, gzip, bzip2 and zstd CSV, then writes the
+matching rows as every output format, reporting throughput and file size.
+Formats whose optional package is missing are skipped.
+
+Usage:
+    python benchmarks/bench_formats.py [rows] [special_ratio]
+"""
+
+import bz2
+import gzip
+import os
+import sys
+import tempfile
+import time
+
+# Add the project root to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from byte_scan import filter_csv_bytes
+from datagen import add_filler_columns, make_frame
+from formats import FORMAT_EXTENSIONS, OUTPUT_FORMATS
+
+
+def compressors():
+    result = {'gz': gzip.compress, 'bz2': bz2.compress}
+    try:
+        import zstandard
+        result['zst'] = zstandard.ZstdCompressor().compress
+    except ImportError:
+        pass
+    return result
+
+
+def time_it(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    special_ratio = float(sys.argv[2]) if len(sys.argv) > 2 else 0.1
+    with tempfile.TemporaryDirectory() as workdir:
+        input_path = os.path.join(workdir, "input.csv")
+        add_filler_columns(make_frame(rows, special_ratio=special_ratio), 10).to_csv(input_path, index=False)
+        data = open(input_path, 'rb').read()
+        size_mb = len(data) / (1024 * 1024)
+        print(f"Rows: {rows}  special: {special_ratio:.1%}  size: {size_mb:.1f} MB")
+
+        print("Input codecs (uncompressed MB/s):")
+        _, plain_secs = time_it(filter_csv_bytes, input_path, os.path.join(workdir, "plain_out.csv"))
+        print(f"  {'csv':<8} {size_mb / plain_secs:8.1f} MB/s  size {size_mb:8.2f} MB")
+        for extension, compress in compressors().items():
+            path = f"{input_path}.{extension}"
+            with open(path, 'wb') as handle:
+                handle.write(compress(data))
+            _, secs = time_it(filter_csv_bytes, path, os.path.join(workdir, f"{extension}_out.csv"))
+            print(f"  {extension:<8} {size_mb / secs:8.1f} MB/s  size {os.path.getsize(path) / (1024 * 1024):8.2f} MB")
+
+        print("Output formats (matching rows):")
+        for output_format in OUTPUT_FORMATS:
+            output_path = os.path.join(workdir, "output" + FORMAT_EXTENSIONS[output_format])
+            try:
+                stats, secs = time_it(filter_csv_bytes, input_path, output_path)
+            except ImportError as e:
+                print(f"  {output_format:<8} skipped: {e}")
+                continue
+            print(
+                f"  {output_format:<8} {stats.matching_rows / secs:10.0f} rows/s  "
+                f"{secs:6.2f}s  size {os.path.getsize(output_path) / (1024 * 1024):8.2f} MB"
+            )
+
+
+if __name__ == "__main__":
+    main()
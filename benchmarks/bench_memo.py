@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Benchmark memoised verdicts on low- and high-cardinality columns.
+
+Times ColumnSelection.mask with the memo off, on and in auto mode on a
+repetitive Developer column, a column of unique titles and an object-dtype
+copy of the Developer column, over several chunks so later chunks reuse the
+verdicts of earlier ones.
+
+Usage:
+    python benchmarks/bench_memo.py [rows] [chunks]
+"""
+
+import io
+import os
+import sys
+import time
+
+import pandas as pd
+
+# Add the project root to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from column_rules import parse_rules
+from datagen import make_frame
+from filter_engine import READ_OPTIONS
+from value_memo import MEMO_MODES
+
+
+def make_columns(rows: int) -> pd.DataFrame:
+    """Developer (few distinct values), UniqueTitle (every value distinct) and Developer as object dtype."""
+    frame = make_frame(rows, 0.01, seed=7)
+    frame['UniqueTitle'] = frame['Title'] + ' #' + frame.index.astype(str)
+    frame = pd.read_csv(io.StringIO(frame.to_csv(index=False)), **READ_OPTIONS)
+    return frame[['Developer', 'UniqueTitle']].assign(DeveloperObject=frame['Developer'].astype(object))
+
+
+def time_mode(chunks, column: str, mode: str):
+    selection = parse_rules([column], memoize=mode).resolve([column])
+    start = time.perf_counter()
+    for chunk in chunks:
+        selection.mask(chunk)
+    return time.perf_counter() - start, selection.memo_stats()[column]
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    chunk_count = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    frame = make_columns(rows)
+    chunk_rows = -(-rows // chunk_count)
+    chunks = [frame.iloc[start:start + chunk_rows] for start in range(0, rows, chunk_rows)]
+    print(f"Rows: {rows}  chunks: {len(chunks)}")
+    print(f"{'column':>16}{'mode':>6}{'seconds':>10}{'rows/s':>14}{'distinct/row':>14}{'reused':>9}")
+    for column in frame.columns:
+        for mode in MEMO_MODES:
+            seconds, stats = time_mode(chunks, column, mode)
+            print(
+                f"{column:>16}{mode:>6}{seconds:>10.4f}{rows / seconds:>14,.0f}"
+                f"{stats.distinct_ratio:>14.4f}{stats.hit_rate:>9.1%}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Scaling benchmark for the process-pool filter across 1/2/4/8 workers.
+
+Usage:
+    python benchmarks/bench_parallel.py [rows]
+"""
+
+import filecmp
+import os
+import sys
+import tempfile
+import time
+
+# Add the project root to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datagen import write_csv
+from parallel_scan import filter_csv_parallel
+
+WORKER_COUNTS = [1, 2, 4, 8]
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    with tempfile.TemporaryDirectory() as workdir:
+        input_path = write_csv(os.path.join(workdir, "input.csv"), rows)
+        size_mb = os.path.getsize(input_path) / (1024 * 1024)
+        print(f"Rows: {rows}  size: {size_mb:.1f} MB  CPUs: {os.cpu_count()}")
+
+        baseline_path = None
+        baseline_secs = None
+        for workers in WORKER_COUNTS:
+            output_path = os.path.join(workdir, f"output_{workers}.csv")
+            start = time.perf_counter()
+            # Small shards so even modest inputs are split across the pool
+            stats = filter_csv_parallel(input_path, output_path, workers=workers, shard_bytes=4 * 1024 * 1024)
+            elapsed = time.perf_counter() - start
+
+            if baseline_path is None:
+                baseline_path, baseline_secs = output_path, elapsed
+            elif not filecmp.cmp(baseline_path, output_path, shallow=False):
+                print(f"Output mismatch with {workers} workers!")
+                sys.exit(1)
+
+            print(
+                f"  workers={workers}: {elapsed:7.3f}s  {rows / elapsed:12,.0f} rows/sec  "
+                f"{size_mb / elapsed:7.1f} MB/s  speedup {baseline_secs / elapsed:4.1f}x  "
+                f"matches {stats.matching_rows}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Microbenchmarks for the character policies.
+
+For every policy this reports the one-off compile time, the vectorized
+column scan (build_special_char_mask) on a mostly clean and a dirty frame,
+and the per-value contains_special_characters check.
+
+Usage:
+    python benchmarks/bench_policies.py [rows]
+"""
+
+import os
+import sys
+import time
+
+# Add the project root to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from char_policy import category_ranges, custom, parse_policy
+from datagen import make_frame
+from filter_engine import build_special_char_mask, contains_special_characters
+
+COLUMNS = ['Title', 'Developer']
+
+POLICIES = {
+    'ascii': lambda: parse_policy('ascii'),
+    'latin1': lambda: parse_policy('latin1'),
+    'unicode:L,M,N,P,S,Zs': lambda: parse_policy('unicode:L,M,N,P,S,Zs'),
+    'ascii +é -$': lambda: custom(allow='é', deny='$', base=parse_policy('ascii')),
+}
+
+
+def best_of(func, repeat: int = 3) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    frames = {
+        'clean': make_frame(rows, special_ratio=0.0),
+        '1% dirty': make_frame(rows, special_ratio=0.01),
+    }
+    values = frames['1% dirty']['Title'].tolist()
+
+    print(f"Rows: {rows}")
+    print(f"{'policy':<24}{'compile':>10}{'clean scan':>16}{'dirty scan':>16}{'per value':>16}")
+    for name, factory in POLICIES.items():
+        # Time a cold compile, including the Unicode category table
+        category_ranges.cache_clear()
+        start = time.perf_counter()
+        policy = factory()
+        compile_secs = time.perf_counter() - start
+
+        scans = [
+            rows / best_of(lambda frame=frame: build_special_char_mask(frame, COLUMNS, policy))
+            for frame in frames.values()
+        ]
+        per_value = len(values) / best_of(lambda: [contains_special_characters(value, policy) for value in values])
+        print(
+            f"{name:<24}{compile_secs * 1000:>8.1f}ms"
+            f"{scans[0]:>12,.0f} r/s{scans[1]:>12,.0f} r/s{per_value:>12,.0f} v/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
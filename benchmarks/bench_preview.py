@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark the results preview: indexing, scrolling, sorting and searching a large result.
+
+Builds the record offset index of a generated file (with some quoted line
+breaks), then times what the preview window does: opening the table (which
+builds the search index), fetching a screen of rows at random positions in
+file order and in a sorted view, the first sort of a column (which ranks
+the values held by the search index) against later sorts (which reuse its
+orders), and searches for a rare and a common piece of text, the latter
+again after the sort changed. Loading the whole file with pandas, the cost
+of showing it eagerly, is the baseline.
+
+Usage:
+    python benchmarks/bench_preview.py [rows] [screens]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+# Add the project root to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from char_policy import DEFAULT_POLICY
+from datagen import DatasetSpec, write_dataset
+from filter_engine import READ_OPTIONS
+from result_table import ResultTable, build_row_index, build_search_index
+
+# Rows fetched per screen, about what fits in the preview window
+SCREEN_ROWS = 40
+
+
+def timed(work):
+    start = time.perf_counter()
+    result = work()
+    return time.perf_counter() - start, result
+
+
+def scroll(table: ResultTable, screens: int) -> float:
+    """Mean seconds to fetch a screen of rows at a random position."""
+    rng = np.random.default_rng(7)
+    seconds, _ = timed(lambda: [
+        table.rows(int(first), int(first) + SCREEN_ROWS)
+        for first in rng.integers(max(len(table) - SCREEN_ROWS, 1), size=screens)
+    ])
+    return seconds / screens
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    screens = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    with tempfile.TemporaryDirectory() as workdir:
+        path = write_dataset(os.path.join(workdir, "result.csv"), DatasetSpec(rows, quote_ratio=0.05))
+        size_mb = os.path.getsize(path) / (1024 * 1024)
+
+        results = [
+            ("pd.read_csv (eager)", timed(lambda: pd.read_csv(path, **READ_OPTIONS))[0]),
+            ("build offset index", timed(lambda: build_row_index(path))[0]),
+            ("build search index", timed(lambda: build_search_index(path))[0]),
+        ]
+        seconds, table = timed(lambda: ResultTable(path, {'Title': DEFAULT_POLICY}))
+        results.append(("open (both indexes)", seconds))
+        with table:
+            results.append(("open (offsets on disk)", timed(lambda: ResultTable(path).close())[0]))
+            results.append(("screen, file order", scroll(table, screens)))
+            results.append(("first sort by Title", timed(lambda: table.sort(0))[0]))
+            results.append(("screen, sorted", scroll(table, screens)))
+            results.append(("sort by Title desc", timed(lambda: table.sort(0, descending=True))[0]))
+            results.append(("sort by Title again", timed(lambda: table.sort(0))[0]))
+            table.sort(None)
+            seconds, hits = timed(lambda: table.find('café', [0]))
+            results.append(("search 'café'", seconds))
+            results.append(("search 'e', all columns", timed(lambda: table.find('e'))[0]))
+            table.sort(0, descending=True)
+            results.append(("same search, sorted", timed(lambda: table.find('e'))[0]))
+
+    print(f"Rows: {rows}  size: {size_mb:.1f} MB  screens: {screens} of {SCREEN_ROWS} rows  'café' hits: {len(hits)}")
+    print(f"{'step':>24}{'seconds':>12}")
+    for name, seconds in results:
+        print(f"{name:>24}{seconds:>12.5f}")
+
+
+if __name__ == "__main__":
+    main()
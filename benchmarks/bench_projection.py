@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Benchmark the two-pass projected filter against the streaming filter on a wide file.
+
+Each filter runs in a fresh process (see bench_suite.measure). Memory is its
+peak RSS above the RSS after the imports: pandas keeps string columns in
+Arrow buffers, which tracemalloc does not see.
+
+Usage:
+    python benchmarks/bench_projection.py [rows] [extra_columns]
+"""
+
+import csv
+import filecmp
+import multiprocessing
+import os
+import sys
+import tempfile
+
+# Add the project root to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_suite import measure
+from datagen import add_filler_columns, make_frame
+
+
+def write_input(input_path: str, rows: int, extra_columns: int) -> None:
+    add_filler_columns(make_frame(rows, special_ratio=0.001), extra_columns).to_csv(input_path, index=False)
+
+
+def run(path: str, input_path: str, output_path: str):
+    """Time ``path`` and return its rows, seconds and peak RSS growth in MB."""
+    result = measure(path, input_path, output_path, workers=1)
+    if 'error' in result:
+        print(f"{path} failed: {result['error']}")
+        sys.exit(1)
+    return result['rows'], result['seconds'], result['peak_rss_mb'] - result['import_rss_mb']
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    extra_columns = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    with tempfile.TemporaryDirectory() as workdir:
+        input_path = os.path.join(workdir, "wide.csv")
+        # Generated in another process: a child inherits this process's peak RSS
+        writer = multiprocessing.get_context('spawn').Process(
+            target=write_input, args=(input_path, rows, extra_columns)
+        )
+        writer.start()
+        writer.join()
+        size_mb = os.path.getsize(input_path) / (1024 * 1024)
+        print(f"Rows: {rows}  columns: {extra_columns + 3}  size: {size_mb:.1f} MB")
+
+        streaming_path = os.path.join(workdir, "streaming.csv")
+        projected_path = os.path.join(workdir, "projected.csv")
+        _, streaming_secs, streaming_mb = run('streaming', input_path, streaming_path)
+        _, projected_secs, projected_mb = run('projected', input_path, projected_path)
+        with open(streaming_path, newline='', encoding='utf-8') as handle:
+            matches = sum(1 for _ in csv.reader(handle)) - 1
+
+        if not filecmp.cmp(streaming_path, projected_path, shallow=False):
+            print("Output mismatch between streaming and projected filters!")
+            sys.exit(1)
+
+    print(f"  matches   : {matches}")
+    print(f"  streaming : {streaming_secs:7.3f}s  {rows / streaming_secs:12,.0f} rows/sec  peak {streaming_mb:7.1f} MB")
+    print(f"  projected : {projected_secs:7.3f}s  {rows / projected_secs:12,.0f} rows/sec  peak {projected_mb:7.1f} MB")
+    print(f"  speedup   : {streaming_secs / projected_secs:.1f}x  memory {streaming_mb / max(projected_mb, 0.1):.1f}x less")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Benchmark the overhead of the offense report over a filter-only run.
+
+Usage:
+    python benchmarks/bench_report.py [rows] [extra_columns]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+# Add the project root to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from byte_scan import filter_csv_bytes
+from datagen import add_filler_columns, make_frame
+from offense_report import OffenseReport
+
+SPECIAL_RATIOS = [0.001, 0.01, 0.1]
+
+# Best of this many runs per configuration
+REPEATS = 3
+
+
+def best_time(func, *args, **kwargs) -> float:
+    best = float('inf')
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        func(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    extra_columns = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    print(f"Rows: {rows}  columns: {extra_columns + 3}")
+    with tempfile.TemporaryDirectory() as workdir:
+        input_path = os.path.join(workdir, "input.csv")
+        output_path = os.path.join(workdir, "output.csv")
+        for ratio in SPECIAL_RATIOS:
+            add_filler_columns(make_frame(rows, special_ratio=ratio), extra_columns).to_csv(input_path, index=False)
+            plain = best_time(filter_csv_bytes, input_path, output_path)
+            report = best_time(filter_csv_bytes, input_path, output_path, report=OffenseReport())
+            annotated = best_time(filter_csv_bytes, input_path, output_path, report=OffenseReport(annotate=True))
+            print(
+                f"  {ratio:>6.1%} special: filter {plain:6.2f}s  "
+                f"+report {report:6.2f}s ({report / plain - 1:+6.1%})  "
+                f"+annotate {annotated:6.2f}s ({annotated / plain - 1:+6.1%})"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Benchmark the sanitize transform against the filter-only byte-level path.
+
+Usage:
+    python benchmarks/bench_sanitize.py [rows] [extra_columns]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+# Add the project root to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from byte_scan import filter_csv_bytes
+from datagen import add_filler_columns, make_frame
+from sanitize import sanitize_csv, sanitize_csv_streaming
+
+SPECIAL_RATIOS = [0.0, 0.001, 0.01, 0.1]
+
+
+def time_it(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    extra_columns = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    print(f"Rows: {rows}  columns: {extra_columns + 3}")
+    with tempfile.TemporaryDirectory() as workdir:
+        input_path = os.path.join(workdir, "input.csv")
+        output_path = os.path.join(workdir, "output.csv")
+        for ratio in SPECIAL_RATIOS:
+            add_filler_columns(make_frame(rows, special_ratio=ratio), extra_columns).to_csv(input_path, index=False)
+            size_mb = os.path.getsize(input_path) / (1024 * 1024)
+            _, filter_secs = time_it(filter_csv_bytes, input_path, output_path)
+            stats, sanitize_secs = time_it(sanitize_csv, input_path, output_path)
+            _, streaming_secs = time_it(sanitize_csv_streaming, input_path, output_path)
+            print(
+                f"  {ratio:>6.1%} special ({stats.changed_cells:>6} cells changed): "
+                f"filter {size_mb / filter_secs:7.1f} MB/s  "
+                f"sanitize {size_mb / sanitize_secs:7.1f} MB/s  "
+                f"re-render all rows {size_mb / streaming_secs:7.1f} MB/s"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Benchmark the startup of each entry path with ``python -X importtime``.
+
+Every path is started in a fresh interpreter several times. For each one the
+median wall time, the import time reported by ``-X importtime`` (the sum of
+the self times of every module), the number of modules imported, whether
+pandas, numpy and Tkinter were loaded and the slowest top-level imports are
+printed. ``python -c pass`` is the baseline of the interpreter itself.
+
+Usage:
+    python benchmarks/bench_startup.py [--repeat N] [--rows N] [--top N] [-o results.json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Add the project root to the path
+sys.path.append(ROOT)
+
+from datagen import DatasetSpec, write_dataset
+
+# Modules whose presence is reported for every path
+HEAVY_MODULES = ['pandas', 'numpy', 'tkinter']
+
+
+def entry_paths(input_path: str, output_path: str) -> Dict[str, List[str]]:
+    """Name -> interpreter arguments of every measured entry path."""
+    cli = os.path.join(ROOT, 'cli.py')
+    main = os.path.join(ROOT, 'main.py')
+    return {
+        'baseline': ['-c', 'pass'],
+        'cli --help': [cli, '--help'],
+        'main --help': [main, '--help'],
+        'dimensions': [cli, 'dimensions', input_path],
+        'scan': [cli, 'scan', input_path],
+        'filter': [cli, 'filter', input_path, '-j', '1', '-o', output_path],
+        'gui import': ['-c', f"import sys; sys.path.insert(0, {ROOT!r}); import gui"],
+    }
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int, int]]:
+    """``(module, self us, cumulative us, nesting depth)`` of every ``import time:`` line."""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return modules
+
+
+def run_once(arguments: List[str]) -> Tuple[float, List[Tuple[str, int, int, int]]]:
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime'] + arguments,
+        cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True,
+    )
+    return time.perf_counter() - start, parse_importtime(completed.stderr)
+
+
+def measure(arguments: List[str], repeat: int, top: int) -> Dict:
+    """Median wall and import time of ``repeat`` runs, plus the modules of the last one."""
+    walls, imports = [], []
+    for _ in range(repeat):
+        wall, modules = run_once(arguments)
+        walls.append(wall)
+        imports.append(sum(self_us for _, self_us, _, _ in modules) / 1e6)
+    names = {name for name, _, _, _ in modules}
+    slowest = sorted((entry for entry in modules if entry[3] == 0), key=lambda entry: entry[2], reverse=True)
+    return {
+        'wall_seconds': round(statistics.median(walls), 4),
+        'import_seconds': round(statistics.median(imports), 4),
+        'modules': len(modules),
+        'loaded': {module: module in names for module in HEAVY_MODULES},
+        'slowest_imports': [
+            {'module': name, 'cumulative_seconds': round(cumulative_us / 1e6, 4)}
+            for name, _, cumulative_us, _ in slowest[:top]
+        ],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure the startup time of every entry path.")
+    parser.add_argument('--repeat', type=int, default=5, help="runs per path (default: %(default)s)")
+    parser.add_argument('--rows', type=int, default=10_000, help="rows of the input file (default: %(default)s)")
+    parser.add_argument('--top', type=int, default=5, help="slowest top-level imports listed (default: %(default)s)")
+    parser.add_argument('-o', '--output', help="also write the results to this JSON file")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        input_path = os.path.join(workdir, "input.csv")
+        write_dataset(input_path, DatasetSpec(args.rows))
+        for name, arguments in entry_paths(input_path, os.path.join(workdir, "output.csv")).items():
+            results[name] = measure(arguments, args.repeat, args.top)
+
+    print(f"Runs per path: {args.repeat}  input rows: {args.rows}")
+    print(f"{'path':>14}{'wall s':>9}{'import s':>10}{'modules':>9}  " + '  '.join(HEAVY_MODULES))
+    for name, result in results.items():
+        loaded = '  '.join(f"{'yes' if result['loaded'][module] else 'no':>{len(module)}}" for module in HEAVY_MODULES)
+        print(f"{name:>14}{result['wall_seconds']:>9.3f}{result['import_seconds']:>10.3f}{result['modules']:>9}  {loaded}")
+    for name, result in results.items():
+        slowest = ', '.join(f"{entry['module']} {entry['cumulative_seconds']:.3f}s" for entry in result['slowest_imports'])
+        print(f"{name}: {slowest}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as handle:
+            json.dump({'python': sys.version.split()[0], 'repeat': args.repeat, 'results': results}, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Reproducible benchmark suite with JSON results for regression checks.
+
+Generates seeded CSV files (see datagen.DatasetSpec) of varying size, width,
+non-ASCII density and quoting, then times the dimension count, the scan
+(parse and mask, no output) and every filter engine on each of them. Each
+run happens in a fresh process so its peak RSS is its own. Results are
+written as JSON; pass an earlier result file with --compare to flag paths
+that got slower (or bigger) than --threshold allows.
+
+Usage:
+    python benchmarks/bench_suite.py [--scale 0.1] [--datasets narrow,quoted] [--paths bytes,parallel]
+                                     [--repeat 3] [--output results.json] [--compare baseline.json]
+"""
+
+import argparse
+import hashlib
+import importlib
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+# Add the project root to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datagen import DatasetSpec, write_dataset
+from run_stats import peak_rss_mb
+
+RESULTS_VERSION = 1
+
+# Name -> dataset at scale 1.0
+DATASETS = {
+    'narrow': DatasetSpec(rows=1_000_000, columns=3, special_ratio=0.01),
+    'dirty': DatasetSpec(rows=1_000_000, columns=3, special_ratio=0.25),
+    'quoted': DatasetSpec(rows=1_000_000, columns=3, special_ratio=0.01, quote_ratio=0.2),
+    'wide': DatasetSpec(rows=100_000, columns=60, special_ratio=0.01, quote_ratio=0.05),
+}
+
+PATHS = ['dimensions', 'scan', 'streaming', 'bytes', 'projected', 'parallel']
+
+# Imported before the clock starts, as a long-lived process would have them
+ENGINE_MODULES = ['byte_scan', 'csv_bytes', 'filter_engine', 'parallel_scan', 'projected_scan']
+
+# Slowdown (and peak RSS growth) tolerated by --compare before a result is flagged
+DEFAULT_THRESHOLD = 0.10
+
+
+def _run_path(path: str, input_path: str, output_path: str, workers: int) -> int:
+    """Run one benchmarked path and return the number of data rows it saw."""
+    if path == 'dimensions':
+        from csv_bytes import count_dimensions
+        return count_dimensions(input_path)[0]
+    if path == 'scan':
+        from filter_engine import iter_filtered_chunks
+        return sum(len(chunk) for chunk, _ in iter_filtered_chunks(input_path))
+    if path == 'streaming':
+        from filter_engine import filter_csv_streaming
+        return filter_csv_streaming(input_path, output_path).total_rows
+    if path == 'bytes':
+        from byte_scan import filter_csv_bytes
+        return filter_csv_bytes(input_path, output_path).total_rows
+    if path == 'projected':
+        from projected_scan import filter_csv_projected
+        return filter_csv_projected(input_path, output_path).total_rows
+    if path == 'parallel':
+        from parallel_scan import filter_csv_parallel
+        return filter_csv_parallel(input_path, output_path, workers=workers).total_rows
+    raise ValueError(f"Unknown benchmark path: {path!r}")
+
+
+def _measure(connection, path: str, input_path: str, output_path: str, workers: int) -> None:
+    """Child process entry point: time one run and send the measurements back."""
+    try:
+        for module in ENGINE_MODULES:
+            importlib.import_module(module)
+        import_rss_mb = peak_rss_mb()
+        start = time.perf_counter()
+        rows = _run_path(path, input_path, output_path, workers)
+        seconds = time.perf_counter() - start
+        connection.send({
+            'seconds': seconds, 'rows': rows, 'peak_rss_mb': peak_rss_mb(), 'import_rss_mb': import_rss_mb
+        })
+    except Exception as e:
+        connection.send({'error': f"{type(e).__name__}: {e}"})
+    finally:
+        connection.close()
+
+
+def measure(path: str, input_path: str, output_path: str, workers: int) -> Dict:
+    """Run ``path`` once in a fresh process."""
+    context = multiprocessing.get_context('spawn')
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=_measure, args=(sender, path, input_path, output_path, workers))
+    process.start()
+    sender.close()
+    try:
+        result = receiver.recv()
+    except EOFError:
+        result = {'error': 'benchmark process exited without a result'}
+    process.join()
+    return result
+
+
+def file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as handle:
+        for block in iter(lambda: handle.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def scaled(spec: DatasetSpec, scale: float, seed: int) -> DatasetSpec:
+    return DatasetSpec(max(int(spec.rows * scale), 1), spec.columns, spec.special_ratio, spec.quote_ratio, seed)
+
+
+def run_suite(
+    datasets: Dict[str, DatasetSpec],
+    paths: List[str],
+    data_dir: str,
+    repeat: int = 3,
+    workers: int = 0,
+    on_result: Optional[Callable[[Dict], None]] = None,
+) -> Dict:
+    """
+    Benchmark every path on every dataset.
+
+    Datasets already present in ``data_dir`` are reused. Each path runs
+    ``repeat`` times; the fastest time and the largest peak RSS are kept.
+
+    Returns:
+        Dict: JSON-serialisable results (see RESULTS_VERSION)
+    """
+    workers = workers or os.cpu_count() or 1
+    results = []
+    dataset_info = {}
+    for name, spec in datasets.items():
+        input_path = os.path.join(data_dir, spec.file_name)
+        if not os.path.exists(input_path):
+            write_dataset(input_path, spec)
+        size = os.path.getsize(input_path)
+        dataset_info[name] = dict(spec.to_dict(), bytes=size, sha256=file_digest(input_path))
+        output_path = os.path.join(data_dir, f"{name}_output.csv")
+        for path in paths:
+            runs = [measure(path, input_path, output_path, workers) for _ in range(repeat)]
+            errors = [run['error'] for run in runs if 'error' in run]
+            result = {'dataset': name, 'path': path}
+            if errors:
+                result['error'] = errors[0]
+            else:
+                seconds = min(run['seconds'] for run in runs)
+                rss = [run['peak_rss_mb'] for run in runs if run['peak_rss_mb'] is not None]
+                result.update(
+                    rows=runs[0]['rows'],
+                    seconds=round(seconds, 6),
+                    runs=[round(run['seconds'], 6) for run in runs],
+                    rows_per_second=round(runs[0]['rows'] / seconds, 1),
+                    mb_per_second=round(size / (1024 * 1024) / seconds, 3),
+                    peak_rss_mb=max(rss) if rss else None,
+                    # Peak RSS after the imports, before the run started
+                    import_rss_mb=runs[0]['import_rss_mb'],
+                )
+            results.append(result)
+            if on_result is not None:
+                on_result(result)
+        if os.path.exists(output_path):
+            os.remove(output_path)
+    return {
+        'version': RESULTS_VERSION,
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'environment': environment(workers),
+        'datasets': dataset_info,
+        'results': results,
+    }
+
+
+def environment(workers: int) -> Dict:
+    """Versions and hardware the results were measured on."""
+    import numpy
+    import pandas
+    try:
+        import pyarrow
+        pyarrow_version = pyarrow.__version__
+    except ImportError:
+        pyarrow_version = None
+    return {
+        'python': platform.python_version(),
+        'pandas': pandas.__version__,
+        'numpy': numpy.__version__,
+        'pyarrow': pyarrow_version,
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+        'workers': workers,
+    }
+
+
+def compare(current: Dict, baseline: Dict, threshold: float = DEFAULT_THRESHOLD) -> List[Dict]:
+    """
+    Match results to ``baseline`` by dataset and path.
+
+    Returns:
+        List[Dict]: One entry per matched result with the time and peak RSS
+        ratios (current / baseline) and whether either exceeds ``1 + threshold``.
+        Results measured on different data (digests differ) are marked and
+        never flagged.
+    """
+    previous = {(result['dataset'], result['path']): result for result in baseline['results']}
+    comparisons = []
+    for result in current['results']:
+        before = previous.get((result['dataset'], result['path']))
+        if before is None or 'seconds' not in result or 'seconds' not in before:
+            continue
+        same_data = (
+            current['datasets'][result['dataset']]['sha256']
+            == baseline['datasets'].get(result['dataset'], {}).get('sha256')
+        )
+        time_ratio = result['seconds'] / before['seconds'] if before['seconds'] else 1.0
+        rss_ratio = None
+        if result.get('peak_rss_mb') and before.get('peak_rss_mb'):
+            rss_ratio = result['peak_rss_mb'] / before['peak_rss_mb']
+        comparisons.append({
+            'dataset': result['dataset'],
+            'path': result['path'],
+            'time_ratio': round(time_ratio, 4),
+            'rss_ratio': round(rss_ratio, 4) if rss_ratio is not None else None,
+            'same_data': same_data,
+            'regression': same_data and (
+                time_ratio > 1 + threshold or (rss_ratio is not None and rss_ratio > 1 + threshold)
+            ),
+        })
+    return comparisons
+
+
+def print_result(result: Dict) -> None:
+    if 'error' in result:
+        print(f"{result['dataset']:>8}{result['path']:>12}  ERROR {result['error']}", flush=True)
+        return
+    rss = f"{result['peak_rss_mb']:>10.1f}" if result['peak_rss_mb'] is not None else f"{'-':>10}"
+    print(
+        f"{result['dataset']:>8}{result['path']:>12}{result['seconds']:>10.3f}"
+        f"{result['rows_per_second']:>14,.0f}{result['mb_per_second']:>9.1f}{rss}",
+        flush=True,
+    )
+
+
+def parse_names(text: Optional[str], choices: List[str], kind: str) -> List[str]:
+    if not text:
+        return list(choices)
+    names = [name.strip() for name in text.split(',') if name.strip()]
+    unknown = [name for name in names if name not in choices]
+    if unknown:
+        raise SystemExit(f"Unknown {kind}: {', '.join(unknown)} (choose from {', '.join(choices)})")
+    return names
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the reproducible benchmark suite.")
+    parser.add_argument('--datasets', help=f"comma-separated subset of: {', '.join(DATASETS)}")
+    parser.add_argument('--paths', help=f"comma-separated subset of: {', '.join(PATHS)}")
+    parser.add_argument('--scale', type=float, default=1.0, help="multiply dataset rows (default: %(default)s)")
+    parser.add_argument('--seed', type=int, default=42, help="dataset seed (default: %(default)s)")
+    parser.add_argument(
+        '--repeat', type=int, default=3, help="runs per path; the fastest counts (default: %(default)s)"
+    )
+    parser.add_argument('-j', '--jobs', type=int, default=0, help="workers of the parallel path (default: every CPU)")
+    parser.add_argument(
+        '--data-dir', help="keep generated datasets here and reuse them (default: a temporary directory)"
+    )
+    parser.add_argument('-o', '--output', help="write the results as JSON to this path")
+    parser.add_argument('--compare', help="earlier results JSON to compare against")
+    parser.add_argument(
+        '--threshold', type=float, default=DEFAULT_THRESHOLD,
+        help="tolerated slowdown / peak RSS growth before --compare fails (default: %(default)s)"
+    )
+    args = parser.parse_args(argv)
+
+    datasets = {
+        name: scaled(DATASETS[name], args.scale, args.seed)
+        for name in parse_names(args.datasets, list(DATASETS), 'datasets')
+    }
+    paths = parse_names(args.paths, PATHS, 'paths')
+
+    print(f"{'dataset':>8}{'path':>12}{'seconds':>10}{'rows/s':>14}{'MB/s':>9}{'peak MB':>10}")
+    if args.data_dir:
+        os.makedirs(args.data_dir, exist_ok=True)
+        results = run_suite(datasets, paths, args.data_dir, args.repeat, args.jobs, print_result)
+    else:
+        with tempfile.TemporaryDirectory() as data_dir:
+            results = run_suite(datasets, paths, data_dir, args.repeat, args.jobs, print_result)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as handle:
+            json.dump(results, handle, indent=2)
+        print(f"Results: {args.output}")
+
+    if not args.compare:
+        return 0
+    with open(args.compare, encoding='utf-8') as handle:
+        baseline = json.load(handle)
+    comparisons = compare(results, baseline, args.threshold)
+    print(f"\nCompared with {args.compare} (threshold {args.threshold:.0%}):")
+    for entry in comparisons:
+        rss = f"{entry['rss_ratio']:.2f}x" if entry['rss_ratio'] is not None else '-'
+        flag = 'REGRESSION' if entry['regression'] else ('different data' if not entry['same_data'] else 'ok')
+        print(f"{entry['dataset']:>8}{entry['path']:>12}  time {entry['time_ratio']:.2f}x  peak RSS {rss}  {flag}")
+    return 1 if any(entry['regression'] for entry in comparisons) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
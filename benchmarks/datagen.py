@@ -0,0 +1,115 @@
+"""
+Synthetic data shared by the benchmark scripts.
+"""
+
+import random
+from dataclasses import asdict, dataclass
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+WORDS = ['Quest', 'Puzzle', 'Studio', 'Adventure', 'Games', 'Legend', 'Racing']
+SPECIALS = ['Café', 'Pokémon', 'Tést', 'Émoji 😀', 'Straße']
+
+# Appended to values that must be quoted: a delimiter, an escaped quote and
+# an embedded line break
+QUOTED_PARTS = [', Inc.', ' "Deluxe" Edition', '\nSecond line']
+
+# Leading columns of every generated dataset; Title and Developer are the checked ones
+BASE_COLUMNS = ['Title', 'Developer', 'Price']
+
+
+def make_frame(rows: int, special_ratio: float = 0.01, seed: int = 42) -> pd.DataFrame:
+    """Build a Title/Developer/Price frame with a small share of non-ASCII values."""
+    rng = random.Random(seed)
+
+    def value() -> str:
+        parts = rng.sample(WORDS, 2)
+        if rng.random() < special_ratio:
+            parts.append(rng.choice(SPECIALS))
+        return ' '.join(parts)
+
+    return pd.DataFrame({
+        'Title': [value() for _ in range(rows)],
+        'Developer': [value() for _ in range(rows)],
+        'Price': [round(rng.random() * 50, 2) for _ in range(rows)],
+    })
+
+
+def write_csv(path: str, rows: int, special_ratio: float = 0.01, seed: int = 42) -> str:
+    """Write a synthetic CSV file to ``path`` and return the path."""
+    make_frame(rows, special_ratio, seed).to_csv(path, index=False)
+    return path
+
+
+def add_filler_columns(df: pd.DataFrame, count: int, seed: int = 42) -> pd.DataFrame:
+    """Widen a frame with ``count`` numeric text columns that are never checked."""
+    rng = random.Random(seed)
+    filler = {
+        f'Extra{index}': [str(rng.randrange(1_000_000)) for _ in range(len(df))]
+        for index in range(count)
+    }
+    return pd.concat([df, pd.DataFrame(filler, index=df.index)], axis=1)
+
+
+@dataclass(frozen=True)
+class DatasetSpec:
+    """
+    Shape of a generated CSV file; equal specs always produce identical bytes.
+
+    Attributes:
+        rows: Data rows
+        columns: Total columns; past BASE_COLUMNS, text and number columns alternate
+        special_ratio: Share of text values holding a non-ASCII character
+        quote_ratio: Share of text values holding a comma, a quote or a line break
+        seed: Random seed
+    """
+    rows: int
+    columns: int = 3
+    special_ratio: float = 0.01
+    quote_ratio: float = 0.0
+    seed: int = 42
+
+    @property
+    def file_name(self) -> str:
+        return (
+            f"data_r{self.rows}_c{self.columns}_s{self.special_ratio:g}_q{self.quote_ratio:g}_{self.seed}.csv"
+        )
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+def _text_column(rng: np.random.Generator, spec: DatasetSpec) -> list:
+    """Mostly unique text values with the spec's share of non-ASCII and quoted values."""
+    first = rng.integers(len(WORDS), size=spec.rows)
+    second = rng.integers(len(WORDS), size=spec.rows)
+    numbers = rng.integers(100_000, size=spec.rows)
+    special = np.where(rng.random(spec.rows) < spec.special_ratio, rng.integers(len(SPECIALS), size=spec.rows), -1)
+    quoted = np.where(rng.random(spec.rows) < spec.quote_ratio, rng.integers(len(QUOTED_PARTS), size=spec.rows), -1)
+    return [
+        f"{WORDS[a]} {WORDS[b]} {n}"
+        + (f" {SPECIALS[s]}" if s >= 0 else '')
+        + (QUOTED_PARTS[q] if q >= 0 else '')
+        for a, b, n, s, q in zip(first.tolist(), second.tolist(), numbers.tolist(), special.tolist(), quoted.tolist())
+    ]
+
+
+def make_dataset(spec: DatasetSpec) -> pd.DataFrame:
+    """Build the frame described by ``spec`` (see DatasetSpec)."""
+    rng = np.random.default_rng(spec.seed)
+    data = {}
+    for index in range(spec.columns):
+        name = BASE_COLUMNS[index] if index < len(BASE_COLUMNS) else f"Extra{index}"
+        if name == 'Price' or (index >= len(BASE_COLUMNS) and index % 2):
+            data[name] = np.round(rng.random(spec.rows) * 50, 2)
+        else:
+            data[name] = _text_column(rng, spec)
+    return pd.DataFrame(data)
+
+
+def write_dataset(path: str, spec: DatasetSpec) -> str:
+    """Write the CSV file described by ``spec`` to ``path`` and return the path."""
+    make_dataset(spec).to_csv(path, index=False)
+    return path
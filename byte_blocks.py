@@ -0,0 +1,245 @@
+"""
+Record-aligned blocks of raw CSV bytes, and the records in them with offending bytes.
+
+These helpers need numpy but not pandas. byte_scan builds its filter on
+them, and scan_bytes uses them on their own to count the rows a policy
+would reject without parsing a single field, which keeps ``cli.py scan``
+free of the pandas import (see common).
+
+Records are delimited by the quoted fields csv_bytes finds: a quote opens
+one only at the start of a field, as in pandas, so a stray quote inside an
+unquoted value (``27" Monitor``) does not hide the newlines after it.
+"""
+
+import threading
+from itertools import accumulate
+from typing import BinaryIO, Iterator, Optional, Tuple
+
+import numpy as np
+
+from char_policy import BYTE_ALLOWED, DEFAULT_POLICY, CharPolicy
+from common import ProgressCallback, check_cancelled
+from csv_bytes import BLOCK_SIZE, LINE_WHITESPACE, RecordCounter, last_record_end, quote_runs
+from formats import open_input
+
+# Parse the whole block instead of single records once this share of its
+# records is dirty; slicing them out would cost more than it saves.
+WHOLE_BLOCK_RATIO = 0.5
+
+# Byte value -> False for the bytes of a whitespace-only line
+NOT_BLANK = np.ones(256, dtype=bool)
+NOT_BLANK[np.frombuffer(LINE_WHITESPACE + b'\n', dtype=np.uint8)] = False
+
+
+def block_is_clean(block: bytes, policy: CharPolicy = DEFAULT_POLICY) -> bool:
+    """True if every byte of ``block`` is an ASCII character the policy allows."""
+    return block.isascii() and not block.translate(None, policy.allowed_ascii)
+
+
+def record_ends(block: bytes) -> np.ndarray:
+    """
+    Offsets just past each record-ending newline of a block that starts on a record boundary.
+
+    A newline ends a record unless it lies inside a quoted field.
+    """
+    ends = np.flatnonzero(np.frombuffer(block, dtype=np.uint8) == ord('\n'))
+    if b'"' in block:
+        # Runs alternate outside and inside quoted fields; keep the newlines
+        # of the outside runs, whose end offsets come at even positions
+        bounds = np.fromiter(accumulate(map(len, quote_runs(block))), dtype=np.int64)
+        ends = ends[np.searchsorted(bounds, ends, side='right') % 2 == 0]
+    return ends + 1
+
+
+def record_starts(block: bytes) -> np.ndarray:
+    """
+    Offsets of the records in a block that starts on a record boundary.
+
+    Returns:
+        np.ndarray: Sorted start offsets, beginning with 0
+    """
+    starts = record_ends(block)
+    if len(starts) and starts[-1] == len(block):
+        starts = starts[:-1]
+    return np.concatenate(([0], starts))
+
+
+def dirty_records(block: bytes, policy: CharPolicy = DEFAULT_POLICY) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Find the records of ``block`` that contain a byte the policy does not allow.
+
+    Bytes of multi-byte UTF-8 characters always count as offending here; the
+    policy decides on the decoded text once the record is parsed.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Start offsets of every record, and the
+        indexes of the dirty ones
+    """
+    table = np.frombuffer(policy.byte_table, dtype=np.uint8)
+    offending = np.flatnonzero(table[np.frombuffer(block, dtype=np.uint8)] != BYTE_ALLOWED)
+    starts = record_starts(block)
+    return starts, np.unique(np.searchsorted(starts, offending, side='right') - 1)
+
+
+def iter_record_blocks(source: BinaryIO, block_size: int = BLOCK_SIZE, carry: bytes = b'') -> Iterator[bytes]:
+    """
+    Read ``source`` in blocks of about ``block_size`` bytes that end on record boundaries.
+
+    Args:
+        source: Binary stream positioned on a record boundary
+        block_size: Bytes read at a time; a longer record makes a longer block
+        carry: Bytes already read from the stream that precede its position
+
+    Yields:
+        bytes: Consecutive blocks of whole records (the last may lack a newline)
+    """
+    while True:
+        data = source.read(block_size)
+        if not data:
+            if carry:
+                yield carry
+            return
+        block = carry + data if carry else data
+        cut = last_record_end(block)
+        if cut:
+            yield block[:cut]
+        carry = block[cut:]
+
+
+def split_header(source: BinaryIO, block_size: int = BLOCK_SIZE, carry: bytes = b'') -> Tuple[bytes, bytes]:
+    """
+    Read the raw header record from the start of ``source``.
+
+    Args:
+        source: Binary stream positioned on a record boundary
+        block_size: Bytes read at a time
+        carry: Bytes already read from the stream that precede its position
+
+    Returns:
+        Tuple[bytes, bytes]: The header record and the data bytes read past it
+    """
+    data = carry
+    while True:
+        chunk = source.read(block_size)
+        data += chunk
+        # The header is the first record; its quoted fields may hold newlines
+        starts = record_starts(data)
+        if len(starts) > 1 or not chunk:
+            end = int(starts[1]) if len(starts) > 1 else len(data)
+            return data[:end], data[end:]
+
+
+def read_header_record(source: BinaryIO, block_size: int = BLOCK_SIZE) -> Tuple[bytes, bytes, int]:
+    """
+    Read the header record, skipping the blank lines pandas skips before it.
+
+    Args:
+        source: Binary stream positioned at the start of the file
+        block_size: Bytes read at a time
+
+    Returns:
+        Tuple[bytes, bytes, int]: The header record, the data bytes read past
+        it, and the offset of those data bytes in the stream
+    """
+    header, carry = split_header(source, block_size)
+    position = len(header)
+    while header and not header.strip(LINE_WHITESPACE + b'\n'):
+        header, carry = split_header(source, block_size, carry)
+        position += len(header)
+    return header, carry, position
+
+
+def data_records(block: bytes) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Start and end offsets of the non-blank records of a record-aligned block.
+
+    Whitespace-only lines are left out like pandas skips them, so record
+    ``n`` here is row ``n`` of the block parsed by pandas. A record ends
+    where the next one (blank or not) starts.
+    """
+    starts = record_starts(block)
+    ends = np.append(starts[1:], len(block))
+    # Only a record starting with whitespace can be blank; look closer at those
+    filled = NOT_BLANK[np.frombuffer(block, dtype=np.uint8)[starts]]
+    for index in np.flatnonzero(~filled):
+        filled[index] = bool(block[starts[index]:ends[index]].strip(LINE_WHITESPACE + b'\n'))
+    return starts[filled], ends[filled]
+
+
+def candidate_records(block: bytes, policy: CharPolicy = DEFAULT_POLICY) -> Tuple[np.ndarray, bytes]:
+    """
+    The non-blank records of a block that may hold a character the policy does not allow.
+
+    Returns:
+        Tuple[np.ndarray, bytes]: Start offsets of the records, and the bytes
+        to parse, which hold exactly those records in order (the whole block
+        when most of its records are candidates)
+    """
+    if block_is_clean(block, policy):
+        return np.empty(0, dtype=np.int64), b''
+    starts, ends = data_records(block)
+    if not len(starts):
+        return np.empty(0, dtype=np.int64), b''
+    table = np.frombuffer(policy.byte_table, dtype=np.uint8)
+    offending = np.flatnonzero(table[np.frombuffer(block, dtype=np.uint8)] != BYTE_ALLOWED)
+    index = np.searchsorted(starts, offending, side='right') - 1
+    # Offending bytes on skipped blank lines belong to no record
+    inside = (index >= 0) & (offending < ends[np.maximum(index, 0)])
+    dirty = np.unique(index[inside])
+    if not len(dirty):
+        return np.empty(0, dtype=np.int64), b''
+    if len(dirty) >= len(starts) * WHOLE_BLOCK_RATIO:
+        return starts, block
+    pieces = zip(starts[dirty].tolist(), ends[dirty].tolist())
+    return starts[dirty], b''.join(block[start:end] for start, end in pieces)
+
+
+def count_dirty_records(block: bytes, policy: CharPolicy = DEFAULT_POLICY) -> int:
+    """Number of non-blank records of a record-aligned block that contain a byte the policy does not allow."""
+    if block_is_clean(block, policy):
+        return 0
+    starts, dirty = dirty_records(block, policy)
+    ends = np.append(starts[1:], len(block))
+    # Whitespace-only lines are skipped like pandas skips them, even if the policy denies their bytes
+    return sum(1 for index in dirty if block[starts[index]:ends[index]].strip(LINE_WHITESPACE + b'\n'))
+
+
+def scan_bytes(
+    path: str,
+    policy: CharPolicy = DEFAULT_POLICY,
+    progress: Optional[ProgressCallback] = None,
+    cancel_event: Optional[threading.Event] = None,
+    block_size: int = BLOCK_SIZE,
+) -> Tuple[int, int]:
+    """
+    Count the data rows of a CSV file and those holding bytes the policy does not allow.
+
+    No field is decoded or parsed, so the dirty rows are those with such a
+    byte in any column: exactly the rows ``filter --columns '*'`` selects
+    under the ascii policy, and an upper bound under policies that allow
+    non-ASCII characters (whose bytes always count as offending here).
+
+    Args:
+        path: Path to the CSV file, plain or compressed
+        policy: Characters considered allowed
+        progress: Called after every block with rows and bytes scanned so far
+        cancel_event: Set by another thread to stop the scan between blocks
+        block_size: Approximate bytes examined at a time
+
+    Returns:
+        Tuple[int, int]: ``(rows, dirty_rows)``
+
+    Raises:
+        ProcessingCancelled: If ``cancel_event`` was set before the scan finished
+    """
+    counter = RecordCounter()
+    dirty = 0
+    with open_input(path) as (source, raw):
+        _, carry, _ = read_header_record(source, block_size)
+        for block in iter_record_blocks(source, block_size, carry):
+            check_cancelled(cancel_event)
+            counter.feed(block)
+            dirty += count_dirty_records(block, policy)
+            if progress is not None:
+                progress(counter.records, raw.tell())
+    return counter.finish()[0], dirty
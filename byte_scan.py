@@ -0,0 +1,200 @@
+"""
+Byte-level filtering that never decodes clean ASCII data.
+
+The file is read in large blocks cut back to record boundaries (gzip, bzip2
+and zstd inputs are decompressed on the fly). A block whose bytes are all
+ASCII characters allowed by the policy cannot hold a matching row, so it is
+only counted (csv_bytes.RecordCounter) and never decoded. In
+the remaining blocks a byte-table lookup locates the offending bytes, and
+only the records that contain them are parsed by pandas to check which of
+the target columns hold them. Output and totals are identical to
+filter_engine.filter_csv_streaming.
+
+Like the other byte-level helpers, records are delimited by the quoted
+fields of byte_blocks, which open a quote only at the start of a field.
+"""
+
+import io
+import threading
+from typing import TYPE_CHECKING, Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from byte_blocks import block_is_clean, candidate_records, iter_record_blocks, split_header
+from char_policy import DEFAULT_POLICY, CharPolicy
+from column_rules import Columns, ColumnSelection, select_columns
+from csv_bytes import BLOCK_SIZE, RecordCounter
+from filter_engine import (
+    DEFAULT_CHUNKSIZE,
+    DEFAULT_COLUMNS,
+    READ_OPTIONS,
+    FilterStats,
+    ProgressCallback,
+    check_cancelled,
+    filter_csv_streaming,
+    read_header,
+    write_matches,
+)
+from formats import open_input, open_writer
+from projected_scan import starts_with_blank_line
+from run_stats import StageTimings
+
+if TYPE_CHECKING:
+    from offense_report import OffenseReport
+
+# Index name of scan_block results whose rows are labelled with the offset of their record
+RECORD_OFFSET = 'record_offset'
+
+
+def scan_block(
+    header: bytes,
+    block: bytes,
+    columns: Union[List[str], ColumnSelection],
+    policy: CharPolicy = DEFAULT_POLICY,
+    timings: Optional[StageTimings] = None,
+    verdicts: Optional[Dict[str, np.ndarray]] = None,
+) -> Optional[pd.DataFrame]:
+    """
+    Return the matching rows of a record-aligned block.
+
+    Args:
+        header: Raw header record, prepended so pandas sees the column names
+        block: Raw records, starting on a record boundary
+        columns: Names of the columns to check, or a ColumnSelection (whose
+            own policies then apply instead of ``policy``)
+        policy: Characters considered allowed
+        timings: Receives the scan, parse and filter stages
+        verdicts: Receives the flags of the matching rows per checked column
+            (see ColumnSelection.mask); left empty for a clean block
+
+    Returns:
+        Optional[pd.DataFrame]: The matching rows, or None if the block is
+        clean. Rows are indexed by the offset of their record in ``block``
+        (index name RECORD_OFFSET) unless pandas found a different number of
+        records than the byte-level scan.
+    """
+    timings = timings if timings is not None else StageTimings()
+    mark = timings.mark()
+    if not isinstance(columns, ColumnSelection):
+        columns = ColumnSelection({column: policy for column in columns})
+    # Records clean under the strictest column policy cannot match
+    policy = columns.scan_policy
+    if block_is_clean(block, policy):
+        timings.lap('scan', mark, nbytes=len(block))
+        return None
+    starts, data = candidate_records(block, policy)
+    mark = timings.lap('scan', mark, nbytes=len(block))
+    if not len(starts):
+        return None
+    chunk = pd.read_csv(io.BytesIO(header + data), **READ_OPTIONS)
+    mark = timings.lap('parse', mark, rows=len(chunk))
+    if len(chunk) == len(starts):
+        chunk.index = pd.Index(starts, name=RECORD_OFFSET)
+    mask = columns.mask(chunk, verdicts)
+    mark = timings.lap('scan', mark, rows=len(chunk))
+    matches = chunk[mask]
+    if verdicts is not None:
+        keep = mask.to_numpy()
+        for column, flags in verdicts.items():
+            verdicts[column] = flags[keep]
+    timings.lap('filter', mark, rows=len(matches))
+    return matches
+
+
+def matched_offsets(matches: Optional[pd.DataFrame], position: int) -> Optional[np.ndarray]:
+    """
+    File offsets of the records of scan_block results for a block read at ``position``.
+
+    Returns:
+        Optional[np.ndarray]: The offsets, or None if the rows are not
+        labelled with them (see scan_block)
+    """
+    if matches is None:
+        return np.empty(0, dtype=np.int64)
+    if matches.index.name != RECORD_OFFSET:
+        return None
+    return matches.index.to_numpy(dtype=np.int64) + position
+
+
+def filter_csv_bytes(
+    input_path: str,
+    output_path: str,
+    columns: Columns = DEFAULT_COLUMNS,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    progress: Optional[ProgressCallback] = None,
+    cancel_event: Optional[threading.Event] = None,
+    policy: CharPolicy = DEFAULT_POLICY,
+    output_format: Optional[str] = None,
+    block_size: int = BLOCK_SIZE,
+    report: Optional['OffenseReport'] = None,
+    record_offsets: Optional[List[Optional[np.ndarray]]] = None,
+) -> FilterStats:
+    """
+    Filter a CSV file, decoding and parsing only records with offending bytes.
+
+    Files that start with a blank line go to the streaming filter, because
+    pandas takes the first non-blank line as their header.
+
+    Args:
+        input_path: Path to the CSV file to filter (may be gzip/bz2/zstd compressed)
+        output_path: Path the matching rows are written to
+        columns: Names of the columns to check, or ColumnRules
+        chunksize: Rows per chunk for the streaming fallback
+        progress: Called after every block with rows and bytes processed so far
+        cancel_event: Set by another thread to stop the scan between blocks
+        policy: Characters considered allowed in columns without a policy of their own
+        output_format: Output format; inferred from ``output_path`` when None
+        block_size: Approximate bytes examined at a time
+        report: Collects the offending characters of the matching rows
+        record_offsets: Receives an array of the file offsets where the
+            matching records of each block start, or None for the whole
+            file when they are unknown (streaming fallback, or quoting the
+            byte scan cannot follow)
+
+    Returns:
+        FilterStats: Row totals for the whole file, with stage timings
+
+    Raises:
+        ProcessingCancelled: If ``cancel_event`` was set before the scan finished
+    """
+    if starts_with_blank_line(input_path):
+        if record_offsets is not None:
+            record_offsets.append(None)
+        return filter_csv_streaming(
+            input_path, output_path, columns, chunksize, progress, cancel_event, policy, output_format, report
+        )
+
+    column_names = read_header(input_path)
+    selection = select_columns(column_names, columns, policy)
+    if report is not None:
+        column_names = report.output_columns(column_names)
+    stats = FilterStats()
+    timings = stats.timings
+    counter = RecordCounter()
+    with open_input(input_path) as (source, raw), \
+            open_writer(output_path, column_names, output_format) as output:
+        source = timings.reader(source)
+        header, carry = split_header(source, block_size)
+        position = len(header)
+        mark = timings.mark()
+        for block in iter_record_blocks(source, block_size, carry):
+            check_cancelled(cancel_event)
+            counter.feed(block)
+            timings.lap('scan', mark)
+            if selection.columns:
+                verdicts = {} if report is not None else None
+                matches = scan_block(header, block, selection, timings=timings, verdicts=verdicts)
+                if record_offsets is not None:
+                    record_offsets.append(matched_offsets(matches, position))
+                if matches is not None and not matches.empty:
+                    stats.matching_rows += len(matches)
+                    write_matches(output, matches, report, selection, timings, verdicts)
+            position += len(block)
+            if progress is not None:
+                progress(counter.records, raw.tell())
+            mark = timings.mark()
+    stats.total_rows = counter.finish()[0]
+    stats.memo = selection.memo_stats()
+    timings.finish(input_path, output_path)
+    return stats
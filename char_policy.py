@@ -0,0 +1,345 @@
+"""
+Character policies: which characters count as "allowed" in a scanned cell.
+
+A policy is declared as a set of allowed code point ranges (ASCII printable,
+printable Latin-1, a list of Unicode categories, or any of those with a
+custom allowlist/denylist applied) and compiled once into:
+
+* ``pattern`` - a regex matching one disallowed character, used by the
+  vectorized column scan;
+* ``byte_table`` - a 256-entry table classifying single bytes of UTF-8 data
+  as allowed ASCII, disallowed ASCII, or non-ASCII (must be decoded);
+* ``bitmap`` - one bit per Unicode code point, for direct membership tests.
+
+Policies are immutable and pickle by their ranges, so they can be sent to
+process-pool workers cheaply.
+"""
+
+import hashlib
+import re
+import sys
+import unicodedata
+from functools import lru_cache
+from typing import TYPE_CHECKING, Iterable, List, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Inclusive code point range
+CodeRange = Tuple[int, int]
+
+# Values of CharPolicy.byte_table
+BYTE_ALLOWED = 0
+BYTE_DISALLOWED = 1
+BYTE_NON_ASCII = 2
+
+# Characters tried, in order, as the separator when a column is joined into
+# one buffer; it must be allowed so joining cannot create a match.
+SEPARATOR_CANDIDATES = "\n\t\r "
+
+# Printable ASCII plus tab, newline and carriage return
+ASCII_PRINTABLE_RANGES = ((0x09, 0x0A), (0x0D, 0x0D), (0x20, 0x7E))
+
+# Printable Latin-1: the above plus no-break space through ÿ (C1 controls excluded)
+LATIN1_PRINTABLE_RANGES = ASCII_PRINTABLE_RANGES + ((0xA0, 0xFF),)
+
+# Major Unicode category letters, for expanding e.g. "L" to Lu, Ll, Lt, Lm, Lo
+MAJOR_CATEGORIES = 'LMNPSZC'
+
+
+def _normalise(ranges: Iterable[CodeRange]) -> Tuple[CodeRange, ...]:
+    """Sort, clip and merge overlapping or adjacent ranges."""
+    merged: List[List[int]] = []
+    for low, high in sorted((max(low, 0), min(high, sys.maxunicode)) for low, high in ranges):
+        if low > high:
+            continue
+        if merged and low <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], high)
+        else:
+            merged.append([low, high])
+    return tuple((low, high) for low, high in merged)
+
+
+def _subtract(ranges: Sequence[CodeRange], points: Iterable[int]) -> Tuple[CodeRange, ...]:
+    """Remove single code points from normalised ranges."""
+    result = []
+    removed = sorted(set(points))
+    for low, high in ranges:
+        start = low
+        for point in removed:
+            if point < start or point > high:
+                continue
+            if point > start:
+                result.append((start, point - 1))
+            start = point + 1
+        if start <= high:
+            result.append((start, high))
+    return _normalise(result)
+
+
+def _intersect(first: Sequence[CodeRange], second: Sequence[CodeRange]) -> Tuple[CodeRange, ...]:
+    """Code points in both of two normalised range lists (one merge-style sweep)."""
+    result = []
+    i = j = 0
+    while i < len(first) and j < len(second):
+        low = max(first[i][0], second[j][0])
+        high = min(first[i][1], second[j][1])
+        if low <= high:
+            result.append((low, high))
+        # Advance whichever range ends first
+        if first[i][1] < second[j][1]:
+            i += 1
+        else:
+            j += 1
+    return tuple(result)
+
+
+def _escape(code_point: int) -> str:
+    # Literal characters above Latin-1 and \xHH below it are understood by both
+    # Python's re and RE2, which pandas uses for Arrow-backed string columns.
+    if code_point < 0x100:
+        return f"\\x{code_point:02x}"
+    return chr(code_point)
+
+
+def _pattern_ranges(ranges: Sequence[CodeRange]) -> List[CodeRange]:
+    """Move range ends off lone surrogates, which RE2 cannot express."""
+    result = []
+    for low, high in ranges:
+        if 0xD800 <= low <= 0xDFFF:
+            low = 0xE000
+        if 0xD800 <= high <= 0xDFFF:
+            high = 0xD7FF
+        if low <= high:
+            result.append((low, high))
+    return result
+
+
+def _disallowed_pattern(ranges: Sequence[CodeRange]) -> 're.Pattern':
+    """Regex matching any single code point outside ``ranges``."""
+    if not ranges:
+        return re.compile(r'(?s:.)')
+    if ranges == ((0, sys.maxunicode),):
+        # Matches nothing, without a lookahead (unsupported by RE2)
+        return re.compile(f"[^\\x00-{chr(sys.maxunicode)}]")
+    items = ''.join(
+        _escape(low) if low == high else f"{_escape(low)}-{_escape(high)}"
+        for low, high in _pattern_ranges(ranges)
+    )
+    return re.compile(f"[^{items}]")
+
+
+@lru_cache(maxsize=None)
+def category_ranges(categories: Tuple[str, ...]) -> Tuple[CodeRange, ...]:
+    """
+    Code point ranges whose Unicode general category is in ``categories``.
+
+    A single letter selects a whole major category (``"L"`` is every letter).
+    The table is built by walking every code point once and memoised.
+
+    Args:
+        categories: Two-letter categories such as ``"Lu"`` or major letters such as ``"P"``
+
+    Returns:
+        Tuple[CodeRange, ...]: Normalised inclusive ranges
+    """
+    wanted = set()
+    for category in categories:
+        if len(category) == 1 and category in MAJOR_CATEGORIES:
+            wanted.add(category)
+        elif len(category) == 2 and category[0] in MAJOR_CATEGORIES:
+            wanted.add(category)
+        else:
+            raise ValueError(f"Unknown Unicode category: {category!r}")
+
+    ranges = []
+    start = None
+    for code_point in range(sys.maxunicode + 1):
+        category = unicodedata.category(chr(code_point))
+        inside = category in wanted or category[0] in wanted
+        if inside and start is None:
+            start = code_point
+        elif not inside and start is not None:
+            ranges.append((start, code_point - 1))
+            start = None
+    if start is not None:
+        ranges.append((start, sys.maxunicode))
+    return _normalise(ranges)
+
+
+class CharPolicy:
+    """
+    A compiled set of allowed characters.
+
+    Build policies with the factory functions below (or ``parse_policy``)
+    rather than from raw ranges.
+    """
+
+    def __init__(self, name: str, ranges: Iterable[CodeRange]):
+        self.name = name
+        self.ranges = _normalise(ranges)
+        self.pattern = _disallowed_pattern(self.ranges)
+
+        # One bit per code point, little-endian within each byte
+        mask = 0
+        for low, high in self.ranges:
+            mask |= ((1 << (high - low + 1)) - 1) << low
+        self.bitmap = mask.to_bytes((sys.maxunicode + 8) // 8, 'little')
+
+        table = bytearray(BYTE_NON_ASCII for _ in range(256))
+        for byte in range(128):
+            table[byte] = BYTE_ALLOWED if self._bit(byte) else BYTE_DISALLOWED
+        self.byte_table = bytes(table)
+        # Allowed ASCII bytes, for deleting them with bytes.translate
+        self.allowed_ascii = bytes(byte for byte in range(128) if table[byte] == BYTE_ALLOWED)
+        self.separator: Optional[str] = next((char for char in SEPARATOR_CANDIDATES if self.allows(char)), None)
+
+    def __reduce__(self):
+        # Workers recompile from the ranges instead of receiving the bitmap
+        return (CharPolicy, (self.name, self.ranges))
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, CharPolicy) and self.ranges == other.ranges
+
+    def __hash__(self) -> int:
+        return hash(self.ranges)
+
+    def __repr__(self) -> str:
+        return f"CharPolicy({self.name!r}, {len(self.ranges)} ranges)"
+
+    @property
+    def key(self) -> str:
+        """Stable identifier of the allowed set, e.g. for cache keys."""
+        digest = hashlib.sha1(repr(self.ranges).encode('ascii')).hexdigest()[:16]
+        return f"{self.name}:{digest}"
+
+    def _bit(self, code_point: int) -> bool:
+        return bool(self.bitmap[code_point >> 3] >> (code_point & 7) & 1)
+
+    def allows(self, char: str) -> bool:
+        """True if the single character ``char`` is allowed."""
+        return self._bit(ord(char))
+
+    def is_clean(self, text: str) -> bool:
+        """
+        True if every character of ``text`` is allowed.
+
+        ASCII text is checked with the byte table (``bytes.translate`` drops
+        allowed bytes in C); other text falls back to the compiled regex.
+        """
+        if text.isascii():
+            return not text.encode('ascii').translate(None, self.allowed_ascii)
+        return self.pattern.search(text) is None
+
+    def code_point_mask(self) -> 'np.ndarray':
+        """Boolean array indexed by code point, True where allowed."""
+        import numpy as np  # Only needed here; the command line parser imports this module
+        bits = np.unpackbits(np.frombuffer(self.bitmap, dtype=np.uint8), bitorder='little')
+        return bits[:sys.maxunicode + 1].astype(bool)
+
+    def allow(self, chars: Iterable[str], name: Optional[str] = None) -> 'CharPolicy':
+        """A copy of this policy that also allows ``chars``."""
+        extra = [(ord(char), ord(char)) for char in chars]
+        return CharPolicy(name or self.name, self.ranges + tuple(extra))
+
+    def deny(self, chars: Iterable[str], name: Optional[str] = None) -> 'CharPolicy':
+        """A copy of this policy that rejects ``chars``."""
+        return CharPolicy(name or self.name, _subtract(self.ranges, (ord(char) for char in chars)))
+
+
+def ascii_printable() -> CharPolicy:
+    """Printable ASCII plus tab, newline and carriage return (the default)."""
+    return CharPolicy('ascii', ASCII_PRINTABLE_RANGES)
+
+
+def latin1_printable() -> CharPolicy:
+    """Printable ASCII and printable Latin-1 (accented Western European letters)."""
+    return CharPolicy('latin1', LATIN1_PRINTABLE_RANGES)
+
+
+def unicode_categories(categories: Iterable[str], whitespace: bool = True) -> CharPolicy:
+    """
+    Allow every character in the given Unicode general categories.
+
+    Args:
+        categories: Categories such as ``["L", "N", "P", "Zs"]``
+        whitespace: Also allow tab, newline and carriage return, which are
+            control characters (``Cc``) but occur in ordinary text
+
+    Returns:
+        CharPolicy: The compiled policy
+    """
+    categories = tuple(sorted(set(categories)))
+    ranges = category_ranges(categories)
+    if whitespace:
+        ranges += ((0x09, 0x0A), (0x0D, 0x0D))
+    return CharPolicy('unicode:' + ','.join(categories), ranges)
+
+
+def intersection(policies: Sequence[CharPolicy], name: str = 'strictest') -> CharPolicy:
+    """
+    The characters every one of ``policies`` allows.
+
+    Text that is clean under the intersection is clean under each policy, so
+    it can pre-screen data that is checked against several policies.
+    """
+    if len(set(policies)) == 1:
+        return policies[0]
+    ranges = policies[0].ranges if policies else ((0, sys.maxunicode),)
+    for policy in policies[1:]:
+        ranges = _intersect(ranges, policy.ranges)
+    return CharPolicy(name, ranges)
+
+
+def custom(allow: str = '', deny: str = '', base: Optional[CharPolicy] = None) -> CharPolicy:
+    """
+    Start from ``base`` (nothing allowed if omitted), allow ``allow``, then reject ``deny``.
+
+    The denylist wins over both the base policy and the allowlist.
+    """
+    policy = base if base is not None else CharPolicy('custom', ())
+    name = policy.name if base is not None else 'custom'
+    if allow:
+        name += '+' + allow
+        policy = policy.allow(allow, name)
+    if deny:
+        name += '-' + deny
+        policy = policy.deny(deny, name)
+    return policy
+
+
+# Named policies selectable from the GUI and the command line
+NAMED_POLICIES = {
+    'ascii': ascii_printable,
+    'latin1': latin1_printable,
+}
+
+DEFAULT_POLICY = ascii_printable()
+
+
+def parse_policy(spec: str = 'ascii', allow: str = '', deny: str = '') -> CharPolicy:
+    """
+    Build a policy from a short text description.
+
+    Args:
+        spec: ``"ascii"``, ``"latin1"`` or ``"unicode:<categories>"`` with
+            comma-separated categories, e.g. ``"unicode:L,N,P,Zs"``
+        allow: Extra characters to allow
+        deny: Characters to reject even if the base policy allows them
+
+    Returns:
+        CharPolicy: The compiled policy
+
+    Raises:
+        ValueError: If ``spec`` names no known policy or category
+    """
+    if spec in NAMED_POLICIES:
+        base = NAMED_POLICIES[spec]()
+    elif spec.startswith('unicode:'):
+        categories = [category.strip() for category in spec[len('unicode:'):].split(',') if category.strip()]
+        if not categories:
+            raise ValueError("No Unicode categories given")
+        base = unicode_categories(categories)
+    else:
+        raise ValueError(f"Unknown character policy: {spec!r}")
+    return custom(allow, deny, base) if allow or deny else base
@@ -0,0 +1,611 @@
+#!/usr/bin/env python3
+"""
+Headless command-line entry point for the CSV special character filter.
+
+Runs the same scan engine as the GUI without importing Tkinter, so it can be
+used from cron jobs and ETL scripts. One JSON object is printed per input
+file, e.g.:
+
+    python cli.py filter "exports/*.csv" --output-dir filtered --jobs 4
+    python cli.py dimensions big.csv
+    python cli.py scan "exports/*.csv"
+    python cli.py batch nightly_drop/ --output-dir filtered
+    python cli.py watch inbox/ --output-dir outbox --jobs 2
+    python cli.py sanitize export.csv --mode transliterate
+    python cli.py filter export.csv -c "Title;re:^desc_=unicode:L,N,P,Zs" --match all
+
+The engines, and with them pandas, are imported by the commands that use
+them, so ``--help``, ``dimensions`` and ``scan`` start in a fraction of the
+time (see common and benchmarks/bench_startup.py).
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple
+
+from char_policy import DEFAULT_POLICY, NAMED_POLICIES, CharPolicy, parse_policy
+from common import (
+    COMBINE_MODES,
+    DEFAULT_CHUNKSIZE,
+    DEFAULT_COLUMNS,
+    DEFAULT_MEMO_MODE,
+    DEFAULT_REPLACEMENT,
+    DEFAULT_SANITIZE_MODE,
+    DEFAULT_TOP_N,
+    MEMO_MODES,
+    REPORT_NAME,
+    SANITIZE_MODES,
+    WATCH_POLL_SECONDS,
+    WATCH_SETTLE_SECONDS,
+    default_cache_dir,
+    default_worker_count,
+)
+from csv_bytes import count_dimensions
+from formats import OUTPUT_FORMATS, infer_output_format, output_path_for, strip_input_extension
+from run_stats import capture_profile, profile_prefix_for, stats_path_for
+
+if TYPE_CHECKING:
+    from column_rules import ColumnRules, Columns
+    from offense_report import OffenseReport
+
+
+def expand_inputs(patterns: List[str]) -> List[str]:
+    """
+    Expand file paths and glob patterns into a list of unique files.
+
+    Args:
+        patterns: Paths or glob patterns (``**`` is supported)
+
+    Returns:
+        List[str]: Matching file paths, in the order they were first seen
+    """
+    paths = []
+    seen = set()
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern, recursive=True)) or [pattern]
+        for path in matches:
+            if path not in seen and not os.path.isdir(path):
+                seen.add(path)
+                paths.append(path)
+    return paths
+
+
+def default_output_path(
+    input_path: str, output_dir: Optional[str], output_format: str = 'csv', suffix: str = '_filtered'
+) -> str:
+    """Place ``<name>_filtered.csv`` (or the extension of ``output_format``) in ``output_dir`` or next to the input."""
+    stem = strip_input_extension(os.path.basename(input_path))
+    directory = output_dir if output_dir else os.path.dirname(input_path)
+    return output_path_for(os.path.join(directory, f"{stem}{suffix}"), output_format)
+
+
+def parse_selection(args: argparse.Namespace) -> Tuple[CharPolicy, 'ColumnRules']:
+    """The policy and the column rules given by the policy, column, ``--match`` and ``--memo`` options."""
+    from column_rules import parse_rules
+
+    try:
+        policy = parse_policy(args.policy, args.allow, args.deny)
+        rules = parse_rules(
+            args.columns, getattr(args, 'match', 'any'), args.allow, args.deny,
+            getattr(args, 'memo', DEFAULT_MEMO_MODE)
+        )
+    except ValueError as e:
+        raise SystemExit(str(e))
+    return policy, rules
+
+
+def filter_file(
+    input_path: str,
+    output_path: str,
+    columns: 'Columns',
+    workers: int,
+    chunksize: int,
+    two_pass: bool = False,
+    cache_dir: Optional[str] = None,
+    policy: CharPolicy = DEFAULT_POLICY,
+    output_format: Optional[str] = None,
+    report: Optional['OffenseReport'] = None,
+    save_report: bool = False,
+    save_stats: bool = False,
+    profile: bool = False,
+) -> Dict:
+    """
+    Filter one file and describe the outcome as a JSON-serialisable dict.
+
+    Errors are reported in the ``error`` field instead of being raised, so
+    one bad file does not stop a batch. With ``save_report`` the character
+    report is written next to the output (see offense_report.report_path_for),
+    with ``save_stats`` the stage timings (see run_stats.stats_path_for), and
+    with ``profile`` a cProfile/tracemalloc capture of the run (see
+    run_stats.capture_profile).
+    """
+    from byte_scan import filter_csv_bytes
+    from column_rules import require_columns
+    from filter_engine import read_header
+    from offense_report import report_path_for
+    from parallel_scan import filter_csv_parallel
+    from projected_scan import filter_csv_projected
+    from scan_cache import ScanCache
+
+    result = {'input': input_path, 'output': output_path}
+    start = time.perf_counter()
+    try:
+        columns = require_columns(read_header(input_path), columns, policy)
+        capture = capture_profile(profile_prefix_for(output_path)) if profile else nullcontext()
+        with capture as profiled:
+            if cache_dir:
+                cache = ScanCache(cache_dir)
+                stats = cache.filter_csv(
+                    input_path, output_path, columns, chunksize, policy=policy, output_format=output_format,
+                    report=report, workers=workers, two_pass=two_pass
+                )
+                result['cache'] = cache.last_status
+            elif two_pass:
+                stats = filter_csv_projected(
+                    input_path, output_path, columns, chunksize, policy=policy, output_format=output_format,
+                    report=report
+                )
+            elif workers > 1:
+                stats = filter_csv_parallel(
+                    input_path, output_path, columns, workers=workers, chunksize=chunksize, policy=policy,
+                    output_format=output_format, report=report
+                )
+            else:
+                stats = filter_csv_bytes(
+                    input_path, output_path, columns, chunksize, policy=policy, output_format=output_format,
+                    report=report
+                )
+        if profile:
+            stats.timings.peak_traced_mb = profiled.peak_traced_mb
+            result['profile'] = profiled.profile_path
+        if save_stats:
+            result['stats'] = stats_path_for(output_path)
+            stats.save(result['stats'])
+        result.update(
+            total_rows=stats.total_rows,
+            matching_rows=stats.matching_rows,
+            percentage=round(stats.percentage, 4),
+        )
+        if stats.memo:
+            result['memo'] = {column: memo.to_dict() for column, memo in stats.memo.items()}
+        if report is not None and save_report:
+            result['report'] = report_path_for(output_path)
+            report.save(result['report'])
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+    result['seconds'] = round(time.perf_counter() - start, 6)
+    return result
+
+
+def sanitize_file(
+    input_path: str,
+    output_path: str,
+    columns: 'Columns',
+    mode: str,
+    replacement: str,
+    chunksize: int,
+    policy: CharPolicy = DEFAULT_POLICY,
+    output_format: Optional[str] = None,
+) -> Dict:
+    """Write a cleaned copy of one file and describe the outcome as a JSON-serialisable dict."""
+    from sanitize import sanitize_csv
+
+    result = {'input': input_path, 'output': output_path}
+    start = time.perf_counter()
+    try:
+        stats = sanitize_csv(
+            input_path, output_path, columns, mode, policy, replacement, chunksize, output_format=output_format
+        )
+        result.update(
+            total_rows=stats.total_rows,
+            changed_rows=stats.changed_rows,
+            changed_cells=stats.changed_cells,
+        )
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+    result['seconds'] = round(time.perf_counter() - start, 6)
+    return result
+
+
+def dimensions_file(input_path: str, cache_dir: Optional[str] = None) -> Dict:
+    """Count the rows and columns of one file as a JSON-serialisable dict."""
+    result = {'input': input_path}
+    start = time.perf_counter()
+    try:
+        if cache_dir:
+            from scan_cache import ScanCache
+            cache = ScanCache(cache_dir)
+            rows, columns = cache.count_dimensions(input_path)
+            result['cache'] = cache.last_status
+        else:
+            rows, columns = count_dimensions(input_path)
+        result.update(rows=rows, columns=columns)
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+    result['seconds'] = round(time.perf_counter() - start, 6)
+    return result
+
+
+def scan_file(input_path: str, policy: CharPolicy = DEFAULT_POLICY) -> Dict:
+    """Count the rows of one file with bytes the policy does not allow, as a JSON-serialisable dict."""
+    from byte_blocks import scan_bytes
+
+    result = {'input': input_path}
+    start = time.perf_counter()
+    try:
+        rows, dirty_rows = scan_bytes(input_path, policy)
+        result.update(rows=rows, dirty_rows=dirty_rows)
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+    result['seconds'] = round(time.perf_counter() - start, 6)
+    return result
+
+
+# Help text of every --columns option
+COLUMNS_HELP = (
+    "columns to check, separated by commas (or semicolons when a spec contains commas): "
+    "a name, #<index>, re:<pattern> or * for every column, each optionally followed by "
+    "=<policy> (default: %(default)s)"
+)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Create the argument parser for every subcommand."""
+    parser = argparse.ArgumentParser(
+        description="Find rows whose columns contain special (non-ASCII) characters."
+    )
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    filter_parser = subparsers.add_parser('filter', help="write the rows that contain special characters")
+    filter_parser.add_argument('inputs', nargs='+', help="input CSV files or glob patterns")
+    output_group = filter_parser.add_mutually_exclusive_group()
+    output_group.add_argument('-o', '--output', help="output path (single input only)")
+    output_group.add_argument('--output-dir', help="directory for <name>_filtered.<format> outputs")
+    filter_parser.add_argument('-c', '--columns', default=','.join(DEFAULT_COLUMNS), help=COLUMNS_HELP)
+    filter_parser.add_argument(
+        '-j', '--jobs', type=int, default=default_worker_count(),
+        help="worker processes (default: %(default)s)"
+    )
+    filter_parser.add_argument(
+        '--chunksize', type=int, default=DEFAULT_CHUNKSIZE,
+        help="rows parsed per chunk (default: %(default)s)"
+    )
+    filter_parser.add_argument(
+        '--two-pass', action='store_true',
+        help="parse only the checked columns first, then full records for matching rows "
+             "(faster for wide files with few matches)"
+    )
+    filter_parser.add_argument(
+        '--report', action='store_true',
+        help="write <name>_filtered_report.json with offending code points, categories and values per column"
+    )
+    filter_parser.add_argument(
+        '--annotate', action='store_true',
+        help="add columns listing the offending columns, code points and their positions in each output row"
+    )
+    filter_parser.add_argument(
+        '--top', type=int, default=DEFAULT_TOP_N,
+        help="offending values listed per column in the report (default: %(default)s)"
+    )
+    filter_parser.add_argument(
+        '--stats', action='store_true',
+        help="write <name>_filtered_stats.json with the time, rows and bytes of each stage and the peak memory"
+    )
+    filter_parser.add_argument(
+        '--profile', action='store_true',
+        help="write a cProfile profile (<name>_filtered_profile.prof) and the top tracemalloc allocations "
+             "(<name>_filtered_profile_memory.txt) of the run; worker processes are not profiled"
+    )
+
+    dimensions_parser = subparsers.add_parser('dimensions', help="count rows and columns")
+    dimensions_parser.add_argument('inputs', nargs='+', help="input CSV files or glob patterns")
+    dimensions_parser.add_argument(
+        '-j', '--jobs', type=int, default=1,
+        help="worker processes (default: %(default)s)"
+    )
+
+    scan_parser = subparsers.add_parser(
+        'scan', help="count the rows with bytes the policy does not allow, in any column, without parsing fields"
+    )
+    scan_parser.add_argument('inputs', nargs='+', help="input CSV files or glob patterns")
+    scan_parser.add_argument(
+        '-j', '--jobs', type=int, default=1,
+        help="worker processes (default: %(default)s)"
+    )
+
+    batch_parser = subparsers.add_parser(
+        'batch', help="filter every CSV of a directory or manifest on one worker pool"
+    )
+    batch_parser.add_argument('source', help="directory (searched recursively) or manifest with one path per line")
+    batch_parser.add_argument(
+        '--output-dir', required=True,
+        help=f"directory for outputs, the resume journal and {REPORT_NAME}"
+    )
+    batch_parser.add_argument(
+        '-j', '--jobs', type=int, default=default_worker_count(),
+        help="worker processes (default: %(default)s)"
+    )
+    batch_parser.add_argument(
+        '--chunksize', type=int, default=DEFAULT_CHUNKSIZE,
+        help="rows parsed per chunk (default: %(default)s)"
+    )
+    batch_parser.add_argument('-c', '--columns', default=','.join(DEFAULT_COLUMNS), help=COLUMNS_HELP)
+
+    watch_parser = subparsers.add_parser(
+        'watch', help="keep filtering the CSV files that land in an inbox directory until interrupted"
+    )
+    watch_parser.add_argument('inbox', help="directory to watch; finished inputs move to its processed/ and failed/")
+    watch_parser.add_argument(
+        '--output-dir', required=True, help="directory for the outputs and their <name>_filtered_stats.json"
+    )
+    watch_parser.add_argument(
+        '-j', '--jobs', type=int, default=default_worker_count(),
+        help="files filtered at once, one worker process each (default: %(default)s)"
+    )
+    watch_parser.add_argument(
+        '--queue', type=int, default=0,
+        help="files claimed while waiting for a worker; others stay in the inbox (default: as many as --jobs)"
+    )
+    watch_parser.add_argument(
+        '--chunksize', type=int, default=DEFAULT_CHUNKSIZE,
+        help="rows parsed per chunk (default: %(default)s)"
+    )
+    watch_parser.add_argument('-c', '--columns', default=','.join(DEFAULT_COLUMNS), help=COLUMNS_HELP)
+    watch_parser.add_argument(
+        '--poll', type=float, default=WATCH_POLL_SECONDS,
+        help="seconds between listings of the inbox (default: %(default)s)"
+    )
+    watch_parser.add_argument(
+        '--settle', type=float, default=WATCH_SETTLE_SECONDS,
+        help="seconds a file's size must stay unchanged before it is filtered (default: %(default)s)"
+    )
+    watch_parser.add_argument(
+        '--polling', action='store_true', help="only poll, even where inotify is available"
+    )
+    watch_parser.add_argument(
+        '--keep-inputs', action='store_true', help="leave finished inputs in the inbox"
+    )
+    watch_parser.add_argument(
+        '--once', action='store_true', help="exit once the inbox holds no more files to filter"
+    )
+
+    sanitize_parser = subparsers.add_parser(
+        'sanitize', help="write a copy of each file with special characters rewritten in the checked columns"
+    )
+    sanitize_parser.add_argument('inputs', nargs='+', help="input CSV files or glob patterns")
+    sanitize_output_group = sanitize_parser.add_mutually_exclusive_group()
+    sanitize_output_group.add_argument('-o', '--output', help="output path (single input only)")
+    sanitize_output_group.add_argument('--output-dir', help="directory for <name>_clean.<format> outputs")
+    sanitize_parser.add_argument(
+        '-c', '--columns', default=','.join(DEFAULT_COLUMNS), help=COLUMNS_HELP.replace('to check', 'to clean')
+    )
+    sanitize_parser.add_argument(
+        '--mode', choices=SANITIZE_MODES, default=DEFAULT_SANITIZE_MODE,
+        help="transliterate (é->e, ß->ss), nfkd (decompose and drop accents), "
+             "replace or delete (default: %(default)s)"
+    )
+    sanitize_parser.add_argument(
+        '--replacement', default=DEFAULT_REPLACEMENT,
+        help="inserted for characters with no allowed spelling (default: %(default)s)"
+    )
+    sanitize_parser.add_argument(
+        '-j', '--jobs', type=int, default=1,
+        help="worker processes, one file each (default: %(default)s)"
+    )
+    sanitize_parser.add_argument(
+        '--chunksize', type=int, default=DEFAULT_CHUNKSIZE,
+        help="rows parsed per chunk (default: %(default)s)"
+    )
+
+    for command_parser in (filter_parser, batch_parser, watch_parser, sanitize_parser):
+        command_parser.add_argument(
+            '--format', choices=OUTPUT_FORMATS, default=None,
+            help="output format (default: from the --output extension, else csv)"
+        )
+
+    for command_parser in (filter_parser, batch_parser, watch_parser, sanitize_parser, scan_parser):
+        command_parser.add_argument(
+            '--policy', default='ascii',
+            help=f"allowed characters: {', '.join(NAMED_POLICIES)} or unicode:<categories>, "
+                 "e.g. unicode:L,N,P,Zs (default: %(default)s)"
+        )
+        command_parser.add_argument('--allow', default='', help="extra characters to allow")
+        command_parser.add_argument(
+            '--deny', default='', help="characters to reject even if the policy allows them"
+        )
+
+    for command_parser in (filter_parser, batch_parser, watch_parser):
+        command_parser.add_argument(
+            '--match', choices=COMBINE_MODES, default='any',
+            help="select rows where any or all of the checked columns contain special characters "
+                 "(default: %(default)s)"
+        )
+        command_parser.add_argument(
+            '--memo', choices=MEMO_MODES, default=DEFAULT_MEMO_MODE,
+            help="check each distinct value once and reuse the verdict; auto does so for columns "
+                 "with few distinct values (default: %(default)s)"
+        )
+
+    for command_parser in (filter_parser, dimensions_parser):
+        command_parser.add_argument(
+            '--cache', action='store_true',
+            help="reuse results of earlier scans and only scan data appended since"
+        )
+        command_parser.add_argument(
+            '--cache-dir', default=default_cache_dir(),
+            help="cache directory (default: %(default)s)"
+        )
+    return parser
+
+
+def run_filter(args: argparse.Namespace, inputs: List[str]) -> Iterator[Dict]:
+    """Filter every input, splitting the work across ``--jobs`` processes."""
+    policy, columns = parse_selection(args)
+    if args.output and len(inputs) > 1:
+        raise SystemExit("--output can only be used with a single input file; use --output-dir instead")
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    output_format = infer_output_format(args.output, args.format) if args.output else args.format or 'csv'
+    outputs = [args.output or default_output_path(path, args.output_dir, output_format) for path in inputs]
+    cache_dir = args.cache_dir if args.cache else None
+    reporting = args.report or args.annotate
+
+    from offense_report import OffenseReport
+
+    def new_report() -> Optional[OffenseReport]:
+        return OffenseReport(args.top, args.annotate) if reporting else None
+
+    if len(inputs) == 1:
+        # A single large file is sharded across the worker processes instead
+        yield filter_file(
+            inputs[0], outputs[0], columns, args.jobs, args.chunksize, args.two_pass, cache_dir, policy,
+            output_format, new_report(), args.report, args.stats, args.profile
+        )
+        return
+
+    with ProcessPoolExecutor(max_workers=max(args.jobs, 1)) as executor:
+        futures = [
+            executor.submit(
+                filter_file, path, output, columns, 1, args.chunksize, args.two_pass, cache_dir, policy, output_format,
+                new_report(), args.report, args.stats, args.profile
+            )
+            for path, output in zip(inputs, outputs)
+        ]
+        for future in futures:
+            yield future.result()
+
+
+def run_batch_command(args: argparse.Namespace) -> int:
+    """Run a batch, printing each file's result as it finishes and the totals last."""
+    from batch import run_batch
+
+    policy, columns = parse_selection(args)
+    if not os.path.exists(args.source):
+        print(f"No such directory or manifest: {args.source}", file=sys.stderr)
+        return 1
+
+    report = run_batch(
+        args.source, args.output_dir, columns, workers=args.jobs, chunksize=args.chunksize, policy=policy,
+        on_result=lambda result: print(json.dumps(result.to_dict()), flush=True),
+        output_format=args.format or 'csv'
+    )
+    print(json.dumps({'report': os.path.join(args.output_dir, REPORT_NAME), **report['totals']}), flush=True)
+    return 1 if report['totals']['failed'] else 0
+
+
+def run_watch_command(args: argparse.Namespace) -> int:
+    """Run the watch daemon, printing each file's result as it finishes and the totals when it stops."""
+    import asyncio
+
+    from watch import WatchFolder
+
+    policy, columns = parse_selection(args)
+    if not os.path.isdir(args.inbox):
+        print(f"No such directory: {args.inbox}", file=sys.stderr)
+        return 1
+
+    daemon = WatchFolder(
+        args.inbox, args.output_dir, columns, policy, workers=args.jobs, queue_size=args.queue,
+        chunksize=args.chunksize, output_format=args.format or 'csv', poll_interval=args.poll,
+        settle_seconds=args.settle, use_inotify=not args.polling, keep_inputs=args.keep_inputs, once=args.once,
+        on_result=lambda result: print(json.dumps(result.to_dict()), flush=True)
+    )
+    totals = asyncio.run(daemon.run(handle_signals=True))
+    print(json.dumps(totals), flush=True)
+    return 1 if totals['failed'] else 0
+
+
+def run_sanitize(args: argparse.Namespace, inputs: List[str]) -> Iterator[Dict]:
+    """Sanitize every input, one file per worker process."""
+    policy, columns = parse_selection(args)
+    if args.output and len(inputs) > 1:
+        raise SystemExit("--output can only be used with a single input file; use --output-dir instead")
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    output_format = infer_output_format(args.output, args.format) if args.output else args.format or 'csv'
+    outputs = [args.output or default_output_path(path, args.output_dir, output_format, '_clean') for path in inputs]
+    arguments = [
+        (path, output, columns, args.mode, args.replacement, args.chunksize, policy, output_format)
+        for path, output in zip(inputs, outputs)
+    ]
+    if args.jobs <= 1 or len(inputs) == 1:
+        for item in arguments:
+            yield sanitize_file(*item)
+        return
+    with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+        for future in [executor.submit(sanitize_file, *item) for item in arguments]:
+            yield future.result()
+
+
+def run_dimensions(args: argparse.Namespace, inputs: List[str]) -> Iterator[Dict]:
+    """Count the dimensions of every input."""
+    cache_dirs = [args.cache_dir if args.cache else None] * len(inputs)
+    if args.jobs <= 1 or len(inputs) == 1:
+        yield from map(dimensions_file, inputs, cache_dirs)
+        return
+    with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+        yield from executor.map(dimensions_file, inputs, cache_dirs)
+
+
+def run_scan(args: argparse.Namespace, inputs: List[str]) -> Iterator[Dict]:
+    """Scan the bytes of every input."""
+    try:
+        policy = parse_policy(args.policy, args.allow, args.deny)
+    except ValueError as e:
+        raise SystemExit(str(e))
+    policies = [policy] * len(inputs)
+    if args.jobs <= 1 or len(inputs) == 1:
+        yield from map(scan_file, inputs, policies)
+        return
+    with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+        yield from executor.map(scan_file, inputs, policies)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Run the command line interface.
+
+    Args:
+        argv: Arguments to parse (defaults to ``sys.argv[1:]``)
+
+    Returns:
+        int: Exit status, 1 if any file failed
+    """
+    args = build_parser().parse_args(argv)
+    if args.command == 'batch':
+        return run_batch_command(args)
+    if args.command == 'watch':
+        return run_watch_command(args)
+
+    inputs = expand_inputs(args.inputs)
+    if not inputs:
+        print("No input files matched.", file=sys.stderr)
+        return 1
+
+    if args.command == 'filter':
+        results = run_filter(args, inputs)
+    elif args.command == 'sanitize':
+        results = run_sanitize(args, inputs)
+    elif args.command == 'scan':
+        results = run_scan(args, inputs)
+    else:
+        results = run_dimensions(args, inputs)
+
+    # One JSON line per file, flushed as soon as it is ready
+    failed = False
+    for result in results:
+        failed = failed or 'error' in result
+        print(json.dumps(result), flush=True)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
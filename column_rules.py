@@ -0,0 +1,439 @@
+"""
+Selection of the checked columns and the character policy of each.
+
+A column selection is written as a list of specs, one per rule:
+
+* ``Title`` - the column with that exact name;
+* ``#3`` - the column at that 0-based position in the header;
+* ``re:^desc`` - every column whose name the regular expression matches
+  (``re.search``, so anchor it to match whole names);
+* ``*`` - every column (all fields are read as text, so this is every string
+  column).
+
+A spec may end in ``=<policy>`` (any ``char_policy.parse_policy`` spec) to
+check its columns against a policy of their own, e.g. ``Notes=latin1`` or
+``re:_ja$=unicode:L,N,P,Zs``. When several rules select the same column the
+last one decides its policy. Rows match when ``any`` (default) or ``all`` of
+the selected columns contain a character their policy rejects.
+
+The rules are resolved against a file's header into a ColumnSelection, which
+evaluates every selected column in one vectorised pass per distinct policy.
+Low-cardinality columns are answered through a ValueMemo (see value_memo).
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_object_dtype, is_string_dtype
+
+from char_policy import DEFAULT_POLICY, CharPolicy, intersection, parse_policy
+from common import COMBINE_MODES
+from value_memo import DEFAULT_MEMO_MODE, MEMO_MODES, MemoStats, ValueMemo
+
+# Selector prefixes and the selector matching every column
+INDEX_PREFIX = '#'
+REGEX_PREFIX = 're:'
+ALL_COLUMNS = '*'
+
+# Every byte that is not ASCII, for bytes.translate
+NON_ASCII_BYTES = bytes(range(128, 256))
+
+
+def _arrow_backed(dtype) -> bool:
+    """True for string dtypes stored in Arrow memory."""
+    return isinstance(dtype, pd.ArrowDtype) or getattr(dtype, 'storage', None) == 'pyarrow'
+
+
+def _string_chunks(values: pd.Series) -> Optional[list]:
+    """The Arrow chunks of ``values``, or None for layouts other than (large) string."""
+    import pyarrow as pa
+
+    array = values.array.__arrow_array__()
+    chunks = array.chunks if isinstance(array, pa.ChunkedArray) else [array]
+    if all(pa.types.is_string(chunk.type) or pa.types.is_large_string(chunk.type) for chunk in chunks):
+        return chunks
+    return None
+
+
+def _chunk_data(chunk) -> bytes:
+    """The UTF-8 bytes of the values of a (large) string chunk, back to back."""
+    import pyarrow as pa
+
+    _, offsets, data = chunk.buffers()
+    if not len(chunk) or data is None:
+        return b''
+    width = np.int64 if pa.types.is_large_string(chunk.type) else np.int32
+    start, end = np.frombuffer(offsets, dtype=width)[[chunk.offset, chunk.offset + len(chunk)]]
+    return memoryview(data)[start:end].tobytes()
+
+
+def _arrow_column_mask(values: pd.Series, policy: CharPolicy) -> pd.Series:
+    """column_mask for Arrow-backed strings, screening their data buffers instead of a joined string."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    chunks = _string_chunks(values)
+    if chunks is not None:
+        # Only offending ASCII bytes and non-ASCII bytes survive
+        offending = b''.join(_chunk_data(chunk).translate(None, policy.allowed_ascii) for chunk in chunks)
+        if not offending:
+            return pd.Series(False, index=values.index)
+        if not offending.translate(None, NON_ASCII_BYTES):
+            # Every ASCII byte is allowed, so only values with other characters can match
+            is_ascii = pc.string_is_ascii(pa.chunked_array(chunks, type=chunks[0].type) if chunks else pa.array([]))
+            candidates = ~is_ascii.fill_null(True).to_numpy(zero_copy_only=False)
+            mask = np.zeros(len(values), dtype=bool)
+            mask[candidates] = values[candidates].str.contains(policy.pattern, na=False).to_numpy(dtype=bool)
+            return pd.Series(mask, index=values.index)
+    return values.str.contains(policy.pattern, na=False).astype(bool)
+
+
+def column_mask(values: pd.Series, policy: CharPolicy = DEFAULT_POLICY) -> pd.Series:
+    """
+    Flag the values of a single column that contain special characters.
+
+    Clean columns are rejected with one pass over the joined column buffer
+    (for Arrow-backed strings, over their data buffers, which hold the
+    values back to back already); only columns that contain at least one
+    offending character are evaluated value by value.
+
+    Args:
+        values: The column to check
+        policy: Characters considered allowed
+
+    Returns:
+        pd.Series: Boolean mask aligned with ``values``
+    """
+    # Numeric, boolean and datetime columns can never hold special characters
+    if not (is_object_dtype(values.dtype) or is_string_dtype(values.dtype)):
+        return pd.Series(False, index=values.index)
+
+    if _arrow_backed(values.dtype):
+        return _arrow_column_mask(values, policy)
+
+    buffer = None
+    if policy.separator is not None:
+        try:
+            # The separator is an allowed character, so joining cannot create a match
+            buffer = policy.separator.join(values.dropna())
+        except TypeError:
+            # Mixed object column (e.g. str and int); let pandas handle each value
+            pass
+
+    if buffer is not None and policy.is_clean(buffer):
+        return pd.Series(False, index=values.index)
+
+    return values.str.contains(policy.pattern, na=False).astype(bool)
+
+
+class ColumnSelection:
+    """
+    The checked columns of one header, each with its policy.
+
+    Args:
+        policies: Column name -> policy, in checking order
+        combine: ``'any'`` or ``'all'`` (see COMBINE_MODES)
+        memoize: When to memoise the verdicts of distinct values (see value_memo.MEMO_MODES)
+    """
+
+    def __init__(self, policies: Dict[str, CharPolicy], combine: str = 'any', memoize: str = DEFAULT_MEMO_MODE):
+        if combine not in COMBINE_MODES:
+            raise ValueError(f"Unknown column combination: {combine!r} (choose from {', '.join(COMBINE_MODES)})")
+        self.policies = dict(policies)
+        self.combine = combine
+        self.memos = {column: ValueMemo(memoize) for column in self.policies}
+        distinct = list(dict.fromkeys(self.policies.values()))
+        # Text clean under the strictest policy is clean in every column, so the
+        # byte-level pre-screen of whole records uses it
+        self.scan_policy = intersection(distinct) if distinct else DEFAULT_POLICY
+
+    def __repr__(self) -> str:
+        return f"ColumnSelection({len(self.policies)} columns, combine={self.combine!r})"
+
+    @property
+    def columns(self) -> List[str]:
+        """Names of the selected columns."""
+        return list(self.policies)
+
+    @property
+    def key(self) -> str:
+        """Stable identifier of the columns, their policies and the combination, e.g. for cache keys."""
+        return ';'.join([self.combine] + [f"{column}={policy.key}" for column, policy in self.policies.items()])
+
+    @property
+    def policy_key(self) -> str:
+        """Key of the policy every column uses, or ``column=key`` pairs when they differ."""
+        distinct = set(self.policies.values())
+        if len(distinct) <= 1:
+            return (distinct.pop() if distinct else self.scan_policy).key
+        return ', '.join(f"{column}={policy.key}" for column, policy in self.policies.items())
+
+    def groups(self) -> List[Tuple[CharPolicy, List[str]]]:
+        """The selected columns grouped by policy, in order of first appearance."""
+        grouped: Dict[CharPolicy, List[str]] = {}
+        for column, policy in self.policies.items():
+            grouped.setdefault(policy, []).append(column)
+        return list(grouped.items())
+
+    def memo_stats(self) -> Dict[str, MemoStats]:
+        """Memo counters of the columns that have been checked so far."""
+        return {column: memo.stats for column, memo in self.memos.items() if memo.stats.values or memo.stats.direct}
+
+    def mask(self, frame: pd.DataFrame, verdicts: Optional[Dict[str, np.ndarray]] = None) -> pd.Series:
+        """
+        Build the row mask of ``frame``.
+
+        The columns sharing a policy are stacked into one Series and searched
+        with a single vectorised call, then folded back to one flag per row.
+        Memoised columns contribute only their distinct values not seen
+        before. Selected columns missing from ``frame`` count as clean.
+
+        Args:
+            frame: The rows to check
+            verdicts: Receives the flags of every column evaluated, one per
+                row, for callers that report on the columns of each match
+
+        Returns:
+            pd.Series: Boolean mask aligned with ``frame.index``
+        """
+        if not self.policies:
+            return pd.Series(False, index=frame.index)
+        rows = len(frame)
+        result = np.zeros(rows, dtype=bool) if self.combine == 'any' else np.ones(rows, dtype=bool)
+        for policy, columns in self.groups():
+            present = [column for column in columns if column in frame.columns]
+            if len(present) < len(columns) and self.combine == 'all':
+                return pd.Series(False, index=frame.index)
+            if not present:
+                continue
+            pieces = []
+            lookups = []
+            for column in present:
+                memo = self.memos[column]
+                lookup = memo.lookup(frame[column]) if memo.wants(rows) else None
+                if lookup is None:
+                    memo.stats.direct += rows
+                lookups.append(lookup)
+                pieces.append(frame[column] if lookup is None else lookup.unknown)
+            values = pieces[0] if len(pieces) == 1 else pd.concat(pieces, ignore_index=True)
+            flags = column_mask(values, policy).to_numpy(dtype=bool)
+            bounds = np.cumsum([0] + [len(piece) for piece in pieces])
+            for index, (column, lookup) in enumerate(zip(present, lookups)):
+                column_flags = flags[bounds[index]:bounds[index + 1]]
+                if lookup is not None:
+                    column_flags = self.memos[column].resolve(lookup, column_flags)
+                if verdicts is not None:
+                    verdicts[column] = column_flags
+                if self.combine == 'any':
+                    result |= column_flags
+                else:
+                    result &= column_flags
+            if self.combine == 'all' and not result.any():
+                break
+        return pd.Series(result, index=frame.index)
+
+
+@dataclass(frozen=True)
+class ColumnRule:
+    """One selector and the policy of the columns it selects (None: the run's policy)."""
+    selector: str
+    policy: Optional[CharPolicy] = None
+
+    def select(self, header: Sequence[str]) -> List[str]:
+        """The columns of ``header`` this rule selects, in header order."""
+        if self.selector == ALL_COLUMNS:
+            return list(header)
+        if self.selector.startswith(REGEX_PREFIX):
+            pattern = re.compile(self.selector[len(REGEX_PREFIX):])
+            return [column for column in header if pattern.search(column)]
+        index = self.index
+        if index is not None:
+            return [header[index]] if index < len(header) else []
+        return [self.selector] if self.selector in header else []
+
+    @property
+    def index(self) -> Optional[int]:
+        """The position of an index selector, None for other selectors."""
+        digits = self.selector[len(INDEX_PREFIX):]
+        if self.selector.startswith(INDEX_PREFIX) and digits.isdigit():
+            return int(digits)
+        return None
+
+    @property
+    def is_name(self) -> bool:
+        """True if the rule names one column, which must then exist."""
+        return self.selector != ALL_COLUMNS and not self.selector.startswith(REGEX_PREFIX) and self.index is None
+
+
+class ColumnRules:
+    """
+    An ordered list of ColumnRule and how their columns combine.
+
+    Pass an instance as ``columns`` to any filter function in place of a
+    list of names.
+
+    Args:
+        rules: Rules in order; later rules override the policy of earlier ones
+        combine: ``'any'`` or ``'all'``
+        memoize: When to memoise the verdicts of distinct values (see value_memo.MEMO_MODES)
+    """
+
+    def __init__(self, rules: Iterable[ColumnRule], combine: str = 'any', memoize: str = DEFAULT_MEMO_MODE):
+        if combine not in COMBINE_MODES:
+            raise ValueError(f"Unknown column combination: {combine!r} (choose from {', '.join(COMBINE_MODES)})")
+        self.rules = list(rules)
+        self.combine = combine
+        self.memoize = memoize
+
+    def __repr__(self) -> str:
+        return f"ColumnRules({[rule.selector for rule in self.rules]!r}, combine={self.combine!r})"
+
+    def resolve(self, header: Sequence[str], policy: CharPolicy = DEFAULT_POLICY) -> ColumnSelection:
+        """
+        Select the columns of ``header``.
+
+        Args:
+            header: Column names of the file
+            policy: Policy of the columns whose rule names none
+
+        Returns:
+            ColumnSelection: The selected columns in order of first selection
+        """
+        header = list(header)
+        policies: Dict[str, CharPolicy] = {}
+        for rule in self.rules:
+            for column in rule.select(header):
+                policies[column] = rule.policy or policy
+        return ColumnSelection(policies, self.combine, self.memoize)
+
+    def missing(self, header: Sequence[str]) -> List[str]:
+        """Selectors of named columns and positions that ``header`` does not have."""
+        header = list(header)
+        return [
+            rule.selector for rule in self.rules
+            if (rule.is_name or rule.index is not None) and not rule.select(header)
+        ]
+
+
+# What the filter functions accept as ``columns``
+Columns = Union[Iterable[str], ColumnRules, ColumnSelection]
+
+
+def parse_rule(spec: str, allow: str = '', deny: str = '') -> ColumnRule:
+    """
+    Parse one column spec, e.g. ``"Title"``, ``"#2=latin1"`` or ``"re:^name_"``.
+
+    Args:
+        spec: Selector with an optional ``=<policy>`` suffix
+        allow: Extra characters allowed by a policy given in the spec
+        deny: Characters rejected by a policy given in the spec
+
+    Raises:
+        ValueError: If the spec is empty or its regular expression is invalid
+    """
+    spec = spec.strip()
+    selector, separator, policy_spec = spec.rpartition('=')
+    policy = None
+    if separator and selector.strip():
+        try:
+            policy = parse_policy(policy_spec.strip(), allow, deny)
+        except ValueError:
+            # Not a policy: the '=' belongs to a column name or pattern
+            selector = spec
+        else:
+            selector = selector.strip()
+    else:
+        selector = spec
+    if not selector:
+        raise ValueError("Empty column spec")
+    if selector.startswith(REGEX_PREFIX):
+        try:
+            re.compile(selector[len(REGEX_PREFIX):])
+        except re.error as e:
+            raise ValueError(f"Invalid column pattern {selector!r}: {e}") from e
+    return ColumnRule(selector, policy)
+
+
+def split_specs(text: str) -> List[str]:
+    """
+    Split a list of column specs typed as one string.
+
+    Specs are separated by commas, or by semicolons when the text contains
+    any (for specs that contain commas themselves, such as ``unicode:L,N``).
+    """
+    separator = ';' if ';' in text else ','
+    return [spec.strip() for spec in text.split(separator) if spec.strip()]
+
+
+def parse_rules(
+    specs: Union[str, Iterable[str]],
+    combine: str = 'any',
+    allow: str = '',
+    deny: str = '',
+    memoize: str = DEFAULT_MEMO_MODE,
+) -> ColumnRules:
+    """
+    Parse column specs into ColumnRules.
+
+    Args:
+        specs: Specs as a list, or as one string for split_specs
+        combine: ``'any'`` or ``'all'``
+        allow: Extra characters allowed by the policies given in the specs
+        deny: Characters rejected by the policies given in the specs
+        memoize: When to memoise the verdicts of distinct values
+
+    Raises:
+        ValueError: If a spec is invalid or ``combine`` or ``memoize`` is unknown
+    """
+    if isinstance(specs, str):
+        specs = split_specs(specs)
+    if memoize not in MEMO_MODES:
+        raise ValueError(f"Unknown memo mode: {memoize!r} (choose from {', '.join(MEMO_MODES)})")
+    return ColumnRules([parse_rule(spec, allow, deny) for spec in specs], combine, memoize)
+
+
+def select_columns(header: Sequence[str], columns: Columns, policy: CharPolicy = DEFAULT_POLICY) -> ColumnSelection:
+    """
+    Resolve ``columns`` against a header.
+
+    Args:
+        header: Column names of the file
+        columns: Names (missing ones are skipped), ColumnRules, or an
+            already resolved ColumnSelection, which is returned as is
+        policy: Policy of columns that do not name their own
+
+    Returns:
+        ColumnSelection: The selected columns present in ``header``
+    """
+    if isinstance(columns, ColumnSelection):
+        return columns
+    if isinstance(columns, ColumnRules):
+        return columns.resolve(header, policy)
+    present = set(header)
+    return ColumnSelection({column: policy for column in columns if column in present})
+
+
+def require_columns(header: Sequence[str], columns: Columns, policy: CharPolicy = DEFAULT_POLICY) -> ColumnSelection:
+    """
+    Resolve ``columns`` like select_columns, insisting that they exist.
+
+    Raises:
+        ValueError: If a named column or a position is missing from the
+            header, or nothing is selected at all
+    """
+    if isinstance(columns, ColumnRules):
+        missing = columns.missing(header)
+    elif isinstance(columns, ColumnSelection):
+        missing = [column for column in columns.columns if column not in header]
+    else:
+        columns = list(columns)
+        missing = [column for column in columns if column not in header]
+    if missing:
+        raise ValueError(f"Missing required columns: {', '.join(missing)}")
+    selection = select_columns(header, columns, policy)
+    if not selection.columns:
+        raise ValueError("No columns match the column selection")
+    return selection
@@ -0,0 +1,77 @@
+"""
+Settings and helpers shared by the engines, the command line and the GUI.
+
+Nothing here imports pandas, numpy or Tkinter. cli.py builds its parser from
+these names, and the dimension count and pure-bytes scan in csv_bytes need
+only this module and formats, so ``--help``, ``dimensions`` and ``scan``
+start without loading pandas (see benchmarks/bench_startup.py). The modules
+that use each setting re-export it under its usual name, e.g.
+``filter_engine.DEFAULT_COLUMNS`` or ``sanitize.MODES``.
+"""
+
+import os
+import threading
+from typing import Callable, Optional
+
+# Columns checked when the caller does not specify any
+DEFAULT_COLUMNS = ['Title', 'Developer']
+
+# Rows parsed per chunk by the streaming filter
+DEFAULT_CHUNKSIZE = 100_000
+
+# How the per-column results are combined into the row result
+COMBINE_MODES = ['any', 'all']
+
+# Whether verdicts of repeated values are memoised (see value_memo)
+MEMO_MODES = ['auto', 'on', 'off']
+DEFAULT_MEMO_MODE = 'auto'
+
+# How sanitize rewrites offending characters
+SANITIZE_MODES = ['transliterate', 'nfkd', 'replace', 'delete']
+DEFAULT_SANITIZE_MODE = 'transliterate'
+DEFAULT_REPLACEMENT = '?'
+
+# Offending values shown per column of a character report
+DEFAULT_TOP_N = 10
+
+# Written to the output directory of a batch
+REPORT_NAME = 'batch_report.json'
+
+# How often the watch daemon lists its inbox, and how long a file's size and
+# modification time must hold still before it is picked up
+WATCH_POLL_SECONDS = 1.0
+WATCH_SETTLE_SECONDS = 2.0
+
+# Called with (rows processed so far, input bytes consumed so far)
+ProgressCallback = Callable[[int, int], None]
+
+
+class ProcessingCancelled(Exception):
+    """Raised inside a running scan when its cancel event has been set."""
+
+
+def check_cancelled(cancel_event: Optional[threading.Event]) -> None:
+    """
+    Stop the current job if cancellation was requested.
+
+    Args:
+        cancel_event: Event set by the caller to request cancellation, or None
+
+    Raises:
+        ProcessingCancelled: If ``cancel_event`` is set
+    """
+    if cancel_event is not None and cancel_event.is_set():
+        raise ProcessingCancelled()
+
+
+def default_worker_count() -> int:
+    """Number of worker processes used when the caller does not choose one."""
+    return os.cpu_count() or 1
+
+
+def default_cache_dir() -> str:
+    """``$CSV_FILTER_CACHE_DIR``, else ``$XDG_CACHE_HOME`` or ``~/.cache``, plus the app name."""
+    if os.environ.get('CSV_FILTER_CACHE_DIR'):
+        return os.environ['CSV_FILTER_CACHE_DIR']
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'csv_special_char_filter')
@@ -0,0 +1,370 @@
+"""
+Quote-aware helpers that work on the raw bytes of a CSV file.
+
+These functions never parse fields. They only track whether a position lies
+inside a quoted field, which is enough to find record boundaries even when
+quoted values contain embedded newlines. Like pandas, they take a quote as
+the start of a quoted field only at the start of a field; anywhere else, as
+in ``27" Monitor``, it is a plain character. Nothing here imports pandas
+(see common), so counting dimensions stays light.
+"""
+
+import csv
+import io
+import mmap
+import re
+import threading
+from bisect import bisect_right
+from itertools import accumulate
+from typing import List, Optional, Tuple
+
+from common import ProgressCallback, check_cancelled
+from formats import open_input
+
+# Bytes copied out of the mapping (or read from disk) at a time
+BLOCK_SIZE = 16 * 1024 * 1024
+# Bytes first searched for the end of a single record; doubled until it is found
+RECORD_WINDOW = 4096
+
+# Lines holding nothing but whitespace, which pandas skips as blank lines
+BLANK_LINE = re.compile(rb'(?<=\n)[ \t\r]*\n')
+BLANK_LINE_HINT = re.compile(rb'\n[ \t\r\n]')
+LINE_WHITESPACE = b' \t\r'
+
+# A quoted field: a quote at the start of a field (first in the data, or
+# after a comma or newline) up to its closing quote, with "" standing for a
+# quote inside it. A field still open at the end of the data runs to its end.
+QUOTED_FIELD = rb'"(?<![^,\n]")[^"]*(?:""[^"]*)*(?:"|\Z)'
+# Splits data into runs outside and inside quoted fields, alternating, outside first
+QUOTED_RUNS = re.compile(b'(' + QUOTED_FIELD + b')')
+
+
+def quote_runs(data: bytes) -> List[bytes]:
+    """
+    Split ``data``, which starts on a record boundary, at its quoted fields.
+
+    Returns:
+        List[bytes]: Runs outside quoted fields at even indexes and the
+        quoted fields between them at odd ones; they join back to ``data``
+    """
+    return QUOTED_RUNS.split(data)
+
+
+def record_end_after(data: bytes, after: int = 0) -> int:
+    """
+    Offset just past the first record-ending newline at or after ``after``.
+
+    Args:
+        data: Bytes starting on a record boundary
+        after: Offset in ``data`` to search from
+
+    Returns:
+        int: The offset, or -1 if no record ends there within ``data``
+    """
+    if b'"' not in data:
+        newline = data.find(b'\n', after)
+        return newline + 1 if newline != -1 else -1
+    runs = quote_runs(data)
+    ends = list(accumulate(map(len, runs)))
+    for index in range(bisect_right(ends, after), len(runs), 1):
+        if index & 1:
+            continue
+        start = ends[index] - len(runs[index])
+        newline = runs[index].find(b'\n', max(after - start, 0))
+        if newline != -1:
+            return start + newline + 1
+    return -1
+
+
+def last_record_end(data: bytes) -> int:
+    """Offset just past the last complete record of ``data``, which starts on a record boundary (0 if there is none)."""
+    if b'"' not in data:
+        return data.rfind(b'\n') + 1
+    runs = quote_runs(data)
+    end = len(data)
+    for index in range(len(runs) - 1, -1, -1):
+        start = end - len(runs[index])
+        if not index & 1:
+            newline = runs[index].rfind(b'\n')
+            if newline != -1:
+                return start + newline + 1
+        end = start
+    return 0
+
+
+def next_record_start(buffer: mmap.mmap, position: int) -> int:
+    """
+    Find the start of the record after the one starting at ``position``.
+
+    The search copies a small window and doubles it until the record's end
+    is inside: a newline outside quoted fields in a prefix of the data is
+    outside them in the whole of it too.
+
+    Args:
+        buffer: The mapped CSV file
+        position: Offset of a record boundary
+
+    Returns:
+        int: Offset just past the record-ending newline, or ``len(buffer)``
+    """
+    size = len(buffer)
+    window = RECORD_WINDOW
+    while position < size:
+        end = record_end_after(buffer[position:position + window])
+        if end != -1:
+            return position + end
+        if position + window >= size:
+            break
+        window *= 2
+    return size
+
+
+def split_record_ranges(path: str, shard_count: int) -> Tuple[bytes, List[Tuple[int, int]]]:
+    """
+    Split the data records of a CSV file into byte ranges.
+
+    Each range starts and ends on a record boundary, so it can be parsed on
+    its own once the header is prepended. Boundaries are found by walking
+    the records from the start of the file a block at a time.
+
+    Args:
+        path: Path to the CSV file
+        shard_count: Desired number of ranges (fewer are returned for small files)
+
+    Returns:
+        Tuple[bytes, List[Tuple[int, int]]]: The raw header record and the
+        ``(start, end)`` offsets of each range, in file order
+    """
+    with open(path, 'rb') as handle:
+        if handle.seek(0, 2) == 0:
+            return b'', []
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            size = len(buffer)
+            data_start = next_record_start(buffer, 0)
+            header = buffer[:data_start]
+
+            boundaries = [data_start]
+            position = data_start
+            for index in range(1, max(shard_count, 1)):
+                target = data_start + (size - data_start) * index // shard_count
+                # Move to the first boundary at or after the target
+                while position < target:
+                    cut = last_record_end(buffer[position:min(position + BLOCK_SIZE, target)])
+                    position = position + cut if cut else next_record_start(buffer, position)
+                if position >= size:
+                    break
+                if position > boundaries[-1]:
+                    boundaries.append(position)
+            boundaries.append(size)
+
+    ranges = [(start, end) for start, end in zip(boundaries, boundaries[1:]) if end > start]
+    return header, ranges
+
+
+def count_records(
+    path: str,
+    progress: Optional[ProgressCallback] = None,
+    cancel_event: Optional[threading.Event] = None,
+) -> int:
+    """
+    Count the non-blank records of a CSV file, including the header.
+
+    The file is streamed in fixed-size blocks, so memory use is constant.
+    Newlines inside quoted fields are not counted, and whitespace-only lines
+    are skipped the same way pandas skips them. Records must end in ``\\n``
+    or ``\\r\\n``.
+
+    Args:
+        path: Path to the CSV file
+        progress: Called after every block with records and bytes counted so far
+        cancel_event: Set by another thread to stop counting between blocks
+
+    Returns:
+        int: Number of records
+
+    Raises:
+        ProcessingCancelled: If ``cancel_event`` was set before counting finished
+    """
+    return count_records_from(path, 0, progress, cancel_event)[0]
+
+
+def count_records_from(
+    path: str,
+    start: int = 0,
+    progress: Optional[ProgressCallback] = None,
+    cancel_event: Optional[threading.Event] = None,
+) -> Tuple[int, bool]:
+    """
+    Count the non-blank records from byte offset ``start`` to the end of the file.
+
+    ``start`` must be a record boundary (0, or just past a record-ending
+    newline), which lets callers count only the data appended to a file.
+
+    Args:
+        path: Path to the CSV file, plain or compressed
+        start: Offset of the first byte to count (in the decompressed data)
+        progress: Called after every block with records and bytes counted so far
+        cancel_event: Set by another thread to stop counting between blocks
+
+    Returns:
+        Tuple[int, bool]: The number of records, and whether the file ends on
+        a record boundary (a newline outside quotes, or nothing after ``start``)
+
+    Raises:
+        ProcessingCancelled: If ``cancel_event`` was set before counting finished
+    """
+    counter = RecordCounter()
+    with open_input(path) as (source, raw):
+        if start:
+            source.seek(start)
+        while True:
+            check_cancelled(cancel_event)
+            block = source.read(BLOCK_SIZE)
+            if not block:
+                break
+            counter.feed(block)
+            if progress is not None:
+                progress(counter.records, raw.tell())
+    return counter.finish()
+
+
+class RecordCounter:
+    """
+    Count non-blank records in blocks of bytes fed in file order.
+
+    The first block must start on a record boundary. Blocks may split
+    records, quoted fields and blank lines anywhere.
+    """
+
+    def __init__(self):
+        self.records = 0
+        self.in_quotes = False
+        # A quoted field that reached the end of the last block on a quote:
+        # it was either closed or escaped the quote starting the next block
+        self.pending_quote = False
+        self.at_field_start = True
+        self.at_line_start = True
+        self.last_byte = b'\n'
+
+    def feed(self, block: bytes) -> int:
+        """
+        Count the records terminated inside ``block``.
+
+        Returns:
+            int: Records completed by this block
+        """
+        if not block:
+            return 0
+        self.last_byte = block[-1:]
+        # Restore the scanner state with a prefix: a quoted field still open
+        # is reopened, otherwise a byte tells whether a field starts here
+        if self.in_quotes:
+            prefix = b'""' if self.pending_quote else b'"'
+        else:
+            prefix = b'\n' if self.at_field_start else b' '
+        data = prefix + block
+        # Keep only the bytes outside quoted fields. Each removed quoted
+        # run is replaced by a single quote so its line stays non-blank.
+        if b'"' not in data:
+            runs = [data]
+        else:
+            runs = quote_runs(data)
+        outside = b'"'.join(runs[0::2])
+        if not self.in_quotes:
+            outside = outside[len(prefix):]
+
+        ends_in_quotes = len(runs) > 1 and not runs[-1]
+        if ends_in_quotes:
+            # An odd run of quotes ending the field closes it: pairs are escaped quotes
+            field = runs[-2][1:]
+            self.pending_quote = bool((len(field) - len(field.rstrip(b'"'))) & 1)
+        else:
+            self.at_field_start = data[-1:] in (b',', b'\n')
+
+        # A leading newline marker lets blank lines that straddle the
+        # block boundary be detected; it is not itself a terminator.
+        text = (b'\n' if self.at_line_start else b'"') + outside
+        terminators = text.count(b'\n') - (1 if self.at_line_start else 0)
+        if BLANK_LINE_HINT.search(text):
+            terminators -= len(BLANK_LINE.findall(text))
+        self.records += terminators
+
+        self.in_quotes = ends_in_quotes
+        if ends_in_quotes:
+            self.at_line_start = False
+        else:
+            self.at_line_start = not text[text.rfind(b'\n') + 1:].strip(LINE_WHITESPACE)
+        return terminators
+
+    def finish(self) -> Tuple[int, bool]:
+        """
+        Total records, counting a last record that has no trailing newline.
+
+        Returns:
+            Tuple[int, bool]: The number of records, and whether the data
+            ended on a record boundary
+        """
+        records = self.records + (0 if self.at_line_start else 1)
+        return records, self.last_byte == b'\n' and not self.in_quotes
+
+
+def header_fields(path: str) -> List[str]:
+    """
+    Parse the header record with the csv module instead of pandas.
+
+    Like pandas, blank lines before the header are skipped, a UTF-8 byte
+    order mark is dropped and the header may span lines inside quotes. The
+    fields are returned as written: pandas additionally names empty and
+    duplicate columns (``Unnamed: 2``, ``Title.1``), but their number is the
+    same as ``len(filter_engine.read_header(path))``.
+
+    Args:
+        path: Path to the CSV file, plain or compressed
+
+    Returns:
+        List[str]: The header fields
+
+    Raises:
+        pd.errors.EmptyDataError: If the file has no header
+    """
+    lines = []
+    with open_input(path) as (source, _):
+        for line in source:
+            if not lines and not line.strip(LINE_WHITESPACE + b'\n'):
+                continue
+            lines.append(line)
+            # Lines are joined until the last newline is outside quoted fields
+            if record_end_after(b''.join(lines)) != -1:
+                break
+    if not lines:
+        # Raised by pandas for the same file; imported only on this error path
+        from pandas.errors import EmptyDataError
+        raise EmptyDataError("No columns to parse from file")
+    text = b''.join(lines).decode('utf-8-sig')
+    return next(csv.reader(io.StringIO(text, newline='')))
+
+
+def count_dimensions(
+    path: str,
+    progress: Optional[ProgressCallback] = None,
+    cancel_event: Optional[threading.Event] = None,
+) -> Tuple[int, int]:
+    """
+    Count the data rows and columns of a CSV file without parsing its fields.
+
+    Only the header is parsed (by header_fields, to get the column count);
+    rows are counted by streaming the raw bytes through count_records.
+
+    Args:
+        path: Path to the CSV file
+        progress: Forwarded to count_records
+        cancel_event: Forwarded to count_records
+
+    Returns:
+        Tuple[int, int]: ``(rows, columns)``, matching ``pd.read_csv(path).shape``
+
+    Raises:
+        pd.errors.EmptyDataError: If the file has no header
+    """
+    columns = len(header_fields(path))
+    return max(count_records(path, progress, cancel_event) - 1, 0), columns
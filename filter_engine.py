@@ -0,0 +1,306 @@
+"""
+Core special character scan engine.
+
+The functions in this module operate on whole pandas columns at once and do
+not depend on Tkinter, so they can be shared by the GUI and by scripts.
+"""
+
+import json
+import threading
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, BinaryIO, Dict, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from char_policy import DEFAULT_POLICY, CharPolicy
+from column_rules import Columns, ColumnSelection, column_mask, select_columns
+from common import (
+    DEFAULT_CHUNKSIZE,
+    DEFAULT_COLUMNS,
+    ProcessingCancelled,
+    ProgressCallback,
+    check_cancelled,
+)
+from formats import RowWriter, open_input, open_writer
+from run_stats import StageTimings
+from value_memo import MemoStats
+
+if TYPE_CHECKING:
+    from offense_report import OffenseReport
+
+__all__ = [
+    # Re-exported for callers that import them from here
+    'DEFAULT_CHUNKSIZE',
+    'DEFAULT_COLUMNS',
+    'ProcessingCancelled',
+    'ProgressCallback',
+    'check_cancelled',
+    'column_mask',
+    # Defined here
+    'READ_OPTIONS',
+    'SPECIAL_CHAR_PATTERN',
+    'FilterStats',
+    'build_special_char_mask',
+    'contains_special_characters',
+    'convert_csv',
+    'filter_csv_streaming',
+    'iter_filtered_chunks',
+    'read_header',
+    'write_matches',
+]
+
+# Characters outside the standard printable ASCII range (tab, newline,
+# carriage return and \x20-\x7E are allowed); see char_policy for others.
+SPECIAL_CHAR_PATTERN = DEFAULT_POLICY.pattern
+
+# Every field is read as text so values are written back unchanged and chunks
+# never disagree on inferred dtypes.
+READ_OPTIONS = {'dtype': str, 'keep_default_na': False, 'na_filter': False}
+
+
+@dataclass
+class FilterStats:
+    """Totals accumulated while filtering a CSV file."""
+    total_rows: int = 0
+    matching_rows: int = 0
+    # Column name -> memo counters of the columns that were checked
+    memo: Dict[str, MemoStats] = field(default_factory=dict, compare=False)
+    # Time, rows and bytes per stage of the run (see run_stats)
+    timings: StageTimings = field(default_factory=StageTimings, compare=False)
+
+    @property
+    def percentage(self) -> float:
+        """Share of rows that matched, in percent (0.0 for an empty file)."""
+        if not self.total_rows:
+            return 0.0
+        return (self.matching_rows / self.total_rows) * 100
+
+    def to_dict(self) -> Dict:
+        return {
+            'total_rows': self.total_rows,
+            'matching_rows': self.matching_rows,
+            'percentage': round(self.percentage, 4),
+            **self.timings.to_dict(),
+            'memo': {column: memo.to_dict() for column, memo in self.memo.items()},
+        }
+
+    def save(self, path: str) -> None:
+        """Write the totals, stage timings and memo counters as JSON."""
+        with open(path, 'w', encoding='utf-8') as handle:
+            json.dump(self.to_dict(), handle, indent=2)
+
+
+def contains_special_characters(text: Union[str, float, None], policy: CharPolicy = DEFAULT_POLICY) -> bool:
+    """
+    Check if text contains special characters outside printable ASCII range.
+
+    Args:
+        text: The text to check (can be string, float, or None)
+        policy: Characters considered allowed (printable ASCII by default)
+
+    Returns:
+        bool: True if special characters are found, False otherwise
+    """
+    # Handle NaN, None, or empty values
+    if text is None or pd.isna(text):
+        return False
+
+    # Convert to string to handle numeric values
+    return not policy.is_clean(str(text))
+
+
+def build_special_char_mask(
+    df: pd.DataFrame,
+    columns: Columns = DEFAULT_COLUMNS,
+    policy: CharPolicy = DEFAULT_POLICY,
+) -> pd.Series:
+    """
+    Build the row mask used to filter a DataFrame for special characters.
+
+    A row is selected when any of the given columns contains a special
+    character (or all of them, for ColumnRules combining with ``'all'``).
+    Columns missing from ``df`` are treated as clean.
+
+    Args:
+        df: The DataFrame to scan
+        columns: Names of the columns to check, ColumnRules or a ColumnSelection
+        policy: Characters considered allowed in columns without a policy of their own
+
+    Returns:
+        pd.Series: Boolean mask aligned with ``df.index``
+    """
+    return select_columns(df.columns, columns, policy).mask(df)
+
+
+def read_header(input_path: str) -> List[str]:
+    """
+    Read only the header row of a CSV file.
+
+    Args:
+        input_path: Path to the CSV file, plain or compressed
+
+    Returns:
+        List[str]: The column names
+    """
+    with open_input(input_path) as (source, _):
+        return pd.read_csv(source, nrows=0).columns.tolist()
+
+
+def iter_filtered_chunks(
+    source: Union[str, BinaryIO],
+    columns: Columns = DEFAULT_COLUMNS,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    cancel_event: Optional[threading.Event] = None,
+    policy: CharPolicy = DEFAULT_POLICY,
+    timings: Optional[StageTimings] = None,
+    verdicts: Optional[Dict[str, np.ndarray]] = None,
+) -> Iterator[Tuple[pd.DataFrame, pd.DataFrame]]:
+    """
+    Read a CSV file in chunks and filter each one.
+
+    Args:
+        source: Path to the CSV file, or a binary handle opened on it
+        columns: Names of the columns to check, ColumnRules or a ColumnSelection
+        chunksize: Number of rows parsed per chunk
+        cancel_event: Checked before each chunk is parsed and again before it is scanned
+        policy: Characters considered allowed
+        timings: Receives the read (handles only), parse, scan and filter stages
+        verdicts: Refilled before each chunk is yielded with the flags of its
+            matching rows per checked column (see ColumnSelection.mask)
+
+    Yields:
+        Tuple[pd.DataFrame, pd.DataFrame]: The chunk and its matching rows
+    """
+    timings = timings if timings is not None else StageTimings()
+    if not isinstance(source, str):
+        source = timings.reader(source)
+    selection = None
+    with pd.read_csv(source, chunksize=chunksize, **READ_OPTIONS) as reader:
+        while True:
+            check_cancelled(cancel_event)
+            mark = timings.mark()
+            chunk = next(reader, None)
+            if chunk is None:
+                return
+            mark = timings.lap('parse', mark, rows=len(chunk))
+            check_cancelled(cancel_event)
+            # Every chunk has the same columns, so the selection is resolved once
+            selection = selection or select_columns(chunk.columns, columns, policy)
+            flags = {} if verdicts is not None else None
+            mask = selection.mask(chunk, flags)
+            mark = timings.lap('scan', mark, rows=len(chunk))
+            filtered = chunk[mask]
+            if verdicts is not None:
+                keep = mask.to_numpy()
+                verdicts.clear()
+                verdicts.update((column, column_flags[keep]) for column, column_flags in flags.items())
+            timings.lap('filter', mark, rows=len(filtered))
+            yield chunk, filtered
+
+
+def write_matches(
+    output: RowWriter,
+    matches: pd.DataFrame,
+    report: Optional['OffenseReport'],
+    selection: ColumnSelection,
+    timings: StageTimings,
+    verdicts: Optional[Dict[str, np.ndarray]] = None,
+) -> None:
+    """
+    Write matching rows, through ``report`` if there is one, timing the ``report`` and ``write`` stages.
+
+    ``verdicts`` holds the flags of ``matches`` per checked column from the
+    filter pass, which spare the report from searching the rows again.
+    """
+    mark = timings.mark()
+    if report is not None:
+        matches = report.observe(matches, selection, verdicts)
+        mark = timings.lap('report', mark, rows=len(matches))
+    output.write(matches)
+    timings.lap('write', mark, rows=len(matches))
+
+
+def filter_csv_streaming(
+    input_path: str,
+    output_path: str,
+    columns: Columns = DEFAULT_COLUMNS,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    progress: Optional[ProgressCallback] = None,
+    cancel_event: Optional[threading.Event] = None,
+    policy: CharPolicy = DEFAULT_POLICY,
+    output_format: Optional[str] = None,
+    report: Optional['OffenseReport'] = None,
+) -> FilterStats:
+    """
+    Filter a CSV file chunk by chunk, appending matching rows to the output.
+
+    Peak memory is bounded by ``chunksize`` rather than by the file size. The
+    output always receives the header, even when no row matches.
+
+    Args:
+        input_path: Path to the CSV file to filter (may be gzip/bz2/zstd compressed)
+        output_path: Path the matching rows are written to
+        columns: Names of the columns to check, or ColumnRules (see column_rules)
+        chunksize: Number of rows parsed per chunk
+        progress: Called after every chunk with rows and bytes processed so far
+        cancel_event: Set by another thread to stop the scan part-way
+        policy: Characters considered allowed in columns without a policy of their own
+        output_format: Output format (see formats.OUTPUT_FORMATS); inferred from
+            ``output_path`` when None
+        report: Collects the offending characters of the matching rows and
+            may add annotation columns to the output
+
+    Returns:
+        FilterStats: Row totals accumulated across all chunks, with stage timings
+
+    Raises:
+        ProcessingCancelled: If ``cancel_event`` was set before the scan finished
+    """
+    stats = FilterStats()
+    header = read_header(input_path)
+    selection = select_columns(header, columns, policy)
+    if report is not None:
+        header = report.output_columns(header)
+    with open_input(input_path) as (source, raw), open_writer(output_path, header, output_format) as output:
+        verdicts = {} if report is not None else None
+        chunks = iter_filtered_chunks(
+            source, selection, chunksize, cancel_event, timings=stats.timings, verdicts=verdicts
+        )
+        for chunk, filtered in chunks:
+            stats.total_rows += len(chunk)
+            stats.matching_rows += len(filtered)
+            if not filtered.empty:
+                write_matches(output, filtered, report, selection, stats.timings, verdicts)
+            if progress is not None:
+                progress(stats.total_rows, raw.tell())
+    stats.memo = selection.memo_stats()
+    stats.timings.finish(input_path, output_path)
+    return stats
+
+
+def convert_csv(
+    input_path: str,
+    output_path: str,
+    output_format: Optional[str] = None,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+) -> int:
+    """
+    Copy a CSV file into another output format, chunk by chunk.
+
+    Args:
+        input_path: Path to the CSV file
+        output_path: Path of the converted file
+        output_format: Output format; inferred from ``output_path`` when None
+        chunksize: Number of rows parsed per chunk
+
+    Returns:
+        int: Number of rows copied
+    """
+    rows = 0
+    with open_input(input_path) as (source, _), open_writer(output_path, read_header(input_path), output_format) as output:
+        with pd.read_csv(source, chunksize=chunksize, **READ_OPTIONS) as reader:
+            for chunk in reader:
+                rows += len(chunk)
+                output.write(chunk)
+    return rows
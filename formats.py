@@ -0,0 +1,319 @@
+"""
+Pluggable input decompression and output writers.
+
+Inputs may be plain or gzip, bzip2 or zstd compressed CSV. The codec is
+chosen from the file extension, or from the file's magic bytes when the
+extension does not name one. Outputs are written through a RowWriter picked
+by format name or output extension: plain or compressed CSV, Parquet, or
+Feather (the Arrow IPC file format). All writers stream: every write appends
+rows (a CSV chunk, a Parquet row group or an Arrow record batch).
+
+zstd needs the ``zstandard`` package and Parquet/Feather need ``pyarrow``;
+both are imported only when such a file is used. pandas is likewise only
+imported by the writers, so reading inputs stays light (see common).
+"""
+
+import bz2
+import gzip
+import io
+import os
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, BinaryIO, Iterator, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# codec name -> (file extensions, magic bytes at the start of the file)
+CODECS = {
+    'gzip': (('.gz', '.gzip'), b'\x1f\x8b'),
+    'bz2': (('.bz2',), b'BZh'),
+    'zstd': (('.zst', '.zstd'), b'\x28\xb5\x2f\xfd'),
+}
+
+# Output formats: plain CSV, CSV through each codec, and the Arrow formats
+OUTPUT_FORMATS = ['csv', 'csv.gz', 'csv.bz2', 'csv.zst', 'parquet', 'feather']
+
+# Output extension -> format, checked longest first
+OUTPUT_EXTENSIONS = {
+    '.csv.gz': 'csv.gz',
+    '.csv.bz2': 'csv.bz2',
+    '.csv.zst': 'csv.zst',
+    '.gz': 'csv.gz',
+    '.bz2': 'csv.bz2',
+    '.zst': 'csv.zst',
+    '.parquet': 'parquet',
+    '.pq': 'parquet',
+    '.feather': 'feather',
+    '.arrow': 'feather',
+    '.ipc': 'feather',
+}
+
+# Format -> extension used when an output name has to be made up
+FORMAT_EXTENSIONS = {
+    'csv': '.csv',
+    'csv.gz': '.csv.gz',
+    'csv.bz2': '.csv.bz2',
+    'csv.zst': '.csv.zst',
+    'parquet': '.parquet',
+    'feather': '.feather',
+}
+
+# Compressed CSV output format -> codec
+CSV_CODECS = {'csv.gz': 'gzip', 'csv.bz2': 'bz2', 'csv.zst': 'zstd'}
+
+
+def _require(module: str, package: str, purpose: str):
+    """Import an optional dependency or explain how to install it."""
+    try:
+        return __import__(module)
+    except ImportError:
+        raise ImportError(f"{purpose} requires the '{package}' package (pip install {package})") from None
+
+
+def detect_compression(path: str) -> Optional[str]:
+    """
+    Name the codec an input file is compressed with.
+
+    Args:
+        path: Path to the input file
+
+    Returns:
+        Optional[str]: ``'gzip'``, ``'bz2'``, ``'zstd'`` or None for plain files
+    """
+    lower = path.lower()
+    for codec, (extensions, _) in CODECS.items():
+        if lower.endswith(extensions):
+            return codec
+    try:
+        with open(path, 'rb') as handle:
+            head = handle.read(4)
+    except OSError:
+        return None
+    for codec, (_, magic) in CODECS.items():
+        if head.startswith(magic):
+            return codec
+    return None
+
+
+def is_compressed(path: str) -> bool:
+    """True if ``path`` must be decompressed, so it cannot be memory-mapped or seeked."""
+    return detect_compression(path) is not None
+
+
+def _decompressing_reader(codec: str, raw: BinaryIO) -> BinaryIO:
+    if codec == 'gzip':
+        return gzip.GzipFile(fileobj=raw, mode='rb')
+    if codec == 'bz2':
+        return bz2.BZ2File(raw, mode='rb')
+    zstandard = _require('zstandard', 'zstandard', "Reading .zst files")
+    # Buffered for readline(), which the zstd reader does not implement
+    return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(raw, closefd=False))
+
+
+def _compressing_writer(codec: str, raw: BinaryIO) -> BinaryIO:
+    if codec == 'gzip':
+        return gzip.GzipFile(fileobj=raw, mode='wb')
+    if codec == 'bz2':
+        return bz2.BZ2File(raw, mode='wb')
+    zstandard = _require('zstandard', 'zstandard', "Writing .zst files")
+    return zstandard.ZstdCompressor().stream_writer(raw, closefd=False)
+
+
+@contextmanager
+def open_input(path: str) -> Iterator[Tuple[BinaryIO, BinaryIO]]:
+    """
+    Open a possibly compressed CSV file for reading.
+
+    Yields:
+        Tuple[BinaryIO, BinaryIO]: The decompressed stream, and the raw file
+        whose ``tell()`` gives the compressed bytes consumed (for progress).
+        For plain files both are the same handle.
+    """
+    codec = detect_compression(path)
+    with open(path, 'rb') as raw:
+        if codec is None:
+            yield raw, raw
+            return
+        stream = _decompressing_reader(codec, raw)
+        try:
+            yield stream, raw
+        finally:
+            stream.close()
+
+
+def infer_output_format(path: str, output_format: Optional[str] = None) -> str:
+    """
+    Pick the output format from an explicit name or the path's extension.
+
+    Args:
+        path: Output path
+        output_format: One of OUTPUT_FORMATS, or None to use the extension
+
+    Returns:
+        str: The format name (``'csv'`` when the extension is not recognised)
+
+    Raises:
+        ValueError: If ``output_format`` is not a known format
+    """
+    if output_format is not None:
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Unknown output format: {output_format!r} (choose from {', '.join(OUTPUT_FORMATS)})")
+        return output_format
+    lower = path.lower()
+    for extension in sorted(OUTPUT_EXTENSIONS, key=len, reverse=True):
+        if lower.endswith(extension):
+            return OUTPUT_EXTENSIONS[extension]
+    return 'csv'
+
+
+@contextmanager
+def open_output_stream(path: str, output_format: Optional[str] = None) -> Iterator[BinaryIO]:
+    """
+    Open a binary stream for raw CSV bytes, compressed if the format asks for it.
+
+    Args:
+        path: Output path
+        output_format: ``'csv'`` or a compressed CSV format; inferred from
+            ``path`` when None
+
+    Yields:
+        BinaryIO: Stream the CSV bytes are written to
+
+    Raises:
+        ValueError: If the format is not CSV (Parquet and Feather need rows, not bytes)
+    """
+    output_format = infer_output_format(path, output_format)
+    if output_format != 'csv' and output_format not in CSV_CODECS:
+        raise ValueError(f"Only CSV output is supported here, not {output_format}")
+    codec = CSV_CODECS.get(output_format)
+    with open(path, 'wb') as raw:
+        if codec is None:
+            yield raw
+            return
+        stream = _compressing_writer(codec, raw)
+        try:
+            yield stream
+        finally:
+            stream.close()
+
+
+class RowWriter:
+    """
+    Streaming writer for the matching rows of one output file.
+
+    Use as a context manager. The header (or schema) is written on open, so
+    an output with no matching rows is still a valid, empty file.
+    """
+
+    # True if write_csv_text is supported, letting workers hand over CSV text
+    accepts_csv_text = False
+
+    def write(self, frame: 'pd.DataFrame') -> None:
+        """Append the rows of ``frame``, whose columns are the output columns."""
+        raise NotImplementedError
+
+    def write_csv_text(self, text: str) -> None:
+        """Append rows already rendered as CSV without a header."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        raise NotImplementedError
+
+    def __enter__(self) -> 'RowWriter':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class CsvWriter(RowWriter):
+    """CSV output, optionally compressed; byte-identical to ``DataFrame.to_csv`` when plain."""
+
+    accepts_csv_text = True
+
+    def __init__(self, path: str, columns: List[str], codec: Optional[str] = None):
+        self._raw = open(path, 'wb')
+        self._binary = _compressing_writer(codec, self._raw) if codec else None
+        self._handle = io.TextIOWrapper(self._binary or self._raw, encoding='utf-8', newline='')
+        import pandas as pd
+        pd.DataFrame(columns=columns).to_csv(self._handle, index=False)
+
+    def write(self, frame: 'pd.DataFrame') -> None:
+        frame.to_csv(self._handle, index=False, header=False)
+
+    def write_csv_text(self, text: str) -> None:
+        self._handle.write(text)
+
+    def close(self) -> None:
+        self._handle.flush()
+        if self._binary is not None:
+            self._handle.detach()
+            self._binary.close()
+        else:
+            self._handle.close()
+        self._raw.close()
+
+
+class ArrowWriter(RowWriter):
+    """Parquet or Feather output with every column stored as a string."""
+
+    def __init__(self, path: str, columns: List[str], output_format: str):
+        pa = _require('pyarrow', 'pyarrow', f"Writing {output_format} files")
+        self._pa = pa
+        self._schema = pa.schema([(str(column), pa.string()) for column in columns])
+        if output_format == 'parquet':
+            import pyarrow.parquet as pq
+            self._writer = pq.ParquetWriter(path, self._schema)
+        else:
+            import pyarrow.ipc
+            self._writer = pyarrow.ipc.new_file(path, self._schema)
+
+    def write(self, frame: 'pd.DataFrame') -> None:
+        arrays = [self._pa.array(frame.iloc[:, index], type=self._pa.string()) for index in range(frame.shape[1])]
+        self._writer.write_table(self._pa.Table.from_arrays(arrays, schema=self._schema))
+
+    def close(self) -> None:
+        self._writer.close()
+
+
+def open_writer(path: str, columns: List[str], output_format: Optional[str] = None) -> RowWriter:
+    """
+    Create the writer for an output file.
+
+    Args:
+        path: Output path
+        columns: Output column names, written as the header or schema
+        output_format: One of OUTPUT_FORMATS, or None to infer it from ``path``
+
+    Returns:
+        RowWriter: An open writer; close it (or use it as a context manager)
+    """
+    output_format = infer_output_format(path, output_format)
+    if output_format in ('parquet', 'feather'):
+        return ArrowWriter(path, columns, output_format)
+    return CsvWriter(path, columns, CSV_CODECS.get(output_format))
+
+
+def output_path_for(stem_path: str, output_format: str) -> str:
+    """``stem_path`` plus the extension of ``output_format``."""
+    return stem_path + FORMAT_EXTENSIONS[output_format]
+
+
+def sidecar_path(output_path: str, suffix: str) -> str:
+    """Replace the format extension of ``output_path`` with ``suffix``, e.g. ``a.csv.gz`` -> ``a_report.json``."""
+    lower = output_path.lower()
+    for extension in sorted(FORMAT_EXTENSIONS.values(), key=len, reverse=True):
+        if lower.endswith(extension):
+            return output_path[:-len(extension)] + suffix
+    return output_path + suffix
+
+
+def strip_input_extension(path: str) -> str:
+    """Drop ``.csv`` and any compression extension, e.g. ``a.csv.gz`` -> ``a``."""
+    stem = path
+    lower = stem.lower()
+    for extensions, _ in CODECS.values():
+        for extension in extensions:
+            if lower.endswith(extension):
+                stem, lower = stem[:-len(extension)], lower[:-len(extension)]
+    return os.path.splitext(stem)[0]
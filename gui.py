@@ -0,0 +1,1068 @@
+"""
+Tkinter GUI of the CSV special character filter.
+
+Started by ``python main.py`` without arguments; main.py imports this module
+(and with it Tkinter and pandas) only then.
+"""
+
+import pandas as pd
+import tkinter as tk
+from tkinter import filedialog, messagebox, ttk
+from typing import Dict, List, Optional, Tuple, Union
+import os
+import shutil
+import tempfile
+
+from background import BackgroundJob, ProgressSnapshot
+from batch import REPORT_NAME, discover_inputs, run_batch
+from char_policy import CharPolicy, parse_policy
+from column_rules import COMBINE_MODES, ColumnRules, parse_rules
+from csv_bytes import count_dimensions
+from filter_engine import (
+    DEFAULT_CHUNKSIZE, DEFAULT_COLUMNS, FilterStats, ProcessingCancelled, contains_special_characters, convert_csv, read_header
+)
+from formats import infer_output_format
+from offense_report import OffenseReport, report_path_for
+from parallel_scan import default_worker_count, filter_csv_parallel
+from projected_scan import filter_csv_projected
+from result_table import ResultTable, index_path_for
+from result_view import ResultPreview
+from sanitize import DEFAULT_MODE, MODES, SanitizeStats, sanitize_csv
+from run_stats import ProfileCapture, capture_profile, profile_prefix_for, stats_path_for
+from scan_cache import ScanCache
+from value_memo import describe_memo
+
+# Character policies offered in the GUI, as char_policy.parse_policy specs
+POLICY_CHOICES = {
+    "ASCII printable": 'ascii',
+    "Latin-1 printable": 'latin1',
+    "Any letter, number, punctuation or symbol": 'unicode:L,M,N,P,S,Zs',
+}
+
+# File dialog filters; compressed CSV inputs are decompressed on the fly
+INPUT_FILETYPES = [
+    ("CSV files", "*.csv *.csv.gz *.csv.bz2 *.csv.zst"),
+    ("All files", "*.*"),
+]
+OUTPUT_FILETYPES = [
+    ("CSV files", "*.csv"),
+    ("Compressed CSV", "*.csv.gz *.csv.bz2 *.csv.zst"),
+    ("Parquet", "*.parquet"),
+    ("Feather", "*.feather"),
+    ("All files", "*.*"),
+]
+
+# Tooltip class for providing hover text on widgets
+class Tooltip:
+    def __init__(self, widget, text):
+        self.widget = widget
+        self.text = text
+        self.tooltip_window = None
+        self.widget.bind("<Enter>", self.show_tooltip)
+        self.widget.bind("<Leave>", self.hide_tooltip)
+
+    def show_tooltip(self, event=None):
+        if self.tooltip_window or not self.text:
+            return
+        x, y, _, _ = self.widget.bbox("insert")
+        x += self.widget.winfo_rootx() + 20
+        y += self.widget.winfo_rooty() + 20
+
+        self.tooltip_window = tw = tk.Toplevel(self.widget)
+        tw.wm_overrideredirect(True) # Remove window decorations
+        tw.wm_geometry(f"+{x}+{y}")
+        label = tk.Label(tw, text=self.text, justify='left',
+                         background="#ffffe0", relief='solid', borderwidth=1,
+                         font=("tahoma", "9", "normal"))
+        label.pack(ipadx=2, ipady=2)
+
+    def hide_tooltip(self, event=None):
+        if self.tooltip_window:
+            self.tooltip_window.destroy()
+        self.tooltip_window = None
+
+class CSVFilterApp:
+    def __init__(self, root: tk.Tk):
+        self.root = root
+        self.root.title("CSV Special Character Filter")
+        self.status_var = tk.StringVar() # For status bar
+        self.chunksize = DEFAULT_CHUNKSIZE # Rows parsed per chunk while filtering
+        self.workers_var = tk.IntVar(value=default_worker_count()) # Worker processes used for filtering
+        self.two_pass_var = tk.BooleanVar(value=False) # Column projection for wide files
+        self.use_cache_var = tk.BooleanVar(value=False) # Reuse results of earlier scans
+        self.profile_var = tk.BooleanVar(value=False) # Profile the filter and save its statistics
+        self.policy_var = tk.StringVar(value=next(iter(POLICY_CHOICES))) # Allowed characters
+        self.annotate_var = tk.BooleanVar(value=False) # Offending-character columns in the output
+        self.columns_var = tk.StringVar(value=', '.join(DEFAULT_COLUMNS)) # Column specs, see column_rules
+        self.match_var = tk.StringVar(value=COMBINE_MODES[0]) # Any or all checked columns must match
+        self.sanitize_mode_var = tk.StringVar(value=DEFAULT_MODE) # How "Clean File" rewrites characters
+        self.scan_cache = ScanCache()
+        self.progress_var = tk.DoubleVar(value=0.0) # Progress of the running job, 0-100
+        self.current_job = None # BackgroundJob while a file is being processed
+        self._configure_window()
+        self._create_widgets()
+        self.status_var.set("Ready") # Initial status
+
+    def _configure_window(self):
+        # Configure window size and position
+        window_width = 900 # Increased window width
+        window_height = 820 # Increased window height
+        screen_width = self.root.winfo_screenwidth()
+        screen_height = self.root.winfo_screenheight()
+        center_x = int(screen_width / 2 - window_width / 2)
+        center_y = int(screen_height / 2 - window_height / 2)
+        self.root.geometry(f'{window_width}x{window_height}+{center_x}+{center_y}')
+        self.root.configure(bg='#f0f0f0')
+        self.root.resizable(False, False)
+
+    def _create_widgets(self):
+        # Main title label
+        title_label = tk.Label(
+            self.root,
+            text="Welcome to the CSV Filter Tool!",
+            font=("Arial", 18, "bold"),
+            bg='#f0f0f0',
+            fg='#333333',
+            pady=20 # Adjusted padding
+        )
+        title_label.pack(fill=tk.X, padx=20) # Added padx for title
+
+        # Description label
+        description_text = (
+            "This tool identifies rows in a CSV file where the checked columns "
+            "(by default 'Title' and 'Developer') contain special (non-ASCII) characters.\n\n"
+            "Features:\n"
+            "• GUI-based file selection (Buttons are improved)\n"
+            "• Detailed processing statistics\n"
+            "• Robust error handling\n"
+            "• Calculate and display CSV dimensions (rows x columns)\n"
+            "• Batch processing of whole folders with a summary report\n"
+            "• Clean a file by transliterating or removing special characters\n\n"
+            "Click 'Start Processing' to begin or 'Calculate Dimensions' for file insights."
+        )
+        description_label = tk.Label(
+            self.root,
+            text=description_text,
+            font=("Arial", 11),
+            bg='#f0f0f0',
+            fg='#555555',
+            wraplength=850, # Adjusted wraplength for wider window
+            justify=tk.LEFT,
+            pady=10 # Adjusted padding
+        )
+        description_label.pack(fill=tk.X, padx=20)
+
+        # Frame for buttons
+        button_frame = tk.Frame(self.root, bg='#f0f0f0')
+        button_frame.pack(pady=20, expand=True) # Adjusted padding
+
+        # Common button styling
+        button_font = ("Arial", 12, "bold")
+        button_relief = tk.RAISED # Changed back to RAISED for visibility
+        button_border_width = 2 # Explicitly set border width
+        button_padx = 25 # Increased horizontal padding
+        button_pady = 12 # Increased vertical padding
+
+        # Start button
+        self.start_button = start_button = tk.Button(
+            button_frame,
+            text="Start Processing",
+            font=button_font,
+            bg="#4CAF50", # Green
+            fg="white",
+            command=self.run_csv_processing,
+            relief=button_relief,
+            bd=button_border_width,
+            padx=button_padx,
+            pady=button_pady,
+            cursor="hand2",
+            activebackground="#45a049", # Darker green on click
+            activeforeground="white"
+        )
+        start_button.pack(side=tk.LEFT, padx=20, ipady=5) # Increased spacing & internal y-padding
+        Tooltip(start_button, "Process selected CSV for special characters in the checked columns.")
+
+        # Calculate Dimensions Button
+        self.calc_dims_button = calc_dims_button = tk.Button(
+            button_frame,
+            text="Calculate Dimensions",
+            font=button_font,
+            bg="#2196F3",  # Blue
+            fg="white",
+            command=self.calculate_and_display_dimensions,
+            relief=button_relief,
+            bd=button_border_width,
+            padx=button_padx,
+            pady=button_pady,
+            cursor="hand2",
+            activebackground="#1E88E5",  # Darker blue
+            activeforeground="white"
+        )
+        calc_dims_button.pack(side=tk.LEFT, padx=20, ipady=5)
+        Tooltip(calc_dims_button, "Calculate and display the number of rows and columns for a selected CSV file.")
+
+        # Exit button
+        exit_button = tk.Button(
+            button_frame,
+            text="Exit",
+            font=button_font,
+            bg="#f44336", # Red
+            fg="white",
+            command=self._exit,
+            relief=button_relief,
+            bd=button_border_width,
+            padx=button_padx,
+            pady=button_pady,
+            cursor="hand2",
+            activebackground="#e53935", # Darker red on click
+            activeforeground="white"
+        )
+        exit_button.pack(side=tk.LEFT, padx=10, ipady=5) # Adjusted padx & internal y-padding
+        Tooltip(exit_button, "Close the application.")
+
+        # Cancel button, only enabled while a job is running
+        self.cancel_button = cancel_button = tk.Button(
+            button_frame,
+            text="Cancel",
+            font=button_font,
+            bg="#9E9E9E", # Grey
+            fg="white",
+            command=self.cancel_current_job,
+            relief=button_relief,
+            bd=button_border_width,
+            padx=button_padx,
+            pady=button_pady,
+            cursor="hand2",
+            activebackground="#757575", # Darker grey on click
+            activeforeground="white",
+            state=tk.DISABLED
+        )
+        cancel_button.pack(side=tk.LEFT, padx=10, ipady=5)
+        Tooltip(cancel_button, "Stop the running job.")
+
+        # Batch button on its own row
+        batch_frame = tk.Frame(self.root, bg='#f0f0f0')
+        batch_frame.pack(pady=(0, 15))
+        self.batch_button = batch_button = tk.Button(
+            batch_frame,
+            text="Process Folder",
+            font=button_font,
+            bg="#FF9800", # Orange
+            fg="white",
+            command=self.run_batch_processing,
+            relief=button_relief,
+            bd=button_border_width,
+            padx=button_padx,
+            pady=button_pady,
+            cursor="hand2",
+            activebackground="#FB8C00", # Darker orange on click
+            activeforeground="white"
+        )
+        batch_button.pack(side=tk.LEFT, padx=20, ipady=5)
+        Tooltip(
+            batch_button,
+            "Filter every CSV file in a folder (and its subfolders) into an output folder.\n"
+            "Largest files run first; an interrupted batch resumes where it stopped."
+        )
+
+        # Sanitize button and its mode, next to the batch button
+        self.sanitize_button = sanitize_button = tk.Button(
+            batch_frame,
+            text="Clean File",
+            font=button_font,
+            bg="#9C27B0", # Purple
+            fg="white",
+            command=self.run_sanitize_processing,
+            relief=button_relief,
+            bd=button_border_width,
+            padx=button_padx,
+            pady=button_pady,
+            cursor="hand2",
+            activebackground="#8E24AA", # Darker purple on click
+            activeforeground="white"
+        )
+        sanitize_button.pack(side=tk.LEFT, padx=(20, 5), ipady=5)
+        Tooltip(
+            sanitize_button,
+            "Write a copy of a CSV file with the special characters in the checked columns\n"
+            "rewritten using the selected mode. Every row is kept."
+        )
+        sanitize_mode_combo = ttk.Combobox(
+            batch_frame,
+            textvariable=self.sanitize_mode_var,
+            values=MODES,
+            state='readonly',
+            width=13
+        )
+        sanitize_mode_combo.pack(side=tk.LEFT)
+        Tooltip(
+            sanitize_mode_combo,
+            "transliterate: é -> e, ß -> ss, “ -> \"\n"
+            "nfkd: drop accents, '?' for the rest\n"
+            "replace: '?' for every special character\n"
+            "delete: remove special characters"
+        )
+
+        # Processing options
+        options_frame = tk.Frame(self.root, bg='#f0f0f0')
+        options_frame.pack(pady=(0, 10))
+        workers_label = tk.Label(
+            options_frame,
+            text="Worker processes:",
+            font=("Arial", 11),
+            bg='#f0f0f0',
+            fg='#555555'
+        )
+        workers_label.pack(side=tk.LEFT, padx=5)
+        workers_spinbox = tk.Spinbox(
+            options_frame,
+            from_=1,
+            to=max(default_worker_count(), 8),
+            textvariable=self.workers_var,
+            width=4,
+            font=("Arial", 11)
+        )
+        workers_spinbox.pack(side=tk.LEFT)
+        Tooltip(workers_spinbox, "Number of CPU cores used to scan large files in parallel.")
+        two_pass_check = tk.Checkbutton(
+            options_frame,
+            text="Two-pass scan",
+            variable=self.two_pass_var,
+            font=("Arial", 11),
+            bg='#f0f0f0',
+            fg='#555555',
+            activebackground='#f0f0f0'
+        )
+        two_pass_check.pack(side=tk.LEFT, padx=(20, 0))
+        Tooltip(
+            two_pass_check,
+            "Read only the checked columns first, then full records for matching rows.\n"
+            "Much faster for wide files with few matches (runs on one core)."
+        )
+        cache_check = tk.Checkbutton(
+            options_frame,
+            text="Reuse cached results",
+            variable=self.use_cache_var,
+            font=("Arial", 11),
+            bg='#f0f0f0',
+            fg='#555555',
+            activebackground='#f0f0f0'
+        )
+        cache_check.pack(side=tk.LEFT, padx=(20, 0))
+        Tooltip(
+            cache_check,
+            "Remember scan results per file. Unchanged files are not rescanned,\n"
+            "and only newly appended rows are scanned in growing files."
+        )
+        profile_check = tk.Checkbutton(
+            options_frame,
+            text="Profile run",
+            variable=self.profile_var,
+            font=("Arial", 11),
+            bg='#f0f0f0',
+            fg='#555555',
+            activebackground='#f0f0f0'
+        )
+        profile_check.pack(side=tk.LEFT, padx=(20, 0))
+        Tooltip(
+            profile_check,
+            "Record a cProfile profile and the peak traced memory of the filter.\n"
+            "The profile and the time spent in each stage (JSON) are saved next to the output."
+        )
+
+        # Character policy
+        policy_frame = tk.Frame(self.root, bg='#f0f0f0')
+        policy_frame.pack(pady=(0, 10))
+        policy_label = tk.Label(
+            policy_frame,
+            text="Allowed characters:",
+            font=("Arial", 11),
+            bg='#f0f0f0',
+            fg='#555555'
+        )
+        policy_label.pack(side=tk.LEFT, padx=5)
+        policy_combo = ttk.Combobox(
+            policy_frame,
+            textvariable=self.policy_var,
+            values=list(POLICY_CHOICES),
+            state='readonly',
+            width=38
+        )
+        policy_combo.pack(side=tk.LEFT)
+        Tooltip(policy_combo, "Rows with any character outside this set are reported.")
+        annotate_check = tk.Checkbutton(
+            policy_frame,
+            text="Annotate rows",
+            variable=self.annotate_var,
+            font=("Arial", 11),
+            bg='#f0f0f0',
+            fg='#555555',
+            activebackground='#f0f0f0'
+        )
+        annotate_check.pack(side=tk.LEFT, padx=(20, 0))
+        Tooltip(
+            annotate_check,
+            "Add columns naming, for each saved row, the columns, code\n"
+            "points (e.g. U+00E9) and character positions of its special\n"
+            "characters."
+        )
+
+        # Checked columns
+        columns_frame = tk.Frame(self.root, bg='#f0f0f0')
+        columns_frame.pack(pady=(0, 10))
+        columns_label = tk.Label(
+            columns_frame,
+            text="Columns:",
+            font=("Arial", 11),
+            bg='#f0f0f0',
+            fg='#555555'
+        )
+        columns_label.pack(side=tk.LEFT, padx=5)
+        columns_entry = tk.Entry(columns_frame, textvariable=self.columns_var, font=("Arial", 11), width=40)
+        columns_entry.pack(side=tk.LEFT)
+        Tooltip(
+            columns_entry,
+            "Comma-separated column names, #<index> (0-based), re:<pattern> or * for every column.\n"
+            "Add =latin1, =ascii or =unicode:<categories> to give columns a policy of their own;\n"
+            "separate with semicolons when a spec contains commas."
+        )
+        match_label = tk.Label(
+            columns_frame,
+            text="Match:",
+            font=("Arial", 11),
+            bg='#f0f0f0',
+            fg='#555555'
+        )
+        match_label.pack(side=tk.LEFT, padx=(20, 5))
+        match_combo = ttk.Combobox(
+            columns_frame,
+            textvariable=self.match_var,
+            values=COMBINE_MODES,
+            state='readonly',
+            width=5
+        )
+        match_combo.pack(side=tk.LEFT)
+        Tooltip(match_combo, "Report rows where any, or all, of the checked columns contain special characters.")
+
+        # Progress bar for background jobs
+        progress_bar = ttk.Progressbar(
+            self.root,
+            variable=self.progress_var,
+            maximum=100,
+            mode='determinate'
+        )
+        progress_bar.pack(side=tk.BOTTOM, fill=tk.X, padx=20, pady=(0, 8))
+
+        # Status Bar
+        status_label = tk.Label(
+            self.root, 
+            textvariable=self.status_var, 
+            bd=1, 
+            relief=tk.SUNKEN, 
+            anchor=tk.W, 
+            font=("Arial", 9),
+            bg='#dfdfdf', 
+            fg='#333333',
+            padx=5
+        )
+        status_label.pack(side=tk.BOTTOM, fill=tk.X, ipady=3)
+
+    @staticmethod
+    def contains_special_characters(text: Union[str, float, None]) -> bool:
+        """
+        Check if text contains special characters outside printable ASCII range.
+        
+        Args:
+            text: The text to check (can be string, float, or None)
+            
+        Returns:
+            bool: True if special characters are found, False otherwise
+        """
+        return contains_special_characters(text)
+
+    # Removed @staticmethod, now an instance method
+    def select_file(self, title: str) -> str:
+        """
+        Open a file dialog to select a CSV file.
+        
+        Args:
+            title: The title for the file dialog
+            
+        Returns:
+            str: The selected file path, or empty string if cancelled
+        """
+        file_path = filedialog.askopenfilename(
+            parent=self.root, # Parented to the main root window
+            title=title, 
+            filetypes=INPUT_FILETYPES
+        )
+        # dialog_root.destroy() # No longer needed
+        return file_path
+
+    # Removed @staticmethod, now an instance method
+    def save_file_as(self, title: str) -> str:
+        """
+        Open a file dialog to save a CSV file.
+        
+        Args:
+            title: The title for the file dialog
+            
+        Returns:
+            str: The selected file path, or empty string if cancelled
+        """
+        file_path = filedialog.asksaveasfilename(
+            parent=self.root, # Parented to the main root window
+            title=title, 
+            defaultextension=".csv", 
+            filetypes=OUTPUT_FILETYPES
+        )
+        # dialog_root.destroy() # No longer needed
+        return file_path
+
+    def calculate_and_display_dimensions(self) -> None:
+        """
+        Prompts the user to select a CSV file, then calculates and displays its dimensions (rows x columns).
+        """
+        self.status_var.set("Awaiting CSV file selection for dimension calculation...")
+        input_csv_path = self.select_file("Select a CSV file to calculate dimensions") # Now self.select_file
+        if not input_csv_path:
+            messagebox.showinfo("Cancelled", "No file selected. Operation cancelled.", parent=self.root)
+            self.status_var.set("Dimension calculation cancelled by user.")
+            return
+        
+        self.status_var.set(f"Calculating dimensions for: {os.path.basename(input_csv_path)}")
+        # Stream the raw bytes for the row count on a worker thread; only the header is parsed
+        count = self.scan_cache.count_dimensions if self.use_cache_var.get() else count_dimensions
+        self._start_job(
+            lambda job: count(input_csv_path, job.report_progress, job.cancel_event),
+            input_csv_path,
+            on_done=lambda dimensions: self._show_dimensions(input_csv_path, *dimensions),
+            on_error=lambda error: self._show_dimensions_error(input_csv_path, error),
+            on_cancelled=lambda: self.status_var.set("Dimension calculation cancelled by user.")
+        )
+
+    def _show_dimensions(self, input_csv_path: str, rows: int, cols: int) -> None:
+        """
+        Display the dimensions calculated by calculate_and_display_dimensions.
+
+        Args:
+            input_csv_path: The CSV file selected by the user
+            rows: Number of data rows
+            cols: Number of columns
+        """
+        if rows == 0:
+            # This handles files with headers but no data rows (shape will be (0, num_cols))
+            # or files that are empty but pandas could still determine columns (less common for read_csv)
+            messagebox.showinfo(
+                "CSV Dimensions",
+                f"The selected CSV file has 0 data rows.\n\nRows: {rows}\nColumns: {cols}",
+                parent=self.root
+            )
+            self.status_var.set(f"Dimensions calculated for {os.path.basename(input_csv_path)}: {rows} rows, {cols} columns.")
+        else:
+            messagebox.showinfo(
+                "CSV Dimensions",
+                f"The selected CSV file has:\\n\\nRows: {rows}\\nColumns: {cols}",
+                parent=self.root
+            )
+            self.status_var.set(f"Dimensions calculated for {os.path.basename(input_csv_path)}: {rows} rows, {cols} columns.")
+
+    def _show_dimensions_error(self, input_csv_path: str, error: Exception) -> None:
+        """
+        Report an error raised while calculating dimensions.
+
+        Args:
+            input_csv_path: The CSV file selected by the user
+            error: The exception raised by the worker thread
+        """
+        if isinstance(error, FileNotFoundError):
+            messagebox.showerror("Error", f"File not found:\\n{input_csv_path}", parent=self.root)
+            self.status_var.set(f"Error: File not found - {os.path.basename(input_csv_path)}")
+        elif isinstance(error, pd.errors.EmptyDataError):
+            messagebox.showerror("Error", "The selected file is completely empty or not a valid CSV.", parent=self.root)
+            self.status_var.set("Error: Selected file is empty or not a valid CSV.")
+        elif isinstance(error, pd.errors.ParserError):
+            messagebox.showerror("Error", "Could not parse the CSV file. Please ensure it's a valid CSV format.", parent=self.root)
+            self.status_var.set("Error: Could not parse the CSV file.")
+        else:
+            messagebox.showerror("Error", f"An error occurred while reading or processing the CSV file:\\n{str(error)}", parent=self.root)
+            self.status_var.set(f"Error calculating dimensions: {str(error)}")
+
+    def _column_rules(self) -> Optional[ColumnRules]:
+        """Parse the Columns entry; shows an error and returns None if it is invalid."""
+        try:
+            rules = parse_rules(self.columns_var.get(), self.match_var.get())
+        except ValueError as e:
+            messagebox.showerror("Invalid Columns", f"Invalid column selection:\n{str(e)}", parent=self.root)
+            self.status_var.set(f"Error: Invalid column selection: {str(e)}")
+            return None
+        if not rules.rules:
+            messagebox.showerror("Invalid Columns", "Enter at least one column to check.", parent=self.root)
+            self.status_var.set("Error: No columns to check.")
+            return None
+        return rules
+
+    def _check_columns(
+        self, input_csv_path: str, header: List[str], rules: ColumnRules, require_all: bool = True
+    ) -> bool:
+        """
+        True if ``rules`` select columns of ``header``; otherwise explains why not.
+
+        With ``require_all`` every named column must exist, else one selected column is enough.
+        """
+        missing_columns = rules.missing(header) if require_all else []
+        if missing_columns or not rules.resolve(header).columns:
+            messagebox.showerror(
+                "Missing Columns",
+                (f"CSV must contain the following columns:\n{', '.join(missing_columns)}\n\n" if missing_columns
+                 else f"No columns match: {self.columns_var.get()}\n\n")
+                + f"Available columns: {', '.join(header)}",
+                parent=self.root
+            )
+            self.status_var.set(f"Error: Missing required columns in '{os.path.basename(input_csv_path)}'.")
+            return False
+        return True
+
+    def run_csv_processing(self) -> None:
+        """
+        The main CSV processing logic.
+        """
+        rules = self._column_rules()
+        if rules is None:
+            return
+        self.status_var.set("Awaiting input CSV file selection for processing...")
+        # Select input file
+        input_csv_path = self.select_file("Select the input CSV file") # Now self.select_file
+        if not input_csv_path:
+            messagebox.showinfo("Cancelled", "No input file selected. Operation cancelled.", parent=self.root)
+            self.status_var.set("CSV processing cancelled: No input file selected.")
+            return
+        
+        self.status_var.set(f"Processing input file: {os.path.basename(input_csv_path)}")
+
+        # Read the header and validate the required columns before scanning
+        try:
+            header = read_header(input_csv_path)
+        except FileNotFoundError:
+            messagebox.showerror("Error", f"Input file not found:\\n{input_csv_path}", parent=self.root)
+            self.status_var.set(f"Error: Input file not found - {os.path.basename(input_csv_path)}")
+            return
+        except pd.errors.EmptyDataError:
+            messagebox.showerror("Error", "The selected file appears to be empty or corrupted.", parent=self.root)
+            self.status_var.set(f"Error: Input file '{os.path.basename(input_csv_path)}' is empty or corrupted.")
+            return
+        except Exception as e:
+            messagebox.showerror("Error", f"Error reading CSV file:\\n{str(e)}", parent=self.root)
+            self.status_var.set(f"Error reading CSV '{os.path.basename(input_csv_path)}': {str(e)}")
+            return
+
+        # Check that the checked columns exist
+        if not self._check_columns(input_csv_path, header, rules):
+            return
+
+        # Stream the matching rows into a temporary file on a worker thread; it
+        # is only moved to the chosen location if the user decides to save it.
+        self.status_var.set(f"Filtering data in '{os.path.basename(input_csv_path)}'...")
+        temp_fd, temp_path = tempfile.mkstemp(suffix=".csv")
+        os.close(temp_fd)
+        try:
+            workers = self.workers_var.get()
+        except tk.TclError: # Spinbox holds something that is not a number
+            workers = default_worker_count()
+        two_pass = self.two_pass_var.get()
+        use_cache = self.use_cache_var.get()
+        policy_spec = POLICY_CHOICES.get(self.policy_var.get(), 'ascii')
+        # Filled in by the filter from the matching rows as they are written
+        report = OffenseReport(annotate=self.annotate_var.get())
+        # Written next to the temporary file and moved next to the output when it is saved
+        profile = ProfileCapture(profile_prefix_for(temp_path)) if self.profile_var.get() else None
+
+        def remove_temp_file() -> None:
+            temp_files = [temp_path, index_path_for(temp_path)]
+            temp_files += [profile.profile_path, profile.memory_path] if profile else []
+            for path in temp_files:
+                if os.path.exists(path):
+                    os.remove(path)
+
+        def on_done(result: Tuple[FilterStats, Optional[ResultTable]]) -> None:
+            stats, table = result
+            try:
+                self._show_results_and_save(input_csv_path, temp_path, stats, report, profile, table)
+            finally:
+                if table is not None:
+                    table.close()
+                remove_temp_file()
+
+        def on_error(error: Exception) -> None:
+            remove_temp_file()
+            messagebox.showerror("Error", f"Error processing data:\\n{str(error)}", parent=self.root)
+            self.status_var.set(f"Error processing data in '{os.path.basename(input_csv_path)}': {str(error)}")
+
+        def on_cancelled() -> None:
+            remove_temp_file()
+            self.status_var.set(f"Processing of '{os.path.basename(input_csv_path)}' cancelled by user.")
+
+        def run_filter(job: BackgroundJob) -> Tuple[FilterStats, Optional[ResultTable]]:
+            # Compiled here, off the main thread: category policies take a moment
+            policy = parse_policy(policy_spec)
+            if profile is None:
+                stats = filter_file(job, policy)
+            else:
+                # The profiler only sees the thread it was started on
+                with capture_profile(profile) as capture:
+                    stats = filter_file(job, policy)
+                stats.timings.peak_traced_mb = capture.peak_traced_mb
+            return stats, open_results(job, stats, policy)
+
+        def open_results(job: BackgroundJob, stats: FilterStats, policy: CharPolicy) -> Optional[ResultTable]:
+            # Index the matching rows for the preview here too; without an index
+            # the results are still offered for saving, only not shown
+            if stats.matching_rows == 0:
+                return None
+            try:
+                return ResultTable(
+                    temp_path, rules.resolve(header, policy).policies, cancel_event=job.cancel_event
+                )
+            except ProcessingCancelled:
+                raise
+            except Exception:
+                return None
+
+        def filter_file(job: BackgroundJob, policy: CharPolicy) -> FilterStats:
+            if use_cache:
+                return self.scan_cache.filter_csv(
+                    input_csv_path, temp_path, rules, self.chunksize,
+                    job.report_progress, job.cancel_event, policy, report=report,
+                    workers=workers, two_pass=two_pass
+                )
+            if two_pass:
+                return filter_csv_projected(
+                    input_csv_path, temp_path, rules, self.chunksize,
+                    job.report_progress, job.cancel_event, policy, report=report
+                )
+            return filter_csv_parallel(
+                input_csv_path, temp_path, rules,
+                workers=workers, chunksize=self.chunksize,
+                progress=job.report_progress, cancel_event=job.cancel_event, policy=policy, report=report
+            )
+
+        self._start_job(
+            run_filter,
+            input_csv_path,
+            on_done=on_done,
+            on_error=on_error,
+            on_cancelled=on_cancelled
+        )
+
+    def run_batch_processing(self) -> None:
+        """
+        Filter every CSV file of a folder into an output folder and summarise the batch.
+        """
+        rules = self._column_rules()
+        if rules is None:
+            return
+        self.status_var.set("Awaiting input folder selection for batch processing...")
+        source_dir = filedialog.askdirectory(parent=self.root, title="Select a folder of CSV files")
+        if not source_dir:
+            self.status_var.set("Batch processing cancelled: No input folder selected.")
+            return
+        output_dir = filedialog.askdirectory(parent=self.root, title="Select the folder for filtered files")
+        if not output_dir:
+            self.status_var.set("Batch processing cancelled: No output folder selected.")
+            return
+
+        inputs = discover_inputs(source_dir)
+        if not inputs:
+            messagebox.showinfo("No Files", "The selected folder contains no CSV files.", parent=self.root)
+            self.status_var.set(f"No CSV files found in '{source_dir}'.")
+            return
+        try:
+            workers = self.workers_var.get()
+        except tk.TclError: # Spinbox holds something that is not a number
+            workers = default_worker_count()
+        policy_spec = POLICY_CHOICES.get(self.policy_var.get(), 'ascii')
+        total_bytes = sum(os.path.getsize(path) for path in inputs if os.path.isfile(path))
+
+        def run(job: BackgroundJob) -> Dict:
+            return run_batch(
+                source_dir, output_dir, rules, workers, self.chunksize,
+                parse_policy(policy_spec), job.report_progress, job.cancel_event
+            )
+
+        def on_done(report: Dict) -> None:
+            totals = report['totals']
+            report_path = os.path.join(output_dir, REPORT_NAME)
+            messagebox.showinfo(
+                "Batch Complete",
+                f"Files processed: {totals['files']} ({totals['resumed']} already done)\n"
+                f"Failed: {totals['failed']}\n"
+                f"Rows: {totals['total_rows']:,}\n"
+                f"Rows with special characters: {totals['matching_rows']:,}\n\n"
+                f"Report saved to:\n{report_path}",
+                parent=self.root
+            )
+            self.status_var.set(
+                f"Batch complete: {totals['files']} files, {totals['failed']} failed. Report: {report_path}"
+            )
+
+        def on_error(error: Exception) -> None:
+            messagebox.showerror("Error", f"Batch processing failed:\n{str(error)}", parent=self.root)
+            self.status_var.set(f"Batch processing failed: {str(error)}")
+
+        self.status_var.set(f"Processing {len(inputs)} files from '{source_dir}'...")
+        self._start_job(
+            run,
+            source_dir,
+            on_done=on_done,
+            on_error=on_error,
+            on_cancelled=lambda: self.status_var.set(
+                "Batch cancelled. Finished files are kept; run it again to resume."
+            ),
+            total_bytes=total_bytes
+        )
+
+    def run_sanitize_processing(self) -> None:
+        """
+        Write a cleaned copy of a CSV file, rewriting special characters in the checked columns.
+        """
+        rules = self._column_rules()
+        if rules is None:
+            return
+        self.status_var.set("Awaiting input CSV file selection for cleaning...")
+        input_csv_path = self.select_file("Select the CSV file to clean")
+        if not input_csv_path:
+            self.status_var.set("Cleaning cancelled: No input file selected.")
+            return
+        try:
+            header = read_header(input_csv_path)
+        except Exception as e:
+            messagebox.showerror("Error", f"Error reading CSV file:\n{str(e)}", parent=self.root)
+            self.status_var.set(f"Error reading CSV '{os.path.basename(input_csv_path)}': {str(e)}")
+            return
+        if not self._check_columns(input_csv_path, header, rules, require_all=False):
+            return
+
+        output_csv_path = self.save_file_as("Save the cleaned CSV file as")
+        if not output_csv_path:
+            self.status_var.set("Cleaning cancelled: No output location selected.")
+            return
+        mode = self.sanitize_mode_var.get()
+        policy_spec = POLICY_CHOICES.get(self.policy_var.get(), 'ascii')
+
+        def run(job: BackgroundJob) -> SanitizeStats:
+            return sanitize_csv(
+                input_csv_path, output_csv_path, rules, mode, parse_policy(policy_spec),
+                chunksize=self.chunksize, progress=job.report_progress, cancel_event=job.cancel_event
+            )
+
+        def on_done(stats: SanitizeStats) -> None:
+            messagebox.showinfo(
+                "Cleaning Complete",
+                f"Rows written: {stats.total_rows:,}\n"
+                f"Rows changed: {stats.changed_rows:,}\n"
+                f"Cells changed: {stats.changed_cells:,}\n\n"
+                f"Saved to:\n{output_csv_path}",
+                parent=self.root
+            )
+            self.status_var.set(
+                f"Cleaned '{os.path.basename(input_csv_path)}': {stats.changed_cells:,} cells changed."
+            )
+
+        def on_error(error: Exception) -> None:
+            if os.path.exists(output_csv_path):
+                os.remove(output_csv_path)
+            messagebox.showerror("Error", f"Error cleaning data:\n{str(error)}", parent=self.root)
+            self.status_var.set(f"Error cleaning '{os.path.basename(input_csv_path)}': {str(error)}")
+
+        def on_cancelled() -> None:
+            if os.path.exists(output_csv_path):
+                os.remove(output_csv_path)
+            self.status_var.set(f"Cleaning of '{os.path.basename(input_csv_path)}' cancelled by user.")
+
+        self.status_var.set(f"Cleaning '{os.path.basename(input_csv_path)}' ({mode})...")
+        self._start_job(run, input_csv_path, on_done=on_done, on_error=on_error, on_cancelled=on_cancelled)
+
+    def _show_results_and_save(
+        self,
+        input_csv_path: str,
+        temp_path: str,
+        stats: FilterStats,
+        report: Optional[OffenseReport] = None,
+        profile: Optional[ProfileCapture] = None,
+        table: Optional[ResultTable] = None,
+    ) -> None:
+        """
+        Report the filtering results and save them on request.
+
+        Args:
+            input_csv_path: The CSV file selected by the user
+            temp_path: Temporary file holding the matching rows
+            stats: Totals and stage timings returned by the filter
+            report: Offending characters found in the matching rows; saved
+                as JSON next to the output
+            profile: Profile of the filter; moved next to the output together
+                with the statistics as JSON
+            table: The matching rows, shown in a preview window next to the
+                results; without it the results are only summarised
+        """
+        # Check if file is empty
+        if stats.total_rows == 0:
+            messagebox.showerror("Error", "The selected CSV file is empty.", parent=self.root)
+            self.status_var.set(f"Error: Input CSV file '{os.path.basename(input_csv_path)}' is empty.")
+            return
+
+        # Show processing results
+        total_rows = stats.total_rows
+        filtered_rows = stats.matching_rows
+        
+        if filtered_rows == 0:
+            messagebox.showinfo(
+                "No Special Characters Found", 
+                f"Processed {total_rows} rows.\n\n"
+                "No rows found with special characters in the checked columns.",
+                parent=self.root
+            )
+            self.status_var.set(f"Processing complete for '{os.path.basename(input_csv_path)}'. No special characters found.")
+            return
+
+        # Ask user if they want to proceed with saving
+        memo_summary = describe_memo(stats.memo)
+        summary = (
+            f"Processing Results:\n"
+            f"• Total rows processed: {total_rows}\n"
+            f"• Rows with special characters: {filtered_rows}\n"
+            f"• Percentage: {stats.percentage:.1f}%\n\n"
+            f"Time per stage ({stats.timings.seconds:.2f}s in total):\n{stats.timings.describe()}\n\n"
+            + (f"Most frequent special characters:\n{report.summary()}\n\n" if report is not None else "")
+            + (f"Memoised columns:\n{memo_summary}\n\n" if memo_summary else "")
+        )
+        if table is not None:
+            self.status_var.set(f"Showing {filtered_rows:,} rows with special characters.")
+            result = ResultPreview(self.root, table, summary.rstrip()).show()
+            # Let go of the temporary file before it is moved
+            table.close()
+        else:
+            result = messagebox.askyesno(
+                "Special Characters Found",
+                summary + "Do you want to save the filtered results?",
+                parent=self.root
+            )
+        
+        if not result:
+            messagebox.showinfo("Cancelled", "Operation cancelled by user.", parent=self.root)
+            self.status_var.set("Save operation cancelled by user.")
+            return
+
+        self.status_var.set("Awaiting output file location selection...")
+        # Select output file
+        output_csv_path = self.save_file_as("Save the filtered CSV file as") # Now self.save_file_as
+        if not output_csv_path:
+            messagebox.showinfo("Cancelled", "No output location selected. Operation cancelled.", parent=self.root)
+            self.status_var.set("Save operation cancelled: No output location selected.")
+            return
+        
+        self.status_var.set(f"Saving filtered data to: {os.path.basename(output_csv_path)}")
+
+        # Save filtered data, converting it if another format was chosen
+        try:
+            if infer_output_format(output_csv_path) == 'csv':
+                shutil.move(temp_path, output_csv_path)
+            else:
+                convert_csv(temp_path, output_csv_path)
+                os.remove(temp_path)
+            report_note = ""
+            if report is not None:
+                report_path = report_path_for(output_csv_path)
+                report.save(report_path)
+                report_note = f"\nCharacter report: {report_path}"
+            if profile is not None:
+                stats_path = stats_path_for(output_csv_path)
+                stats.save(stats_path)
+                profile_path = profile_prefix_for(output_csv_path)
+                shutil.move(profile.profile_path, profile_path + '.prof')
+                shutil.move(profile.memory_path, profile_path + '_memory.txt')
+                report_note += f"\nRun statistics: {stats_path}\nProfile: {profile_path}.prof"
+            messagebox.showinfo(
+                "Success", 
+                f"Filtered data successfully saved!\n\n"
+                f"Location: {output_csv_path}\n"
+                f"Rows saved: {filtered_rows}"
+                f"{report_note}",
+                parent=self.root
+            )
+            self.status_var.set(f"Filtered data saved successfully to '{os.path.basename(output_csv_path)}'.")
+        except Exception as e:
+            messagebox.showerror("Error", f"Error saving filtered CSV file:\\n{str(e)}", parent=self.root)
+            self.status_var.set(f"Error saving filtered data to '{os.path.basename(output_csv_path)}': {str(e)}")
+
+    def _start_job(
+        self, target, input_csv_path: str, on_done, on_error, on_cancelled, total_bytes: Optional[int] = None
+    ) -> None:
+        """
+        Run ``target`` on a worker thread while the UI shows its progress.
+
+        Args:
+            target: Called with the BackgroundJob on the worker thread
+            input_csv_path: File being processed, used to size the progress bar
+            on_done: Called on the main thread with the result of ``target``
+            on_error: Called on the main thread with the raised exception
+            on_cancelled: Called on the main thread if the user cancelled
+            total_bytes: Size of the whole job, if it is not the size of ``input_csv_path``
+        """
+        if total_bytes is None:
+            try:
+                total_bytes = os.path.getsize(input_csv_path)
+            except OSError:
+                total_bytes = 0
+        label = os.path.basename(input_csv_path)
+
+        def finish(callback):
+            def handler(*args):
+                self._set_busy(False)
+                callback(*args)
+            return handler
+
+        def on_progress(snapshot: ProgressSnapshot) -> None:
+            self.progress_var.set(snapshot.fraction * 100)
+            self.status_var.set(f"Processing '{label}': {snapshot.describe()}")
+
+        self.current_job = BackgroundJob(
+            self.root, target, total_bytes, on_progress,
+            finish(on_done), finish(on_error), finish(on_cancelled)
+        )
+        self._set_busy(True)
+        self.current_job.start()
+
+    def _set_busy(self, busy: bool) -> None:
+        """Enable the Cancel button while a job runs and the other actions otherwise."""
+        self.start_button.config(state=tk.DISABLED if busy else tk.NORMAL)
+        self.calc_dims_button.config(state=tk.DISABLED if busy else tk.NORMAL)
+        self.batch_button.config(state=tk.DISABLED if busy else tk.NORMAL)
+        self.sanitize_button.config(state=tk.DISABLED if busy else tk.NORMAL)
+        self.cancel_button.config(state=tk.NORMAL if busy else tk.DISABLED)
+        self.progress_var.set(0.0)
+        if not busy:
+            self.current_job = None
+
+    def cancel_current_job(self) -> None:
+        """Ask the running job to stop at its next checkpoint."""
+        if self.current_job is not None:
+            self.current_job.cancel()
+            self.status_var.set("Cancelling...")
+
+    def _exit(self) -> None:
+        """Stop any running job, then close the application."""
+        self.cancel_current_job()
+        self.root.destroy()
+
+def main() -> None:
+    """
+    Create and run the main GUI application.
+    """
+    root = tk.Tk()
+    app = CSVFilterApp(root)
+    root.mainloop()
+
+if __name__ == "__main__":
+    main()
+
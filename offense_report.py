@@ -0,0 +1,219 @@
+"""
+Per-character report of the offending characters found by a filter run.
+
+Every offending character sits in a matching row, so the report is built from
+the matching rows as the filters write them; the input is not read again.
+The filter pass also hands over which checked columns of each row matched,
+so only those values are searched, once, for their offending characters.
+For each checked column it counts the offending code points, their Unicode
+categories, the rows affected and the most frequent offending values with
+the positions of their offending characters. Optionally the output gets
+three extra columns naming, per row, the columns, code points and character
+positions that matched.
+"""
+
+import json
+import unicodedata
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from char_policy import CharPolicy
+from column_rules import ColumnSelection, column_mask
+from common import DEFAULT_TOP_N
+from formats import sidecar_path
+
+# Annotation columns appended to the output when ``annotate`` is set
+ANNOTATION_COLUMNS = ['offending_columns', 'offending_codepoints', 'offending_positions']
+
+# Distinct values tracked per column before the rarest are dropped, which
+# bounds memory on files where nearly every value is different
+MAX_TRACKED_VALUES = 100_000
+
+
+def format_code_point(char: str) -> str:
+    """``'é'`` -> ``'U+00E9'``."""
+    return f"U+{ord(char):04X}"
+
+
+def report_path_for(output_path: str) -> str:
+    """``out/a_filtered.csv.gz`` -> ``out/a_filtered_report.json``."""
+    return sidecar_path(output_path, '_report.json')
+
+
+class ColumnOffenses:
+    """Counts for one checked column, whose values are checked against ``policy``."""
+
+    def __init__(self, policy: CharPolicy):
+        self.policy = policy
+        self.rows = 0
+        self.code_points: Counter = Counter()
+        self.values: Counter = Counter()
+        # Offending characters and their offsets per value, e.g. 'Café' -> ('é', (3,))
+        self._found: Dict[str, Tuple[str, Tuple[int, ...]]] = {}
+
+    def find(self, value: str) -> Tuple[str, Tuple[int, ...]]:
+        """The offending characters of ``value`` and their character offsets, searched once per distinct value."""
+        found = self._found.get(value)
+        if found is None:
+            if len(self._found) > MAX_TRACKED_VALUES:
+                self._found.clear()
+            starts = tuple(match.start() for match in self.policy.pattern.finditer(value))
+            found = self._found[value] = (''.join(value[start] for start in starts), starts)
+        return found
+
+    def add(self, values: Iterable[str]) -> None:
+        """Count offending ``values`` and their offending characters."""
+        counts = Counter(values)
+        self.rows += sum(counts.values())
+        for value, count in counts.items():
+            for char in self.find(value)[0]:
+                self.code_points[char] += count
+        self.values.update(counts)
+        if len(self.values) > MAX_TRACKED_VALUES:
+            # Keep the most common half; counts of the top values stay exact
+            # unless a value is rare early on and frequent later
+            self.values = Counter(dict(self.values.most_common(MAX_TRACKED_VALUES // 2)))
+
+    def categories(self) -> Counter:
+        """Offending characters per Unicode general category."""
+        counts: Counter = Counter()
+        for char, count in self.code_points.items():
+            counts[unicodedata.category(char)] += count
+        return counts
+
+    def to_dict(self, top_n: int) -> Dict:
+        return {
+            'rows': self.rows,
+            'characters': sum(self.code_points.values()),
+            'code_points': [
+                {
+                    'code_point': format_code_point(char),
+                    'char': char,
+                    'name': unicodedata.name(char, ''),
+                    'category': unicodedata.category(char),
+                    'count': count,
+                }
+                for char, count in self.code_points.most_common()
+            ],
+            'categories': dict(self.categories().most_common()),
+            'top_values': [
+                {'value': value, 'count': count, 'positions': list(self.find(value)[1])}
+                for value, count in self.values.most_common(top_n)
+            ],
+        }
+
+
+class OffenseReport:
+    """
+    Collects offending characters from the matching rows of one filter run.
+
+    Pass an instance as ``report`` to a filter function; it is filled in as
+    the matching rows are written.
+
+    Args:
+        top_n: Offending values listed per column
+        annotate: Append ANNOTATION_COLUMNS to the output rows
+    """
+
+    def __init__(self, top_n: int = DEFAULT_TOP_N, annotate: bool = False):
+        self.top_n = top_n
+        self.annotate = annotate
+        self.matching_rows = 0
+        self.policy: Optional[str] = None
+        self.columns: Dict[str, ColumnOffenses] = {}
+        # Annotation text per string of offending characters, e.g. 'é™' -> 'U+00E9 U+2122'
+        self._labels: Dict[str, str] = {}
+
+    def output_columns(self, header: List[str]) -> List[str]:
+        """The output header: ``header`` plus the annotation columns if enabled."""
+        return header + ANNOTATION_COLUMNS if self.annotate else header
+
+    def observe(
+        self,
+        frame: pd.DataFrame,
+        selection: ColumnSelection,
+        verdicts: Optional[Dict[str, np.ndarray]] = None,
+    ) -> pd.DataFrame:
+        """
+        Count the offending characters of a frame of matching rows.
+
+        Args:
+            frame: Matching rows about to be written
+            selection: The checked columns and the policy of each
+            verdicts: Per checked column, which rows of ``frame`` it matched
+                in, as the filter pass found (see ColumnSelection.mask);
+                columns without them are checked here
+
+        Returns:
+            pd.DataFrame: ``frame``, with the annotation columns added if enabled
+        """
+        self.policy = selection.policy_key
+        self.matching_rows += len(frame)
+        # One cell per row and annotation column, filled column by column
+        cells = [np.full(len(frame), '', dtype=object) for _ in ANNOTATION_COLUMNS]
+        annotated = np.zeros(len(frame), dtype=bool)
+        for column, policy in selection.policies.items():
+            if column not in frame.columns:
+                continue
+            flags = verdicts.get(column) if verdicts else None
+            if flags is None:
+                flags = column_mask(frame[column], policy).to_numpy(dtype=bool)
+            rows = np.flatnonzero(flags)
+            if not len(rows):
+                continue
+            offending = frame[column].iloc[rows].astype(str).to_numpy(dtype=object)
+            offenses = self.columns.get(column)
+            if offenses is None:
+                offenses = self.columns[column] = ColumnOffenses(policy)
+            offenses.add(offending)
+            if self.annotate:
+                # Each distinct value is labelled once, then spread over its rows
+                codes, distinct = pd.factorize(offending)
+                found = [offenses.find(value) for value in distinct]
+                pieces = [
+                    column,
+                    np.array([self._label(chars) for chars, _ in found], dtype=object)[codes],
+                    np.array([' '.join(map(str, starts)) for _, starts in found], dtype=object)[codes],
+                ]
+                first = ~annotated[rows]
+                for cell, piece in zip(cells, pieces):
+                    cell[rows] = np.where(first, piece, cell[rows] + ';' + piece)
+                annotated[rows] = True
+
+        if not self.annotate:
+            return frame
+        return frame.assign(**dict(zip(ANNOTATION_COLUMNS, cells)))
+
+    def _label(self, chars: str) -> str:
+        label = self._labels.get(chars)
+        if label is None:
+            if len(self._labels) > MAX_TRACKED_VALUES:
+                self._labels.clear()
+            label = self._labels[chars] = ' '.join(map(format_code_point, dict.fromkeys(chars)))
+        return label
+
+    def to_dict(self) -> Dict:
+        """JSON-serialisable report; only columns with offending characters are listed."""
+        return {
+            'policy': self.policy,
+            'matching_rows': self.matching_rows,
+            'columns': {name: offenses.to_dict(self.top_n) for name, offenses in self.columns.items()},
+        }
+
+    def save(self, path: str) -> None:
+        """Write the report as JSON."""
+        with open(path, 'w', encoding='utf-8') as handle:
+            json.dump(self.to_dict(), handle, indent=2, ensure_ascii=False)
+
+    def summary(self, limit: int = 5) -> str:
+        """A few lines naming the most frequent offending characters, for message boxes."""
+        lines = []
+        for name, offenses in self.columns.items():
+            common = ', '.join(
+                f"{char!r} {format_code_point(char)} x{count}" for char, count in offenses.code_points.most_common(limit)
+            )
+            lines.append(f"{name}: {offenses.rows} rows; {common}")
+        return '\n'.join(lines)
@@ -0,0 +1,203 @@
+"""
+Multi-core filtering over record-aligned byte ranges of a CSV file.
+
+The input is split into shards that start and end on record boundaries
+(see csv_bytes.split_record_ranges). Each shard is filtered by a process-pool
+worker with the byte-level fast path of byte_scan, and the matching rows are
+written back in file order, so the output is identical to
+filter_engine.filter_csv_streaming.
+"""
+
+import io
+import math
+import os
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from byte_scan import filter_csv_bytes, matched_offsets, scan_block
+from char_policy import DEFAULT_POLICY, CharPolicy
+from column_rules import Columns, ColumnSelection, select_columns
+from common import default_worker_count
+from csv_bytes import RecordCounter, split_record_ranges
+from filter_engine import (
+    DEFAULT_CHUNKSIZE,
+    DEFAULT_COLUMNS,
+    FilterStats,
+    ProcessingCancelled,
+    ProgressCallback,
+    check_cancelled,
+    write_matches,
+)
+from formats import is_compressed, open_writer
+from projected_scan import starts_with_blank_line
+from run_stats import StageTimings
+from value_memo import MemoStats
+
+if TYPE_CHECKING:
+    from offense_report import OffenseReport
+
+# Upper bound on the bytes a single worker parses at once
+DEFAULT_SHARD_BYTES = 32 * 1024 * 1024
+
+# Shards per worker, so uneven shards do not leave cores idle at the end
+SHARDS_PER_WORKER = 4
+
+
+def _scan_shard(
+    path: str,
+    header: bytes,
+    start: int,
+    end: int,
+    columns: Union[List[str], ColumnSelection],
+    policy: CharPolicy = DEFAULT_POLICY,
+    render: bool = True,
+) -> Tuple[
+    int, int, Union[str, pd.DataFrame, None], Dict[str, np.ndarray], Optional[np.ndarray],
+    Dict[str, MemoStats], StageTimings
+]:
+    """
+    Filter one byte range of the input file.
+
+    Rows are counted from the raw bytes; only records holding offending
+    bytes are parsed (see byte_scan.scan_block).
+
+    Returns:
+        Tuple: Rows in the shard, matching rows, the matching rows - rendered
+        as CSV without a header if ``render`` is set, otherwise as a frame
+        (None if there are none) - the flags of those rows per checked column
+        for the report (empty when rendered), the file offsets of their
+        records (see byte_scan.matched_offsets), and the memo counters and
+        stage timings of the shard
+    """
+    timings = StageTimings()
+    mark = timings.mark()
+    with open(path, 'rb') as handle:
+        handle.seek(start)
+        data = handle.read(end - start)
+    mark = timings.lap('read', mark, nbytes=len(data))
+
+    counter = RecordCounter()
+    counter.feed(data)
+    timings.lap('scan', mark)
+    if not isinstance(columns, ColumnSelection):
+        columns = ColumnSelection({column: policy for column in columns})
+    verdicts = {} if not render else None
+    filtered = scan_block(header, data, columns, policy, timings, verdicts)
+    offsets = matched_offsets(filtered, start)
+    if filtered is None or filtered.empty:
+        return counter.finish()[0], 0, '' if render else None, {}, offsets, columns.memo_stats(), timings
+    mark = timings.mark()
+    rendered = filtered.to_csv(index=False, header=False) if render else filtered
+    if render:
+        timings.lap('render', mark, rows=len(filtered))
+    return counter.finish()[0], len(filtered), rendered, verdicts or {}, offsets, columns.memo_stats(), timings
+
+
+def filter_csv_parallel(
+    input_path: str,
+    output_path: str,
+    columns: Columns = DEFAULT_COLUMNS,
+    workers: int = 0,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    shard_bytes: int = DEFAULT_SHARD_BYTES,
+    progress: Optional[ProgressCallback] = None,
+    cancel_event: Optional[threading.Event] = None,
+    policy: CharPolicy = DEFAULT_POLICY,
+    output_format: Optional[str] = None,
+    report: Optional['OffenseReport'] = None,
+    record_offsets: Optional[List[Optional[np.ndarray]]] = None,
+) -> FilterStats:
+    """
+    Filter a CSV file using a pool of worker processes.
+
+    Falls back to the single-process byte-level filter when only one worker
+    is requested, the file fits in a single shard, or the file is compressed
+    (a compressed stream cannot be split at byte offsets).
+
+    Args:
+        input_path: Path to the CSV file to filter
+        output_path: Path the matching rows are written to
+        columns: Names of the columns to check, or ColumnRules
+        workers: Number of worker processes (0 uses every CPU)
+        chunksize: Rows per chunk for the single-process fallback
+        shard_bytes: Upper bound on the size of one shard
+        progress: Called after every shard with rows and bytes processed so far
+        cancel_event: Set by another thread to stop the scan; queued shards are dropped
+        policy: Characters considered allowed in columns without a policy of their own
+        output_format: Output format; inferred from ``output_path`` when None
+        report: Collects the offending characters of the matching rows; it is
+            filled in this process as shards arrive
+        record_offsets: Receives the file offsets of the matching records
+            in file order, as byte_scan.filter_csv_bytes does
+
+    Returns:
+        FilterStats: Row totals accumulated across all shards; the stage
+        timings of the shards are summed over the workers
+
+    Raises:
+        ProcessingCancelled: If ``cancel_event`` was set before the scan finished
+    """
+    workers = workers or default_worker_count()
+    file_size = os.path.getsize(input_path)
+    fallback = (input_path, output_path, columns, chunksize, progress, cancel_event, policy, output_format)
+    # Files that start with a blank line have no header at offset 0 to prepend
+    if workers <= 1 or file_size <= shard_bytes or is_compressed(input_path) or starts_with_blank_line(input_path):
+        return filter_csv_bytes(*fallback, report=report, record_offsets=record_offsets)
+
+    shard_count = max(workers * SHARDS_PER_WORKER, math.ceil(file_size / shard_bytes))
+    header, ranges = split_record_ranges(input_path, shard_count)
+    if len(ranges) <= 1:
+        return filter_csv_bytes(*fallback, report=report, record_offsets=record_offsets)
+
+    stats = FilterStats()
+    column_names = pd.read_csv(io.BytesIO(header), nrows=0).columns.tolist()
+    selection = select_columns(column_names, columns, policy)
+    if report is not None:
+        column_names = report.output_columns(column_names)
+    with open_writer(output_path, column_names, output_format) as output, \
+            ProcessPoolExecutor(max_workers=workers) as executor:
+        # CSV text is rendered in the workers; other formats and the report need the frames
+        render = output.accepts_csv_text and report is None
+        shard_args = (selection, policy, render)
+
+        # Keep a bounded window of shards in flight and write results in order
+        pending = deque()
+        remaining = iter(ranges)
+        for start, end in remaining:
+            pending.append((end, executor.submit(_scan_shard, input_path, header, start, end, *shard_args)))
+            if len(pending) >= workers * 2:
+                break
+        try:
+            while pending:
+                check_cancelled(cancel_event)
+                end, future = pending.popleft()
+                rows, matches, rendered, verdicts, offsets, memo, shard_timings = future.result()
+                if record_offsets is not None:
+                    record_offsets.append(offsets)
+                for column, memo_stats in memo.items():
+                    stats.memo.setdefault(column, MemoStats()).merge(memo_stats)
+                stats.timings.merge(shard_timings)
+                stats.total_rows += rows
+                stats.matching_rows += matches
+                if matches and render:
+                    mark = stats.timings.mark()
+                    output.write_csv_text(rendered)
+                    stats.timings.lap('write', mark, rows=matches)
+                elif matches:
+                    write_matches(output, rendered, report, selection, stats.timings, verdicts)
+                if progress is not None:
+                    progress(stats.total_rows, end)
+                for start, end in remaining:
+                    pending.append((end, executor.submit(_scan_shard, input_path, header, start, end, *shard_args)))
+                    break
+        except ProcessingCancelled:
+            # Drop queued shards instead of waiting for the whole window
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+    stats.timings.finish(input_path, output_path)
+    return stats
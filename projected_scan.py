@@ -0,0 +1,303 @@
+"""
+Two-pass filtering that only parses the checked columns of every row.
+
+Pass one reads the file in record-aligned blocks (see byte_blocks) and
+parses just the checked columns (``usecols``) of each to find the byte
+offsets where the matching records start. Pass two copies those records out
+of the file and parses only them. For wide files with sparse matches this avoids
+building string objects for most of the file. The output is identical to
+filter_engine.filter_csv_streaming.
+"""
+
+import io
+import mmap
+import os
+import threading
+from typing import TYPE_CHECKING, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from byte_blocks import data_records, iter_record_blocks, read_header_record
+from char_policy import DEFAULT_POLICY, CharPolicy
+from column_rules import Columns, ColumnSelection, select_columns
+from csv_bytes import RecordCounter, count_records, next_record_start
+from filter_engine import (
+    DEFAULT_CHUNKSIZE,
+    DEFAULT_COLUMNS,
+    READ_OPTIONS,
+    FilterStats,
+    ProgressCallback,
+    build_special_char_mask,
+    check_cancelled,
+    filter_csv_streaming,
+    read_header,
+    write_matches,
+)
+from formats import is_compressed, open_input, open_writer
+from run_stats import StageTimings
+
+if TYPE_CHECKING:
+    from offense_report import OffenseReport
+
+# Bytes parsed at a time by pass one. Only a few columns of each block are
+# parsed, so small blocks keep its memory low at little cost in speed.
+PROJECTION_BLOCK_SIZE = 1024 * 1024
+
+
+class RecordMismatch(ValueError):
+    """pandas parsed a different number of rows than the byte-level scan found records."""
+
+
+def find_matching_records(
+    input_path: str,
+    columns: Union[List[str], ColumnSelection],
+    progress: Optional[ProgressCallback] = None,
+    cancel_event: Optional[threading.Event] = None,
+    start: int = 0,
+    policy: CharPolicy = DEFAULT_POLICY,
+    timings: Optional[StageTimings] = None,
+    block_size: int = PROJECTION_BLOCK_SIZE,
+) -> Tuple[np.ndarray, int, bool]:
+    """
+    Find the byte offsets of the records that contain special characters.
+
+    Only ``columns`` are parsed. Each parsed row is paired with the record
+    the byte-level scan found for it.
+
+    Args:
+        input_path: Path to an uncompressed CSV file
+        columns: Names of the columns to check, or a ColumnSelection; all
+            must exist in the header
+        progress: Called after every block with records and bytes scanned so far
+        cancel_event: Set by another thread to stop the scan
+        start: Record boundary to start scanning from; data after the header
+            when non-zero, so only records appended to a file can be scanned
+        policy: Characters considered allowed
+        timings: Receives the read, parse and scan stages
+        block_size: Approximate bytes examined at a time
+
+    Returns:
+        Tuple[np.ndarray, int, bool]: Sorted start offsets of the matching
+        records, the number of records scanned, and whether the data ended
+        on a record boundary
+
+    Raises:
+        RecordMismatch: If pandas and the byte-level scan disagree on
+            where records start
+        ProcessingCancelled: If ``cancel_event`` was set before the scan finished
+    """
+    timings = timings if timings is not None else StageTimings()
+    if not isinstance(columns, ColumnSelection):
+        columns = ColumnSelection({column: policy for column in columns})
+    found = [np.empty(0, dtype=np.int64)]
+    counter = RecordCounter()
+    with open(input_path, 'rb') as handle:
+        if start:
+            header, _, _ = read_header_record(handle, block_size)
+            handle.seek(start)
+        source = timings.reader(handle)
+        if start:
+            carry, position = b'', start
+        else:
+            header, carry, position = read_header_record(source, block_size)
+        # Blocks are parsed without a copy of the header in front
+        names = pd.read_csv(io.BytesIO(header), nrows=0, **READ_OPTIONS).columns.tolist()
+        mark = timings.mark()
+        for block in iter_record_blocks(source, block_size, carry):
+            check_cancelled(cancel_event)
+            counter.feed(block)
+            starts, _ = data_records(block)
+            mark = timings.lap('scan', mark, nbytes=len(block))
+            if len(starts):
+                try:
+                    chunk = pd.read_csv(
+                        io.BytesIO(block), header=None, names=names, usecols=columns.columns, **READ_OPTIONS
+                    )
+                except pd.errors.ParserError:
+                    raise
+                except ValueError as e:
+                    # A record with more fields than the header, which pandas
+                    # would read as an index column after the header
+                    raise RecordMismatch(f"{input_path}: {e} at offset {position}") from e
+                mark = timings.lap('parse', mark, rows=len(chunk))
+                if len(chunk) != len(starts):
+                    raise RecordMismatch(
+                        f"{input_path}: {len(chunk)} rows parsed from {len(starts)} records at offset {position}"
+                    )
+                mask = build_special_char_mask(chunk, columns, policy).to_numpy(dtype=bool)
+                found.append(starts[mask] + position)
+                mark = timings.lap('scan', mark, rows=len(chunk))
+            position += len(block)
+            if progress is not None:
+                progress(counter.records, handle.tell())
+    records, clean_end = counter.finish()
+    return np.concatenate(found).astype(np.int64), records, clean_end
+
+
+def read_records(buffer: mmap.mmap, offsets: Iterable[int]) -> bytes:
+    """The records starting at ``offsets`` (ascending), with adjacent ones copied in one piece."""
+    pieces = []
+    run_start = run_end = -1
+    for start in offsets:
+        end = next_record_start(buffer, start)
+        if start != run_end:
+            if run_end > run_start:
+                pieces.append(buffer[run_start:run_end])
+            run_start = start
+        run_end = end
+    if run_end > run_start:
+        pieces.append(buffer[run_start:run_end])
+    return b''.join(pieces)
+
+
+def write_matching_records(
+    input_path: str,
+    output_path: str,
+    offsets: np.ndarray,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    progress: Optional[ProgressCallback] = None,
+    cancel_event: Optional[threading.Event] = None,
+    output_format: Optional[str] = None,
+    report: Optional['OffenseReport'] = None,
+    columns: Columns = DEFAULT_COLUMNS,
+    policy: CharPolicy = DEFAULT_POLICY,
+    timings: Optional[StageTimings] = None,
+) -> int:
+    """
+    Write the header and the records starting at the given byte offsets, parsing only those.
+
+    Args:
+        input_path: Path to an uncompressed CSV file
+        output_path: Path the selected rows are written to
+        offsets: Sorted record start offsets, as returned by find_matching_records
+        chunksize: Number of records parsed at a time
+        progress: Called after every chunk with rows written and bytes read so far
+        cancel_event: Set by another thread to stop the copy
+        output_format: Output format; inferred from ``output_path`` when None
+        report: Collects the offending characters of the written rows
+        columns: Checked columns or their ColumnSelection, for the report
+        policy: Policy the records were found with, for the report
+        timings: Receives the read, parse, report and write stages
+
+    Returns:
+        int: Number of rows written
+    """
+    timings = timings if timings is not None else StageTimings()
+    written = 0
+    column_names = read_header(input_path)
+    selection = select_columns(column_names, columns, policy)
+    if report is not None:
+        column_names = report.output_columns(column_names)
+    with open_writer(output_path, column_names, output_format) as output:
+        if not len(offsets):
+            return 0
+        with open(input_path, 'rb') as handle:
+            header, _, _ = read_header_record(handle, PROJECTION_BLOCK_SIZE)
+            with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                for first in range(0, len(offsets), chunksize):
+                    check_cancelled(cancel_event)
+                    mark = timings.mark()
+                    batch = offsets[first:first + chunksize].tolist()
+                    data = read_records(buffer, batch)
+                    mark = timings.lap('read', mark, nbytes=len(data))
+                    chunk = pd.read_csv(io.BytesIO(header + data), **READ_OPTIONS)
+                    timings.lap('parse', mark, rows=len(chunk))
+                    written += len(chunk)
+                    write_matches(output, chunk, report, selection, timings)
+                    if progress is not None:
+                        progress(written, batch[-1])
+    return written
+
+
+def split_progress(
+    progress: Optional[ProgressCallback], total_bytes: int
+) -> Tuple[Optional[ProgressCallback], Optional[ProgressCallback]]:
+    """
+    Map the progress of two passes over the same file onto one 0..total_bytes scale.
+
+    Returns:
+        Tuple: Callbacks for the first and second pass (None if ``progress`` is None)
+    """
+    if progress is None:
+        return None, None
+
+    def first(rows: int, bytes_done: int) -> None:
+        progress(rows, bytes_done // 2)
+
+    def second(rows: int, bytes_done: int) -> None:
+        progress(rows, (total_bytes + bytes_done) // 2)
+
+    return first, second
+
+
+def filter_csv_projected(
+    input_path: str,
+    output_path: str,
+    columns: Columns = DEFAULT_COLUMNS,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    progress: Optional[ProgressCallback] = None,
+    cancel_event: Optional[threading.Event] = None,
+    policy: CharPolicy = DEFAULT_POLICY,
+    output_format: Optional[str] = None,
+    report: Optional['OffenseReport'] = None,
+) -> FilterStats:
+    """
+    Filter a CSV file in two passes, parsing full records only for matching rows.
+
+    Compressed files are handed to the streaming filter, because they would
+    have to be decompressed twice and cannot be read at byte offsets. So are
+    files whose quoting the byte-level record scan cannot follow.
+
+    Args:
+        input_path: Path to the CSV file to filter
+        output_path: Path the matching rows are written to
+        columns: Names of the columns to check, or ColumnRules
+        chunksize: Number of records parsed per chunk in pass two
+        progress: Called after every block or chunk; each pass covers half of the input size
+        cancel_event: Set by another thread to stop the scan
+        policy: Characters considered allowed in columns without a policy of their own
+        output_format: Output format; inferred from ``output_path`` when None
+        report: Collects the offending characters of the matching rows
+
+    Returns:
+        FilterStats: Row totals for the whole file
+
+    Raises:
+        ProcessingCancelled: If ``cancel_event`` was set before the scan finished
+    """
+    fallback = (input_path, output_path, columns, chunksize, progress, cancel_event, policy, output_format, report)
+    if is_compressed(input_path):
+        return filter_csv_streaming(*fallback)
+
+    stats = FilterStats()
+    timings = stats.timings
+    selection = select_columns(read_header(input_path), columns, policy)
+    first_pass, second_pass = split_progress(progress, os.path.getsize(input_path))
+
+    offsets = np.empty(0, dtype=np.int64)
+    try:
+        if selection.columns:
+            offsets, stats.total_rows, _ = find_matching_records(
+                input_path, selection, first_pass, cancel_event, timings=timings
+            )
+        else:
+            mark = timings.mark()
+            stats.total_rows = max(count_records(input_path, cancel_event=cancel_event) - 1, 0)
+            timings.lap('count', mark, rows=stats.total_rows)
+        stats.matching_rows = write_matching_records(
+            input_path, output_path, offsets, chunksize, second_pass, cancel_event, output_format,
+            report, selection, timings=timings
+        )
+    except (RecordMismatch, pd.errors.ParserError):
+        # Records pandas delimits differently from the byte scan (a lone \r, say)
+        return filter_csv_streaming(*fallback)
+    stats.memo = selection.memo_stats()
+    timings.finish(input_path, output_path)
+    return stats
+
+
+def starts_with_blank_line(input_path: str) -> bool:
+    """True if the first line is blank, which the engines that split off the first line as header cannot handle."""
+    with open_input(input_path) as (source, _):
+        return not source.readline().strip(b' \t\r\n')
@@ -0,0 +1,450 @@
+"""
+Random access to the rows of a filtered CSV file, for the results preview.
+
+A result may hold millions of matching rows, far more than a Tk widget can
+take at once. ResultTable keeps only an index of where each record starts in
+the file (built in one pass over the raw bytes with the record helpers of
+byte_blocks and saved next to the file as ``.npy``) and parses the rows a
+view asks for, a page at a time, when it asks for them.
+
+Searching uses an index built when the table is opened: for every column,
+its casefolded values encoded as UTF-8 and joined into one buffer with NUL
+separators, the offset where each value starts, and how often each byte
+occurs. A query is found with vectorised byte comparisons anchored on its
+rarest byte, and the hits are mapped back to records through the offsets.
+The index stays in memory while the table is open: about the size of the
+file's text plus 8 bytes per value (a 45 MB result of a million rows and
+three columns takes about 70 MB).
+
+Sorting ranks the casefolded values held by the search index, so the file
+is not read again. The first sort of a column takes a moment on large
+results (callers such as result_view run it on a worker thread); its sort
+orders and their inverse (the position of every record in the sorted view)
+are kept, so changing the sort afterwards costs a few array operations.
+"""
+
+import csv
+import io
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from byte_blocks import data_records, iter_record_blocks, read_header_record
+from char_policy import CharPolicy
+from common import check_cancelled
+from csv_bytes import BLOCK_SIZE, header_fields
+
+# Rows parsed together when a view asks for one of them, and pages kept
+PAGE_ROWS = 256
+CACHED_PAGES = 64
+
+# Values of a column tried as numbers before all of them are
+NUMBER_SAMPLE = 1000
+
+# Suffix of the record offset index written next to the result
+INDEX_SUFFIX = '.rows.npy'
+
+# Rows read at a time while the search index is built
+SEARCH_CHUNK_ROWS = 100_000
+
+# A query is checked byte by byte at the positions of its rarest byte while
+# that byte occurs at most once in this many; otherwise whole columns are
+# compared at once
+SPARSE_BYTES = 16
+
+# Stands in for NUL, which separates the values of the search index
+NUL_STAND_IN = '\ufffd'
+
+
+def index_path_for(path: str) -> str:
+    """Path of the record offset index of ``path``, e.g. ``out.csv.rows.npy``."""
+    return path + INDEX_SUFFIX
+
+
+def build_row_index(
+    path: str,
+    cancel_event: Optional[threading.Event] = None,
+    block_size: int = BLOCK_SIZE,
+) -> np.ndarray:
+    """
+    Find the byte offset of every data record of an uncompressed CSV file.
+
+    Whitespace-only lines are skipped like pandas skips them, so record ``n``
+    of the index is row ``n`` of ``pd.read_csv(path)``.
+
+    Args:
+        path: Path to the CSV file
+        cancel_event: Set by another thread to stop between blocks
+        block_size: Approximate bytes examined at a time
+
+    Returns:
+        np.ndarray: int64 start offsets of the records followed by the size
+        of the file, so record ``n`` lies within ``[index[n], index[n + 1])``
+
+    Raises:
+        ProcessingCancelled: If ``cancel_event`` was set before the index was built
+    """
+    found = []
+    with open(path, 'rb') as source:
+        _, carry, position = read_header_record(source, block_size)
+        for block in iter_record_blocks(source, block_size, carry):
+            check_cancelled(cancel_event)
+            found.append(data_records(block)[0] + position)
+            position += len(block)
+    found.append(np.array([position]))
+    return np.concatenate(found).astype(np.int64)
+
+
+def load_row_index(
+    path: str,
+    index_path: Optional[str] = None,
+    cancel_event: Optional[threading.Event] = None,
+) -> np.ndarray:
+    """
+    Memory-map the record offset index of ``path``, building it first if it is missing or stale.
+
+    Args:
+        path: Path to the CSV file
+        index_path: Where the index is kept (default: index_path_for(path))
+        cancel_event: Set by another thread to stop building the index
+
+    Returns:
+        np.ndarray: The index as returned by build_row_index
+    """
+    index_path = index_path or index_path_for(path)
+    if os.path.exists(index_path) and os.path.getmtime(index_path) >= os.path.getmtime(path):
+        offsets = np.load(index_path, mmap_mode='r')
+        # The last entry is the size of the file it was built from
+        if len(offsets) and offsets[-1] == os.path.getsize(path):
+            return offsets
+    np.save(index_path, build_row_index(path, cancel_event))
+    return np.load(index_path, mmap_mode='r')
+
+
+def fold_query(text: str) -> bytes:
+    """A search query in the form of the search index."""
+    return text.casefold().replace('\0', NUL_STAND_IN).encode('utf-8')
+
+
+@dataclass
+class ColumnSearchIndex:
+    """The casefolded values of one column, for finding substrings in all of them at once."""
+    # UTF-8 of every value followed by a NUL
+    data: np.ndarray
+    # Offset of every value in ``data``
+    starts: np.ndarray
+    # Occurrences of every byte value in ``data``
+    counts: np.ndarray
+
+    @classmethod
+    def from_pieces(cls, pieces: List[bytes]) -> 'ColumnSearchIndex':
+        data = np.frombuffer(b''.join(pieces), dtype=np.uint8)
+        ends = np.flatnonzero(data == 0)
+        starts = np.concatenate([[0], ends[:-1] + 1]) if len(ends) else ends
+        return cls(data, starts, np.bincount(data, minlength=256))
+
+    def values(self) -> List[str]:
+        """Every casefolded value, in file order."""
+        return self.data.tobytes().decode('utf-8').split('\0')[:-1]
+
+    def contains(self, pattern: bytes) -> np.ndarray:
+        """Per value, whether it contains ``pattern`` (as returned by fold_query)."""
+        hits = np.zeros(len(self.starts), dtype=bool)
+        if not pattern:
+            hits[:] = True
+            return hits
+        needle = np.frombuffer(pattern, dtype=np.uint8)
+        # Matches cannot cross a separator: NUL never occurs in a query
+        anchor = int(np.argmin(self.counts[needle]))
+        if not self.counts[needle[anchor]]:
+            return hits
+        last = len(self.data) - len(needle)
+        if self.counts[needle[anchor]] * SPARSE_BYTES <= len(self.data):
+            positions = np.flatnonzero(self.data == needle[anchor]) - anchor
+            positions = positions[(positions >= 0) & (positions <= last)]
+            for offset, byte in enumerate(needle.tolist()):
+                if offset != anchor:
+                    positions = positions[self.data[positions + offset] == byte]
+            hits[np.searchsorted(self.starts, positions, side='right') - 1] = True
+            return hits
+        found = np.zeros(len(self.data), dtype=bool)
+        found[:last + 1] = self.data[:last + 1] == needle[0]
+        for offset, byte in enumerate(needle[1:].tolist(), start=1):
+            found[:last + 1] &= self.data[offset:last + 1 + offset] == byte
+        return np.logical_or.reduceat(found, self.starts)
+
+
+def build_search_index(
+    path: str,
+    cancel_event: Optional[threading.Event] = None,
+) -> List[ColumnSearchIndex]:
+    """
+    Build the search index of every column of a CSV file.
+
+    Returns:
+        List[ColumnSearchIndex]: One index per column of the header
+
+    Raises:
+        ProcessingCancelled: If ``cancel_event`` was set before the index was built
+    """
+    import pandas as pd
+    from filter_engine import READ_OPTIONS
+    pieces: List[List[bytes]] = []
+    for chunk in pd.read_csv(path, chunksize=SEARCH_CHUNK_ROWS, **READ_OPTIONS):
+        check_cancelled(cancel_event)
+        if not pieces:
+            pieces = [[] for _ in chunk.columns]
+        for column, name in enumerate(chunk.columns):
+            values = chunk[name].tolist()
+            text = '\0'.join(values) + '\0'
+            if text.count('\0') != len(values):
+                text = '\0'.join(value.replace('\0', NUL_STAND_IN) for value in values) + '\0'
+            # Casefolding may change the length of values; their offsets are taken afterwards
+            pieces[column].append(text.casefold().encode('utf-8'))
+    if not pieces:
+        pieces = [[] for _ in header_fields(path)]
+    return [ColumnSearchIndex.from_pieces(column) for column in pieces]
+
+
+def offending_spans(text: str, policy: CharPolicy) -> List[Tuple[int, int]]:
+    """
+    Character ranges of ``text`` that the policy does not allow.
+
+    Returns:
+        List[Tuple[int, int]]: ``(start, end)`` of each run of adjacent
+        offending characters, in order
+    """
+    if policy.is_clean(text):
+        return []
+    spans: List[Tuple[int, int]] = []
+    for match in policy.pattern.finditer(text):
+        if spans and spans[-1][1] == match.start():
+            spans[-1] = (spans[-1][0], match.end())
+        else:
+            spans.append(match.span())
+    return spans
+
+
+class ResultTable:
+    """
+    The rows of a filtered CSV file, parsed on demand and optionally sorted.
+
+    Positions passed to rows() and returned by find() are positions in the
+    current view: file order, or the order chosen with sort(). Record numbers
+    are the 0-based rows of the file and do not change when the view does.
+
+    Args:
+        path: Path to an uncompressed CSV file, e.g. the temporary output of a filter
+        policies: Checked column -> policy; offending characters of these
+            columns are reported by spans()
+        index_path: Where the record offset index is kept (default:
+            index_path_for(path)); removed by the caller with the file
+        cancel_event: Set by another thread to stop building the indexes
+    """
+
+    def __init__(
+        self,
+        path: str,
+        policies: Optional[Mapping[str, CharPolicy]] = None,
+        index_path: Optional[str] = None,
+        cancel_event: Optional[threading.Event] = None,
+    ):
+        self.path = path
+        self.header = header_fields(path)
+        self.index_path = index_path or index_path_for(path)
+        self.offsets = load_row_index(path, self.index_path, cancel_event)
+        self._search = build_search_index(path, cancel_event)
+        if self._search and len(self._search[0].starts) != len(self):
+            raise ValueError(f"{path} changed: {len(self._search[0].starts):,} rows read, {len(self):,} indexed")
+        positions = {name: position for position, name in reversed(list(enumerate(self.header)))}
+        self.policies: Dict[int, CharPolicy] = {
+            positions[name]: policy for name, policy in (policies or {}).items() if name in positions
+        }
+        self.sort_column: Optional[int] = None
+        self.descending = False
+        self._handle = open(path, 'rb')
+        self._pages: 'OrderedDict[int, List[List[str]]]' = OrderedDict()
+        self._keys: Dict[int, np.ndarray] = {}
+        self._orders: Dict[Tuple[int, bool], np.ndarray] = {}
+        self._ranks: Dict[Tuple[int, bool], np.ndarray] = {}
+        self._matches: Dict[Tuple[bytes, Tuple[int, ...]], np.ndarray] = {}
+
+    def __repr__(self) -> str:
+        return f"ResultTable({self.path!r}, {len(self):,} rows)"
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __enter__(self) -> 'ResultTable':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the file; the table cannot read rows afterwards."""
+        self._handle.close()
+        self._pages.clear()
+        # Release the memory map so the index file can be removed
+        self.offsets = np.zeros(1, dtype=np.int64)
+        self._search = []
+
+    def _read(self, first: int, stop: int) -> List[List[str]]:
+        """Parse records ``first`` to ``stop - 1`` of the file."""
+        bounds = [int(offset) for offset in self.offsets[first:stop + 1]]
+        self._handle.seek(bounds[0])
+        data = self._handle.read(bounds[-1] - bounds[0])
+        width = len(self.header)
+        rows = []
+        for start, end in zip(bounds, bounds[1:]):
+            # A record may be followed by skipped blank lines; only its first row counts
+            text = data[start - bounds[0]:end - bounds[0]].decode('utf-8', errors='replace')
+            row = next(csv.reader(io.StringIO(text, newline='')), [])
+            # Short rows are padded and long ones cut to the header, as pandas does
+            rows.append((row + [''] * (width - len(row)))[:width])
+        return rows
+
+    def _cached(self, number: int) -> List[str]:
+        """Record ``number`` from the page cache, or read alone without caching a page."""
+        rows = self._pages.get(number // PAGE_ROWS)
+        return rows[number % PAGE_ROWS] if rows is not None else self._read(number, number + 1)[0]
+
+    def record(self, number: int) -> List[str]:
+        """The fields of record ``number`` (in file order)."""
+        if not 0 <= number < len(self):
+            raise IndexError(f"record {number} out of range")
+        page = number // PAGE_ROWS
+        rows = self._pages.get(page)
+        if rows is None:
+            rows = self._read(page * PAGE_ROWS, min((page + 1) * PAGE_ROWS, len(self)))
+            self._pages[page] = rows
+            if len(self._pages) > CACHED_PAGES:
+                self._pages.popitem(last=False)
+        else:
+            self._pages.move_to_end(page)
+        return rows[number - page * PAGE_ROWS]
+
+    def records(self, start: int, stop: int) -> np.ndarray:
+        """Record numbers shown at view positions ``start`` to ``stop - 1``."""
+        start, stop = max(start, 0), min(stop, len(self))
+        if self.sort_column is None:
+            return np.arange(start, max(start, stop))
+        return np.asarray(self._orders[(self.sort_column, self.descending)][start:stop])
+
+    def rows(self, start: int, stop: int) -> List[Tuple[int, List[str]]]:
+        """
+        The rows shown at view positions ``start`` to ``stop - 1``.
+
+        In a sorted view neighbouring rows are scattered over the file, so
+        each is read on its own instead of parsing a page around it.
+
+        Returns:
+            List[Tuple[int, List[str]]]: ``(record number, fields)`` of each row
+        """
+        numbers = [int(number) for number in self.records(start, stop)]
+        if self.sort_column is None:
+            return [(number, self.record(number)) for number in numbers]
+        return [(number, self._cached(number)) for number in numbers]
+
+    def spans(self, column: int, text: str) -> List[Tuple[int, int]]:
+        """Runs of offending characters in a value of ``column`` (none if the column is not checked)."""
+        policy = self.policies.get(column)
+        return offending_spans(text, policy) if policy is not None else []
+
+    def sort_order(self, column: int, descending: bool = False) -> np.ndarray:
+        """
+        Record numbers of ``column``'s sorted view.
+
+        Columns whose non-empty values are all numbers sort numerically, the
+        others by text ignoring case; empty values come last either way.
+        Equal values keep their file order in both directions. Safe to call
+        from a worker thread while another thread reads rows.
+        """
+        key = (column, descending)
+        order = self._orders.get(key)
+        if order is None:
+            keys = self._sort_key(column)
+            order = self._orders[key] = np.argsort(-keys if descending else keys, kind='stable')
+        return order
+
+    def _sort_key(self, column: int) -> np.ndarray:
+        """Numbers or text ranks ordering the values of ``column``, computed once for both directions."""
+        keys = self._keys.get(column)
+        if keys is not None:
+            return keys
+        import pandas as pd
+        values = pd.Series(self._search[column].values(), dtype='str')
+        filled = (values != '').to_numpy()
+        # A sample rules out most text columns before converting every value
+        sample = values[filled][:NUMBER_SAMPLE]
+        numbers = None
+        if len(sample) and not pd.to_numeric(sample, errors='coerce').isna().any():
+            numbers = pd.to_numeric(values.where(filled), errors='coerce').to_numpy(dtype=float)
+            if np.isnan(numbers[filled]).any():
+                numbers = None
+        if numbers is not None:
+            keys = numbers
+        else:
+            codes, _ = pd.factorize(values, sort=True)
+            keys = codes.astype(float)
+            # Empty values are NaN, which argsort places last in both directions
+            keys[~filled] = np.nan
+        self._keys[column] = keys
+        return keys
+
+    def has_sort_order(self, column: Optional[int], descending: bool = False) -> bool:
+        """True if sort() can show this order without ranking the column first."""
+        return column is None or (column, descending) in self._orders
+
+    def sort(self, column: Optional[int], descending: bool = False) -> None:
+        """Show the rows sorted by ``column``, or in file order if it is None."""
+        if column is not None:
+            self.sort_order(column, descending)
+        self.sort_column = column
+        self.descending = descending
+
+    def _rank(self) -> Optional[np.ndarray]:
+        """View position of every record under the current sort (None in file order)."""
+        if self.sort_column is None:
+            return None
+        key = (self.sort_column, self.descending)
+        rank = self._ranks.get(key)
+        if rank is None:
+            order = self._orders[key]
+            rank = self._ranks[key] = np.empty_like(order)
+            rank[order] = np.arange(len(order))
+        return rank
+
+    def matching_records(self, text: str, columns: Optional[Sequence[int]] = None) -> np.ndarray:
+        """
+        Record numbers of the rows containing ``text``, ignoring case.
+
+        Args:
+            text: Substring to look for
+            columns: Columns searched (default: every column)
+        """
+        columns = tuple(range(len(self.header))) if columns is None else tuple(columns)
+        key = (fold_query(text), columns)
+        found = self._matches.get(key)
+        if found is None:
+            hits = np.zeros(len(self), dtype=bool)
+            for column in columns:
+                hits |= self._search[column].contains(key[0])
+            found = self._matches[key] = np.flatnonzero(hits)
+        return found
+
+    def find(self, text: str, columns: Optional[Sequence[int]] = None) -> np.ndarray:
+        """
+        View positions of the rows containing ``text``, ignoring case.
+
+        Returns:
+            np.ndarray: Sorted positions, for stepping through the hits with
+            ``np.searchsorted``
+        """
+        found = self.matching_records(text, columns)
+        rank = self._rank()
+        return found if rank is None else np.sort(rank[found])
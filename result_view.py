@@ -0,0 +1,395 @@
+"""
+Preview window of the filtered rows, shown before the GUI saves them.
+
+The grid is virtual: its Text widget only ever holds the rows that fit in
+the window, fetched from a ResultTable whenever the view moves, and the
+vertical scrollbar is driven by the row count of the table rather than by
+the widget's contents. Scrolling through millions of matches therefore
+costs the same as scrolling through fifty.
+
+Offending characters of the checked columns are highlighted, clicking a
+column heading sorts by it (ascending, descending, file order) and the
+search bar steps through the rows containing a piece of text; both use the
+indexes ResultTable keeps per column. The first sort of a column ranks its
+values on a worker thread, so the window keeps scrolling meanwhile.
+"""
+
+import tkinter as tk
+from tkinter import font as tkfont
+from tkinter import messagebox, ttk
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from background import BackgroundJob
+from result_table import PAGE_ROWS, ResultTable
+
+# Characters shown per cell before it is cut short with an ellipsis
+MIN_CELL_WIDTH = 4
+MAX_CELL_WIDTH = 40
+
+# Printed between cells, and in place of characters that would break a line
+SEPARATOR = ' │ '
+SHOWN_AS = str.maketrans({'\n': '↵', '\r': '↵', '\t': '→'})
+
+# Rows moved per mouse wheel step
+WHEEL_ROWS = 3
+
+ALL_COLUMNS = "All columns"
+
+
+def format_cell(value: str, width: int, spans: Sequence[Tuple[int, int]] = ()) -> Tuple[str, List[Tuple[int, int]]]:
+    """
+    Fit a value into a cell of ``width`` characters.
+
+    Args:
+        value: The field as read from the file
+        width: Characters available
+        spans: Ranges of ``value`` to highlight
+
+    Returns:
+        Tuple[str, List[Tuple[int, int]]]: The padded cell text and the
+        ranges to highlight in it; a cut-off value whose hidden part holds a
+        highlighted range gets its ellipsis highlighted instead
+    """
+    text = value.translate(SHOWN_AS)
+    if len(text) <= width:
+        return text.ljust(width), list(spans)
+    cut = width - 1
+    shown = [(start, min(end, cut)) for start, end in spans if start < cut]
+    if any(end > cut for _, end in spans):
+        shown.append((cut, width))
+    return text[:cut] + '…', shown
+
+
+class ResultPreview:
+    """
+    A modal window showing the rows of a ResultTable and a summary of the run.
+
+    Args:
+        parent: Window the preview belongs to
+        table: The filtered rows
+        summary: Totals, timings and offending characters of the run
+        title: Window title
+    """
+
+    def __init__(self, parent: tk.Misc, table: ResultTable, summary: str, title: str = "Special Characters Found"):
+        self.parent = parent
+        self.table = table
+        self.save_requested = False
+        self.first = 0  # View position of the top row
+        self.visible = 20
+        self.hits = np.empty(0, dtype=np.int64)
+        self.hit = -1  # Index into hits of the current match, -1 before the first step
+        self._search_key: Optional[Tuple] = None
+        self._sorting: Optional[Tuple[int, bool]] = None  # Sort being ranked on a worker thread
+
+        self.window = tk.Toplevel(parent)
+        self.window.title(title)
+        self.window.geometry("1100x620")
+        self.window.transient(parent)
+        self.window.protocol("WM_DELETE_WINDOW", self.discard)
+        self.font = tkfont.nametofont("TkFixedFont")
+        self.widths = self._column_widths()
+        self.gutter = max(len(f"{len(table):,}"), 1)
+        self._create_widgets(summary)
+        self.render()
+
+    def _column_widths(self) -> List[int]:
+        """Width of each column, from its heading and the first page of rows."""
+        widths = [len(name) + 2 for name in self.table.header]  # Room for the sort arrow
+        for _, fields in self.table.rows(0, PAGE_ROWS):
+            widths = [max(width, len(value)) for width, value in zip(widths, fields)]
+        return [min(max(width, MIN_CELL_WIDTH), MAX_CELL_WIDTH) for width in widths]
+
+    def _create_widgets(self, summary: str) -> None:
+        search_frame = ttk.Frame(self.window, padding=(10, 10, 10, 5))
+        search_frame.pack(fill=tk.X)
+        ttk.Label(search_frame, text="Search:").pack(side=tk.LEFT)
+        self.query_var = tk.StringVar()
+        self.query_entry = ttk.Entry(search_frame, textvariable=self.query_var, width=30)
+        self.query_entry.pack(side=tk.LEFT, padx=(5, 5))
+        self.query_entry.bind("<Return>", lambda event: self.find(1))
+        self.query_entry.bind("<Shift-Return>", lambda event: self.find(-1))
+        self.search_column_var = tk.StringVar(value=ALL_COLUMNS)
+        ttk.Combobox(
+            search_frame, textvariable=self.search_column_var, state='readonly', width=20,
+            values=[ALL_COLUMNS] + self.table.header
+        ).pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(search_frame, text="Find Next", command=lambda: self.find(1)).pack(side=tk.LEFT)
+        ttk.Button(search_frame, text="Find Previous", command=lambda: self.find(-1)).pack(side=tk.LEFT, padx=(5, 0))
+        self.match_var = tk.StringVar()
+        ttk.Label(search_frame, textvariable=self.match_var).pack(side=tk.LEFT, padx=(10, 0))
+
+        button_frame = ttk.Frame(self.window, padding=(10, 5, 10, 10))
+        button_frame.pack(side=tk.BOTTOM, fill=tk.X)
+        self.position_var = tk.StringVar()
+        ttk.Label(button_frame, textvariable=self.position_var).pack(side=tk.LEFT)
+        ttk.Button(button_frame, text="Discard", command=self.discard).pack(side=tk.RIGHT)
+        ttk.Button(button_frame, text="Save Results...", command=self.save).pack(side=tk.RIGHT, padx=(0, 5))
+
+        panes = ttk.PanedWindow(self.window, orient=tk.HORIZONTAL)
+        panes.pack(fill=tk.BOTH, expand=True, padx=10)
+
+        grid = ttk.Frame(panes)
+        grid.rowconfigure(1, weight=1)
+        grid.columnconfigure(0, weight=1)
+        self.heading = tk.Text(grid, height=1, wrap=tk.NONE, font=self.font, cursor='hand2', relief=tk.FLAT)
+        self.heading.grid(row=0, column=0, sticky='ew')
+        self.heading.bind("<Button-1>", self._on_heading_click)
+        self.body = tk.Text(grid, wrap=tk.NONE, font=self.font, relief=tk.FLAT)
+        self.body.grid(row=1, column=0, sticky='nsew')
+        self.vertical = ttk.Scrollbar(grid, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.vertical.grid(row=1, column=1, sticky='ns')
+        horizontal = ttk.Scrollbar(grid, orient=tk.HORIZONTAL, command=self._xview)
+        horizontal.grid(row=2, column=0, sticky='ew')
+        self.body.configure(xscrollcommand=horizontal.set)
+        self.heading.tag_configure('heading', font=(self.font.actual('family'), self.font.actual('size'), 'bold'))
+        self.body.tag_configure('match', background='#fff3b0')
+        self.body.tag_configure('hit', background='#ffd24d')
+        self.body.tag_configure('offending', background='#d9534f', foreground='white')
+        self.body.tag_raise('offending')
+        self.body.bind("<Configure>", self._on_resize)
+        self.body.bind("<Button-1>", lambda event: self.body.focus_set())
+        for widget in (self.body, self.heading):
+            widget.bind("<MouseWheel>", self._on_wheel)
+            widget.bind("<Button-4>", lambda event: self.scroll_to(self.first - WHEEL_ROWS) or 'break')
+            widget.bind("<Button-5>", lambda event: self.scroll_to(self.first + WHEEL_ROWS) or 'break')
+        for key, move in (("<Up>", -1), ("<Down>", 1)):
+            self.body.bind(key, lambda event, move=move: self.scroll_to(self.first + move) or 'break')
+        for key, pages in (("<Prior>", -1), ("<Next>", 1)):
+            self.body.bind(key, lambda event, pages=pages: self.scroll_to(self.first + pages * self.visible) or 'break')
+        self.body.bind("<Control-Home>", lambda event: self.scroll_to(0) or 'break')
+        self.body.bind("<Control-End>", lambda event: self.scroll_to(len(self.table)) or 'break')
+        panes.add(grid, weight=3)
+
+        summary_frame = ttk.Frame(panes)
+        summary_text = tk.Text(summary_frame, width=44, wrap=tk.WORD, relief=tk.FLAT)
+        summary_scroll = ttk.Scrollbar(summary_frame, orient=tk.VERTICAL, command=summary_text.yview)
+        summary_text.configure(yscrollcommand=summary_scroll.set)
+        summary_text.insert('1.0', summary)
+        summary_text.configure(state=tk.DISABLED)
+        summary_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        summary_text.pack(fill=tk.BOTH, expand=True)
+        panes.add(summary_frame, weight=1)
+
+    def show(self) -> bool:
+        """
+        Wait until the window is closed.
+
+        Returns:
+            bool: True if the user chose to save the results
+        """
+        self.window.grab_set()
+        self.query_entry.focus_set()
+        self.window.wait_window()
+        return self.save_requested
+
+    def save(self) -> None:
+        self.save_requested = True
+        self.window.destroy()
+
+    def discard(self) -> None:
+        self.window.destroy()
+
+    def _cell_starts(self) -> List[int]:
+        """Character offset of each column in a line of the grid."""
+        starts, offset = [], self.gutter + len(SEPARATOR)
+        for width in self.widths:
+            starts.append(offset)
+            offset += width + len(SEPARATOR)
+        return starts
+
+    def _heading_line(self) -> str:
+        cells = []
+        for column, (name, width) in enumerate(zip(self.table.header, self.widths)):
+            if column == self.table.sort_column:
+                name = f"{name} {'▼' if self.table.descending else '▲'}"
+            cells.append(format_cell(name, width)[0])
+        return '#'.rjust(self.gutter) + SEPARATOR + SEPARATOR.join(cells)
+
+    def render(self) -> None:
+        """Fill the grid with the rows from the current position down."""
+        rows = self.table.rows(self.first, self.first + self.visible)
+        lines, highlights = [], []
+        starts = self._cell_starts()
+        for line, (number, fields) in enumerate(rows, start=1):
+            cells = []
+            for column, (value, width) in enumerate(zip(fields, self.widths)):
+                text, spans = format_cell(value, width, self.table.spans(column, value))
+                cells.append(text)
+                highlights += [(line, starts[column] + start, starts[column] + end) for start, end in spans]
+            lines.append(f"{number + 1:>{self.gutter},}" + SEPARATOR + SEPARATOR.join(cells))
+
+        self.heading.configure(state=tk.NORMAL)
+        self.heading.delete('1.0', tk.END)
+        self.heading.insert('1.0', self._heading_line(), 'heading')
+        self.heading.configure(state=tk.DISABLED)
+
+        self.body.configure(state=tk.NORMAL)
+        self.body.delete('1.0', tk.END)
+        self.body.insert('1.0', '\n'.join(lines))
+        for line, start, end in highlights:
+            self.body.tag_add('offending', f"{line}.{start}", f"{line}.{end}")
+        # Search hits among the rows shown
+        low, high = np.searchsorted(self.hits, [self.first, self.first + len(rows)])
+        current = int(self.hits[self.hit]) if self.hit >= 0 else -1
+        for position in self.hits[low:high]:
+            line = int(position) - self.first + 1
+            self.body.tag_add('hit' if position == current else 'match', f"{line}.0", f"{line}.end")
+        self.body.configure(state=tk.DISABLED)
+        self.heading.xview_moveto(self.body.xview()[0])
+
+        total = len(self.table)
+        if total:
+            self.vertical.set(self.first / total, min(self.first + self.visible, total) / total)
+        column = self.table.sort_column
+        order = "file order" if column is None else f"sorted by {self.table.header[column]}"
+        if self._sorting is not None:
+            hint = f"sorting by {self.table.header[self._sorting[0]]}..."
+        else:
+            hint = "click a column heading to sort"
+        self.position_var.set(f"Rows {self.first + 1:,}-{self.first + len(rows):,} of {total:,} ({order}); {hint}")
+
+    def scroll_to(self, first: int) -> None:
+        """Show the rows from view position ``first`` on, keeping the last page full."""
+        first = max(0, min(first, len(self.table) - self.visible))
+        if first != self.first:
+            self.first = first
+            self.render()
+
+    def _on_scrollbar(self, action: str, amount: str, unit: Optional[str] = None) -> None:
+        if action == tk.MOVETO:
+            self.scroll_to(int(float(amount) * len(self.table)))
+        elif action == tk.SCROLL:
+            step = self.visible if unit == tk.PAGES else 1
+            self.scroll_to(self.first + int(amount) * step)
+
+    def _on_wheel(self, event: tk.Event) -> str:
+        # Windows reports multiples of 120 per notch, macOS small deltas
+        notches = -(event.delta // 120) or (-1 if event.delta > 0 else 1)
+        self.scroll_to(self.first + notches * WHEEL_ROWS)
+        # The Text widget would otherwise scroll its few lines itself
+        return 'break'
+
+    def _on_resize(self, event: tk.Event) -> None:
+        visible = max(1, event.height // self.font.metrics('linespace'))
+        if visible != self.visible:
+            self.visible = visible
+            self.first = max(0, min(self.first, len(self.table) - visible))
+            self.render()
+
+    def _xview(self, *args) -> None:
+        self.body.xview(*args)
+        self.heading.xview_moveto(self.body.xview()[0])
+
+    def _busy(self, work) -> bool:
+        """Run a slow step (a search through every column) under a busy cursor."""
+        self.window.configure(cursor='watch')
+        self.window.update_idletasks()
+        try:
+            work()
+            return True
+        except Exception as e:
+            messagebox.showerror("Error", f"Error reading the filtered rows:\n{str(e)}", parent=self.window)
+            return False
+        finally:
+            self.window.configure(cursor='')
+
+    def _on_heading_click(self, event: tk.Event) -> None:
+        offset = int(self.heading.index(f"@{event.x},{event.y}").split('.')[1])
+        starts = self._cell_starts()
+        column = next(
+            (index for index, start in enumerate(starts) if start - len(SEPARATOR) < offset < start + self.widths[index]),
+            None
+        )
+        if column is None or self._sorting is not None:
+            return
+        # Each click moves on: ascending, descending, back to file order
+        if column != self.table.sort_column:
+            sort = (column, False)
+        elif not self.table.descending:
+            sort = (column, True)
+        else:
+            sort = (None, False)
+        if self.table.has_sort_order(*sort):
+            self._show_sort(sort)
+        else:
+            self._rank_in_background(sort)
+
+    def _show_sort(self, sort: Tuple[Optional[int], bool]) -> None:
+        self.table.sort(*sort)
+        self.first = 0
+        self._refresh_search()
+        self.render()
+
+    def _rank_in_background(self, sort: Tuple[int, bool]) -> None:
+        """Rank a column on a worker thread, then show the sort if the window is still open."""
+        self._sorting = sort
+        self.window.configure(cursor='watch')
+        self.render()
+
+        def finished(then):
+            def callback(*args):
+                self._sorting = None
+                if self.window.winfo_exists():
+                    self.window.configure(cursor='')
+                    then(*args)
+            return callback
+
+        def failed(error: Exception) -> None:
+            self.render()
+            messagebox.showerror("Error", f"Error sorting the filtered rows:\n{str(error)}", parent=self.window)
+
+        # Polled from the parent, which outlives this window if it is closed first
+        BackgroundJob(
+            self.parent, lambda job: self.table.sort_order(*sort), 0, lambda snapshot: None,
+            finished(lambda order: self._show_sort(sort)), finished(failed), finished(self.render)
+        ).start()
+
+    def _search_columns(self) -> Optional[List[int]]:
+        name = self.search_column_var.get()
+        return None if name == ALL_COLUMNS else [self.table.header.index(name)]
+
+    def _refresh_search(self) -> None:
+        """Map the hits of the current query onto the current view."""
+        if self._search_key is not None:
+            query, columns = self._search_key[:2]
+            self.hits = self.table.find(query, columns)
+            self.hit = -1
+            self.match_var.set(f"{len(self.hits):,} matches")
+
+    def find(self, step: int) -> None:
+        """Move to the next (``step`` 1) or previous (-1) row containing the search text."""
+        query = self.query_var.get()
+        columns = self._search_columns()
+        if not query:
+            self._search_key = None
+            self.hits = np.empty(0, dtype=np.int64)
+            self.hit = -1
+            self.match_var.set("")
+            self.render()
+            return
+        key = (query, columns)
+        if key != self._search_key:
+            if not self._busy(lambda: setattr(self, 'hits', self.table.find(query, columns))):
+                return
+            self._search_key = key
+            self.hit = -1
+        if not len(self.hits):
+            self.match_var.set("No matches")
+            self.render()
+            return
+        if self.hit < 0:
+            # Start from the rows on screen
+            after = int(np.searchsorted(self.hits, self.first))
+            self.hit = after % len(self.hits) if step > 0 else (after - 1) % len(self.hits)
+        else:
+            self.hit = (self.hit + step) % len(self.hits)
+        position = int(self.hits[self.hit])
+        self.match_var.set(f"Match {self.hit + 1:,} of {len(self.hits):,}")
+        if self.first <= position < self.first + self.visible:
+            self.render()
+        else:
+            self.first = -1  # Force a render even if the position is unchanged
+            self.scroll_to(position - self.visible // 3)
@@ -0,0 +1,264 @@
+"""
+Per-stage timings, counters and optional profiles of a filter run.
+
+The engines split their work into stages and time each one with
+StageTimings.lap, which costs one clock read per chunk or block:
+
+    read    raw bytes pulled from the (decompressed) input
+    parse   pandas turning bytes into frames, excluding the reads it triggers
+    scan    finding offending characters: byte prescreens and column masks
+    filter  selecting the matching rows
+    write   handing the matching rows to the output writer
+
+Engines add extra stages where they do other work, e.g. ``count`` for the
+record count of the two-pass engine, ``report`` for the character report and
+``render`` for CSV text rendered in worker processes. Stages timed in worker
+processes are summed over the workers, so they can add up to more than the
+wall time of the run.
+
+capture_profile additionally records a cProfile profile and the peak memory
+traced by tracemalloc for the code run inside it.
+"""
+
+import cProfile
+import io
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple, Union
+
+from formats import sidecar_path
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Display order; other stages follow in the order they were first timed
+STAGES = ['read', 'parse', 'scan', 'filter', 'write']
+
+# Allocation sites listed in the tracemalloc part of a profile
+TOP_ALLOCATIONS = 25
+
+# (clock, nested read seconds) at the start of a lap
+Mark = Tuple[float, float]
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process and its finished children, in MB (None if unknown)."""
+    if resource is None:
+        return None
+    peak = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def stats_path_for(output_path: str) -> str:
+    """``out/a_filtered.csv.gz`` -> ``out/a_filtered_stats.json``."""
+    return sidecar_path(output_path, '_stats.json')
+
+
+def profile_prefix_for(output_path: str) -> str:
+    """``out/a_filtered.csv`` -> ``out/a_filtered_profile`` (see capture_profile)."""
+    return sidecar_path(output_path, '_profile')
+
+
+@dataclass
+class StageStats:
+    """Totals of one stage."""
+    seconds: float = 0.0
+    rows: int = 0
+    bytes: int = 0
+
+    def merge(self, other: 'StageStats') -> None:
+        self.seconds += other.seconds
+        self.rows += other.rows
+        self.bytes += other.bytes
+
+
+class TimedReader(io.RawIOBase):
+    """Binary reader that books the time and bytes of every read as the ``read`` stage."""
+
+    def __init__(self, handle: BinaryIO, timings: 'StageTimings'):
+        super().__init__()
+        self.handle = handle
+        self.timings = timings
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        start = time.perf_counter()
+        if hasattr(self.handle, 'readinto'):
+            count = self.handle.readinto(buffer)
+        else:
+            data = self.handle.read(len(buffer))
+            count = len(data)
+            buffer[:count] = data
+        self.timings.add_nested('read', time.perf_counter() - start, count or 0)
+        return count
+
+    def read(self, size: int = -1) -> bytes:
+        start = time.perf_counter()
+        data = self.handle.read(size)
+        self.timings.add_nested('read', time.perf_counter() - start, len(data))
+        return data
+
+    def tell(self) -> int:
+        return self.handle.tell()
+
+
+class StageTimings:
+    """
+    Time, rows and bytes per stage of one run, plus its wall time and peak memory.
+
+    Laps are meant to be taken from one thread. Time booked through a
+    TimedReader while a lap is running is left out of that lap, so ``parse``
+    does not count the reads pandas makes.
+    """
+
+    def __init__(self):
+        self.stages: Dict[str, StageStats] = {}
+        self.seconds = 0.0  # Wall time, set by finish
+        self.input_bytes = 0
+        self.output_bytes = 0
+        self.peak_rss_mb: Optional[float] = None
+        self.peak_traced_mb: Optional[float] = None  # Set when the run was profiled
+        self._started = time.perf_counter()
+        self._nested = 0.0
+
+    def add(self, stage: str, seconds: float = 0.0, rows: int = 0, nbytes: int = 0) -> None:
+        stats = self.stages.get(stage)
+        if stats is None:
+            stats = self.stages[stage] = StageStats()
+        stats.seconds += seconds
+        stats.rows += rows
+        stats.bytes += nbytes
+
+    def add_nested(self, stage: str, seconds: float, nbytes: int = 0) -> None:
+        """Book time spent inside another stage's lap, which then leaves it out."""
+        self.add(stage, seconds, nbytes=nbytes)
+        self._nested += seconds
+
+    def mark(self) -> Mark:
+        """Start a lap."""
+        return time.perf_counter(), self._nested
+
+    def lap(self, stage: str, since: Mark, rows: int = 0, nbytes: int = 0) -> Mark:
+        """
+        Book the time since ``since`` to ``stage`` and start the next lap.
+
+        Returns:
+            Mark: The start of the next lap
+        """
+        now = time.perf_counter()
+        nested = self._nested - since[1]
+        self.add(stage, max(now - since[0] - nested, 0.0), rows, nbytes)
+        return now, self._nested
+
+    def reader(self, handle: BinaryIO) -> io.BufferedReader:
+        """Wrap ``handle`` so its reads are booked as the ``read`` stage."""
+        return io.BufferedReader(TimedReader(handle, self))
+
+    def merge(self, other: 'StageTimings') -> None:
+        """Add the stages of ``other``, e.g. timed in a worker process."""
+        for name, stats in other.stages.items():
+            self.stages.setdefault(name, StageStats()).merge(stats)
+
+    def finish(self, input_path: Optional[str] = None, output_path: Optional[str] = None) -> 'StageTimings':
+        """Record the wall time, the peak RSS and the input and output sizes."""
+        self.seconds = time.perf_counter() - self._started
+        self.peak_rss_mb = peak_rss_mb()
+        if input_path is not None and os.path.exists(input_path):
+            self.input_bytes = os.path.getsize(input_path)
+        if output_path is not None and os.path.exists(output_path):
+            self.output_bytes = os.path.getsize(output_path)
+        return self
+
+    def ordered(self) -> List[Tuple[str, StageStats]]:
+        """Stages in STAGES order, then the others."""
+        names = [name for name in STAGES if name in self.stages]
+        names += [name for name in self.stages if name not in STAGES]
+        return [(name, self.stages[name]) for name in names]
+
+    def to_dict(self) -> Dict:
+        return {
+            'seconds': round(self.seconds, 6),
+            'input_bytes': self.input_bytes,
+            'output_bytes': self.output_bytes,
+            'peak_rss_mb': self.peak_rss_mb,
+            'peak_traced_mb': self.peak_traced_mb,
+            'stages': {
+                name: dict(asdict(stats), seconds=round(stats.seconds, 6)) for name, stats in self.ordered()
+            },
+        }
+
+    def describe(self) -> str:
+        """One line per stage, e.g. ``parse: 1.24s (38%), 1,000,000 rows``, for message boxes."""
+        total = sum(stats.seconds for stats in self.stages.values())
+        lines = []
+        for name, stats in self.ordered():
+            share = stats.seconds / total if total else 0.0
+            line = f"{name}: {stats.seconds:.2f}s ({share:.0%})"
+            if stats.rows:
+                line += f", {stats.rows:,} rows"
+            if stats.bytes:
+                line += f", {stats.bytes / (1024 * 1024):,.1f} MB"
+            lines.append(line)
+        if self.peak_rss_mb is not None:
+            lines.append(f"peak memory: {self.peak_rss_mb:,.0f} MB")
+        return '\n'.join(lines)
+
+
+class ProfileCapture:
+    """Files and peak memory of a capture_profile block, filled in when it exits."""
+
+    def __init__(self, prefix: str):
+        self.profile_path = prefix + '.prof'
+        self.memory_path = prefix + '_memory.txt'
+        self.peak_traced_mb: Optional[float] = None
+
+
+@contextmanager
+def capture_profile(target: Union[str, ProfileCapture]) -> Iterator[ProfileCapture]:
+    """
+    Profile the code run inside the block with cProfile and tracemalloc.
+
+    Writes ``<prefix>.prof`` (load it with ``pstats`` or snakeviz) and
+    ``<prefix>_memory.txt`` (the peak traced memory and the top allocation
+    sites still alive at the end). Only the calling thread is profiled;
+    worker processes are not.
+
+    Args:
+        target: The prefix, or a ProfileCapture made from it in advance
+
+    Yields:
+        ProfileCapture: The output paths and, after the block, the peak traced memory
+    """
+    capture = target if isinstance(target, ProfileCapture) else ProfileCapture(target)
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield capture
+    finally:
+        profiler.disable()
+        _, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot()
+        if not was_tracing:
+            tracemalloc.stop()
+        capture.peak_traced_mb = round(peak / (1024 * 1024), 1)
+        profiler.dump_stats(capture.profile_path)
+        with open(capture.memory_path, 'w', encoding='utf-8') as handle:
+            handle.write(f"Peak traced memory: {capture.peak_traced_mb} MB\n\n")
+            for statistic in snapshot.statistics('lineno')[:TOP_ALLOCATIONS]:
+                handle.write(f"{statistic}\n")
@@ -0,0 +1,360 @@
+"""
+Streaming transform that cleans the checked columns of a whole CSV file.
+
+Instead of selecting the rows with special characters, every row is written
+and the disallowed characters of the checked columns are rewritten:
+
+* ``transliterate`` - common letters and punctuation get an ASCII spelling
+  (é -> e, ß -> ss, “ -> "), anything else as in ``nfkd``;
+* ``nfkd`` - NFKD decomposition with combining marks dropped (é -> e,
+  ﬁ -> fi); characters still disallowed become the replacement;
+* ``replace`` - every disallowed character becomes the replacement;
+* ``delete`` - every disallowed character is removed.
+
+Characters are translated through a per-character table (filled for the
+common ranges up front and on demand for the rest) and whole cleaned values
+are memoised, so repeated values cost one dict lookup.
+
+sanitize_csv shares the byte-level fast path of byte_scan: blocks with only
+allowed ASCII are copied through untouched, and only records that contain
+offending bytes are parsed. Records whose checked columns change are written
+back with pandas' minimal quoting; every other record keeps its exact bytes.
+"""
+
+import io
+import threading
+import unicodedata
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from byte_blocks import block_is_clean, dirty_records, iter_record_blocks, record_starts, split_header
+from char_policy import DEFAULT_POLICY, CharPolicy
+from column_rules import Columns, ColumnSelection, select_columns
+from common import DEFAULT_REPLACEMENT, DEFAULT_SANITIZE_MODE, SANITIZE_MODES
+from csv_bytes import BLOCK_SIZE, RecordCounter
+from filter_engine import (
+    DEFAULT_CHUNKSIZE,
+    DEFAULT_COLUMNS,
+    READ_OPTIONS,
+    ProgressCallback,
+    check_cancelled,
+    read_header,
+)
+from formats import infer_output_format, open_input, open_output_stream, open_writer
+from projected_scan import RecordMismatch, starts_with_blank_line
+
+# Short names used by the callers of this module
+MODES = SANITIZE_MODES
+DEFAULT_MODE = DEFAULT_SANITIZE_MODE
+
+# Cleaned values remembered per Sanitizer before the memo is reset
+MEMO_SIZE = 65_536
+
+# Code points translated when a Sanitizer is built: ASCII, Latin-1, Latin
+# Extended-A/B and General Punctuation cover most real-world offenders
+PRECOMPUTED_RANGES = ((0x0000, 0x024F), (0x2000, 0x206F))
+
+# ASCII spellings for characters NFKD leaves alone
+TRANSLITERATIONS = {
+    'ß': 'ss', 'ẞ': 'SS', 'æ': 'ae', 'Æ': 'AE', 'œ': 'oe', 'Œ': 'OE',
+    'ø': 'o', 'Ø': 'O', 'ł': 'l', 'Ł': 'L', 'đ': 'd', 'Đ': 'D', 'ð': 'd', 'Ð': 'D',
+    'þ': 'th', 'Þ': 'Th', 'ı': 'i', 'ħ': 'h', 'Ħ': 'H',
+    '‘': "'", '’': "'", '‚': "'", '‛': "'", '′': "'", '‹': "'", '›': "'",
+    '“': '"', '”': '"', '„': '"', '‟': '"', '″': '"', '«': '"', '»': '"',
+    '‐': '-', '‑': '-', '‒': '-', '–': '-', '—': '-', '―': '-', '−': '-',
+    '⁄': '/', '•': '*', '·': '.', '×': 'x', '÷': '/',
+    '€': 'EUR', '£': 'GBP', '¥': 'JPY', '©': '(C)', '®': '(R)', '°': 'deg',
+    '\u200b': '', '\ufeff': '',  # Zero-width space and BOM
+}
+
+
+@dataclass
+class SanitizeStats:
+    """Totals of a sanitize run."""
+    total_rows: int = 0
+    changed_rows: int = 0
+    changed_cells: int = 0
+
+
+class _TranslationTable(dict):
+    """``str.translate`` table that fills in missing code points on first use."""
+
+    def __init__(self, translate_char):
+        super().__init__()
+        self._translate_char = translate_char
+
+    def __missing__(self, code_point: int) -> str:
+        result = self[code_point] = self._translate_char(chr(code_point))
+        return result
+
+
+class Sanitizer:
+    """
+    Rewrites the characters a policy does not allow.
+
+    Args:
+        mode: One of MODES
+        policy: Characters considered allowed; they are never changed
+        replacement: Inserted for characters with no allowed spelling
+            (ignored in ``delete`` mode)
+
+    Raises:
+        ValueError: If ``mode`` is unknown or ``replacement`` is not allowed by ``policy``
+    """
+
+    def __init__(self, mode: str = DEFAULT_MODE, policy: CharPolicy = DEFAULT_POLICY,
+                 replacement: str = DEFAULT_REPLACEMENT):
+        if mode not in MODES:
+            raise ValueError(f"Unknown sanitize mode: {mode!r} (choose from {', '.join(MODES)})")
+        if mode == 'delete':
+            replacement = ''
+        if not policy.is_clean(replacement):
+            raise ValueError(f"Replacement {replacement!r} is not allowed by the {policy.name} policy")
+        self.mode = mode
+        self.policy = policy
+        self.replacement = replacement
+        self._memo: Dict[str, str] = {}
+        self._table = _TranslationTable(self._translate_char)
+        for low, high in PRECOMPUTED_RANGES:
+            for code_point in range(low, high + 1):
+                self._table[code_point]  # Fills the entry
+        for char in TRANSLITERATIONS:
+            self._table[ord(char)]
+
+    def _spell(self, char: str) -> str:
+        """The TRANSLITERATIONS spelling of ``char`` if the policy allows it, else the replacement."""
+        spelling = TRANSLITERATIONS.get(char) if self.mode == 'transliterate' else None
+        if spelling is not None and self.policy.is_clean(spelling):
+            return spelling
+        return self.replacement
+
+    def _translate_char(self, char: str) -> str:
+        if self.policy.allows(char):
+            return char
+        if self.mode in ('replace', 'delete'):
+            return self.replacement
+        if self.mode == 'transliterate' and char in TRANSLITERATIONS:
+            return self._spell(char)
+        decomposed = unicodedata.normalize('NFKD', char)
+        if decomposed == char:
+            return self._spell(char)
+        # Drop the combining marks, then spell out whatever is still disallowed
+        return ''.join(
+            part if self.policy.allows(part) else self._spell(part)
+            for part in decomposed if not unicodedata.combining(part)
+        )
+
+    def clean(self, value: str) -> str:
+        """The value with every disallowed character rewritten."""
+        if self.policy.is_clean(value):
+            return value
+        result = self._memo.get(value)
+        if result is None:
+            if len(self._memo) >= MEMO_SIZE:
+                self._memo.clear()
+            result = self._memo[value] = value.translate(self._table)
+        return result
+
+    def clean_frame(self, frame: pd.DataFrame, columns: Iterable[str]) -> Tuple[pd.DataFrame, np.ndarray, int]:
+        """
+        Clean the given columns of a frame.
+
+        Returns:
+            Tuple[pd.DataFrame, np.ndarray, int]: The cleaned frame (``frame``
+            itself if nothing changed), a boolean array flagging the changed
+            rows, and the number of changed cells
+        """
+        changed_rows = np.zeros(len(frame), dtype=bool)
+        changed_cells = 0
+        updates = {}
+        for column in columns:
+            if column not in frame.columns:
+                continue
+            values = frame[column].astype(str)
+            # Vectorised search first; only the offending values are rewritten
+            positions = np.flatnonzero(values.str.contains(self.policy.pattern, na=False).to_numpy(dtype=bool))
+            if not len(positions):
+                continue
+            cleaned = values.to_numpy(dtype=object, copy=True)
+            for position in positions:
+                cleaned[position] = self.clean(cleaned[position])
+            changed = cleaned[positions] != values.to_numpy(dtype=object)[positions]
+            changed_rows[positions[changed]] = True
+            changed_cells += int(changed.sum())
+            updates[column] = cleaned
+        if not updates:
+            return frame, changed_rows, 0
+        return frame.assign(**updates), changed_rows, changed_cells
+
+
+# A Sanitizer and the columns it cleans, one per distinct column policy
+SanitizerGroups = List[Tuple[Sanitizer, List[str]]]
+
+
+def _sanitizer_groups(selection: ColumnSelection, sanitizer: Sanitizer) -> SanitizerGroups:
+    """Pair each policy of ``selection`` with a Sanitizer like ``sanitizer`` (reused where the policy matches)."""
+    return [
+        (sanitizer if policy == sanitizer.policy else Sanitizer(sanitizer.mode, policy, sanitizer.replacement), columns)
+        for policy, columns in selection.groups()
+    ]
+
+
+def _clean_groups(frame: pd.DataFrame, groups: SanitizerGroups) -> Tuple[pd.DataFrame, np.ndarray, int]:
+    """Clean every group of columns with its Sanitizer; returns as Sanitizer.clean_frame."""
+    changed_rows = np.zeros(len(frame), dtype=bool)
+    changed_cells = 0
+    for sanitizer, columns in groups:
+        frame, rows, cells = sanitizer.clean_frame(frame, columns)
+        changed_rows |= rows
+        changed_cells += cells
+    return frame, changed_rows, changed_cells
+
+
+def _sanitize_block(header: bytes, block: bytes, groups: SanitizerGroups, scan_policy: CharPolicy,
+                    stats: SanitizeStats, newline: str) -> bytes:
+    """
+    Rewrite the records of a dirty block whose checked columns change; keep the rest byte for byte.
+
+    Raises:
+        RecordMismatch: If pandas parsed a different number of rows than
+            there are dirty records
+    """
+    starts, dirty = dirty_records(block, scan_policy)
+    ends = np.append(starts[1:], len(block))
+    records = [block[starts[index]:ends[index]] for index in dirty]
+    # Blank records are kept as rows so rows and records stay aligned
+    frame = pd.read_csv(io.BytesIO(header + b''.join(records)), skip_blank_lines=False, **READ_OPTIONS)
+    if len(frame) != len(dirty):
+        raise RecordMismatch(f"{len(frame)} rows parsed from {len(dirty)} records")
+    cleaned, changed_rows, changed_cells = _clean_groups(frame, groups)
+    if not changed_cells:
+        return block
+    stats.changed_rows += int(changed_rows.sum())
+    stats.changed_cells += changed_cells
+
+    rendered = cleaned[changed_rows].to_csv(index=False, header=False, lineterminator=newline).encode('utf-8')
+    rendered_starts = np.append(record_starts(rendered), len(rendered))
+    pieces = []
+    position = 0
+    for number, row in enumerate(np.flatnonzero(changed_rows)):
+        index = dirty[row]
+        replacement = rendered[rendered_starts[number]:rendered_starts[number + 1]]
+        if block[ends[index] - 1:ends[index]] != b'\n':
+            replacement = replacement.rstrip(b'\r\n')  # The file's last record had no newline
+        pieces.append(block[position:starts[index]])
+        pieces.append(replacement)
+        position = ends[index]
+    pieces.append(block[position:])
+    return b''.join(pieces)
+
+
+def sanitize_csv(
+    input_path: str,
+    output_path: str,
+    columns: Columns = DEFAULT_COLUMNS,
+    mode: str = DEFAULT_MODE,
+    policy: CharPolicy = DEFAULT_POLICY,
+    replacement: str = DEFAULT_REPLACEMENT,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    progress: Optional[ProgressCallback] = None,
+    cancel_event: Optional[threading.Event] = None,
+    output_format: Optional[str] = None,
+    block_size: int = BLOCK_SIZE,
+) -> SanitizeStats:
+    """
+    Write a copy of a CSV file with the disallowed characters of ``columns`` rewritten.
+
+    Parquet/Feather outputs, files that start with a blank line and files
+    whose records pandas delimits differently from the byte-level scan go
+    through sanitize_csv_streaming instead.
+
+    Args:
+        input_path: Path to the CSV file (may be gzip/bz2/zstd compressed)
+        output_path: Path of the cleaned file
+        columns: Names of the columns to clean, or ColumnRules (each column
+            is cleaned to its own policy; the combination does not apply)
+        mode: One of MODES
+        policy: Characters considered allowed in columns without a policy of their own
+        replacement: Inserted for characters with no allowed spelling
+        chunksize: Rows per chunk for the streaming fallback
+        progress: Called after every block with rows and bytes processed so far
+        cancel_event: Set by another thread to stop between blocks
+        output_format: Output format; inferred from ``output_path`` when None
+        block_size: Approximate bytes examined at a time
+
+    Returns:
+        SanitizeStats: Rows in the file and the rows and cells that changed
+
+    Raises:
+        ProcessingCancelled: If ``cancel_event`` was set before the file was finished
+        ValueError: If ``mode`` or ``replacement`` is invalid
+    """
+    sanitizer = Sanitizer(mode, policy, replacement)
+    fallback = (
+        input_path, output_path, columns, mode, policy, replacement, chunksize, progress, cancel_event,
+        output_format, sanitizer
+    )
+    if infer_output_format(output_path, output_format) in ('parquet', 'feather') or starts_with_blank_line(input_path):
+        return sanitize_csv_streaming(*fallback)
+
+    selection = select_columns(read_header(input_path), columns, policy)
+    groups = _sanitizer_groups(selection, sanitizer)
+    stats = SanitizeStats()
+    counter = RecordCounter()
+    try:
+        with open_input(input_path) as (source, raw), open_output_stream(output_path, output_format) as output:
+            header, carry = split_header(source, block_size)
+            newline = '\r\n' if header.endswith(b'\r\n') else '\n'
+            output.write(header)
+            for block in iter_record_blocks(source, block_size, carry):
+                check_cancelled(cancel_event)
+                counter.feed(block)
+                if groups and not block_is_clean(block, selection.scan_policy):
+                    block = _sanitize_block(header, block, groups, selection.scan_policy, stats, newline)
+                output.write(block)
+                if progress is not None:
+                    progress(counter.records, raw.tell())
+    except (RecordMismatch, pd.errors.ParserError):
+        # Rows cannot be paired with records; rewrite the whole file from pandas' rows
+        return sanitize_csv_streaming(*fallback)
+    stats.total_rows = counter.finish()[0]
+    return stats
+
+
+def sanitize_csv_streaming(
+    input_path: str,
+    output_path: str,
+    columns: Columns = DEFAULT_COLUMNS,
+    mode: str = DEFAULT_MODE,
+    policy: CharPolicy = DEFAULT_POLICY,
+    replacement: str = DEFAULT_REPLACEMENT,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    progress: Optional[ProgressCallback] = None,
+    cancel_event: Optional[threading.Event] = None,
+    output_format: Optional[str] = None,
+    sanitizer: Optional[Sanitizer] = None,
+) -> SanitizeStats:
+    """
+    Sanitize a CSV file chunk by chunk, re-rendering every row with pandas.
+
+    Arguments are as for sanitize_csv; ``sanitizer`` reuses an existing one.
+    """
+    sanitizer = sanitizer or Sanitizer(mode, policy, replacement)
+    stats = SanitizeStats()
+    header = read_header(input_path)
+    groups = _sanitizer_groups(select_columns(header, columns, policy), sanitizer)
+    with open_input(input_path) as (source, raw), open_writer(output_path, header, output_format) as output, \
+            pd.read_csv(source, chunksize=chunksize, **READ_OPTIONS) as reader:
+        for chunk in reader:
+            check_cancelled(cancel_event)
+            cleaned, changed_rows, changed_cells = _clean_groups(chunk, groups)
+            stats.total_rows += len(chunk)
+            stats.changed_rows += int(changed_rows.sum())
+            stats.changed_cells += changed_cells
+            output.write(cleaned)
+            if progress is not None:
+                progress(stats.total_rows, raw.tell())
+    return stats
@@ -0,0 +1,414 @@
+"""
+Persistent on-disk cache of scan results.
+
+Each entry records the byte offsets of the matching records and the row
+totals of one file for one column set and character policy. A first scan is
+an ordinary run of the parallel (or two-pass) filter that also collects
+those offsets; later runs copy the cached records out of the file and parse
+only them. Entries are validated against a fingerprint of the file (path,
+size, mtime and hashes of its first bytes and of the bytes before the
+scanned end). When a file has only grown since it was scanned, just the
+appended tail is scanned and merged into the entry. The cache is bounded in
+size and evicts the least recently used entries first.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from dataclasses import asdict, dataclass, field
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from char_policy import DEFAULT_POLICY, CharPolicy
+from column_rules import Columns, select_columns
+from common import default_cache_dir
+from csv_bytes import count_dimensions, count_records_from, header_fields
+from filter_engine import (
+    DEFAULT_CHUNKSIZE,
+    DEFAULT_COLUMNS,
+    FilterStats,
+    ProgressCallback,
+    read_header,
+)
+from formats import is_compressed
+from parallel_scan import filter_csv_parallel
+from projected_scan import (
+    RecordMismatch,
+    filter_csv_projected,
+    find_matching_records,
+    split_progress,
+    write_matching_records,
+)
+
+if TYPE_CHECKING:
+    from offense_report import OffenseReport
+
+# Bump when the entry layout changes; older entries are then ignored
+CACHE_VERSION = 3
+
+# Default upper bound on the total size of the cache directory
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Bytes hashed at the start of the file and just before the scanned end
+FINGERPRINT_BYTES = 64 * 1024
+
+
+def _hash_range(path: str, start: int, end: int) -> str:
+    with open(path, 'rb') as handle:
+        handle.seek(start)
+        return hashlib.sha1(handle.read(max(end - start, 0))).hexdigest()
+
+
+def _ends_with_newline(path: str) -> bool:
+    # Files pandas parsed without error close their last quote, so a final
+    # newline puts the end on a record boundary
+    with open(path, 'rb') as handle:
+        handle.seek(0, os.SEEK_END)
+        if not handle.tell():
+            return False
+        handle.seek(-1, os.SEEK_END)
+        return handle.read(1) == b'\n'
+
+
+@dataclass
+class CacheEntry:
+    """What is known about one file after a scan."""
+    path: str
+    size: int
+    mtime_ns: int
+    head_length: int
+    head_sha1: str
+    # Record boundary up to which the file has been scanned, or None when the
+    # file did not end on a record boundary (so appends cannot be merged)
+    scanned_end: Optional[int]
+    tail_sha1: str
+    total_rows: int
+    column_count: int
+    columns: List[str] = field(default_factory=list)
+    policy: str = ''
+    version: int = CACHE_VERSION
+
+
+class ScanCache:
+    """
+    Cache of scan results and dimensions, stored as files in one directory.
+
+    ``last_status`` is set by every lookup to ``'hit'`` (nothing rescanned),
+    ``'incremental'`` (only appended data scanned) or ``'miss'``.
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory or default_cache_dir()
+        self.max_bytes = max_bytes
+        self.last_status = 'miss'
+        self._lock = threading.Lock()
+
+    # Public API
+
+    def filter_csv(
+        self,
+        input_path: str,
+        output_path: str,
+        columns: Columns = DEFAULT_COLUMNS,
+        chunksize: int = DEFAULT_CHUNKSIZE,
+        progress: Optional[ProgressCallback] = None,
+        cancel_event: Optional[threading.Event] = None,
+        policy: CharPolicy = DEFAULT_POLICY,
+        output_format: Optional[str] = None,
+        report: Optional['OffenseReport'] = None,
+        workers: int = 0,
+        two_pass: bool = False,
+    ) -> FilterStats:
+        """
+        Filter a CSV file, reusing cached matches where the file is unchanged.
+
+        Produces the same output as filter_engine.filter_csv_streaming. Only
+        the matching records are parsed when the cache is current. Compressed
+        files are not cached: byte offsets into them cannot be resumed from.
+        Neither are files whose quoting the byte-level record scan cannot
+        follow; they are filtered without the cache.
+
+        Args:
+            input_path: Path to the CSV file to filter
+            output_path: Path the matching rows are written to
+            columns: Names of the columns to check, or ColumnRules; the
+                resolved columns and their policies are part of the cache key
+            chunksize: Number of rows parsed per chunk
+            progress: Called after every chunk with rows and bytes processed so far
+            cancel_event: Set by another thread to stop the scan
+            policy: Characters considered allowed in columns without a policy of their own
+            output_format: Output format; inferred from ``output_path`` when None
+            report: Collects the offending characters of the matching rows;
+                filled in from the cached matches on a hit
+            workers: Worker processes for a full scan (0 uses every CPU)
+            two_pass: Scan with the two-pass filter of projected_scan instead
+
+        Returns:
+            FilterStats: Row totals for the whole file
+        """
+        arguments = (input_path, output_path, columns, chunksize, progress, cancel_event, policy, output_format, report)
+        self.last_status = 'miss'
+        if is_compressed(input_path):
+            return self._filter_uncached(arguments, workers, two_pass)
+
+        before = os.stat(input_path)
+        header = read_header(input_path)
+        selection = select_columns(header, columns, policy)
+        key = self._key(input_path, 'scan', selection.key)
+        entry, offsets = self._load(key)
+        start, status = self._resume_point(input_path, entry)
+
+        if status == 'miss' and not two_pass:
+            # A full scan is a parallel run that also collects where the matches are
+            found = []
+            stats = self._filter_uncached(arguments, workers, two_pass, found)
+            if all(part is not None for part in found):
+                offsets = np.concatenate([np.empty(0, dtype=np.int64)] + found)
+                self._remember(
+                    input_path, key, before, _ends_with_newline(input_path), offsets,
+                    total_rows=stats.total_rows, column_count=len(header),
+                    columns=selection.columns, policy=selection.policy_key,
+                )
+            return stats
+
+        stats = FilterStats()
+        timings = stats.timings
+        first_pass, second_pass = split_progress(progress, os.path.getsize(input_path))
+        if status == 'miss':
+            entry, offsets = None, np.empty(0, dtype=np.int64)
+        try:
+            if status == 'hit':
+                total_rows = entry.total_rows
+            else:
+                if selection.columns:
+                    new_offsets, records, clean_end = find_matching_records(
+                        input_path, selection, first_pass, cancel_event, start, timings=timings
+                    )
+                else:
+                    mark = timings.mark()
+                    new_offsets = np.empty(0, dtype=np.int64)
+                    records, clean_end = count_records_from(input_path, start, cancel_event=cancel_event)
+                    # Counted from the start of the file, the header is a record too
+                    records -= 0 if start else 1
+                    timings.lap('count', mark, rows=records)
+                offsets = np.concatenate([offsets, new_offsets])
+                total_rows = (entry.total_rows if entry else 0) + records
+                self._remember(
+                    input_path, key, before, clean_end, offsets,
+                    total_rows=total_rows, column_count=len(header),
+                    columns=selection.columns, policy=selection.policy_key,
+                )
+            stats.matching_rows = write_matching_records(
+                input_path, output_path, offsets, chunksize, second_pass, cancel_event, output_format,
+                report, selection, timings=timings
+            )
+        except (RecordMismatch, pd.errors.ParserError):
+            # Stray quotes inside unquoted fields: offsets cannot be trusted
+            self.last_status = 'miss'
+            return self._filter_uncached(arguments, workers, two_pass)
+
+        self.last_status = status
+        stats.total_rows = total_rows
+        stats.memo = selection.memo_stats()
+        timings.finish(input_path, output_path)
+        return stats
+
+    def _filter_uncached(
+        self,
+        arguments: Tuple,
+        workers: int,
+        two_pass: bool,
+        record_offsets: Optional[List[Optional[np.ndarray]]] = None,
+    ) -> FilterStats:
+        """Run the filter the cache stands in for, with filter_csv's positional ``arguments``."""
+        if two_pass:
+            return filter_csv_projected(*arguments)
+        input_path, output_path, columns, chunksize, progress, cancel_event, policy, output_format, report = arguments
+        return filter_csv_parallel(
+            input_path, output_path, columns, workers, chunksize,
+            progress=progress, cancel_event=cancel_event, policy=policy, output_format=output_format,
+            report=report, record_offsets=record_offsets
+        )
+
+    def _remember(
+        self, path: str, key: str, before: os.stat_result, clean_end: bool, offsets: np.ndarray, **values
+    ) -> None:
+        """Store the scan results of ``path``, unless it changed while it was being scanned."""
+        entry = self._make_entry(path, before, clean_end, **values)
+        if entry is not None:
+            self._store(key, entry, offsets)
+            self._store_dimensions(path, entry)
+
+    def count_dimensions(
+        self,
+        path: str,
+        progress: Optional[ProgressCallback] = None,
+        cancel_event: Optional[threading.Event] = None,
+    ) -> Tuple[int, int]:
+        """
+        Count the data rows and columns of a CSV file, reusing cached counts.
+
+        Args:
+            path: Path to the CSV file
+            progress: Called after every block counted
+            cancel_event: Set by another thread to stop counting
+
+        Returns:
+            Tuple[int, int]: ``(rows, columns)``, as csv_bytes.count_dimensions
+        """
+        if is_compressed(path):
+            self.last_status = 'miss'
+            return count_dimensions(path, progress, cancel_event)
+        before = os.stat(path)
+        key = self._key(path, 'dimensions')
+        entry, _ = self._load(key)
+        start, status = self._resume_point(path, entry)
+        self.last_status = status
+        if status == 'hit':
+            return entry.total_rows, entry.column_count
+
+        column_count = len(header_fields(path))
+        records, clean_end = count_records_from(path, start, progress, cancel_event)
+        previous_rows = entry.total_rows if status == 'incremental' else 0
+        total_rows = max(previous_rows + records - (0 if start else 1), 0)
+        entry = self._make_entry(path, before, clean_end, total_rows=total_rows, column_count=column_count)
+        if entry is not None:
+            self._store(key, entry)
+        return total_rows, column_count
+
+    def clear(self) -> None:
+        """Delete every cache file."""
+        for name in self._cache_files():
+            self._remove(os.path.join(self.directory, name))
+
+    # Validation
+
+    def _resume_point(self, path: str, entry: Optional[CacheEntry]) -> Tuple[int, str]:
+        """
+        Decide how much of ``path`` must be scanned given its cached entry.
+
+        Returns:
+            Tuple[int, str]: Offset to scan from and the cache status
+        """
+        if entry is None:
+            return 0, 'miss'
+        stat = os.stat(path)
+        if stat.st_size < entry.size or _hash_range(path, 0, entry.head_length) != entry.head_sha1:
+            return 0, 'miss'
+        if stat.st_size == entry.size and stat.st_mtime_ns == entry.mtime_ns:
+            return entry.size, 'hit'
+        # Anything other than a pure append means a full rescan
+        if entry.scanned_end is None or stat.st_size == entry.size:
+            return 0, 'miss'
+        tail_start = max(entry.scanned_end - FINGERPRINT_BYTES, 0)
+        if _hash_range(path, tail_start, entry.scanned_end) != entry.tail_sha1:
+            return 0, 'miss'
+        return entry.scanned_end, 'incremental'
+
+    def _make_entry(self, path: str, before: os.stat_result, clean_end: bool, **values) -> Optional[CacheEntry]:
+        """
+        Fingerprint ``path`` after a scan.
+
+        Returns None if the file changed while it was being scanned, since
+        the results may then cover only part of it.
+        """
+        stat = os.stat(path)
+        if (stat.st_size, stat.st_mtime_ns) != (before.st_size, before.st_mtime_ns):
+            return None
+        head_length = min(stat.st_size, FINGERPRINT_BYTES)
+        scanned_end = stat.st_size if clean_end else None
+        tail_end = scanned_end if scanned_end is not None else stat.st_size
+        return CacheEntry(
+            path=os.path.abspath(path),
+            size=stat.st_size,
+            mtime_ns=stat.st_mtime_ns,
+            head_length=head_length,
+            head_sha1=_hash_range(path, 0, head_length),
+            scanned_end=scanned_end,
+            tail_sha1=_hash_range(path, max(tail_end - FINGERPRINT_BYTES, 0), tail_end),
+            **values,
+        )
+
+    # Storage
+
+    def _key(self, path: str, *parts: str) -> str:
+        digest = hashlib.sha1(os.path.abspath(path).encode('utf-8'))
+        for part in parts:
+            digest.update(b'\0' + part.encode('utf-8'))
+        return digest.hexdigest()
+
+    def _load(self, key: str) -> Tuple[Optional[CacheEntry], np.ndarray]:
+        meta_path = os.path.join(self.directory, f"{key}.json")
+        offsets_path = os.path.join(self.directory, f"{key}.npy")
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as handle:
+                entry = CacheEntry(**json.load(handle))
+            offsets = np.load(offsets_path) if os.path.exists(offsets_path) else np.empty(0, dtype=np.int64)
+        except (OSError, ValueError, TypeError):
+            return None, np.empty(0, dtype=np.int64)
+        if entry.version != CACHE_VERSION:
+            return None, np.empty(0, dtype=np.int64)
+        # Mark as recently used for LRU eviction
+        for used_path in (meta_path, offsets_path):
+            if os.path.exists(used_path):
+                os.utime(used_path)
+        return entry, offsets
+
+    def _store(self, key: str, entry: CacheEntry, offsets: Optional[np.ndarray] = None) -> None:
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            if offsets is not None:
+                self._atomic_write(f"{key}.npy", lambda handle: np.save(handle, offsets.astype(np.int64)))
+            self._atomic_write(
+                f"{key}.json", lambda handle: handle.write(json.dumps(asdict(entry)).encode('utf-8'))
+            )
+            self._evict()
+
+    def _store_dimensions(self, path: str, entry: CacheEntry) -> None:
+        """A full or incremental scan also refreshes the dimension entry for free."""
+        dimensions = CacheEntry(**dict(asdict(entry), columns=[]))
+        self._store(self._key(path, 'dimensions'), dimensions)
+
+    def _atomic_write(self, name: str, write) -> None:
+        target = os.path.join(self.directory, name)
+        temp_path = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'wb') as handle:
+            write(handle)
+        os.replace(temp_path, target)
+
+    def _cache_files(self) -> List[str]:
+        try:
+            return [name for name in os.listdir(self.directory) if name.endswith(('.json', '.npy'))]
+        except OSError:
+            return []
+
+    def _evict(self) -> None:
+        """Delete least recently used entries until the directory fits in ``max_bytes``."""
+        entries = {}
+        for name in self._cache_files():
+            file_path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                continue
+            key = os.path.splitext(name)[0]
+            size, used = entries.get(key, (0, 0.0))
+            entries[key] = (size + stat.st_size, max(used, stat.st_mtime))
+
+        total = sum(size for size, _ in entries.values())
+        for key, (size, _) in sorted(entries.items(), key=lambda item: item[1][1]):
+            if total <= self.max_bytes:
+                break
+            for extension in ('.json', '.npy'):
+                self._remove(os.path.join(self.directory, key + extension))
+            total -= size
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Tests for the worker-thread job runner used by the GUI.
+"""
+
+import os
+import sys
+import threading
+import time
+
+# Add the main module to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from background import BackgroundJob, ProgressSnapshot, format_duration
+from filter_engine import filter_csv_streaming
+
+
+class FakeRoot:
+    """Stands in for tk.Tk: runs ``after`` callbacks from a simple loop."""
+
+    def __init__(self):
+        self.callbacks = []
+
+    def after(self, delay_ms, callback):
+        self.callbacks.append(callback)
+
+    def run_until_idle(self, timeout: float = 10.0):
+        deadline = time.monotonic() + timeout
+        while self.callbacks and time.monotonic() < deadline:
+            self.callbacks.pop(0)()
+            time.sleep(0.005)
+
+
+def run_job(target, total_bytes: int = 100):
+    root = FakeRoot()
+    events = []
+    job = BackgroundJob(
+        root, target, total_bytes,
+        on_progress=lambda snapshot: events.append(('progress', snapshot)),
+        on_done=lambda result: events.append(('done', result)),
+        on_error=lambda error: events.append(('error', error)),
+        on_cancelled=lambda: events.append(('cancelled', None)),
+    )
+    job.start()
+    return job, root, events
+
+
+def test_progress_and_result_are_delivered(tmp_path):
+    input_path = tmp_path / "input.csv"
+    input_path.write_text("Title,Developer\n" + "Café,x\nok,y\n" * 50, encoding='utf-8')
+
+    job, root, events = run_job(
+        lambda job: filter_csv_streaming(
+            str(input_path), str(tmp_path / "out.csv"), chunksize=10,
+            progress=job.report_progress, cancel_event=job.cancel_event
+        ),
+        total_bytes=os.path.getsize(input_path)
+    )
+    root.run_until_idle()
+
+    kinds = [kind for kind, _ in events]
+    assert kinds[-1] == 'done'
+    assert 'progress' in kinds
+    assert events[-1][1].matching_rows == 50
+    last_progress = [payload for kind, payload in events if kind == 'progress'][-1]
+    assert last_progress.rows == 100
+    assert last_progress.fraction == 1.0
+
+
+def test_cancel_stops_the_job(tmp_path):
+    input_path = tmp_path / "input.csv"
+    input_path.write_text("Title,Developer\n" + "Café,x\n" * 1000, encoding='utf-8')
+    started = threading.Event()
+
+    def progress(job, rows, bytes_done):
+        started.set()
+        job.cancel_event.wait(5)  # Hold the worker until cancel is requested
+        job.report_progress(rows, bytes_done)
+
+    job, root, events = run_job(
+        lambda job: filter_csv_streaming(
+            str(input_path), str(tmp_path / "out.csv"), chunksize=10,
+            progress=lambda rows, done: progress(job, rows, done), cancel_event=job.cancel_event
+        )
+    )
+    assert started.wait(5)
+    job.cancel()
+    root.run_until_idle()
+
+    assert events[-1][0] == 'cancelled'
+
+
+def test_errors_are_reported():
+    def fail(job):
+        raise ValueError("boom")
+
+    job, root, events = run_job(fail)
+    root.run_until_idle()
+
+    assert events[-1][0] == 'error'
+    assert str(events[-1][1]) == "boom"
+
+
+def test_snapshot_rate_and_eta():
+    snapshot = ProgressSnapshot(rows=1000, bytes_done=25, total_bytes=100, elapsed=2.0)
+    assert snapshot.rows_per_second == 500
+    assert snapshot.eta_seconds == 6.0
+    assert format_duration(snapshot.eta_seconds) == "0:06"
+    assert format_duration(3725) == "1:02:05"
+    assert "ETA 0:06" in snapshot.describe()
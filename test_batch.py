@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Tests for the multi-file batch scheduler.
+"""
+
+import json
+import os
+import sys
+
+# Add the main module to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from batch import JOURNAL_NAME, REPORT_NAME, discover_inputs, plan_batch, run_batch
+from filter_engine import filter_csv_streaming
+from test_parallel_scan import write_quoted_sample
+
+
+def make_drop(root) -> None:
+    """A small nightly drop: files of different sizes, nested, plus one without the required columns."""
+    (root / "sub").mkdir(parents=True)
+    write_quoted_sample(root / "large.csv", rows=600)
+    write_quoted_sample(root / "sub" / "large.csv", rows=200)
+    (root / "small.csv").write_text("Title,Developer\nCafé,Studio\nPlain,Studio\n", encoding='utf-8')
+    (root / "sub" / "wrong.csv").write_text("Name,Price\nfoo,1\n", encoding='utf-8')
+    (root / "notes.txt").write_text("not a csv", encoding='utf-8')
+
+
+def test_plan_orders_largest_first_and_mirrors_layout(tmp_path):
+    make_drop(tmp_path / "in")
+    items = plan_batch(discover_inputs(str(tmp_path / "in")), str(tmp_path / "out"))
+
+    assert [item.size for item in items] == sorted((item.size for item in items), reverse=True)
+    outputs = {os.path.relpath(item.output, tmp_path / "out") for item in items}
+    assert outputs == {
+        "large_filtered.csv", os.path.join("sub", "large_filtered.csv"),
+        "small_filtered.csv", os.path.join("sub", "wrong_filtered.csv"),
+    }
+
+
+def test_batch_report_and_failures(tmp_path):
+    make_drop(tmp_path / "in")
+    report = run_batch(str(tmp_path / "in"), str(tmp_path / "out"), workers=2)
+
+    totals = report['totals']
+    assert (totals['files'], totals['succeeded'], totals['failed']) == (4, 3, 1)
+    by_name = {os.path.relpath(entry['input'], tmp_path / "in"): entry for entry in report['files']}
+    assert "Missing required columns" in by_name[os.path.join("sub", "wrong.csv")]['error']
+    assert by_name["small.csv"]['matching_rows'] == 1
+    assert all(entry['bytes_per_second'] > 0 for entry in report['files'] if entry['error'] is None)
+    assert json.loads((tmp_path / "out" / REPORT_NAME).read_text()) == report
+
+    # Each output is what the single-file filter produces
+    expected = tmp_path / "expected.csv"
+    stats = filter_csv_streaming(str(tmp_path / "in" / "large.csv"), str(expected))
+    assert by_name["large.csv"]['total_rows'] == stats.total_rows
+    assert (tmp_path / "out" / "large_filtered.csv").read_bytes() == expected.read_bytes()
+
+
+def test_resume_skips_finished_files(tmp_path):
+    make_drop(tmp_path / "in")
+    out = tmp_path / "out"
+    run_batch(str(tmp_path / "in"), str(out), workers=1)
+
+    # Simulate a batch killed before "small.csv" was journaled
+    journal = out / JOURNAL_NAME
+    lines = [line for line in journal.read_text().splitlines() if 'small.csv' not in line]
+    journal.write_text('\n'.join(lines) + '\n{"input": "cut sh')
+    (out / "small_filtered.csv").unlink()
+
+    report = run_batch(str(tmp_path / "in"), str(out), workers=1)
+    fresh = [entry for entry in report['files'] if not entry['resumed']]
+    # The unfinished file and the failed one are redone; the rest are skipped
+    assert sorted(os.path.basename(entry['input']) for entry in fresh) == ["small.csv", "wrong.csv"]
+    assert (out / "small_filtered.csv").exists()
+    assert report['totals']['matching_rows'] > 0
+
+
+def test_resume_redoes_changed_outputs_and_selections(tmp_path):
+    make_drop(tmp_path / "in")
+    out = tmp_path / "out"
+    run_batch(str(tmp_path / "in"), str(out), workers=1)
+
+    # An output edited since it was journaled is written again
+    with open(out / "small_filtered.csv", 'a', encoding='utf-8') as handle:
+        handle.write("tampered,row\n")
+    report = run_batch(str(tmp_path / "in"), str(out), workers=1)
+    fresh = [entry for entry in report['files'] if not entry['resumed']]
+    assert sorted(os.path.basename(entry['input']) for entry in fresh) == ["small.csv", "wrong.csv"]
+    assert "tampered" not in (out / "small_filtered.csv").read_text(encoding='utf-8')
+
+    # So is every file when other columns are selected
+    report = run_batch(str(tmp_path / "in"), str(out), columns=['Title'], workers=1)
+    assert not any(entry['resumed'] for entry in report['files'])
+
+
+def test_manifest_input(tmp_path):
+    make_drop(tmp_path / "in")
+    manifest = tmp_path / "manifest.txt"
+    manifest.write_text("# nightly\nin/small.csv\n\nin/small.csv\nin/missing.csv\n", encoding='utf-8')
+
+    report = run_batch(str(manifest), str(tmp_path / "out"), workers=1)
+    assert report['totals']['files'] == 2
+    assert report['totals']['failed'] == 1
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Tests for the byte-level filter that skips clean ASCII blocks.
+"""
+
+import io
+import os
+import random
+import sys
+
+# Add the main module to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from byte_blocks import iter_record_blocks, record_starts
+from byte_scan import block_is_clean, filter_csv_bytes
+from char_policy import DEFAULT_POLICY, latin1_printable, parse_policy
+from filter_engine import filter_csv_streaming
+from test_projected_scan import TRICKY_CSV
+
+
+def assert_same_as_streaming(tmp_path, text: str, columns=('Title', 'Developer'), policy=DEFAULT_POLICY,
+                             block_size: int = 16):
+    input_path = tmp_path / "input.csv"
+    input_path.write_bytes(text.encode('utf-8'))
+
+    expected = filter_csv_streaming(
+        str(input_path), str(tmp_path / "streaming.csv"), list(columns), chunksize=2, policy=policy
+    )
+    actual = filter_csv_bytes(
+        str(input_path), str(tmp_path / "bytes.csv"), list(columns), policy=policy, block_size=block_size
+    )
+
+    assert actual == expected
+    assert (tmp_path / "bytes.csv").read_bytes() == (tmp_path / "streaming.csv").read_bytes()
+    return actual
+
+
+def test_block_checks():
+    assert block_is_clean(b'a,b\n"c,d",e\n')
+    assert not block_is_clean('Café\n'.encode('utf-8'))
+    assert not block_is_clean(b'bell\x07\n')
+    assert record_starts(b'a,b\n"x\ny",z\n\nq').tolist() == [0, 4, 12, 13]
+    # Only a quote at the start of a field opens a quoted field
+    assert record_starts(b'27" a,b\nc,"d""\n"\ne,f "g\nh').tolist() == [0, 8, 17, 24]
+
+
+def test_output_matches_streaming_filter(tmp_path):
+    for block_size in (1, 16, 1 << 20):
+        stats = assert_same_as_streaming(tmp_path, TRICKY_CSV, block_size=block_size)
+        assert (stats.total_rows, stats.matching_rows) == (5, 2)
+    assert_same_as_streaming(tmp_path, TRICKY_CSV.replace('\n', '\r\n'))
+    assert_same_as_streaming(tmp_path, TRICKY_CSV.rstrip('\n'))
+    assert_same_as_streaming(tmp_path, '\n' + TRICKY_CSV)
+    assert_same_as_streaming(tmp_path, TRICKY_CSV, columns=('Notes',))
+    assert_same_as_streaming(tmp_path, TRICKY_CSV, columns=('Publisher',))
+    assert_same_as_streaming(tmp_path, 'Title,Developer\n')
+
+
+def test_policies(tmp_path):
+    stats = assert_same_as_streaming(tmp_path, TRICKY_CSV, policy=latin1_printable())
+    assert stats.matching_rows == 0
+    # A policy that rejects spaces flags ASCII-only records too
+    no_spaces = parse_policy('ascii', deny=' ')
+    assert assert_same_as_streaming(tmp_path, TRICKY_CSV, policy=no_spaces).matching_rows == 3
+
+
+def test_random_files_match_streaming(tmp_path):
+    rng = random.Random(3)
+    pieces = ['plain', 'x y', 'Café', '😀', '"q, ""r"""', '"multi\nline"', '', ' ', '\x07', 'Ünï']
+    for _ in range(30):
+        lines = ['Title,Notes,Developer']
+        for _ in range(rng.randrange(0, 40)):
+            if rng.random() < 0.1:
+                lines.append(rng.choice(['', '  ']))
+            else:
+                lines.append(','.join(rng.choice(pieces) for _ in range(3)))
+        text = '\n'.join(lines) + rng.choice(['', '\n'])
+        assert_same_as_streaming(tmp_path, text, block_size=rng.choice([1, 8, 64, 4096]))
+
+
+def test_stray_quote_in_unquoted_field(tmp_path):
+    rows = ['Café {},x'.format(index) if index % 1000 == 0 else 'row {},x'.format(index) for index in range(20000)]
+    data = ('Title,Developer\n27" Monitor,Acme\n' + '\n'.join(rows) + '\n').encode('utf-8')
+    input_path = tmp_path / "input.csv"
+    input_path.write_bytes(data)
+
+    expected = filter_csv_streaming(str(input_path), str(tmp_path / "streaming.csv"), ['Title'])
+    actual = filter_csv_bytes(str(input_path), str(tmp_path / "bytes.csv"), ['Title'], block_size=4096)
+    assert actual == expected
+    assert (actual.total_rows, actual.matching_rows) == (20001, 20)
+    assert (tmp_path / "bytes.csv").read_bytes() == (tmp_path / "streaming.csv").read_bytes()
+
+    # The quote does not make the rest of the file one record
+    blocks = list(iter_record_blocks(io.BytesIO(data), 4096))
+    assert max(map(len, blocks)) < 4096 + 32
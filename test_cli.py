@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Tests for the headless command-line entry point.
+"""
+
+import json
+import os
+import sys
+
+# Add the main module to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import cli
+
+
+def write_inputs(directory):
+    (directory / "games.csv").write_text(
+        "Title,Developer,Price\nCafé Adventure,Studio,9.99\nPlain,Studio,1.00\n", encoding='utf-8'
+    )
+    (directory / "other.csv").write_text("Name,Value\nx,1\n", encoding='utf-8')
+
+
+def read_json_lines(output: str):
+    return [json.loads(line) for line in output.splitlines()]
+
+
+def test_filter_glob_reports_each_file(tmp_path, capsys):
+    write_inputs(tmp_path)
+    output_dir = tmp_path / "out"
+
+    status = cli.main(['filter', str(tmp_path / "*.csv"), '--output-dir', str(output_dir), '--jobs', '1'])
+
+    games, other = read_json_lines(capsys.readouterr().out)
+    assert status == 1
+    assert (games['total_rows'], games['matching_rows']) == (2, 1)
+    assert (output_dir / "games_filtered.csv").read_text(encoding='utf-8') == (
+        "Title,Developer,Price\nCafé Adventure,Studio,9.99\n"
+    )
+    assert 'Missing required columns' in other['error']
+
+
+def test_filter_custom_columns_and_output(tmp_path, capsys):
+    write_inputs(tmp_path)
+    output = tmp_path / "result.csv"
+
+    status = cli.main(['filter', str(tmp_path / "other.csv"), '-o', str(output), '-c', 'Name', '-j', '1'])
+
+    (result,) = read_json_lines(capsys.readouterr().out)
+    assert status == 0
+    assert result['matching_rows'] == 0
+    assert output.read_text(encoding='utf-8') == "Name,Value\n"
+
+
+def test_dimensions(tmp_path, capsys):
+    write_inputs(tmp_path)
+
+    status = cli.main(['dimensions', str(tmp_path / "games.csv")])
+
+    (result,) = read_json_lines(capsys.readouterr().out)
+    assert status == 0
+    assert (result['rows'], result['columns']) == (2, 3)
+
+
+def test_two_pass_matches_default_output(tmp_path, capsys):
+    write_inputs(tmp_path)
+    games = str(tmp_path / "games.csv")
+
+    cli.main(['filter', games, '-o', str(tmp_path / "default.csv"), '-j', '1'])
+    cli.main(['filter', games, '-o', str(tmp_path / "two_pass.csv"), '--two-pass'])
+
+    default, two_pass = read_json_lines(capsys.readouterr().out)
+    assert two_pass['matching_rows'] == default['matching_rows'] == 1
+    assert (tmp_path / "two_pass.csv").read_bytes() == (tmp_path / "default.csv").read_bytes()
+
+
+def test_batch_prints_files_then_totals(tmp_path, capsys):
+    write_inputs(tmp_path)
+    output_dir = tmp_path / "out"
+
+    status = cli.main(['batch', str(tmp_path), '--output-dir', str(output_dir), '--jobs', '1'])
+
+    *files, totals = read_json_lines(capsys.readouterr().out)
+    assert status == 1
+    assert sorted(os.path.basename(entry['input']) for entry in files) == ["games.csv", "other.csv"]
+    assert (totals['files'], totals['failed'], totals['matching_rows']) == (2, 1, 1)
+    assert os.path.exists(totals['report'])
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Tests for column selection by name, index and pattern with per-column policies.
+"""
+
+import json
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+# Add the main module to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import cli
+from byte_scan import filter_csv_bytes
+from char_policy import DEFAULT_POLICY, latin1_printable
+from column_rules import ColumnRules, ColumnSelection, parse_rule, parse_rules, require_columns, split_specs
+from filter_engine import READ_OPTIONS, build_special_char_mask, filter_csv_streaming
+from parallel_scan import filter_csv_parallel
+from projected_scan import filter_csv_projected
+from sanitize import sanitize_csv
+from scan_cache import ScanCache
+
+CSV = (
+    "id,name_en,name_fr,desc\n"
+    "1,Plain,Plain,ok\n"
+    "2,Plain,Café,ok\n"
+    "3,Café,Café,ok\n"
+    "4,Plain,Plain,naïve™\n"
+    "5,Œuvre,Plain,ok\n"
+)
+
+
+def expected_ids(rules, policy=DEFAULT_POLICY):
+    """Row ids selected by a plain Python evaluation of ``rules``."""
+    frame = pd.DataFrame([line.split(',') for line in CSV.splitlines()[1:]], columns=CSV.splitlines()[0].split(','))
+    selection = rules.resolve(frame.columns.tolist(), policy)
+    ids = []
+    for _, row in frame.iterrows():
+        flags = [not column_policy.is_clean(row[column]) for column, column_policy in selection.policies.items()]
+        if flags and (any(flags) if rules.combine == 'any' else all(flags)):
+            ids.append(row['id'])
+    return ids
+
+
+def run_engines(tmp_path, columns):
+    """Run every engine with ``columns``; return {name: matching ids}."""
+    input_path = tmp_path / "input.csv"
+    input_path.write_text(CSV, encoding='utf-8')
+    engines = {
+        'streaming': lambda out: filter_csv_streaming(str(input_path), out, columns),
+        'bytes': lambda out: filter_csv_bytes(str(input_path), out, columns, block_size=16),
+        'projected': lambda out: filter_csv_projected(str(input_path), out, columns),
+        'parallel': lambda out: filter_csv_parallel(str(input_path), out, columns, workers=2, shard_bytes=16),
+        'cache': lambda out: ScanCache(str(tmp_path / "cache")).filter_csv(str(input_path), out, columns),
+    }
+    results = {}
+    for name, engine in engines.items():
+        output = str(tmp_path / f"{name}.csv")
+        stats = engine(output)
+        assert stats.total_rows == 5, name
+        results[name] = pd.read_csv(output, **READ_OPTIONS)['id'].tolist()
+    return results
+
+
+def test_parse_specs():
+    assert parse_rule('Title') == parse_rule(' Title ')
+    assert parse_rule('#2=latin1').selector == '#2'
+    assert parse_rule('#2=latin1').policy == latin1_printable()
+    assert parse_rule('re:^name_=unicode:L,N').policy.name == 'unicode:L,N'
+    # An '=' that does not start a policy belongs to the selector
+    assert parse_rule('a=b').selector == 'a=b' and parse_rule('a=b').policy is None
+    assert split_specs('Title, Developer') == ['Title', 'Developer']
+    assert split_specs('Title; Notes=unicode:L,N') == ['Title', 'Notes=unicode:L,N']
+    with pytest.raises(ValueError):
+        parse_rule('re:(')
+    with pytest.raises(ValueError):
+        parse_rules('Title', combine='some')
+
+
+def test_resolve_selectors():
+    header = ['id', 'name_en', 'name_fr', 'desc']
+    rules = parse_rules(['re:^name_', '#3', 'desc=latin1', 'missing', '#9'])
+    selection = rules.resolve(header)
+    assert selection.columns == ['name_en', 'name_fr', 'desc']
+    assert selection.policies['desc'] == latin1_printable()
+    assert selection.policies['name_en'] == DEFAULT_POLICY
+    # The strictest policy pre-screens the bytes of whole records
+    assert selection.scan_policy == DEFAULT_POLICY
+    mixed = parse_rules('a=latin1;b=unicode:L').resolve(['a', 'b'])
+    assert mixed.scan_policy.allows('é') and not mixed.scan_policy.allows('1')
+    assert rules.missing(header) == ['missing', '#9']
+    assert parse_rules('*').resolve(header).columns == header
+
+    with pytest.raises(ValueError, match='Missing required columns: missing, #9'):
+        require_columns(header, rules)
+    with pytest.raises(ValueError, match='No columns match'):
+        require_columns(header, parse_rules('re:^x'))
+    assert require_columns(header, ['id']).columns == ['id']
+
+
+def test_mask_combines_columns_in_one_pass():
+    frame = pd.DataFrame({'a': ['é', 'x', 'é', 'x'], 'b': ['é', 'é', 'x', 'x'], 'n': [1, 2, 3, 4]})
+    any_mask = ColumnSelection({'a': DEFAULT_POLICY, 'b': DEFAULT_POLICY, 'n': DEFAULT_POLICY}).mask(frame)
+    all_mask = ColumnSelection({'a': DEFAULT_POLICY, 'b': DEFAULT_POLICY}, 'all').mask(frame)
+    assert any_mask.tolist() == [True, True, True, False]
+    assert all_mask.tolist() == [True, False, False, False]
+    # Names, rules and selections are interchangeable
+    assert build_special_char_mask(frame, ['a', 'b']).equals(any_mask)
+    assert build_special_char_mask(frame, ColumnRules(parse_rules('a,b').rules, 'all')).equals(all_mask)
+    # A missing column is clean, so nothing matches all of them
+    assert not ColumnSelection({'a': DEFAULT_POLICY, 'z': DEFAULT_POLICY}, 'all').mask(frame).any()
+
+
+@pytest.mark.parametrize('specs,combine', [
+    (['#1', '#2'], 'any'),
+    (['re:^name_'], 'all'),
+    (['*=latin1', 'desc'], 'any'),
+    (['name_fr=latin1', 'name_en'], 'any'),
+])
+def test_engines_agree(tmp_path, specs, combine):
+    rules = parse_rules(specs, combine)
+    expected = expected_ids(rules)
+    for name, ids in run_engines(tmp_path, rules).items():
+        assert ids == expected, name
+    assert expected  # Every case selects something
+
+
+def test_cache_key_follows_selection(tmp_path):
+    input_path = tmp_path / "input.csv"
+    input_path.write_text(CSV, encoding='utf-8')
+    cache = ScanCache(str(tmp_path / "cache"))
+    first = cache.filter_csv(str(input_path), str(tmp_path / "a.csv"), parse_rules('re:^name_'))
+    assert cache.last_status == 'miss'
+    cache.filter_csv(str(input_path), str(tmp_path / "b.csv"), parse_rules('name_en,name_fr'))
+    assert cache.last_status == 'hit'  # Same resolved columns
+    second = cache.filter_csv(str(input_path), str(tmp_path / "c.csv"), parse_rules('re:^name_', 'all'))
+    assert cache.last_status == 'miss'
+    assert (first.matching_rows, second.matching_rows) == (3, 1)
+
+
+def test_sanitize_per_column_policy(tmp_path):
+    input_path = tmp_path / "input.csv"
+    input_path.write_text(CSV, encoding='utf-8')
+    output_path = tmp_path / "clean.csv"
+    stats = sanitize_csv(str(input_path), str(output_path), parse_rules('re:^name_=latin1,desc'))
+    cleaned = pd.read_csv(output_path, **READ_OPTIONS)
+    # é is Latin-1 and stays; Œ and the desc column are cleaned
+    assert cleaned['name_fr'].tolist()[1:3] == ['Café', 'Café']
+    assert cleaned['name_en'].tolist()[4] == 'OEuvre'
+    assert cleaned['desc'].tolist()[3] == 'naiveTM'
+    assert stats.changed_cells == 2
+
+
+def test_cli_columns_and_match(tmp_path, capsys):
+    input_path = tmp_path / "input.csv"
+    input_path.write_text(CSV, encoding='utf-8')
+    assert cli.main(['filter', str(input_path), '-j', '1', '-c', 're:^name_', '--match', 'all']) == 0
+    result = json.loads(capsys.readouterr().out)
+    assert result['matching_rows'] == 1
+    assert pd.read_csv(result['output'], **READ_OPTIONS)['id'].tolist() == ['3']
+
+    assert cli.main(['filter', str(input_path), '-j', '1', '-c', 'Title']) == 1
+    assert 'Missing required columns: Title' in capsys.readouterr().out
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Tests for the streaming dimension counter in csv_bytes.py.
+"""
+
+import os
+import sys
+
+import pandas as pd
+
+# Add the main module to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import csv_bytes
+from csv_bytes import count_dimensions
+
+
+def test_dimensions_match_pandas_shape(tmp_path):
+    path = tmp_path / "input.csv"
+    pd.DataFrame({
+        'Title': ['Plain', 'Multi\nline, "quoted"', 'Café', ''],
+        'Developer': ['A', 'B', 'C', 'D'],
+        'Price': [1, 2, 3, 4],
+    }).to_csv(path, index=False)
+    assert count_dimensions(str(path)) == pd.read_csv(path).shape == (4, 3)
+
+
+def test_blank_lines_and_missing_final_newline(tmp_path):
+    path = tmp_path / "input.csv"
+    path.write_bytes(b'\r\nTitle,Developer\r\n"a\r\n\r\nb",x\r\n\r\n  \r\n"",y')
+    assert count_dimensions(str(path)) == pd.read_csv(path).shape == (2, 2)
+
+
+def test_quotes_straddling_block_boundaries(tmp_path, monkeypatch):
+    path = tmp_path / "input.csv"
+    path.write_bytes(b'Title,Developer\n"x\n""y""\nno quotes\n\nhere\n",1\n\n \n"",2\nz,3\n')
+    monkeypatch.setattr(csv_bytes, 'BLOCK_SIZE', 3)
+    assert count_dimensions(str(path)) == pd.read_csv(path).shape == (3, 2)
+
+
+def test_quotes_inside_unquoted_fields(tmp_path, monkeypatch):
+    path = tmp_path / "input.csv"
+    rows = ['row {},x'.format(index) for index in range(20000)]
+    path.write_bytes(('Size 27",Developer\n27" Monitor,Acme\n' + '\n'.join(rows) + '\n').encode('utf-8'))
+    assert count_dimensions(str(path)) == pd.read_csv(path).shape == (20001, 2)
+    assert csv_bytes.header_fields(str(path)) == ['Size 27"', 'Developer']
+
+    path.write_bytes(b'Title,Developer\n"a""\n""",x\nb"c,"d\ne"""\n"f""",""\n')
+    monkeypatch.setattr(csv_bytes, 'BLOCK_SIZE', 3)
+    assert count_dimensions(str(path)) == pd.read_csv(path).shape == (3, 2)
+
+
+def test_header_only_and_empty_files(tmp_path):
+    header_only = tmp_path / "header.csv"
+    header_only.write_bytes(b'Title,Developer\n')
+    assert count_dimensions(str(header_only)) == (0, 2)
+
+    empty = tmp_path / "empty.csv"
+    empty.write_bytes(b'')
+    try:
+        count_dimensions(str(empty))
+    except pd.errors.EmptyDataError:
+        pass
+    else:
+        raise AssertionError("expected EmptyDataError")
+
+
+def test_header_fields_match_pandas(tmp_path):
+    path = tmp_path / "input.csv"
+    for data in [b'\n \nTitle,Developer\n1,2\n', b'\xef\xbb\xbfTitle,,Title\n', b'"Multi\nline, ""quoted""",x\r\n1,2\r\n']:
+        path.write_bytes(data)
+        assert len(csv_bytes.header_fields(str(path))) == len(pd.read_csv(path, nrows=0).columns)
+    assert csv_bytes.header_fields(str(path)) == ['Multi\nline, "quoted"', 'x']
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Tests for the column-wise scan engine in filter_engine.py.
+"""
+
+import os
+import sys
+
+import pandas as pd
+
+# Add the main module to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from filter_engine import (
+    READ_OPTIONS,
+    build_special_char_mask,
+    column_mask,
+    contains_special_characters,
+    filter_csv_streaming,
+)
+
+
+def sample_frame() -> pd.DataFrame:
+    """Same rows as the sample CSV in test_improvements.py, plus edge cases."""
+    return pd.DataFrame({
+        'Title': ['Normal Game Title', 'Café Adventure', 'Simple Puzzle', 'Pokémon Quest',
+                  'Test Game', None, 'Tab\tSeparated', 'Bell\x07'],
+        'Developer': ['Normal Studio', 'Gaming Inc', 'Tést Studios', 'Regular Dev',
+                      'Émoji Games 😀', 'Plain', 'Line\nBreak', 'Plain'],
+        'Price': [9.99, 14.99, 4.99, 19.99, 0.99, 1.0, 2.0, 3.0],
+    })
+
+
+def legacy_apply_mask(df: pd.DataFrame) -> pd.Series:
+    """The row-wise mask the GUI used to build with df.apply."""
+    return df.apply(
+        lambda row: (
+            contains_special_characters(row.get('Title')) or
+            contains_special_characters(row.get('Developer'))
+        ),
+        axis=1
+    ).astype(bool)
+
+
+def test_mask_matches_row_wise_apply():
+    df = sample_frame()
+    mask = build_special_char_mask(df, ['Title', 'Developer'])
+    assert mask.tolist() == legacy_apply_mask(df).tolist()
+    assert mask.tolist() == [False, True, True, True, True, False, False, True]
+
+
+def test_clean_column_short_circuits():
+    values = pd.Series(['alpha', 'beta', None, 'gamma\tdelta'])
+    assert not column_mask(values).any()
+
+
+def test_mixed_and_numeric_columns():
+    mixed = pd.Series(['ok', 12, 'naïve', None], dtype=object)
+    assert column_mask(mixed).tolist() == [False, False, True, False]
+    assert not column_mask(pd.Series([1.5, 2.5])).any()
+
+
+def test_missing_columns_are_ignored():
+    df = sample_frame()
+    mask = build_special_char_mask(df, ['Title', 'Publisher'])
+    assert mask.sum() == 3
+
+
+def test_streaming_matches_in_memory_filter(tmp_path):
+    input_path = tmp_path / "input.csv"
+    output_path = tmp_path / "output.csv"
+    sample_frame().to_csv(input_path, index=False)
+
+    stats = filter_csv_streaming(str(input_path), str(output_path), chunksize=3)
+
+    df = pd.read_csv(input_path, **READ_OPTIONS)
+    expected = df[build_special_char_mask(df)]
+    assert stats.total_rows == 8
+    assert stats.matching_rows == 5
+    assert stats.percentage == 62.5
+    assert output_path.read_text(encoding='utf-8') == expected.to_csv(index=False)
+
+
+def test_streaming_writes_header_without_matches(tmp_path):
+    input_path = tmp_path / "input.csv"
+    output_path = tmp_path / "output.csv"
+    input_path.write_text("Title,Developer,Price\nPlain,Studio,9.990\n", encoding='utf-8')
+
+    stats = filter_csv_streaming(str(input_path), str(output_path))
+
+    assert (stats.total_rows, stats.matching_rows) == (1, 0)
+    assert output_path.read_text(encoding='utf-8') == "Title,Developer,Price\n"
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Tests for compressed inputs and the pluggable output writers.
+"""
+
+import bz2
+import gzip
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+# Add the main module to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from byte_scan import filter_csv_bytes
+from cli import main as cli_main
+from csv_bytes import count_dimensions
+from filter_engine import READ_OPTIONS, filter_csv_streaming
+from formats import detect_compression, infer_output_format, strip_input_extension
+from parallel_scan import filter_csv_parallel
+from projected_scan import filter_csv_projected
+from test_projected_scan import TRICKY_CSV
+
+COMPRESSORS = {
+    'gz': gzip.compress,
+    'bz2': bz2.compress,
+}
+
+
+def write_inputs(tmp_path):
+    """The tricky CSV as plain text and through every available codec."""
+    data = TRICKY_CSV.encode('utf-8')
+    plain = tmp_path / "input.csv"
+    plain.write_bytes(data)
+    compressors = dict(COMPRESSORS)
+    try:
+        import zstandard
+        compressors['zst'] = zstandard.ZstdCompressor().compress
+    except ImportError:
+        pass
+    compressed = []
+    for extension, compress in compressors.items():
+        path = tmp_path / f"input.csv.{extension}"
+        path.write_bytes(compress(data))
+        compressed.append(path)
+    return plain, compressed
+
+
+def test_compressed_inputs_match_plain(tmp_path):
+    plain, compressed = write_inputs(tmp_path)
+    expected = filter_csv_streaming(str(plain), str(tmp_path / "expected.csv"))
+    for path in compressed:
+        for name, engine in [
+            ('streaming', filter_csv_streaming),
+            ('bytes', filter_csv_bytes),
+            ('projected', filter_csv_projected),
+            ('parallel', lambda src, dst: filter_csv_parallel(src, dst, workers=2, shard_bytes=16)),
+        ]:
+            output = tmp_path / f"{path.name}.{name}.csv"
+            assert engine(str(path), str(output)) == expected
+            assert output.read_bytes() == (tmp_path / "expected.csv").read_bytes()
+        assert count_dimensions(str(path)) == count_dimensions(str(plain))
+
+
+def test_codec_detection(tmp_path):
+    plain, _ = write_inputs(tmp_path)
+    # No extension: the codec is sniffed from the magic bytes
+    sniffed = tmp_path / "export"
+    sniffed.write_bytes(gzip.compress(plain.read_bytes()))
+    assert detect_compression(str(sniffed)) == 'gzip'
+    assert detect_compression(str(plain)) is None
+    assert detect_compression(str(tmp_path / "input.csv.bz2")) == 'bz2'
+    filter_csv_bytes(str(sniffed), str(tmp_path / "sniffed.csv"))
+    filter_csv_bytes(str(plain), str(tmp_path / "plain.csv"))
+    assert (tmp_path / "sniffed.csv").read_bytes() == (tmp_path / "plain.csv").read_bytes()
+
+    assert infer_output_format('out.CSV.GZ') == 'csv.gz'
+    assert infer_output_format('out.parquet') == 'parquet'
+    assert infer_output_format('out.txt') == 'csv'
+    assert infer_output_format('out.csv', 'feather') == 'feather'
+    with pytest.raises(ValueError):
+        infer_output_format('out.csv', 'xlsx')
+    assert strip_input_extension('dir/a.csv.gz') == 'dir/a'
+
+
+def test_compressed_csv_output(tmp_path):
+    plain, _ = write_inputs(tmp_path)
+    filter_csv_bytes(str(plain), str(tmp_path / "expected.csv"))
+    filter_csv_bytes(str(plain), str(tmp_path / "out.csv.gz"))
+    filter_csv_parallel(str(plain), str(tmp_path / "out.csv.bz2"), workers=2, shard_bytes=16)
+    expected = (tmp_path / "expected.csv").read_bytes()
+    assert gzip.decompress((tmp_path / "out.csv.gz").read_bytes()) == expected
+    assert bz2.decompress((tmp_path / "out.csv.bz2").read_bytes()) == expected
+
+
+@pytest.mark.parametrize('extension', ['parquet', 'feather'])
+def test_arrow_outputs_hold_the_same_rows(tmp_path, extension):
+    pytest.importorskip('pyarrow')
+    plain, _ = write_inputs(tmp_path)
+    filter_csv_streaming(str(plain), str(tmp_path / "expected.csv"))
+    expected = pd.read_csv(tmp_path / "expected.csv", **READ_OPTIONS)
+    reader = pd.read_parquet if extension == 'parquet' else pd.read_feather
+
+    for name, engine in [
+        ('streaming', filter_csv_streaming),
+        ('bytes', filter_csv_bytes),
+        ('parallel', lambda src, dst: filter_csv_parallel(src, dst, workers=2, shard_bytes=16)),
+    ]:
+        output = tmp_path / f"{name}.{extension}"
+        engine(str(plain), str(output))
+        actual = reader(output)
+        assert actual.columns.tolist() == expected.columns.tolist()
+        assert actual.astype(object).values.tolist() == expected.astype(object).values.tolist()
+
+    # A file with no matches still has the schema
+    clean = tmp_path / "clean.csv"
+    clean.write_text("Title,Developer\nA,B\n", encoding='utf-8')
+    filter_csv_bytes(str(clean), str(tmp_path / f"empty.{extension}"))
+    assert reader(tmp_path / f"empty.{extension}").columns.tolist() == ['Title', 'Developer']
+
+
+def test_cli_format_flag(tmp_path, capsys):
+    _, compressed = write_inputs(tmp_path)
+    out_dir = tmp_path / "out"
+    assert cli_main(['filter', str(compressed[0]), '--output-dir', str(out_dir), '--format', 'csv.gz', '-j', '1']) == 0
+    assert os.listdir(out_dir) == ['input_filtered.csv.gz']
+    assert '"matching_rows": 2' in capsys.readouterr().out
@@ -5,6 +5,8 @@ Test script to demonstrate the improvements made to the CSV special character fi
 
 import pandas as pd
 import os
+import pickle
+import random
 import sys
 import tempfile
 
@@ -12,6 +14,18 @@ import tempfile
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from main import contains_special_characters
+from char_policy import (
+    BYTE_ALLOWED,
+    BYTE_DISALLOWED,
+    BYTE_NON_ASCII,
+    DEFAULT_POLICY,
+    ascii_printable,
+    custom,
+    latin1_printable,
+    parse_policy,
+    unicode_categories,
+)
+from filter_engine import build_special_char_mask
 
 def test_special_character_detection():
     """Test the improved special character detection function."""
@@ -46,6 +60,105 @@ def test_special_character_detection():
     print(f"\nTest Results: {passed}/{total} passed")
     return passed == total
 
+def test_character_policies():
+    """Each built-in policy accepts and rejects the expected characters."""
+    print("Testing character policies...")
+    policies = {
+        'ascii': ascii_printable(),
+        'latin1': latin1_printable(),
+        'unicode': unicode_categories(['L', 'M', 'N', 'P', 'S', 'Zs']),
+        'custom': custom(allow='é', deny='$', base=ascii_printable()),
+    }
+
+    # text -> expected "contains special characters" per policy
+    test_cases = [
+        ("Normal text",        {'ascii': False, 'latin1': False, 'unicode': False, 'custom': False}),
+        ("Café",               {'ascii': True,  'latin1': False, 'unicode': False, 'custom': False}),
+        ("Résumé",             {'ascii': True,  'latin1': False, 'unicode': False, 'custom': False}),
+        ("Crème brûlée",       {'ascii': True,  'latin1': False, 'unicode': False, 'custom': True}),
+        ("Price: $50",         {'ascii': False, 'latin1': False, 'unicode': False, 'custom': True}),
+        ("Straße",             {'ascii': True,  'latin1': False, 'unicode': False, 'custom': True}),
+        ("Ελληνικά",           {'ascii': True,  'latin1': True,  'unicode': False, 'custom': True}),
+        ("Émoji 😀",           {'ascii': True,  'latin1': True,  'unicode': False, 'custom': True}),
+        ("Hello\tWorld\r\n",  {'ascii': False, 'latin1': False, 'unicode': False, 'custom': False}),
+        ("Bell\x07",           {'ascii': True,  'latin1': True,  'unicode': True,  'custom': True}),
+        ("C1 \x85 control",    {'ascii': True,  'latin1': True,  'unicode': True,  'custom': True}),
+        ("No\u00a0break",      {'ascii': True,  'latin1': False, 'unicode': False, 'custom': True}),
+        ("Zero\u200bwidth",    {'ascii': True,  'latin1': True,  'unicode': True,  'custom': True}),
+        ("",                   {'ascii': False, 'latin1': False, 'unicode': False, 'custom': False}),
+    ]
+
+    failures = []
+    for text, expected in test_cases:
+        for name, policy in policies.items():
+            result = contains_special_characters(text, policy)
+            if result != expected[name]:
+                failures.append((name, text, result))
+                print(f"  ✗ [{name}] {text!r} -> {result} (expected: {expected[name]})")
+    print(f"\nPolicy Results: {len(test_cases) * len(policies) - len(failures)}/{len(test_cases) * len(policies)} passed")
+    assert not failures
+
+
+def test_policy_tables_agree_with_pattern():
+    """The regex, code point bitmap and byte table of a policy never disagree."""
+    rng = random.Random(7)
+    samples = [chr(code_point) for code_point in range(0x300)]
+    samples += [chr(rng.randrange(0x110000)) for _ in range(3000)]
+    samples = [char for char in samples if not 0xD800 <= ord(char) <= 0xDFFF]
+
+    for policy in (DEFAULT_POLICY, latin1_printable(), unicode_categories(['L', 'Nd']),
+                   custom(allow='é€', deny=' e', base=DEFAULT_POLICY)):
+        allowed = policy.code_point_mask()
+        for char in samples:
+            by_pattern = policy.pattern.search(char) is None
+            assert policy.allows(char) == by_pattern == allowed[ord(char)] == policy.is_clean(char), (policy, char)
+            if ord(char) < 128:
+                assert policy.byte_table[ord(char)] == (BYTE_ALLOWED if by_pattern else BYTE_DISALLOWED)
+        assert set(policy.byte_table[128:]) == {BYTE_NON_ASCII}
+
+
+def test_policy_parsing_and_pickling():
+    """Policies are built from text specs and survive a round trip to worker processes."""
+    assert parse_policy('ascii') == DEFAULT_POLICY
+    assert parse_policy('ascii', allow='é').is_clean("Café")
+    assert not parse_policy('latin1', deny='é').is_clean("Café")
+    assert parse_policy('unicode:L,Zs').is_clean("Ünïcödé words")
+    for spec in ('ebcdic', 'unicode:', 'unicode:Xx'):
+        try:
+            parse_policy(spec)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f"{spec!r} should be rejected")
+
+    policy = unicode_categories(['L', 'N'])
+    copy = pickle.loads(pickle.dumps(policy))
+    assert copy == policy and copy.key == policy.key
+    assert copy.bitmap == policy.bitmap
+
+
+def test_policy_column_scan():
+    """The vectorized column scan honours the policy, including one that rejects newlines."""
+    specs = {'ascii': ('ascii', ''), 'latin1': ('latin1', ''), 'no newline': ('unicode:L,Zs', '\n')}
+    df = pd.DataFrame({
+        'Title': ['Plain', 'Café', 'Line\nbreak', 'Ελληνικά', None],
+        'Developer': ['Dev', 'Dev', 'Dev', 'Dev', 'Straße'],
+    })
+    expected = {
+        'ascii': [False, True, False, True, True],
+        'latin1': [False, False, False, True, False],
+        'no newline': [False, False, True, False, False],
+    }
+    for name, rows in expected.items():
+        policy = parse_policy(specs[name][0], deny=specs[name][1])
+        mask = build_special_char_mask(df, ['Title', 'Developer'], policy)
+        assert mask.tolist() == rows, name
+        for index, row in df.iterrows():
+            assert rows[index] == any(
+                contains_special_characters(row[column], policy) for column in ('Title', 'Developer')
+            )
+
+
 def create_sample_csv():
     """Create a sample CSV file for testing."""
     data = {
@@ -94,7 +207,15 @@ def main():
         print("\n✗ Special character detection tests failed!")
         return False
     
-    # Test 2: Create sample CSV for manual testing
+    # Test 2: Character policies
+    print("\n" + "-" * 30)
+    test_character_policies()
+    test_policy_tables_agree_with_pattern()
+    test_policy_parsing_and_pickling()
+    test_policy_column_scan()
+    print("✓ Character policy tests passed!")
+
+    # Test 3: Create sample CSV for manual testing
     print("\n" + "-" * 30)
     print("Creating sample CSV for manual testing...")
     sample_file = create_sample_csv()
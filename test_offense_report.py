@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Tests for the per-character offense report.
+"""
+
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Add the main module to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import cli
+from byte_scan import filter_csv_bytes
+from char_policy import DEFAULT_POLICY, latin1_printable
+from column_rules import select_columns
+from filter_engine import READ_OPTIONS, filter_csv_streaming
+from offense_report import ANNOTATION_COLUMNS, OffenseReport, report_path_for
+from parallel_scan import filter_csv_parallel
+from projected_scan import filter_csv_projected
+from scan_cache import ScanCache
+
+CSV = (
+    "Title,Developer,Notes\n"
+    "Café,Studio,x\n"
+    "Plain,Ünïcode,ñ\n"
+    "Café,Studio™,y\n"
+    "Plain,Plain,é\n"
+)
+
+
+def run_engines(tmp_path, **options):
+    """Run every engine with a fresh report; return {name: (report dict, output frame)}."""
+    input_path = tmp_path / "input.csv"
+    input_path.write_text(CSV, encoding='utf-8')
+    engines = {
+        'streaming': lambda out, report: filter_csv_streaming(str(input_path), out, report=report),
+        'bytes': lambda out, report: filter_csv_bytes(str(input_path), out, block_size=16, report=report),
+        'projected': lambda out, report: filter_csv_projected(str(input_path), out, report=report),
+        'parallel': lambda out, report: filter_csv_parallel(
+            str(input_path), out, workers=2, shard_bytes=16, report=report
+        ),
+        'cache': lambda out, report: ScanCache(str(tmp_path / "cache")).filter_csv(str(input_path), out, report=report),
+    }
+    results = {}
+    for name, engine in engines.items():
+        report = OffenseReport(**options)
+        output = str(tmp_path / f"{name}.csv")
+        engine(output, report)
+        results[name] = (report.to_dict(), pd.read_csv(output, **READ_OPTIONS))
+    return results
+
+
+def test_report_counts_code_points_categories_and_values(tmp_path):
+    results = run_engines(tmp_path)
+    expected, _ = results['streaming']
+    for name, (report, _) in results.items():
+        assert report == expected, name
+
+    assert expected['matching_rows'] == 3
+    assert expected['policy'] == DEFAULT_POLICY.key
+    title = expected['columns']['Title']
+    assert title['rows'] == 2
+    assert [(item['code_point'], item['count']) for item in title['code_points']] == [('U+00E9', 2)]
+    assert title['categories'] == {'Ll': 2}
+    assert title['top_values'] == [{'value': 'Café', 'count': 2, 'positions': [3]}]
+    developer = expected['columns']['Developer']
+    assert developer['characters'] == 3
+    assert developer['categories'] == {'Ll': 1, 'Lu': 1, 'So': 1}
+    # Notes is not a checked column
+    assert 'Notes' not in expected['columns']
+
+
+def test_annotation_columns(tmp_path):
+    for name, (_, output) in run_engines(tmp_path, annotate=True).items():
+        assert output.columns.tolist()[-3:] == ANNOTATION_COLUMNS, name
+        assert output[ANNOTATION_COLUMNS[0]].tolist() == ['Title', 'Developer', 'Title;Developer'], name
+        assert output[ANNOTATION_COLUMNS[1]].tolist() == ['U+00E9', 'U+00DC U+00EF', 'U+00E9;U+2122'], name
+        assert output[ANNOTATION_COLUMNS[2]].tolist() == ['3', '0 2', '3;6'], name
+
+    # Without annotation the output is unchanged
+    input_path = tmp_path / "input.csv"
+    filter_csv_bytes(str(input_path), str(tmp_path / "plain.csv"))
+    filter_csv_bytes(str(input_path), str(tmp_path / "reported.csv"), report=OffenseReport())
+    assert (tmp_path / "plain.csv").read_bytes() == (tmp_path / "reported.csv").read_bytes()
+
+
+def test_report_uses_filter_verdicts():
+    frame = pd.DataFrame({'Title': ['Café', 'Naïve'], 'Developer': ['Ünïcode', 'Plain']})
+    selection = select_columns(frame.columns, ['Title', 'Developer'])
+    verdicts = {}
+    selection.mask(frame, verdicts)
+    report = OffenseReport(annotate=True)
+    annotated = report.observe(frame, selection, verdicts)
+    assert annotated[ANNOTATION_COLUMNS[2]].tolist() == ['3;0 2', '2']
+
+    # Values the filter pass cleared are not searched again
+    report = OffenseReport()
+    report.observe(frame, selection, {'Title': np.array([True, False]), 'Developer': np.zeros(2, dtype=bool)})
+    assert list(report.columns) == ['Title']
+    assert report.columns['Title'].values == {'Café': 1}
+
+
+def test_report_follows_policy(tmp_path):
+    input_path = tmp_path / "input.csv"
+    input_path.write_text(CSV, encoding='utf-8')
+    report = OffenseReport()
+    stats = filter_csv_bytes(str(input_path), str(tmp_path / "out.csv"), policy=latin1_printable(), report=report)
+    assert stats.matching_rows == 1
+    assert list(report.to_dict()['columns']) == ['Developer']
+    assert report.columns['Developer'].code_points == {'™': 1}
+    assert '™' in report.summary()
+
+
+def test_cli_report(tmp_path, capsys):
+    input_path = tmp_path / "games.csv"
+    input_path.write_text(CSV, encoding='utf-8')
+    assert cli.main(['filter', str(input_path), '-j', '1', '--report', '--top', '1']) == 0
+    result = json.loads(capsys.readouterr().out)
+    assert result['report'] == report_path_for(result['output']) == str(tmp_path / "games_filtered_report.json")
+    with open(result['report'], encoding='utf-8') as handle:
+        saved = json.load(handle)
+    assert saved['columns']['Developer']['top_values'] == [{'value': 'Ünïcode', 'count': 1, 'positions': [0, 2]}]
+    assert report_path_for('out/a_filtered.csv.gz') == 'out/a_filtered_report.json'
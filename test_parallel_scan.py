@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Tests for record-aligned sharding and the process-pool filter.
+"""
+
+import io
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Add the main module to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import csv_bytes
+from csv_bytes import split_record_ranges
+from filter_engine import filter_csv_streaming
+from parallel_scan import filter_csv_parallel
+from projected_scan import find_matching_records
+
+
+def write_quoted_sample(path, rows: int = 400) -> None:
+    """Write a CSV whose quoted fields contain commas, quotes and newlines."""
+    titles = []
+    for index in range(rows):
+        if index % 7 == 0:
+            titles.append(f'Multi\nline "{index}", café')
+        elif index % 5 == 0:
+            titles.append(f'Quoted, "title" {index}')
+        else:
+            titles.append(f'Plain title {index}')
+    pd.DataFrame({
+        'Title': titles,
+        'Developer': ['Studio Ü' if index % 11 == 0 else 'Studio' for index in range(rows)],
+        'Price': [f'{index}.50' for index in range(rows)],
+    }).to_csv(path, index=False)
+
+
+def test_ranges_cover_every_record(tmp_path):
+    path = tmp_path / "input.csv"
+    write_quoted_sample(path)
+
+    header, ranges = split_record_ranges(str(path), 9)
+
+    data = path.read_bytes()
+    assert header == data[:len(header)]
+    assert ranges[0][0] == len(header)
+    assert ranges[-1][1] == len(data)
+    assert all(end == next_start for (_, end), (next_start, _) in zip(ranges, ranges[1:]))
+    rows = sum(len(pd.read_csv(io.BytesIO(header + data[start:end]))) for start, end in ranges)
+    assert rows == 400
+
+
+def test_parallel_output_matches_streaming(tmp_path):
+    input_path = tmp_path / "input.csv"
+    write_quoted_sample(input_path)
+
+    streaming_stats = filter_csv_streaming(str(input_path), str(tmp_path / "streaming.csv"))
+    offsets = []
+    parallel_stats = filter_csv_parallel(
+        str(input_path), str(tmp_path / "parallel.csv"), workers=2, shard_bytes=1024, record_offsets=offsets
+    )
+
+    assert parallel_stats == streaming_stats
+    assert (tmp_path / "parallel.csv").read_bytes() == (tmp_path / "streaming.csv").read_bytes()
+    # Every shard reports where its matching records start in the file
+    assert len(offsets) > 1
+    expected = find_matching_records(str(input_path), ['Title', 'Developer'])[0]
+    assert np.concatenate(offsets).tolist() == expected.tolist()
+
+
+def test_ranges_with_quotes_inside_unquoted_fields(tmp_path, monkeypatch):
+    path = tmp_path / "input.csv"
+    write_quoted_sample(path)
+    path.write_bytes(path.read_bytes().replace(b'Plain title 1,', b'27" Monitor 1,'))
+    # Small blocks and windows, so records straddle them
+    monkeypatch.setattr(csv_bytes, 'BLOCK_SIZE', 64)
+    monkeypatch.setattr(csv_bytes, 'RECORD_WINDOW', 8)
+
+    header, ranges = split_record_ranges(str(path), 9)
+
+    data = path.read_bytes()
+    assert len(ranges) == 9
+    rows = sum(len(pd.read_csv(io.BytesIO(header + data[start:end]))) for start, end in ranges)
+    assert rows == len(pd.read_csv(path)) == 400
+
+
+def test_empty_file_has_no_ranges(tmp_path):
+    path = tmp_path / "empty.csv"
+    path.write_bytes(b'')
+    assert split_record_ranges(str(path), 4) == (b'', [])
+
+
+def test_leading_blank_line_falls_back(tmp_path):
+    input_path = tmp_path / "input.csv"
+    write_quoted_sample(input_path)
+    input_path.write_bytes(b'\n' + input_path.read_bytes())
+
+    streaming_stats = filter_csv_streaming(str(input_path), str(tmp_path / "streaming.csv"))
+    parallel_stats = filter_csv_parallel(
+        str(input_path), str(tmp_path / "parallel.csv"), workers=2, shard_bytes=1024
+    )
+
+    assert parallel_stats == streaming_stats
+    assert (tmp_path / "parallel.csv").read_bytes() == (tmp_path / "streaming.csv").read_bytes()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Tests for the two-pass column projection filter.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Add the main module to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from filter_engine import filter_csv_streaming
+from projected_scan import filter_csv_projected, find_matching_records
+
+TRICKY_CSV = (
+    'Id,Title,Notes,Developer\n'
+    '1,Plain,"multi\nline",Studio\n'
+    '\n'
+    '2,Café,x,Studio\n'
+    '   \n'
+    '3,"quoted, ""title""","ünïcode only in notes",Dev\n'
+    '4,Plain,y,"Tést\nStudio"\n'
+    '5,,,\n'
+)
+
+
+def assert_same_as_streaming(tmp_path, text: str, columns=('Title', 'Developer')):
+    input_path = tmp_path / "input.csv"
+    input_path.write_text(text, encoding='utf-8')
+
+    expected = filter_csv_streaming(str(input_path), str(tmp_path / "streaming.csv"), list(columns), chunksize=2)
+    actual = filter_csv_projected(str(input_path), str(tmp_path / "projected.csv"), list(columns), chunksize=2)
+
+    assert actual == expected
+    assert (tmp_path / "projected.csv").read_bytes() == (tmp_path / "streaming.csv").read_bytes()
+    return actual
+
+
+def test_output_matches_streaming_filter(tmp_path):
+    stats = assert_same_as_streaming(tmp_path, TRICKY_CSV)
+    assert (stats.total_rows, stats.matching_rows) == (5, 2)
+
+
+def test_missing_columns_and_leading_blank_line(tmp_path):
+    stats = assert_same_as_streaming(tmp_path, TRICKY_CSV, columns=('Publisher',))
+    assert stats.matching_rows == 0
+    assert_same_as_streaming(tmp_path, '\n' + TRICKY_CSV)
+
+
+def test_quoted_line_break_before_match(tmp_path):
+    # A line break inside a quoted field must not shift the rows of pass two
+    stats = assert_same_as_streaming(tmp_path, 'Title,Developer\n,"a\nb"\nCafé,y\n')
+    assert (tmp_path / "projected.csv").read_text(encoding='utf-8') == 'Title,Developer\nCafé,y\n'
+    assert (stats.total_rows, stats.matching_rows) == (2, 1)
+
+
+def test_random_quoting_matches_streaming(tmp_path):
+    rng = np.random.default_rng(3)
+    pieces = ['a', 'é', ' ', ',', '\n', '""', 'ü\nb', '', '\r\n']
+    for _ in range(60):
+        rows = []
+        for _ in range(int(rng.integers(1, 8))):
+            fields = [''.join(rng.choice(pieces, size=int(rng.integers(0, 3)))) for _ in range(3)]
+            rows.append(','.join(f'"{field}"' if rng.random() < 0.7 else field.strip(',\n"\r') for field in fields))
+        assert_same_as_streaming(tmp_path, 'Title,Developer,Notes\n' + '\n'.join(rows) + '\n')
+
+
+def test_first_pass_reads_only_checked_columns(tmp_path):
+    input_path = tmp_path / "input.csv"
+    input_path.write_text(TRICKY_CSV, encoding='utf-8')
+    data = TRICKY_CSV.encode('utf-8')
+
+    # "Notes" holds special characters but is not checked
+    offsets, records, clean_end = find_matching_records(str(input_path), ['Title', 'Developer'], block_size=8)
+    assert offsets.tolist() == [data.index(b'2,Caf'), data.index(b'4,Plain')]
+    assert (records, clean_end) == (5, True)
+    assert find_matching_records(str(input_path), ['Notes'])[0].tolist() == [data.index(b'3,"quoted')]
+    assert len(pd.read_csv(input_path)) == 5
+
+
+def test_scan_from_record_boundary(tmp_path):
+    input_path = tmp_path / "input.csv"
+    input_path.write_text(TRICKY_CSV, encoding='utf-8')
+    data = TRICKY_CSV.encode('utf-8')
+    start = data.index(b'   \n') + 4
+
+    offsets, records, _ = find_matching_records(str(input_path), ['Title', 'Developer'], start=start)
+
+    assert offsets.tolist() == [data.index(b'4,Plain')]
+    assert records == 3
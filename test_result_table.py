@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Tests for the lazily read results in result_table.py and the cell layout of result_view.py.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Add the main module to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import result_table
+from char_policy import parse_policy
+from filter_engine import READ_OPTIONS
+from result_table import ResultTable, build_row_index, build_search_index, fold_query, index_path_for, offending_spans
+from result_view import format_cell
+
+DATA = (
+    b'\n  \nTitle,Developer,Year\n"Caf\xc3\xa9\nNoir",Studio,10\n\n   \n'
+    b'Zeta,\xc3\x9cnity,9\nalpha,"x,y",\nBeta,Studio,100\n'
+)
+
+
+def write(tmp_path, data=DATA):
+    path = tmp_path / "result.csv"
+    path.write_bytes(data)
+    return str(path)
+
+
+def test_rows_match_pandas(tmp_path, monkeypatch):
+    path = write(tmp_path)
+    # Pages of two rows and blocks of a few bytes split quoted fields and pages
+    monkeypatch.setattr(result_table, 'PAGE_ROWS', 2)
+    assert len(build_row_index(path, block_size=3)) == 5
+    expected = pd.read_csv(path, **READ_OPTIONS)
+    with ResultTable(path) as table:
+        assert table.header == list(expected.columns)
+        assert len(table) == len(expected) == 4
+        assert [fields for _, fields in table.rows(0, 10)] == expected.values.tolist()
+        assert table.rows(3, 4) == [(3, ['Beta', 'Studio', '100'])]
+        assert table.rows(5, 10) == []
+
+
+def test_index_is_kept_on_disk_and_rebuilt_when_stale(tmp_path):
+    path = write(tmp_path)
+    ResultTable(path).close()
+    assert os.path.exists(index_path_for(path))
+    with open(path, 'ab') as handle:
+        handle.write(b'Omega,Studio,1\n')
+    with ResultTable(path) as table:
+        assert len(table) == 5 and table.rows(4, 5)[0][1][0] == 'Omega'
+
+
+def test_sort_numbers_text_and_empty_values(tmp_path):
+    path = write(tmp_path)
+    with ResultTable(path) as table:
+        table.sort(2)
+        assert table.records(0, 4).tolist() == [1, 0, 3, 2]
+        table.sort(2, descending=True)
+        assert table.records(0, 4).tolist() == [3, 0, 1, 2]
+        # Text ignores case, and equal values keep their file order both ways
+        table.sort(1)
+        assert [fields[1] for _, fields in table.rows(0, 4)] == ['Studio', 'Studio', 'x,y', 'Ünity']
+        assert table.records(0, 2).tolist() == [0, 3]
+        table.sort(1, descending=True)
+        assert table.records(0, 4).tolist() == [1, 2, 0, 3]
+        table.sort(None)
+        assert table.records(0, 4).tolist() == [0, 1, 2, 3]
+
+
+def test_find_maps_hits_onto_the_current_view(tmp_path):
+    path = write(tmp_path)
+    with ResultTable(path) as table:
+        assert table.find('STUDIO').tolist() == [0, 3]
+        assert table.find('a', [0]).tolist() == [0, 1, 2, 3]
+        assert table.find('nothing').tolist() == []
+        table.sort(0, descending=True)
+        # Zeta, Café Noir, Beta, alpha
+        assert table.find('studio').tolist() == [1, 2]
+        assert table.find('X,', [1]).tolist() == [3]
+
+
+def test_search_index_matches_str_contains(tmp_path, monkeypatch):
+    rng = np.random.default_rng(5)
+    pieces = ['a', 'b', 'É', 'é', 'ß', '\n', ',', ' ', '\0', 'x"y']
+    values = [''.join(rng.choice(pieces, size=int(rng.integers(0, 6)))) for _ in range(300)]
+    path = tmp_path / "search.csv"
+    pd.DataFrame({'Text': values, 'Other': values[::-1]}).to_csv(path, index=False)
+    frame = pd.read_csv(path, **READ_OPTIONS)
+    # Chunks split the values, and every query takes both the sparse and the dense path
+    monkeypatch.setattr(result_table, 'SEARCH_CHUNK_ROWS', 7)
+    index = build_search_index(str(path))
+    for sparse_bytes in (1, 10 ** 9):
+        monkeypatch.setattr(result_table, 'SPARSE_BYTES', sparse_bytes)
+        for query in ['a', 'é', 'SS', 'ab', '\nb', 'b,', 'x"y', '\0', 'zz', '']:
+            for column, name in enumerate(frame.columns):
+                expected = frame[name].str.casefold().str.contains(query.casefold(), regex=False)
+                assert index[column].contains(fold_query(query)).tolist() == expected.tolist(), (query, name)
+
+
+def test_offending_spans_of_checked_columns(tmp_path):
+    path = write(tmp_path)
+    with ResultTable(path, {'Title': parse_policy('ascii'), 'Missing': parse_policy('ascii')}) as table:
+        assert table.policies.keys() == {0}
+        assert table.spans(0, 'Café Noïr') == [(3, 4), (7, 8)]
+        assert table.spans(1, 'Ünity') == []
+    assert offending_spans('aéèb', parse_policy('ascii')) == [(1, 3)]
+    assert offending_spans('plain', parse_policy('ascii')) == []
+
+
+def test_format_cell_pads_cuts_and_keeps_highlights():
+    assert format_cell('Café', 6, [(3, 4)]) == ('Café  ', [(3, 4)])
+    assert format_cell('a\nb', 3) == ('a↵b', [])
+    # Hidden offending characters light up the ellipsis
+    assert format_cell('abcdefé', 5, [(1, 2), (6, 7)]) == ('abcd…', [(1, 2), (4, 5)])
+    assert format_cell('abéécdef', 4, [(2, 4)]) == ('abé…', [(2, 3), (3, 4)])
+
+
+def test_large_result_pages(tmp_path):
+    path = tmp_path / "large.csv"
+    frame = pd.DataFrame({'Title': [f"Row {index}" for index in range(5000)], 'Year': np.arange(5000) % 7})
+    frame.to_csv(path, index=False)
+    with ResultTable(str(path)) as table:
+        assert len(table) == 5000
+        assert table.rows(4998, 5001) == [(4998, ['Row 4998', '0']), (4999, ['Row 4999', '1'])]
+        table.sort(1, descending=True)
+        assert table.rows(0, 1) == [(6, ['Row 6', '6'])]
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Tests for per-stage timings, run statistics and profiling.
+"""
+
+import io
+import json
+import os
+import pstats
+import sys
+import time
+
+import pytest
+
+# Add the main module to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import cli
+from byte_scan import filter_csv_bytes
+from filter_engine import filter_csv_streaming
+from parallel_scan import filter_csv_parallel
+from projected_scan import filter_csv_projected
+from run_stats import STAGES, StageTimings, capture_profile, profile_prefix_for, stats_path_for
+
+ROWS = 2_000
+
+
+def write_input(tmp_path) -> str:
+    lines = ["Title,Developer,Price"]
+    for index in range(ROWS):
+        title = f"Café {index}" if index % 10 == 0 else f"Game {index}"
+        lines.append(f"{title},Studio {index % 7},{index}.99")
+    input_path = tmp_path / "input.csv"
+    input_path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    return str(input_path)
+
+
+class SlowHandle(io.BytesIO):
+    """In-memory file whose reads take a known time."""
+
+    def read(self, size=-1):
+        time.sleep(0.01)
+        return super().read(size)
+
+    def readinto(self, buffer):
+        time.sleep(0.01)
+        return super().readinto(buffer)
+
+
+def test_lap_leaves_out_nested_reads():
+    timings = StageTimings()
+    reader = timings.reader(SlowHandle(b'x' * 100))
+    mark = timings.mark()
+    assert reader.read() == b'x' * 100
+    timings.lap('parse', mark, rows=1)
+    assert timings.stages['read'].bytes == 100
+    assert timings.stages['read'].seconds >= 0.01
+    assert timings.stages['parse'].seconds < timings.stages['read'].seconds
+    assert [name for name, _ in timings.ordered()] == ['read', 'parse']
+
+
+@pytest.mark.parametrize('engine', [
+    lambda i, o: filter_csv_streaming(i, o, chunksize=500),
+    lambda i, o: filter_csv_bytes(i, o, block_size=4096),
+    lambda i, o: filter_csv_projected(i, o, chunksize=500),
+    lambda i, o: filter_csv_parallel(i, o, workers=2, shard_bytes=8192),
+])
+def test_engines_time_every_stage(tmp_path, engine):
+    input_path = write_input(tmp_path)
+    output_path = str(tmp_path / "output.csv")
+    stats = engine(input_path, output_path)
+    timings = stats.timings
+    assert stats.matching_rows == ROWS // 10
+    assert {'read', 'parse', 'scan', 'write'} <= set(timings.stages)
+    assert timings.stages['write'].rows == stats.matching_rows
+    assert timings.stages['read'].bytes >= os.path.getsize(input_path) - 100  # The header may be read apart
+    assert (timings.input_bytes, timings.output_bytes) == (os.path.getsize(input_path), os.path.getsize(output_path))
+    assert timings.seconds > 0
+    assert timings.ordered()[0][0] == STAGES[0]
+
+
+def test_stats_json(tmp_path):
+    input_path = write_input(tmp_path)
+    stats = filter_csv_bytes(input_path, str(tmp_path / "output.csv"))
+    path = stats_path_for(str(tmp_path / "output.csv.gz"))
+    assert path == str(tmp_path / "output_stats.json")
+    stats.save(path)
+    with open(path, encoding='utf-8') as handle:
+        saved = json.load(handle)
+    assert saved['matching_rows'] == ROWS // 10
+    assert saved['stages']['parse']['rows'] == stats.timings.stages['parse'].rows
+    assert saved['peak_rss_mb'] is None or saved['peak_rss_mb'] > 0
+    assert 'parse:' in stats.timings.describe()
+
+
+def test_capture_profile(tmp_path):
+    prefix = profile_prefix_for(str(tmp_path / "out.csv"))
+    with capture_profile(prefix) as capture:
+        data = [bytes(1024) for _ in range(1000)]
+    assert capture.peak_traced_mb >= 1.0
+    assert 'Peak traced memory' in open(capture.memory_path, encoding='utf-8').read()
+    assert pstats.Stats(capture.profile_path).total_calls > 0
+    del data
+
+
+def test_cli_stats_and_profile(tmp_path, capsys):
+    input_path = write_input(tmp_path)
+    assert cli.main(['filter', input_path, '-j', '1', '--stats', '--profile']) == 0
+    result = json.loads(capsys.readouterr().out)
+    with open(result['stats'], encoding='utf-8') as handle:
+        saved = json.load(handle)
+    assert saved['matching_rows'] == result['matching_rows']
+    assert saved['peak_traced_mb'] is not None
+    assert os.path.exists(result['profile'])
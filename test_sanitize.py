@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Tests for the sanitize/transliterate transform.
+"""
+
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+# Add the main module to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import cli
+from char_policy import DEFAULT_POLICY, latin1_printable
+from filter_engine import READ_OPTIONS, filter_csv_streaming
+from sanitize import Sanitizer, sanitize_csv, sanitize_csv_streaming
+from test_projected_scan import TRICKY_CSV
+
+
+def test_modes():
+    text = 'Café “Straße” ﬁ ½ 日本'
+    assert Sanitizer('transliterate').clean(text) == 'Cafe "Strasse" fi 1/2 ??'
+    assert Sanitizer('nfkd').clean(text) == 'Cafe ?Stra?e? fi 1?2 ??'
+    assert Sanitizer('replace', replacement='_').clean(text) == 'Caf_ _Stra_e_ _ _ __'
+    assert Sanitizer('delete').clean(text) == 'Caf Strae   '
+    # Characters the policy allows are kept
+    assert Sanitizer('transliterate', latin1_printable()).clean('Café ™') == 'Café TM'
+    assert Sanitizer().clean('plain') == 'plain'
+    with pytest.raises(ValueError):
+        Sanitizer('shout')
+    with pytest.raises(ValueError):
+        Sanitizer('replace', replacement='�')
+
+
+def assert_sanitized(tmp_path, text, **options):
+    """Byte-level and streaming transforms agree, and the result has no offending cells."""
+    input_path = tmp_path / "input.csv"
+    input_path.write_bytes(text.encode('utf-8'))
+    stats = sanitize_csv(str(input_path), str(tmp_path / "fast.csv"), block_size=16, **options)
+    expected = sanitize_csv_streaming(str(input_path), str(tmp_path / "streaming.csv"), **options)
+    assert stats == expected
+    fast = pd.read_csv(tmp_path / "fast.csv", **READ_OPTIONS)
+    assert fast.equals(pd.read_csv(tmp_path / "streaming.csv", **READ_OPTIONS))
+    assert filter_csv_streaming(str(tmp_path / "fast.csv"), str(tmp_path / "left.csv")).matching_rows == 0
+    return stats
+
+
+def test_byte_level_transform_matches_streaming(tmp_path):
+    stats = assert_sanitized(tmp_path, TRICKY_CSV)
+    assert (stats.total_rows, stats.changed_rows) == (5, 2)
+    assert stats.changed_cells >= 2
+    assert_sanitized(tmp_path, TRICKY_CSV.replace('\n', '\r\n'))
+    assert_sanitized(tmp_path, TRICKY_CSV.rstrip('\n'))
+    assert_sanitized(tmp_path, '\n' + TRICKY_CSV)
+    assert_sanitized(tmp_path, TRICKY_CSV, mode='delete')
+
+
+def test_untouched_records_keep_their_bytes(tmp_path):
+    text = 'Title,Developer,Notes\r\n"Plain",x,"quoted ñ"\r\nCafé,"Studio, Inc",1\r\n'
+    input_path = tmp_path / "input.csv"
+    input_path.write_bytes(text.encode('utf-8'))
+    stats = sanitize_csv(str(input_path), str(tmp_path / "out.csv"))
+    assert (stats.total_rows, stats.changed_rows, stats.changed_cells) == (2, 1, 1)
+    # Only the changed record is re-rendered; Notes is not a checked column
+    assert (tmp_path / "out.csv").read_bytes() == (
+        b'Title,Developer,Notes\r\n"Plain",x,"quoted \xc3\xb1"\r\nCafe,"Studio, Inc",1\r\n'
+    )
+
+    # A clean file is copied unchanged
+    clean = tmp_path / "clean.csv"
+    clean.write_bytes(b'Title,Developer\n"a",b\n')
+    assert sanitize_csv(str(clean), str(tmp_path / "clean_out.csv")).changed_cells == 0
+    assert (tmp_path / "clean_out.csv").read_bytes() == clean.read_bytes()
+
+
+def test_records_pandas_splits_differently(tmp_path):
+    # A literal quote in an unquoted field does not hide later records
+    stats = assert_sanitized(tmp_path, 'Title,Developer\n27" Café monitor,Acme\nplain,ok\nother,row\n')
+    assert (stats.total_rows, stats.changed_rows) == (3, 1)
+    assert (tmp_path / "fast.csv").read_bytes() == (
+        b'Title,Developer\n"27"" Cafe monitor",Acme\nplain,ok\nother,row\n'
+    )
+    # pandas breaks records on a lone carriage return; rows are then taken from pandas
+    stats = assert_sanitized(tmp_path, 'Title,Developer\nCafé,x\ry™,z\nq,r\n')
+    assert (stats.total_rows, stats.changed_rows) == (3, 2)
+
+
+def test_cli_sanitize(tmp_path, capsys):
+    input_path = tmp_path / "games.csv"
+    input_path.write_text("Title,Developer\nCafé,Studio™\nPlain,Plain\n", encoding='utf-8')
+    assert cli.main(['sanitize', str(input_path), '--mode', 'transliterate']) == 0
+    assert '"changed_cells": 2' in capsys.readouterr().out
+    assert (tmp_path / "games_clean.csv").read_text(encoding='utf-8') == "Title,Developer\nCafe,StudioTM\nPlain,Plain\n"
+    assert DEFAULT_POLICY.is_clean((tmp_path / "games_clean.csv").read_text(encoding='utf-8'))
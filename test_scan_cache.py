@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Tests for the persistent scan-result cache.
+"""
+
+import os
+import sys
+
+import numpy as np
+
+# Add the main module to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from csv_bytes import count_dimensions
+from filter_engine import filter_csv_streaming
+from scan_cache import ScanCache
+
+HEADER = 'Title,Developer,Notes\n'
+FIRST_ROWS = 'Plain,Studio,"multi\nline"\nCafé,Studio,x\n\n'
+APPENDED_ROWS = 'Plain,"Tést",y\nok,ok,ok\n'
+
+
+def check_against_streaming(cache, tmp_path, input_path, **options):
+    """Filter through the cache and compare with an uncached streaming run."""
+    cached = cache.filter_csv(str(input_path), str(tmp_path / "cached.csv"), **options)
+    expected = filter_csv_streaming(str(input_path), str(tmp_path / "expected.csv"))
+    assert cached == expected
+    assert (tmp_path / "cached.csv").read_bytes() == (tmp_path / "expected.csv").read_bytes()
+    return cached
+
+
+def test_hit_after_first_scan(tmp_path):
+    cache = ScanCache(str(tmp_path / "cache"))
+    input_path = tmp_path / "input.csv"
+    input_path.write_text(HEADER + FIRST_ROWS, encoding='utf-8')
+
+    check_against_streaming(cache, tmp_path, input_path)
+    assert cache.last_status == 'miss'
+    stats = check_against_streaming(cache, tmp_path, input_path)
+    assert cache.last_status == 'hit'
+    assert (stats.total_rows, stats.matching_rows) == (2, 1)
+
+
+def test_cached_offsets_survive_quoted_line_breaks(tmp_path):
+    data = 'Title,Developer\n,"a\nb"\nCafé,y\n'
+    for two_pass in (False, True):
+        cache = ScanCache(str(tmp_path / f"cache{two_pass}"))
+        input_path = tmp_path / "input.csv"
+        input_path.write_text(data, encoding='utf-8')
+        check_against_streaming(cache, tmp_path, input_path, two_pass=two_pass)
+        check_against_streaming(cache, tmp_path, input_path, two_pass=two_pass)
+        assert cache.last_status == 'hit'
+        assert (tmp_path / "cached.csv").read_text(encoding='utf-8') == 'Title,Developer\nCafé,y\n'
+        # The entry holds the byte offset of the matching record
+        stored = [np.load(entry) for entry in (tmp_path / f"cache{two_pass}").glob('*.npy')]
+        assert [offsets.tolist() for offsets in stored] == [[data.encode('utf-8').index(b'Caf')]]
+
+
+def test_appended_rows_are_scanned_incrementally(tmp_path):
+    for two_pass in (False, True):
+        cache = ScanCache(str(tmp_path / f"cache{two_pass}"))
+        input_path = tmp_path / "input.csv"
+        input_path.write_text(HEADER + FIRST_ROWS, encoding='utf-8')
+        check_against_streaming(cache, tmp_path, input_path, two_pass=two_pass)
+
+        with open(input_path, 'a', encoding='utf-8') as handle:
+            handle.write(APPENDED_ROWS)
+        stats = check_against_streaming(cache, tmp_path, input_path, two_pass=two_pass)
+
+        assert cache.last_status == 'incremental'
+        assert (stats.total_rows, stats.matching_rows) == (4, 2)
+
+
+def test_rewritten_file_is_rescanned(tmp_path):
+    cache = ScanCache(str(tmp_path / "cache"))
+    input_path = tmp_path / "input.csv"
+    input_path.write_text(HEADER + FIRST_ROWS, encoding='utf-8')
+    check_against_streaming(cache, tmp_path, input_path)
+
+    # Same head, different middle, and longer: not an append
+    input_path.write_text(HEADER + FIRST_ROWS.replace('Café', 'Cafe') + APPENDED_ROWS, encoding='utf-8')
+    stats = check_against_streaming(cache, tmp_path, input_path)
+
+    assert cache.last_status == 'miss'
+    assert stats.matching_rows == 1
+
+
+def test_dimensions_are_served_from_scan(tmp_path):
+    cache = ScanCache(str(tmp_path / "cache"))
+    input_path = tmp_path / "input.csv"
+    input_path.write_text(HEADER + FIRST_ROWS, encoding='utf-8')
+    check_against_streaming(cache, tmp_path, input_path)
+
+    assert cache.count_dimensions(str(input_path)) == count_dimensions(str(input_path))
+    assert cache.last_status == 'hit'
+
+    with open(input_path, 'a', encoding='utf-8') as handle:
+        handle.write(APPENDED_ROWS)
+    assert cache.count_dimensions(str(input_path)) == count_dimensions(str(input_path)) == (4, 3)
+    assert cache.last_status == 'incremental'
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ScanCache(str(tmp_path / "cache"), max_bytes=2500)
+    paths = []
+    for index in range(4):
+        input_path = tmp_path / f"input{index}.csv"
+        input_path.write_text(HEADER + FIRST_ROWS, encoding='utf-8')
+        cache.filter_csv(str(input_path), str(tmp_path / "out.csv"))
+        paths.append(input_path)
+
+    total = sum(entry.stat().st_size for entry in (tmp_path / "cache").iterdir())
+    assert total <= 2500
+    cache.filter_csv(str(paths[-1]), str(tmp_path / "out.csv"))
+    assert cache.last_status == 'hit'
+    cache.filter_csv(str(paths[0]), str(tmp_path / "out.csv"))
+    assert cache.last_status == 'miss'
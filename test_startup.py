@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Tests for the light entry paths and the pure-bytes scan.
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+# Add the main module to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import cli
+from byte_blocks import scan_bytes
+from char_policy import parse_policy
+from filter_engine import filter_csv_streaming
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+HEAVY_MODULES = ['pandas', 'numpy', 'tkinter']
+
+
+def loaded_modules(code: str) -> list:
+    """Heavy modules imported by ``code`` run in a fresh interpreter."""
+    completed = subprocess.run(
+        [sys.executable, '-c', f"{code}\nimport json\nprint(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    return json.loads(completed.stdout.splitlines()[-1])
+
+
+@pytest.mark.parametrize('command, expected', [
+    ("['--help']", []),
+    ("['dimensions', PATH]", []),
+    ("['scan', PATH]", ['numpy']),
+])
+def test_light_paths_skip_pandas_and_tk(tmp_path, command, expected):
+    path = tmp_path / "input.csv"
+    path.write_text("Title,Developer\nCafé,x\n", encoding='utf-8')
+    code = f"import sys, main\nPATH = {str(path)!r}\ntry:\n    main.main({command})\nexcept SystemExit:\n    pass"
+    assert loaded_modules(code) == expected
+
+
+def test_main_forwards_gui_names():
+    assert loaded_modules("import sys, main") == []
+    assert loaded_modules("import sys\nfrom main import CSVFilterApp") == HEAVY_MODULES
+
+
+def test_scan_matches_filter_on_every_column(tmp_path):
+    path = tmp_path / "input.csv"
+    path.write_bytes(
+        b'\n  \nTitle,Developer,Notes\n'
+        b'Plain,A,ok\n"Multi\nline \xc3\xa9",B,ok\n\n \t\nC,D,"tab\x0b"\n'
+        + b''.join(b'Game %d,Studio,x\n' % index for index in range(200))
+        + b'Last,\xe2\x84\xa2,end'
+    )
+    expected = filter_csv_streaming(str(path), str(tmp_path / "out.csv"), ['Title', 'Developer', 'Notes'])
+    for block_size in (8, 1 << 20):
+        assert scan_bytes(str(path), block_size=block_size) == (expected.total_rows, expected.matching_rows) == (204, 3)
+    # Non-ASCII bytes always count, so under latin1 the scan is an upper bound
+    assert scan_bytes(str(path), parse_policy('latin1')) == (204, 3)
+
+
+def test_cli_scan(tmp_path, capsys):
+    path = tmp_path / "input.csv"
+    path.write_text("Title\nCafé\nGame\n", encoding='utf-8')
+    assert cli.main(['scan', str(path), '--deny', 'G']) == 0
+    result = json.loads(capsys.readouterr().out)
+    assert (result['rows'], result['dirty_rows']) == (2, 2)
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Tests for memoised verdicts of low-cardinality columns.
+"""
+
+import io
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add the main module to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import cli
+from char_policy import DEFAULT_POLICY
+from column_rules import ColumnSelection, column_mask, parse_rules
+from filter_engine import READ_OPTIONS, filter_csv_streaming
+from value_memo import MIN_ROWS, MemoStats, ValueMemo, describe_memo
+
+DEVELOPERS = ['Valve', 'Ubisoft', 'Square Enix', 'Bandai Namco', 'Café Studio', 'Nintendo']
+
+
+def make_csv(rows: int) -> str:
+    """Repetitive Developer column next to a unique Title column."""
+    frame = pd.DataFrame({
+        'Title': [f"Game {index}" + ('™' if index % 97 == 0 else '') for index in range(rows)],
+        'Developer': [DEVELOPERS[index % len(DEVELOPERS)] for index in range(rows)],
+    })
+    return frame.to_csv(index=False)
+
+
+def read(text: str) -> pd.DataFrame:
+    return pd.read_csv(io.StringIO(text), **READ_OPTIONS)
+
+
+@pytest.mark.parametrize('mode', ['auto', 'on', 'off'])
+def test_modes_agree_with_direct_search(mode):
+    frame = read(make_csv(3 * MIN_ROWS))
+    expected = column_mask(frame['Title'], DEFAULT_POLICY) | column_mask(frame['Developer'], DEFAULT_POLICY)
+    selection = parse_rules('Title,Developer', memoize=mode).resolve(frame.columns.tolist())
+    assert selection.mask(frame).equals(expected)
+    stats = selection.memo_stats()
+    if mode == 'off':
+        assert stats['Developer'].values == 0 and stats['Developer'].direct == len(frame)
+    else:
+        assert stats['Developer'].values == len(frame)
+        assert stats['Developer'].distinct == len(DEVELOPERS)
+    # Auto mode stops memoising the unique titles after the first frame
+    assert selection.mask(frame).equals(expected)
+    titles = selection.memo_stats()['Title']
+    assert (titles.values, titles.direct) == {
+        'auto': (len(frame), len(frame)), 'on': (2 * len(frame), 0), 'off': (0, 2 * len(frame))
+    }[mode]
+
+
+def test_verdicts_are_reused_across_chunks():
+    selection = ColumnSelection({'Developer': DEFAULT_POLICY}, memoize='on')
+    frame = read(make_csv(600))
+    for _ in range(3):
+        assert selection.mask(frame).sum() == 100  # Every 'Café Studio' row
+    stats = selection.memo_stats()['Developer']
+    assert (stats.values, stats.distinct, stats.checked, stats.hits) == (1800, 18, 6, 12)
+    assert stats.hit_rate == pytest.approx(2 / 3)
+    assert 'Developer: 18 distinct values in 1,800 rows' in describe_memo({'Developer': stats})
+
+
+def test_all_combination_and_missing_values():
+    frame = pd.DataFrame({'a': ['é', 'x', None, 'é'] * 500, 'b': ['é', 'é', 'é', 'x'] * 500}, dtype=object)
+    selection = ColumnSelection({'a': DEFAULT_POLICY, 'b': DEFAULT_POLICY}, 'all', memoize='on')
+    assert selection.mask(frame).tolist()[:4] == [True, False, False, False]
+
+
+def test_auto_mode_switches_off_for_unique_values():
+    memo = ValueMemo('auto')
+    assert not memo.wants(MIN_ROWS - 1)
+    values = pd.Series([str(index) for index in range(MIN_ROWS)])
+    lookup = memo.lookup(values)
+    memo.resolve(lookup, np.zeros(len(lookup.unknown), dtype=bool))
+    assert not memo.wants(MIN_ROWS)
+    with pytest.raises(ValueError):
+        ValueMemo('sometimes')
+
+
+def test_stats_merge_and_engine_totals(tmp_path):
+    input_path = tmp_path / "input.csv"
+    input_path.write_text(make_csv(5 * MIN_ROWS), encoding='utf-8')
+    stats = filter_csv_streaming(str(input_path), str(tmp_path / "out.csv"), chunksize=MIN_ROWS)
+    developer = stats.memo['Developer']
+    assert developer.values == 5 * MIN_ROWS
+    assert developer.checked == len(DEVELOPERS)
+    assert developer.hits == 4 * len(DEVELOPERS)
+
+    total = MemoStats()
+    total.merge(developer)
+    total.merge(developer)
+    assert total.to_dict()['hits'] == 8 * len(DEVELOPERS)
+
+
+def test_cli_reports_memo(tmp_path, capsys):
+    input_path = tmp_path / "input.csv"
+    input_path.write_text(make_csv(2 * MIN_ROWS), encoding='utf-8')
+    assert cli.main(['filter', str(input_path), '-j', '1', '--two-pass', '--memo', 'on']) == 0
+    result = json.loads(capsys.readouterr().out)
+    assert result['memo']['Developer']['distinct'] == len(DEVELOPERS)
+    assert result['memo']['Title']['distinct'] == 2 * MIN_ROWS
+    # 'Café Studio' rows and titles ending in a trademark sign
+    assert result['matching_rows'] == len(read(make_csv(2 * MIN_ROWS)).query(
+        "Developer == 'Café Studio' or Title.str.endswith('™')", engine='python'
+    ))
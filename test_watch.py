@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Tests for the watch-folder daemon.
+"""
+
+import asyncio
+import gzip
+import json
+import os
+import sys
+import time
+
+import pandas as pd
+
+# Add the main module to the path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import cli
+from watch import WatchFolder
+
+CSV = "Title,Developer\nPlain,Studio\nCafé,Studio\nGame,Ubisoft\n"
+
+
+def make_dirs(tmp_path):
+    inbox, outbox = tmp_path / "inbox", tmp_path / "outbox"
+    inbox.mkdir()
+    return str(inbox), str(outbox)
+
+
+def test_waits_for_the_size_to_settle(tmp_path):
+    inbox, outbox = make_dirs(tmp_path)
+    path = os.path.join(inbox, "drop.csv")
+    with open(path, 'w', encoding='utf-8') as handle:
+        handle.write("Title,Developer\n")
+    daemon = WatchFolder(inbox, outbox, settle_seconds=2.0)
+    assert daemon.poll(100.0) == ([], 2.0)
+    with open(path, 'a', encoding='utf-8') as handle:
+        handle.write("Café,Studio\n")
+    # Growing restarts the wait
+    assert daemon.poll(101.5) == ([], 2.0)
+    ready, next_check = daemon.poll(103.5)
+    assert [item.input for item in ready] == [path] and next_check is None
+    assert ready[0].output == os.path.join(outbox, "drop_filtered.csv")
+    # Hidden and non-CSV files are never picked up
+    for name in (".drop.csv", "notes.txt"):
+        open(os.path.join(inbox, name), 'w').close()
+    assert [item.input for item in daemon.poll(110.0)[0]] == [path]
+
+
+def test_once_filters_and_archives(tmp_path):
+    inbox, outbox = make_dirs(tmp_path)
+    with open(os.path.join(inbox, "good.csv"), 'w', encoding='utf-8') as handle:
+        handle.write(CSV)
+    with open(os.path.join(inbox, "bad.csv"), 'w', encoding='utf-8') as handle:
+        handle.write("Name\nCafé\n")
+    daemon = WatchFolder(inbox, outbox, workers=2, poll_interval=0.05, settle_seconds=0.1, once=True)
+    totals = asyncio.run(daemon.run())
+
+    assert (totals['files'], totals['succeeded'], totals['failed']) == (2, 1, 1)
+    assert pd.read_csv(os.path.join(outbox, "good_filtered.csv"))['Title'].tolist() == ['Café']
+    with open(os.path.join(outbox, "good_filtered_stats.json"), encoding='utf-8') as handle:
+        stats = json.load(handle)
+    assert (stats['total_rows'], stats['matching_rows']) == (3, 1)
+    assert 'scan' in stats['stages']
+    with open(os.path.join(outbox, "bad_filtered_stats.json"), encoding='utf-8') as handle:
+        assert 'Developer' in json.load(handle)['error']
+    assert not os.path.exists(os.path.join(outbox, "bad_filtered.csv"))
+    assert sorted(os.listdir(inbox)) == ['failed', 'processed']
+    assert os.listdir(os.path.join(inbox, 'processed')) == ['good.csv']
+
+
+def test_backpressure_and_graceful_stop(tmp_path):
+    inbox, outbox = make_dirs(tmp_path)
+    for index in range(5):
+        with open(os.path.join(inbox, f"drop{index}.csv"), 'w', encoding='utf-8') as handle:
+            handle.write(CSV)
+    peak = 0
+
+    def on_result(result):
+        # Stopping after the first file drains what is running and leaves the rest
+        daemon.stop()
+
+    async def watch():
+        nonlocal peak
+        task = asyncio.ensure_future(daemon.run())
+        while not task.done():
+            peak = max(peak, daemon.in_flight)
+            await asyncio.sleep(0.001)
+        return await task
+
+    daemon = WatchFolder(
+        inbox, outbox, workers=1, queue_size=1, poll_interval=0.05, settle_seconds=0.0, on_result=on_result
+    )
+    totals = asyncio.run(watch())
+    assert peak == 2
+    assert totals['files'] == totals['succeeded'] == 1
+    assert daemon.in_flight == 0
+    assert len([name for name in os.listdir(inbox) if name.endswith('.csv')]) == 4
+
+
+def test_picks_up_files_dropped_while_running(tmp_path):
+    inbox, outbox = make_dirs(tmp_path)
+    results = []
+    dropped = finished = 0.0
+
+    def on_result(result):
+        nonlocal finished
+        finished = time.monotonic()
+        results.append(result)
+        daemon.stop()
+
+    async def drop_then_wait():
+        nonlocal dropped
+        task = asyncio.ensure_future(daemon.run())
+        await asyncio.sleep(0.2)
+        # Written under a temporary name and renamed in, as upstream jobs should
+        temp_path = os.path.join(inbox, ".incoming")
+        with open(temp_path, 'w', encoding='utf-8') as handle:
+            handle.write(CSV)
+        os.replace(temp_path, os.path.join(inbox, "late.csv"))
+        dropped = time.monotonic()
+        return await task
+
+    daemon = WatchFolder(
+        inbox, outbox, workers=1, poll_interval=5.0, settle_seconds=0.2, on_result=on_result
+    )
+    asyncio.run(asyncio.wait_for(drop_then_wait(), 30))
+    assert [os.path.basename(result.input) for result in results] == ['late.csv']
+    assert results[0].matching_rows == 1
+    if daemon.inotify:
+        # Woken by the rename and the settle timer, not by the 5 s poll
+        assert finished - dropped < 4.0
+
+
+def test_cli_watch_once(tmp_path, capsys):
+    inbox, outbox = make_dirs(tmp_path)
+    with open(os.path.join(inbox, "drop.csv.gz"), 'wb') as handle:
+        handle.write(gzip.compress(CSV.encode('utf-8')))
+    status = cli.main(['watch', inbox, '--output-dir', outbox, '-j', '1', '--settle', '0', '--once', '--keep-inputs'])
+    assert status == 0
+    lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert lines[0]['matching_rows'] == 1 and lines[-1]['succeeded'] == 1
+    assert os.listdir(inbox) == ['drop.csv.gz']
@@ -0,0 +1,147 @@
+"""
+Memoised verdicts for the distinct values of low-cardinality columns.
+
+Columns such as ``Developer`` repeat a few thousand values across millions
+of rows. A ValueMemo factorises each chunk of such a column, searches only
+the distinct values it has not seen before and broadcasts the verdicts back
+to the rows through the factorisation codes. Verdicts are kept across
+chunks, so later chunks are mostly answered from the memo.
+
+In ``auto`` mode a column is memoised while its chunks have few distinct
+values per row (MAX_DISTINCT_RATIO); a column whose chunks turn out to be
+mostly unique goes back to being searched directly.
+"""
+
+from dataclasses import asdict, dataclass
+from typing import Dict, List, NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from common import DEFAULT_MEMO_MODE, MEMO_MODES
+
+# Frames with fewer rows are searched directly in auto mode; their share of
+# distinct values says little about the column
+MIN_ROWS = 1_000
+
+# Auto mode keeps memoising while a chunk has at most this many distinct
+# values per row; above it factorising costs more than it saves
+MAX_DISTINCT_RATIO = 0.05
+
+# Verdicts kept per column before the memo is reset
+MAX_MEMO_VALUES = 200_000
+
+
+@dataclass
+class MemoStats:
+    """Counters of one memoised column."""
+    values: int = 0  # Values answered through the memo
+    distinct: int = 0  # Distinct values per chunk, summed over the chunks
+    checked: int = 0  # Distinct values that had to be searched
+    direct: int = 0  # Values searched directly while the memo was off
+
+    @property
+    def hits(self) -> int:
+        """Distinct values answered from earlier chunks."""
+        return self.distinct - self.checked
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of the distinct values answered from the memo."""
+        return self.hits / self.distinct if self.distinct else 0.0
+
+    @property
+    def distinct_ratio(self) -> float:
+        """Distinct values per memoised value (lower means more repetition)."""
+        return self.distinct / self.values if self.values else 0.0
+
+    def merge(self, other: 'MemoStats') -> None:
+        """Add the counters of ``other``, e.g. from another worker."""
+        self.values += other.values
+        self.distinct += other.distinct
+        self.checked += other.checked
+        self.direct += other.direct
+
+    def to_dict(self) -> Dict:
+        return dict(
+            asdict(self),
+            hits=self.hits,
+            hit_rate=round(self.hit_rate, 4),
+            distinct_ratio=round(self.distinct_ratio, 6),
+        )
+
+
+class MemoLookup(NamedTuple):
+    """A factorised frame column, waiting for the verdicts of its unseen values."""
+    codes: np.ndarray  # Row -> index into the distinct values (-1 for missing)
+    verdicts: np.ndarray  # Per distinct value: 1 offending, 0 clean, -1 unknown
+    unknown_keys: List  # The unknown distinct values, as memo keys
+    unknown: pd.Series  # The same values, to be searched
+
+
+class ValueMemo:
+    """
+    Verdicts for the distinct values of one column, kept across chunks.
+
+    Args:
+        mode: One of MEMO_MODES
+
+    Raises:
+        ValueError: If ``mode`` is unknown
+    """
+
+    def __init__(self, mode: str = DEFAULT_MEMO_MODE):
+        if mode not in MEMO_MODES:
+            raise ValueError(f"Unknown memo mode: {mode!r} (choose from {', '.join(MEMO_MODES)})")
+        self.mode = mode
+        self.enabled = mode != 'off'
+        self.verdicts: Dict[object, bool] = {}
+        self.stats = MemoStats()
+
+    def wants(self, rows: int) -> bool:
+        """True if a frame of ``rows`` rows should go through the memo."""
+        if self.mode != 'auto':
+            return self.enabled
+        return self.enabled and rows >= MIN_ROWS
+
+    def lookup(self, values: pd.Series) -> MemoLookup:
+        """Factorise ``values`` and look their distinct values up in the memo."""
+        codes, uniques = pd.factorize(values)
+        keys = uniques.tolist()
+        verdicts = np.fromiter((self.verdicts.get(key, -1) for key in keys), dtype=np.int8, count=len(keys))
+        unknown = verdicts < 0
+        if self.mode == 'auto':
+            self.enabled = len(keys) <= len(values) * MAX_DISTINCT_RATIO
+        self.stats.values += len(values)
+        self.stats.distinct += len(keys)
+        return MemoLookup(
+            codes, verdicts, [key for key, missing in zip(keys, unknown) if missing], pd.Series(uniques[unknown])
+        )
+
+    def resolve(self, lookup: MemoLookup, flags: np.ndarray) -> np.ndarray:
+        """
+        Record the verdicts of the unknown values and broadcast all verdicts to the rows.
+
+        Args:
+            lookup: Result of lookup
+            flags: Verdicts of ``lookup.unknown``, in order
+
+        Returns:
+            np.ndarray: One flag per row of the looked-up values
+        """
+        verdicts = lookup.verdicts.copy()
+        verdicts[verdicts < 0] = flags
+        if len(self.verdicts) + len(flags) > MAX_MEMO_VALUES:
+            self.verdicts.clear()
+        self.verdicts.update(zip(lookup.unknown_keys, flags.tolist()))
+        self.stats.checked += len(flags)
+        # Missing values (code -1) pick up the appended False
+        return np.append(verdicts.astype(bool), False)[lookup.codes]
+
+
+def describe_memo(stats: Dict[str, MemoStats]) -> str:
+    """One line per memoised column, e.g. ``Developer: 1,204 distinct values in 1,000,000 rows (93.1% reused)``."""
+    return '\n'.join(
+        f"{column}: {memo.distinct:,} distinct values in {memo.values:,} rows ({memo.hit_rate:.1%} reused)"
+        for column, memo in stats.items() if memo.values
+    )
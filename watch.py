@@ -0,0 +1,376 @@
+"""
+Watch-folder daemon that filters CSV files as they land in an inbox.
+
+An asyncio loop lists the inbox (top level only) whenever inotify reports a
+change, on Linux, and at least every ``poll_interval`` seconds everywhere
+else. A file is picked up once its size and modification time have held
+still for ``settle_seconds``, so files that are still being copied in are
+left alone. Each file is then filtered by the byte-level engine of
+byte_scan, one file per process of a pool with ``workers`` processes. The
+matching rows go to ``<outbox>/<stem>_filtered.<format>`` and the stage
+timings to a ``<stem>_filtered_stats.json`` sidecar (or the error, if the
+file failed).
+Outputs are written under a temporary name and renamed when complete, so
+the outbox never holds a partial file.
+
+Backpressure: at most ``workers + queue_size`` files are claimed at a time.
+Further files stay untouched in the inbox until a slot frees up.
+
+Finished inputs are moved to ``<inbox>/processed`` or ``<inbox>/failed``, so
+a restarted daemon does not process them again. A file dropped again under
+the same name replaces the earlier output. A file that changed while it was
+being filtered stays in the inbox and is filtered again.
+
+Shutdown (stop(), SIGINT or SIGTERM): no new files are claimed, running jobs
+finish and are recorded, and files that were queued but not started stay in
+the inbox for the next run.
+"""
+
+import asyncio
+import ctypes
+import ctypes.util
+import json
+import os
+import signal
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from batch import INPUT_SUFFIXES, BatchItem, FileResult, summarize
+from byte_scan import filter_csv_bytes
+from char_policy import DEFAULT_POLICY, CharPolicy
+from column_rules import ColumnRules, Columns, require_columns
+from common import DEFAULT_CHUNKSIZE, DEFAULT_COLUMNS, WATCH_POLL_SECONDS, WATCH_SETTLE_SECONDS, default_worker_count
+from filter_engine import read_header
+from formats import output_path_for, strip_input_extension
+from run_stats import stats_path_for
+
+# Subdirectories of the inbox that finished inputs are moved to
+PROCESSED_DIR = 'processed'
+FAILED_DIR = 'failed'
+
+# Appended to an output while it is being written
+PARTIAL_SUFFIX = '.partial'
+
+# inotify_init1 flags and the events that wake the daemon (see inotify(7))
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+WATCH_EVENTS = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+# (size, mtime_ns) of an input, compared between listings
+FileKey = Tuple[int, int]
+
+
+def open_inotify(directory: str) -> Optional[int]:
+    """
+    Watch ``directory`` with inotify.
+
+    Returns:
+        Optional[int]: A non-blocking file descriptor that becomes readable
+        when a file is created, closed after writing or moved into the
+        directory, or None where inotify is not available (then only polling
+        is used)
+    """
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+    except (OSError, AttributeError):
+        return None
+    if fd < 0:
+        return None
+    if libc.inotify_add_watch(fd, os.fsencode(directory), WATCH_EVENTS) < 0:
+        os.close(fd)
+        return None
+    return fd
+
+
+def filter_watched_file(
+    item: BatchItem, columns: Columns, chunksize: int, policy: CharPolicy, output_format: str
+) -> FileResult:
+    """
+    Filter one inbox file in a worker process and write its stats sidecar; errors are captured, not raised.
+
+    The checks are those of the GUI; like batch.filter_item, the file is
+    filtered by the byte-level engine in this process.
+    The sidecar holds the input and output paths plus FilterStats.to_dict,
+    or the error.
+    """
+    result = FileResult(item.input, item.output, item.size, item.mtime_ns)
+    sidecar = {'input': item.input, 'output': item.output}
+    partial_path = item.output + PARTIAL_SUFFIX
+    start = time.perf_counter()
+    try:
+        selection = require_columns(read_header(item.input), columns, policy)
+        stats = filter_csv_bytes(item.input, partial_path, selection, chunksize, output_format=output_format)
+        os.replace(partial_path, item.output)
+        result.total_rows = stats.total_rows
+        result.matching_rows = stats.matching_rows
+        sidecar.update(stats.to_dict())
+    except Exception as e:
+        result.error = sidecar['error'] = f"{type(e).__name__}: {e}"
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+    result.seconds = round(time.perf_counter() - start, 6)
+    with open(stats_path_for(item.output), 'w', encoding='utf-8') as handle:
+        json.dump(sidecar, handle, indent=2)
+    return result
+
+
+class WatchFolder:
+    """
+    Filter the CSV files that land in ``inbox`` into ``outbox`` until stopped.
+
+    Args:
+        inbox: Directory to watch (files directly inside it only)
+        outbox: Directory for the outputs and their stats sidecars
+        columns: Names of the columns to check, or ColumnRules resolved
+            against each file's header
+        policy: Characters considered allowed in columns without a policy of their own
+        workers: Files filtered at once, each in its own process (0 uses every CPU)
+        queue_size: Files claimed and waiting for a worker (0 means ``workers``)
+        chunksize: Rows per chunk where a file is parsed in chunks
+        output_format: Format of the outputs (see formats.OUTPUT_FORMATS)
+        poll_interval: Longest time between two listings of the inbox
+        settle_seconds: How long a file must stay unchanged before it is picked up
+        use_inotify: Wake up on inotify events where available, not only on the poll interval
+        keep_inputs: Leave finished inputs in the inbox instead of moving them
+            (they are filtered again after a restart)
+        once: Stop by itself as soon as the inbox holds no more files to filter
+        on_result: Called in the event loop with each file's result
+    """
+
+    def __init__(
+        self,
+        inbox: str,
+        outbox: str,
+        columns: Columns = DEFAULT_COLUMNS,
+        policy: CharPolicy = DEFAULT_POLICY,
+        workers: int = 0,
+        queue_size: int = 0,
+        chunksize: int = DEFAULT_CHUNKSIZE,
+        output_format: str = 'csv',
+        poll_interval: float = WATCH_POLL_SECONDS,
+        settle_seconds: float = WATCH_SETTLE_SECONDS,
+        use_inotify: bool = True,
+        keep_inputs: bool = False,
+        once: bool = False,
+        on_result: Optional[Callable[[FileResult], None]] = None,
+    ):
+        self.inbox = inbox
+        self.outbox = outbox
+        self.columns = columns if isinstance(columns, ColumnRules) else list(columns)
+        self.policy = policy
+        self.workers = workers or default_worker_count()
+        self.capacity = self.workers + (queue_size or self.workers)
+        self.chunksize = chunksize
+        self.output_format = output_format
+        self.poll_interval = poll_interval
+        self.settle_seconds = settle_seconds
+        self.use_inotify = use_inotify
+        self.keep_inputs = keep_inputs
+        self.once = once
+        self.on_result = on_result
+        self.results: List[FileResult] = []
+        self.inotify = False  # Whether inotify was used, set by run
+        self._claimed: Set[str] = set()  # Queued or running
+        self._settling: Dict[str, Tuple[FileKey, float]] = {}  # Path -> key and when it was first seen
+        self._finished: Dict[str, FileKey] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stopping: Optional[asyncio.Event] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def in_flight(self) -> int:
+        """Files claimed from the inbox: queued or running."""
+        return len(self._claimed)
+
+    def output_for(self, input_path: str) -> str:
+        """``inbox/a.csv.gz`` -> ``outbox/a_filtered.csv`` (or the extension of the output format)."""
+        stem = strip_input_extension(os.path.basename(input_path))
+        return output_path_for(os.path.join(self.outbox, f"{stem}_filtered"), self.output_format)
+
+    def list_inbox(self) -> Dict[str, FileKey]:
+        """The CSV files directly inside the inbox and their keys; hidden files are ignored."""
+        files = {}
+        with os.scandir(self.inbox) as entries:
+            for entry in entries:
+                if entry.name.startswith('.') or not entry.name.lower().endswith(INPUT_SUFFIXES):
+                    continue
+                try:
+                    if entry.is_file():
+                        stat = entry.stat()
+                        files[entry.path] = (stat.st_size, stat.st_mtime_ns)
+                except FileNotFoundError:
+                    continue  # Moved away while listing
+        return files
+
+    def poll(self, now: float) -> Tuple[List[BatchItem], Optional[float]]:
+        """
+        List the inbox and find the files that have settled.
+
+        Args:
+            now: ``time.monotonic()``
+
+        Returns:
+            Tuple[List[BatchItem], Optional[float]]: The settled files not
+            claimed yet, oldest first, and the seconds until the next
+            unsettled file may settle (None if there is none)
+        """
+        files = self.list_inbox()
+        ready = []
+        next_check = None
+        for path in list(self._settling):
+            if path not in files:
+                del self._settling[path]
+        for path, key in files.items():
+            if path in self._claimed or self._finished.get(path) == key:
+                self._settling.pop(path, None)
+                continue
+            seen = self._settling.get(path)
+            if seen is None or seen[0] != key:
+                self._settling[path] = seen = (key, now)
+            remaining = self.settle_seconds - (now - seen[1])
+            if remaining <= 0:
+                ready.append(BatchItem(path, self.output_for(path), *key))
+            else:
+                next_check = remaining if next_check is None else min(next_check, remaining)
+        ready.sort(key=lambda item: item.mtime_ns)
+        return ready, next_check
+
+    def stop(self) -> None:
+        """Stop claiming files and let running jobs finish; safe to call from any thread once run has started."""
+        if self._loop is None:
+            return
+        try:
+            in_loop = asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            in_loop = False
+        if in_loop:
+            self._request_stop()  # Before the worker that called on_result takes the next file
+        else:
+            self._loop.call_soon_threadsafe(self._request_stop)
+
+    def _request_stop(self) -> None:
+        self._stopping.set()
+        self._wakeup.set()
+
+    async def run(self, handle_signals: bool = False) -> Dict:
+        """
+        Watch the inbox until stop() is called (or, with ``once``, until it is empty).
+
+        Args:
+            handle_signals: Stop gracefully on SIGINT and SIGTERM (main thread only)
+
+        Returns:
+            Dict: Totals over the files filtered (see batch.summarize)
+        """
+        self._loop = loop = asyncio.get_running_loop()
+        self._stopping = asyncio.Event()
+        self._wakeup = asyncio.Event()
+        os.makedirs(self.outbox, exist_ok=True)
+        started = time.perf_counter()
+
+        inotify_fd = open_inotify(self.inbox) if self.use_inotify else None
+        if inotify_fd is not None:
+            loop.add_reader(inotify_fd, self._drain_inotify, inotify_fd)
+        self.inotify = inotify_fd is not None
+        signals = []
+        if handle_signals:
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                try:
+                    loop.add_signal_handler(signum, self._request_stop)
+                    signals.append(signum)
+                except (NotImplementedError, RuntimeError):  # Windows, or not the main thread
+                    pass
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.capacity)
+        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        tasks = [loop.create_task(self._work(queue)) for _ in range(self.workers)]
+        try:
+            while not self._stopping.is_set():
+                ready, next_check = self.poll(time.monotonic())
+                for item in ready[:self.capacity - len(self._claimed)]:
+                    self._claimed.add(item.input)
+                    queue.put_nowait(item)
+                if self.once and not self._claimed and not self._settling:
+                    break
+                timeout = self.poll_interval if next_check is None else min(self.poll_interval, next_check)
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+        finally:
+            self._stopping.set()
+            for _ in tasks:
+                await queue.put(None)
+            await asyncio.gather(*tasks)
+            self._executor.shutdown(wait=True)
+            if inotify_fd is not None:
+                loop.remove_reader(inotify_fd)
+                os.close(inotify_fd)
+            for signum in signals:
+                loop.remove_signal_handler(signum)
+        return summarize(self.results, time.perf_counter() - started)
+
+    def _drain_inotify(self, fd: int) -> None:
+        """Read the pending events; only the fact that something changed matters."""
+        try:
+            while os.read(fd, 64 * 1024):
+                pass
+        except BlockingIOError:
+            pass
+        self._wakeup.set()
+
+    async def _work(self, queue: asyncio.Queue) -> None:
+        """Filter queued files one at a time until a None arrives."""
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            if self._stopping.is_set():
+                self._claimed.discard(item.input)  # Not started: left in the inbox for the next run
+                continue
+            executor = self._executor
+            try:
+                result = await loop.run_in_executor(
+                    executor, filter_watched_file, item, self.columns, self.chunksize, self.policy, self.output_format
+                )
+            except BrokenProcessPool as e:
+                # A worker died (e.g. killed for memory); later files get a fresh pool
+                if self._executor is executor:
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                    executor.shutdown(wait=False)
+                result = FileResult(item.input, item.output, item.size, item.mtime_ns, error=f"{type(e).__name__}: {e}")
+            self._complete(item, result)
+            self._wakeup.set()
+
+    def _complete(self, item: BatchItem, result: FileResult) -> None:
+        """Record a finished file and move its input out of the inbox, unless it changed meanwhile."""
+        self._claimed.discard(item.input)
+        self.results.append(result)
+        try:
+            stat = os.stat(item.input)
+            unchanged = (stat.st_size, stat.st_mtime_ns) == (item.size, item.mtime_ns)
+        except OSError:
+            unchanged = False
+        if unchanged:
+            self._finished[item.input] = (item.size, item.mtime_ns)
+            if not self.keep_inputs:
+                target_dir = os.path.join(self.inbox, FAILED_DIR if result.error else PROCESSED_DIR)
+                try:
+                    os.makedirs(target_dir, exist_ok=True)
+                    os.replace(item.input, os.path.join(target_dir, os.path.basename(item.input)))
+                except OSError:
+                    pass  # Still recorded as finished, so it is not filtered again in this run
+        if self.on_result is not None:
+            self.on_result(result)